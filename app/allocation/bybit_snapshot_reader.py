@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from decimal import Decimal
@@ -28,11 +29,10 @@ from app.allocation.bybit_snapshot_completeness import (
     SnapshotEndpointMatrix,
 )
 from app.bybit.client import BybitApiError, BybitV5Client
-from app.bybit.instruments import (
-    BybitInstrumentInfo,
-    query_instrument_info,
-)
+from app.bybit.instrument_cache import cached_instrument_info
+from app.bybit.instruments import BybitInstrumentInfo
 from app.bybit.credentials import get_active_fund_bybit_client
+from app.config import settings
 from app.models import Fund
 
 
@@ -190,6 +190,21 @@ def _required_call(
     return result
 
 
+def _defer(
+    executor: Executor | None,
+    call: Callable[[], Any],
+) -> Callable[[], Any]:
+    """
+    Serial mode returns the call itself. Concurrent mode submits it now
+    and returns future.result, so _required_call still records success
+    or failure when the result is consumed, in the serial order.
+    """
+    if executor is None:
+        return call
+
+    return executor.submit(call).result
+
+
 def _is_noncritical_earn_error(exc: Exception) -> bool:
     text = _bybit_error_text(exc)
 
@@ -214,14 +229,11 @@ def _is_noncritical_earn_error(exc: Exception) -> bool:
     return any(pattern in text for pattern in patterns)
 
 
-def _safe_earn_call(
+def _earn_call(
     client: BybitV5Client,
     *,
     category: str,
-    matrix: SnapshotEndpointMatrix,
-) -> list[dict[str, Any]]:
-    endpoint_key = f"earn:{category}"
-
+) -> Callable[[], list[dict[str, Any]]]:
     def call() -> list[dict[str, Any]]:
         payload = client.get(
             "/v5/earn/position",
@@ -236,10 +248,22 @@ def _safe_earn_call(
             "data",
         )
 
+    return call
+
+
+def _safe_earn_call(
+    client: BybitV5Client,
+    *,
+    category: str,
+    matrix: SnapshotEndpointMatrix,
+    call: Callable[[], list[dict[str, Any]]] | None = None,
+) -> list[dict[str, Any]]:
+    endpoint_key = f"earn:{category}"
+
     return _required_call(
         matrix=matrix,
         endpoint_key=endpoint_key,
-        call=call,
+        call=call or _earn_call(client, category=category),
         default=[],
     )
 
@@ -357,110 +381,172 @@ def _tag_position_rows(
     return out
 
 
+def _position_endpoint_specs(
+    *,
+    inverse_coins: list[str],
+    option_coins: list[str],
+) -> list[tuple[str, dict[str, Any], str]]:
+    specs: list[tuple[str, dict[str, Any], str]] = [
+        (
+            "positions:linear:USDT",
+            {
+                "category": "linear",
+                "settleCoin": "USDT",
+            },
+            "linear",
+        ),
+        (
+            "positions:linear:USDC",
+            {
+                "category": "linear",
+                "settleCoin": "USDC",
+            },
+            "linear",
+        ),
+    ]
+
+    for coin in inverse_coins:
+        specs.append(
+            (
+                f"positions:inverse:{coin}",
+                {
+                    "category": "inverse",
+                    "settleCoin": coin,
+                },
+                "inverse",
+            )
+        )
+
+    for coin in option_coins:
+        specs.append(
+            (
+                f"positions:option:{coin}",
+                {
+                    "category": "option",
+                    "baseCoin": coin,
+                },
+                "option",
+            )
+        )
+
+    return specs
+
+
+def _position_calls(
+    client: BybitV5Client,
+    *,
+    specs: list[tuple[str, dict[str, Any], str]],
+    executor: Executor | None,
+) -> list[Callable[[], Any]]:
+    return [
+        _defer(
+            executor,
+            lambda params=params: _paginate_get(
+                client,
+                "/v5/position/list",
+                params,
+            ),
+        )
+        for _, params, _ in specs
+    ]
+
+
 def _fetch_positions(
     client: BybitV5Client,
     *,
     inverse_coins: list[str],
     option_coins: list[str],
     matrix: SnapshotEndpointMatrix,
+    executor: Executor | None = None,
+    calls: list[Callable[[], Any]] | None = None,
 ) -> tuple[
     list[dict[str, Any]],
     list[dict[str, Any]],
     list[dict[str, Any]],
     list[dict[str, Any]],
 ]:
-    def fetch_rows(
-        *,
-        endpoint_key: str,
-        params: dict[str, Any],
-        category: str,
-    ) -> list[dict[str, Any]]:
+    specs = _position_endpoint_specs(
+        inverse_coins=inverse_coins,
+        option_coins=option_coins,
+    )
+
+    if calls is None:
+        calls = _position_calls(
+            client,
+            specs=specs,
+            executor=executor,
+        )
+
+    by_category: dict[str, list[dict[str, Any]]] = {
+        "linear:USDT": [],
+        "linear:USDC": [],
+        "inverse": [],
+        "option": [],
+    }
+
+    for (endpoint_key, params, category), call in zip(specs, calls):
         rows = _required_call(
             matrix=matrix,
             endpoint_key=endpoint_key,
-            call=lambda: _paginate_get(
-                client,
-                "/v5/position/list",
-                params,
-            ),
+            call=call,
             default=[],
         )
 
-        return _tag_position_rows(
-            rows,
-            category=category,
+        bucket = (
+            f"linear:{params['settleCoin']}"
+            if category == "linear"
+            else category
         )
-
-    linear_usdt = fetch_rows(
-        endpoint_key="positions:linear:USDT",
-        params={
-            "category": "linear",
-            "settleCoin": "USDT",
-        },
-        category="linear",
-    )
-
-    linear_usdc = fetch_rows(
-        endpoint_key="positions:linear:USDC",
-        params={
-            "category": "linear",
-            "settleCoin": "USDC",
-        },
-        category="linear",
-    )
-
-    inverse: list[dict[str, Any]] = []
-
-    for coin in inverse_coins:
-        inverse.extend(
-            fetch_rows(
-                endpoint_key=(
-                    f"positions:inverse:{coin}"
-                ),
-                params={
-                    "category": "inverse",
-                    "settleCoin": coin,
-                },
-                category="inverse",
-            )
-        )
-
-    options: list[dict[str, Any]] = []
-
-    for coin in option_coins:
-        options.extend(
-            fetch_rows(
-                endpoint_key=(
-                    f"positions:option:{coin}"
-                ),
-                params={
-                    "category": "option",
-                    "baseCoin": coin,
-                },
-                category="option",
+        by_category[bucket].extend(
+            _tag_position_rows(
+                rows,
+                category=category,
             )
         )
 
     return (
-        linear_usdt,
-        linear_usdc,
-        inverse,
-        options,
+        by_category["linear:USDT"],
+        by_category["linear:USDC"],
+        by_category["inverse"],
+        by_category["option"],
     )
 
 
+def _earn_calls(
+    client: BybitV5Client,
+    *,
+    executor: Executor | None,
+) -> list[Callable[[], Any]]:
+    return [
+        _defer(
+            executor,
+            _earn_call(client, category=category),
+        )
+        for category in EARN_CATEGORIES
+    ]
+
+
 def _fetch_earn_positions(
     client: BybitV5Client,
     *,
     matrix: SnapshotEndpointMatrix,
+    executor: Executor | None = None,
+    calls: list[Callable[[], Any]] | None = None,
 ) -> list[dict[str, Any]]:
     rows: list[dict[str, Any]] = []
 
-    for category in EARN_CATEGORIES:
+    if calls is None:
+        calls = _earn_calls(
+            client,
+            executor=executor,
+        )
+
+    for category, call in zip(EARN_CATEGORIES, calls):
         category_rows = _safe_earn_call(
             client,
             category=category,
             matrix=matrix,
+            call=call,
         )
 
         for row in category_rows:
@@ -1153,14 +1239,26 @@ def _fetch_required_instruments(
     *,
     specs: list[tuple[str, str]],
     matrix: SnapshotEndpointMatrix,
-    captured_at: datetime,
+    executor: Executor | None = None,
 ) -> dict[str, BybitInstrumentInfo]:
     instruments: dict[
         str,
         BybitInstrumentInfo,
     ] = {}
 
-    for category, symbol in specs:
+    calls = [
+        _defer(
+            executor,
+            lambda category=category, symbol=symbol: cached_instrument_info(
+                client,
+                category=category,
+                symbol=symbol,
+            ),
+        )
+        for category, symbol in specs
+    ]
+
+    for (category, symbol), call in zip(specs, calls):
         endpoint_key = _instrument_endpoint_key(
             category=category,
             symbol=symbol,
@@ -1168,12 +1266,7 @@ def _fetch_required_instruments(
         matrix.require(endpoint_key)
 
         try:
-            info = query_instrument_info(
-                client,
-                category=category,
-                symbol=symbol,
-                captured_at=captured_at,
-            )
+            info = call()
         except Exception as exc:
             matrix.mark_failure(
                 endpoint_key,
@@ -1283,34 +1376,64 @@ def _fetch_bybit_readonly_raw_data(
     *,
     inverse_coins: list[str],
     option_coins: list[str],
+    executor: Executor | None = None,
 ) -> BybitReadonlyRawData:
+    """
+    Fetch every read-only endpoint the snapshot needs.
+
+    With an executor the independent endpoints are all in flight at
+    once and instrument info is fetched concurrently afterwards. Results
+    are still consumed in the serial order, so the endpoint matrix is
+    filled exactly as in the serial path.
+    """
     captured_at = utcnow()
     matrix = SnapshotEndpointMatrix()
 
+    unified_wallet_call = _defer(
+        executor,
+        lambda: _fetch_unified_wallet(client),
+    )
+    funding_wallet_call = _defer(
+        executor,
+        lambda: _fetch_funding_wallet(client),
+    )
+    spot_tickers_call = _defer(
+        executor,
+        lambda: _fetch_spot_tickers(client),
+    )
+
+    # Positions and earn are submitted before any result is consumed.
+    position_calls = _position_calls(
+        client,
+        specs=_position_endpoint_specs(
+            inverse_coins=inverse_coins,
+            option_coins=option_coins,
+        ),
+        executor=executor,
+    )
+    earn_calls = _earn_calls(
+        client,
+        executor=executor,
+    )
+
     unified_wallet = _required_call(
         matrix=matrix,
         endpoint_key="wallet:UNIFIED",
-        call=lambda: _fetch_unified_wallet(
-            client
-        ),
+        call=unified_wallet_call,
         default={},
     )
 
     funding_wallet = _required_call(
         matrix=matrix,
         endpoint_key="wallet:FUND",
-        call=lambda: _fetch_funding_wallet(
-            client
-        ),
+        call=funding_wallet_call,
         default={},
     )
 
     spot_tickers = _required_call(
         matrix=matrix,
         endpoint_key="tickers:spot",
-        call=lambda: _fetch_spot_tickers(
-            client
-        ),
+        call=spot_tickers_call,
         default={},
     )
 
@@ -1324,11 +1447,13 @@ def _fetch_bybit_readonly_raw_data(
         inverse_coins=inverse_coins,
         option_coins=option_coins,
         matrix=matrix,
+        calls=position_calls,
     )
 
     earn_positions = _fetch_earn_positions(
         client,
         matrix=matrix,
+        calls=earn_calls,
     )
 
     all_position_rows = [
@@ -1352,7 +1477,7 @@ def _fetch_bybit_readonly_raw_data(
             client,
             specs=instrument_specs,
             matrix=matrix,
-            captured_at=captured_at,
+            executor=executor,
         )
     )
 
@@ -1386,6 +1511,7 @@ def build_allocation_snapshot_from_bybit(
     inverse_coins: list[str] | None = None,
     option_coins: list[str] | None = None,
     client: BybitV5Client | None = None,
+    max_workers: int | None = None,
 ) -> AllocationSnapshot:
     """
     Build allocation snapshot from real Bybit read-only endpoints.
@@ -1404,6 +1530,12 @@ def build_allocation_snapshot_from_bybit(
     - no trades;
     - no transfers;
     - no Earn stake.
+
+    Fetch mode:
+    - max_workers (default ALLOCATION_SNAPSHOT_FETCH_WORKERS) bounds the
+      pool used for the independent endpoint calls;
+    - max_workers <= 1 keeps the fully serial path;
+    - completeness semantics are the same in both modes.
     """
     del history_days  # reserved for later historical extensions
 
@@ -1424,12 +1556,30 @@ def build_allocation_snapshot_from_bybit(
     opt_coins = [normalize_coin(x) or "" for x in (option_coins or DEFAULT_OPTION_COINS)]
     opt_coins = [x for x in opt_coins if x]
 
-    raw = _fetch_bybit_readonly_raw_data(
-        effective_client,
-        inverse_coins=inv_coins,
-        option_coins=opt_coins,
+    workers = int(
+        max_workers
+        if max_workers is not None
+        else settings.ALLOCATION_SNAPSHOT_FETCH_WORKERS
     )
 
+    if workers <= 1:
+        raw = _fetch_bybit_readonly_raw_data(
+            effective_client,
+            inverse_coins=inv_coins,
+            option_coins=opt_coins,
+        )
+    else:
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="bybit-snapshot",
+        ) as executor:
+            raw = _fetch_bybit_readonly_raw_data(
+                effective_client,
+                inverse_coins=inv_coins,
+                option_coins=opt_coins,
+                executor=executor,
+            )
+
     risk = _risk_from_unified_wallet(raw.unified_wallet)
     holdings = _build_holdings_from_raw(raw)
 
@@ -12,6 +12,8 @@ from app.allocation.statuses import (
     EXECUTION_MODE_SKIPPED,
 )
 from app.bybit.client import BybitV5Client
+from app.bybit.instrument_cache import cached_instrument_info
+from app.bybit.instruments import BybitInstrumentInfoError
 
 
 ZERO = Decimal("0")
@@ -78,26 +80,6 @@ def _normalize_text(value: Any) -> str:
     return str(value or "").strip()
 
 
-def _result_list(payload: dict[str, Any]) -> list[dict[str, Any]]:
-    result = payload.get("result")
-    if not isinstance(result, dict):
-        return []
-
-    rows = result.get("list")
-    if isinstance(rows, list):
-        return [row for row in rows if isinstance(row, dict)]
-
-    return []
-
-
-def _public_get(client: BybitV5Client, path: str, params: dict[str, Any]) -> dict[str, Any]:
-    public_get = getattr(client, "public_get", None)
-    if callable(public_get):
-        return public_get(path, params)
-
-    return client.get(path, params)
-
-
 def parse_instrument_info_row(
     row: dict[str, Any],
     *,
@@ -157,31 +139,21 @@ def get_instrument_info(
     if not normalized_symbol:
         raise InstrumentInfoError("symbol is required")
 
-    payload = _public_get(
-        client,
-        "/v5/market/instruments-info",
-        {
-            "category": normalized_category,
-            "symbol": normalized_symbol,
-        },
-    )
-
-    rows = _result_list(payload)
-    if not rows:
-        raise InstrumentInfoError(
-            f"Instrument not found: category={normalized_category}, symbol={normalized_symbol}"
+    try:
+        cached = cached_instrument_info(
+            client,
+            category=normalized_category,
+            symbol=normalized_symbol,
         )
+    except BybitInstrumentInfoError as exc:
+        raise InstrumentInfoError(
+            f"Instrument not found: category={normalized_category}, "
+            f"symbol={normalized_symbol}: {exc}"
+        ) from exc
 
-    for row in rows:
-        row_symbol = _normalize_text(row.get("symbol")).upper()
-        if row_symbol == normalized_symbol:
-            return parse_instrument_info_row(
-                row,
-                fallback_category=normalized_category,
-            )
-
-    raise InstrumentInfoError(
-        f"Instrument not found in response list: category={normalized_category}, symbol={normalized_symbol}"
+    return parse_instrument_info_row(
+        cached.raw,
+        fallback_category=normalized_category,
     )
 
 
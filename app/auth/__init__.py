@@ -17,6 +17,7 @@ from app.auth.deps import (
     NotAuthenticated,
     utcnow,
     create_session,
+    get_current_principal as _get_current_principal,
     get_current_user as _get_current_user,
     COOKIE_NAME,
     SESSION_TTL_DAYS,
@@ -34,6 +35,11 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return _get_current_user(request, db)
 
 
+def get_current_principal(request: Request, db: Session = Depends(get_db)):
+    """FastAPI dependency wrapper for deps.get_current_principal."""
+    return _get_current_principal(request, db)
+
+
 # Re-export for backward compatibility
 __all__ = [
     "get_lang_from_request",
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from starlette.requests import Request
 from sqlalchemy.orm import Session
 
+from app.auth.session_cache import SessionPrincipal, get_session_cache
 from app.config import settings
 from app.models import User, SessionModel
 
@@ -21,8 +22,7 @@ class NotAuthenticated(Exception):
 
 
 def create_session(db: Session, user_id: int, commit: bool = True) -> str:
-    db.query(SessionModel).filter(SessionModel.expires_at < utcnow()).delete(synchronize_session=False)
-
+    # Expired rows are pruned in batches by workers.session_sweeper.
     session_id = uuid.uuid4().hex
     expires_at = utcnow() + timedelta(days=SESSION_TTL_DAYS)
 
@@ -36,22 +36,75 @@ def create_session(db: Session, user_id: int, commit: bool = True) -> str:
     return session_id
 
 
-def get_current_user(request: Request, db: Session) -> User:
+def invalidate_session(session_id: str | None) -> None:
+    """Drop a session from this process's auth cache (call after commit)."""
+    if session_id:
+        get_session_cache().invalidate(session_id)
+
+
+def invalidate_user_sessions(user_id: int, *, keep: str | None = None) -> None:
+    get_session_cache().invalidate_user(user_id, keep=keep)
+
+
+def _authenticate(request: Request, db: Session) -> tuple[SessionPrincipal, User | None]:
     session_id = request.cookies.get(COOKIE_NAME)
     if not session_id:
         raise NotAuthenticated()
 
-    sess = db.query(SessionModel).filter(SessionModel.id == session_id).first()
-    if not sess:
+    cache = get_session_cache()
+    principal = cache.get(session_id)
+    if principal is not None:
+        if not principal.is_active:
+            raise NotAuthenticated()
+        return principal, None
+
+    # Session and user in one round trip.
+    row = (
+        db.query(SessionModel, User)
+        .join(User, User.id == SessionModel.user_id)
+        .filter(SessionModel.id == session_id)
+        .first()
+    )
+    if not row:
         raise NotAuthenticated()
 
+    sess, user = row
     if sess.expires_at <= utcnow():
         db.delete(sess)
         db.commit()
         raise NotAuthenticated()
 
-    user = db.query(User).filter(User.id == sess.user_id).first()
+    if not user.is_active:
+        raise NotAuthenticated()
+
+    principal = SessionPrincipal(
+        session_id=session_id,
+        user_id=int(user.id),
+        expires_at=sess.expires_at,
+        is_active=bool(user.is_active),
+        compliance_status=str(getattr(user, "compliance_status", None) or "ok"),
+    )
+    cache.put(principal)
+    return principal, user
+
+
+def get_current_principal(request: Request, db: Session) -> SessionPrincipal:
+    """
+    Session owner without loading the user row; no DB access while the
+    session is cached. For endpoints that only need the user id, active
+    flag and compliance status (live polling).
+    """
+    principal, _ = _authenticate(request, db)
+    return principal
+
+
+def get_current_user(request: Request, db: Session) -> User:
+    principal, user = _authenticate(request, db)
+
+    if user is None:
+        user = db.get(User, principal.user_id)
     if not user or not user.is_active:
+        invalidate_session(principal.session_id)
         raise NotAuthenticated()
 
     return user
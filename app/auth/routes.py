@@ -31,7 +31,12 @@ from app.auth import (
     create_session,
 )
 from app.auth.cookies import set_auth_cookie, clear_auth_cookie
-from app.auth.deps import NotAuthenticated, get_current_user as deps_get_current_user
+from app.auth.deps import (
+    NotAuthenticated,
+    get_current_user as deps_get_current_user,
+    invalidate_session,
+    invalidate_user_sessions,
+)
 from app.auth.code_action_cooldown import enforce_code_action_cooldown
 
 router = APIRouter()
@@ -406,6 +411,7 @@ def logout(request: Request, db: Session = Depends(get_db)):
     if session_id:
         db.query(SessionModel).filter(SessionModel.id == session_id).delete()
         db.commit()
+        invalidate_session(session_id)
 
     resp = RedirectResponse(url="/", status_code=302)
     clear_auth_cookie(resp)
@@ -578,4 +584,5 @@ async def forgot_set_new_password(request: Request, db: Session = Depends(get_db
     db.query(SessionModel).filter(SessionModel.user_id == user.id).delete(synchronize_session=False)
 
     db.commit()
+    invalidate_user_sessions(user.id)
     return JSONResponse({"status": "ok", "redirect": "/"}, status_code=200)
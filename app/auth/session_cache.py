@@ -0,0 +1,101 @@
+"""In-process cache of authenticated sessions."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton, TtlLruCache
+
+
+@dataclass(frozen=True)
+class SessionPrincipal:
+    """
+    Session owner plus the user fields live-polling endpoints read, so a
+    cache hit needs no users row. Like the session itself, the fields
+    may lag a change made in another process by up to ttl_sec.
+    """
+
+    session_id: str
+    user_id: int
+    expires_at: datetime
+    is_active: bool
+    compliance_status: str
+
+    @property
+    def id(self) -> int:
+        # Portfolio helpers read user.id; a principal can stand in for User.
+        return self.user_id
+
+
+class SessionPrincipalCache:
+    """
+    session_id -> principal for recently authenticated sessions.
+
+    An entry lives for ttl_sec or until the session itself expires,
+    whichever is first; the oldest are dropped beyond max_entries.
+    Logout and password changes invalidate entries in this process;
+    other processes see the change after at most ttl_sec.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._entries: TtlLruCache[str, SessionPrincipal] = TtlLruCache(
+            ttl_sec=(
+                ttl_sec
+                if ttl_sec is not None
+                else settings.AUTH_SESSION_CACHE_TTL_SEC
+            ),
+            max_entries=(
+                max_entries
+                if max_entries is not None
+                else settings.AUTH_SESSION_CACHE_MAX_ENTRIES
+            ),
+            clock=self._now,
+        )
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def get(self, session_id: str) -> SessionPrincipal | None:
+        principal = self._entries.get(session_id)
+        if principal is None:
+            return None
+
+        if principal.expires_at <= datetime.now(timezone.utc):
+            self._entries.pop(session_id)
+            return None
+
+        return principal
+
+    def put(self, principal: SessionPrincipal) -> None:
+        self._entries.put(principal.session_id, principal)
+
+    def invalidate(self, session_id: str) -> None:
+        self._entries.pop(session_id)
+
+    def invalidate_user(self, user_id: int, *, keep: str | None = None) -> None:
+        self._entries.discard_where(
+            lambda session_id, principal: (
+                principal.user_id == user_id and session_id != keep
+            )
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_CACHE: ProcessSingleton[SessionPrincipalCache] = ProcessSingleton(SessionPrincipalCache)
+
+
+def get_session_cache() -> SessionPrincipalCache:
+    return _CACHE.get()
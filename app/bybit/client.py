@@ -11,6 +11,13 @@ from urllib.parse import urlencode
 
 import requests
 
+from app.bybit.transport import (
+    RATE_LIMIT_RET_CODES,
+    RETRYABLE_RET_CODES,
+    BybitRateLimited,
+    BybitTransport,
+    get_bybit_transport,
+)
 from app.config import settings
 
 
@@ -21,6 +28,19 @@ class BybitApiError(RuntimeError):
     pass
 
 
+class _BybitRetCodeError(BybitApiError):
+    def __init__(self, message: str, *, ret_code: Any) -> None:
+        super().__init__(message)
+        self.ret_code = ret_code
+
+    @property
+    def retryable(self) -> bool:
+        try:
+            return int(self.ret_code) in RETRYABLE_RET_CODES
+        except (TypeError, ValueError):
+            return False
+
+
 class BybitV5Client:
     def __init__(
         self,
@@ -32,6 +52,7 @@ class BybitV5Client:
         timeout_sec: int | None = None,
         retries: int | None = None,
         backoff_sec: Decimal | None = None,
+        transport: BybitTransport | None = None,
     ) -> None:
         self.api_key = (api_key or "").strip()
         self.api_secret = (api_secret or "").strip()
@@ -40,6 +61,7 @@ class BybitV5Client:
         self.timeout_sec = int(timeout_sec or settings.BYBIT_MASTER_HTTP_TIMEOUT_SEC)
         self.retries = int(retries if retries is not None else settings.BYBIT_MASTER_RETRIES)
         self.backoff_sec = Decimal(str(backoff_sec if backoff_sec is not None else settings.BYBIT_MASTER_BACKOFF_SEC))
+        self.transport = transport or get_bybit_transport()
 
         if not self.api_key:
             raise BybitApiError("Bybit API key is empty")
@@ -75,61 +97,129 @@ class BybitV5Client:
             "Content-Type": "application/json",
         }
 
-    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
-        if not path.startswith("/"):
-            raise ValueError("Bybit path must start with '/'")
+    def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None,
+        body: str | None,
+        headers: dict[str, str],
+        api_key: str | None,
+        error_prefix: str,
+    ) -> dict[str, Any]:
+        resp = self.transport.request(
+            method,
+            base_url=self.base_url,
+            path=path,
+            api_key=api_key,
+            params=params,
+            data=body,
+            headers=headers,
+            timeout=self.timeout_sec,
+        )
+        resp.raise_for_status()
+
+        data = resp.json()
+        ret_code = data.get("retCode")
+        if ret_code != 0:
+            message = (
+                f"{error_prefix} path={path} retCode={ret_code} retMsg={data.get('retMsg')}"
+            )
+            if ret_code in RATE_LIMIT_RET_CODES:
+                self.transport.note_rate_limited(
+                    api_key=api_key,
+                    path=path,
+                    reset_at_ms=None,
+                )
+                raise BybitRateLimited(message)
+            raise _BybitRetCodeError(message, ret_code=ret_code)
 
-        clean_params: dict[str, Any] = {}
-        for key, value in (params or {}).items():
-            if value is None:
-                continue
-            clean_params[key] = value
+        return data
 
-        query_string = urlencode(clean_params)
-        url = f"{self.base_url}{path}"
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        if attempt >= self.retries:
+            return False
+
+        # A definite business error is not retried: the same request
+        # would fail the same way.
+        if isinstance(exc, _BybitRetCodeError):
+            return exc.retryable
+
+        if isinstance(exc, requests.HTTPError):
+            status = exc.response.status_code if exc.response is not None else 0
+            return status == 0 or status >= 500
 
+        return True
+
+    def _call_with_retries(
+        self,
+        *,
+        path: str,
+        send,
+        failure_label: str,
+    ) -> dict[str, Any]:
         last_error: Exception | None = None
 
         for attempt in range(self.retries + 1):
             try:
-                timestamp = self._timestamp_ms()
-                signature = self._sign_get(timestamp=timestamp, query_string=query_string)
-                headers = self._headers(timestamp=timestamp, signature=signature)
-
-                log.debug(
-                    "Bybit GET request path=%s params_keys=%s attempt=%s recv_window_ms=%s",
-                    path,
-                    sorted(clean_params.keys()),
-                    attempt + 1,
-                    self.recv_window_ms,
-                )
+                return send(attempt)
 
-                resp = requests.get(
-                    url,
-                    params=clean_params,
-                    headers=headers,
-                    timeout=self.timeout_sec,
+            except Exception as exc:
+                last_error = exc
+                if not self._should_retry(exc, attempt):
+                    break
+
+                sleep_sec = self.transport.retry_delay_sec(
+                    exc,
+                    attempt=attempt,
+                    base_sec=self.backoff_sec,
                 )
-                resp.raise_for_status()
+                if sleep_sec > 0:
+                    time.sleep(sleep_sec)
 
-                data = resp.json()
-                ret_code = data.get("retCode")
-                if ret_code != 0:
-                    raise BybitApiError(
-                        f"Bybit API error path={path} retCode={ret_code} retMsg={data.get('retMsg')}"
-                    )
+        raise BybitApiError(f"{failure_label} failed path={path}: {last_error}")
 
-                return data
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        if not path.startswith("/"):
+            raise ValueError("Bybit path must start with '/'")
 
-            except Exception as exc:
-                last_error = exc
-                if attempt >= self.retries:
-                    break
+        clean_params: dict[str, Any] = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            clean_params[key] = value
 
-                sleep_sec = float(self.backoff_sec * Decimal(attempt + 1))
-                time.sleep(sleep_sec)
+        query_string = urlencode(clean_params)
 
-        raise BybitApiError(f"Bybit GET failed path={path}: {last_error}")
+        def send(attempt: int) -> dict[str, Any]:
+            timestamp = self._timestamp_ms()
+            signature = self._sign_get(timestamp=timestamp, query_string=query_string)
+            headers = self._headers(timestamp=timestamp, signature=signature)
+
+            log.debug(
+                "Bybit GET request path=%s params_keys=%s attempt=%s recv_window_ms=%s",
+                path,
+                sorted(clean_params.keys()),
+                attempt + 1,
+                self.recv_window_ms,
+            )
+
+            return self._send(
+                "GET",
+                path,
+                params=clean_params,
+                body=None,
+                headers=headers,
+                api_key=self.api_key,
+                error_prefix="Bybit API error",
+            )
+
+        return self._call_with_retries(
+            path=path,
+            send=send,
+            failure_label="Bybit GET",
+        )
 
     def post(self, path: str, payload: dict[str, Any] | None = None) -> dict[str, Any]:
         if not path.startswith("/"):
@@ -147,50 +237,34 @@ class BybitV5Client:
             ensure_ascii=False,
         )
 
-        url = f"{self.base_url}{path}"
-
-        last_error: Exception | None = None
-
-        for attempt in range(self.retries + 1):
-            try:
-                timestamp = self._timestamp_ms()
-                signature = self._sign_post(timestamp=timestamp, body=body)
-                headers = self._headers(timestamp=timestamp, signature=signature)
-
-                log.debug(
-                    "Bybit POST request path=%s payload_keys=%s attempt=%s recv_window_ms=%s",
-                    path,
-                    sorted(clean_payload.keys()),
-                    attempt + 1,
-                    self.recv_window_ms,
-                )
-
-                resp = requests.post(
-                    url,
-                    data=body,
-                    headers=headers,
-                    timeout=self.timeout_sec,
-                )
-                resp.raise_for_status()
-
-                data = resp.json()
-                ret_code = data.get("retCode")
-                if ret_code != 0:
-                    raise BybitApiError(
-                        f"Bybit API error path={path} retCode={ret_code} retMsg={data.get('retMsg')}"
-                    )
-
-                return data
-
-            except Exception as exc:
-                last_error = exc
-                if attempt >= self.retries:
-                    break
-
-                sleep_sec = float(self.backoff_sec * Decimal(attempt + 1))
-                time.sleep(sleep_sec)
-
-        raise BybitApiError(f"Bybit POST failed path={path}: {last_error}")
+        def send(attempt: int) -> dict[str, Any]:
+            timestamp = self._timestamp_ms()
+            signature = self._sign_post(timestamp=timestamp, body=body)
+            headers = self._headers(timestamp=timestamp, signature=signature)
+
+            log.debug(
+                "Bybit POST request path=%s payload_keys=%s attempt=%s recv_window_ms=%s",
+                path,
+                sorted(clean_payload.keys()),
+                attempt + 1,
+                self.recv_window_ms,
+            )
+
+            return self._send(
+                "POST",
+                path,
+                params=None,
+                body=body,
+                headers=headers,
+                api_key=self.api_key,
+                error_prefix="Bybit API error",
+            )
+
+        return self._call_with_retries(
+            path=path,
+            send=send,
+            failure_label="Bybit POST",
+        )
 
     def public_get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
         if not path.startswith("/"):
@@ -202,45 +276,29 @@ class BybitV5Client:
                 continue
             clean_params[key] = value
 
-        url = f"{self.base_url}{path}"
-
-        last_error: Exception | None = None
-
-        for attempt in range(self.retries + 1):
-            try:
-                log.debug(
-                    "Bybit PUBLIC GET request path=%s params_keys=%s attempt=%s",
-                    path,
-                    sorted(clean_params.keys()),
-                    attempt + 1,
-                )
-
-                resp = requests.get(
-                    url,
-                    params=clean_params,
-                    headers={"Accept": "application/json"},
-                    timeout=self.timeout_sec,
-                )
-                resp.raise_for_status()
-
-                data = resp.json()
-                ret_code = data.get("retCode")
-                if ret_code != 0:
-                    raise BybitApiError(
-                        f"Bybit public API error path={path} retCode={ret_code} retMsg={data.get('retMsg')}"
-                    )
-
-                return data
-
-            except Exception as exc:
-                last_error = exc
-                if attempt >= self.retries:
-                    break
-
-                sleep_sec = float(self.backoff_sec * Decimal(attempt + 1))
-                time.sleep(sleep_sec)
-
-        raise BybitApiError(f"Bybit PUBLIC GET failed path={path}: {last_error}")
+        def send(attempt: int) -> dict[str, Any]:
+            log.debug(
+                "Bybit PUBLIC GET request path=%s params_keys=%s attempt=%s",
+                path,
+                sorted(clean_params.keys()),
+                attempt + 1,
+            )
+
+            return self._send(
+                "GET",
+                path,
+                params=clean_params,
+                body=None,
+                headers={"Accept": "application/json"},
+                api_key=None,
+                error_prefix="Bybit public API error",
+            )
+
+        return self._call_with_retries(
+            path=path,
+            send=send,
+            failure_label="Bybit PUBLIC GET",
+        )
 
     def paginate_get(
         self,
@@ -0,0 +1,500 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.bybit.client import BybitV5Client
+from app.bybit.instruments import (
+    SUPPORTED_CATEGORIES,
+    BybitInstrumentInfo,
+    BybitInstrumentInfoError,
+    parse_bybit_instrument_row,
+    query_category_instruments,
+    query_instrument_info,
+    utcnow,
+)
+from app.config import settings
+from app.db import SessionLocal
+from app.models import BybitInstrumentInfoCache
+from app.utils.cache import ProcessSingleton
+
+
+log = logging.getLogger("app.bybit.instrument_cache")
+
+DEFAULT_NETWORK = "default"
+
+# Persisted per (network, category) by a successful bulk load. Per-symbol
+# rows alone (fallback lookups) never prove the category is complete.
+CATEGORY_MARKER_SYMBOL = "*"
+
+
+def network_key(client: BybitV5Client) -> str:
+    """
+    Cache partition for a client: mainnet and testnet instruments differ,
+    so entries are keyed by the client's base URL.
+    """
+    base_url = getattr(client, "base_url", None)
+    return str(base_url or DEFAULT_NETWORK).rstrip("/")
+
+
+class BybitInstrumentCache:
+    """
+    Process-wide instruments-info cache.
+
+    The first lookup in a (network, category) loads the whole category
+    with one paginated request, so every later leg/batch in the TTL
+    window validates quantities without a network round trip. Symbols
+    missing from the bulk result (new listings, fakes that only answer
+    per-symbol queries) fall back to query_instrument_info and are
+    cached individually. A failed bulk load is not retried for
+    retry_sec; per-symbol queries keep working meanwhile.
+
+    With persist=True parsed rows are also written to
+    bybit_instrument_info_cache and read back on the first lookup, so a
+    restarted worker starts warm. Persisted rows count as a category
+    load only while the CATEGORY_MARKER_SYMBOL row of the last bulk load
+    is fresh; otherwise the category is fetched in bulk again.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: int | None = None,
+        retry_sec: int | None = None,
+        persist: bool | None = None,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        self.ttl_sec = int(
+            ttl_sec
+            if ttl_sec is not None
+            else settings.BYBIT_INSTRUMENT_CACHE_TTL_SEC
+        )
+        self.retry_sec = int(
+            retry_sec
+            if retry_sec is not None
+            else settings.BYBIT_INSTRUMENT_CACHE_RETRY_SEC
+        )
+        self.persist = bool(
+            persist
+            if persist is not None
+            else settings.BYBIT_INSTRUMENT_CACHE_PERSIST
+        )
+        self.session_factory = session_factory or SessionLocal
+
+        self._lock = threading.Lock()
+        self._entries: dict[
+            tuple[str, str, str],
+            tuple[BybitInstrumentInfo, float],
+        ] = {}
+        self._categories: dict[tuple[str, str], float] = {}
+        self._failed: dict[tuple[str, str], float] = {}
+        self._load_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def _cached(
+        self,
+        key: tuple[str, str, str],
+    ) -> BybitInstrumentInfo | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            info, expires_at = entry
+            if expires_at <= self._now():
+                del self._entries[key]
+                return None
+
+            return info
+
+    def _store(
+        self,
+        network: str,
+        infos: list[BybitInstrumentInfo],
+        *,
+        expires_at: float,
+    ) -> None:
+        with self._lock:
+            for info in infos:
+                self._entries[
+                    (network, info.category, info.symbol)
+                ] = (info, expires_at)
+
+    def _category_fresh(self, key: tuple[str, str]) -> bool:
+        now = self._now()
+
+        with self._lock:
+            expires_at = self._categories.get(key)
+            if expires_at is not None and expires_at > now:
+                return True
+
+            failed_at = self._failed.get(key)
+            return (
+                failed_at is not None
+                and now - failed_at < self.retry_sec
+            )
+
+    def _load_lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._load_locks[key] = lock
+            return lock
+
+    def _load_category(
+        self,
+        client: BybitV5Client,
+        *,
+        network: str,
+        category: str,
+    ) -> None:
+        key = (network, category)
+
+        if self._category_fresh(key):
+            return
+
+        # Single flight: concurrent lookups in one category wait for
+        # the first loader instead of each issuing a bulk request.
+        with self._load_lock(key):
+            if self._category_fresh(key):
+                return
+
+            if self.persist and self._load_persisted(
+                network=network,
+                category=category,
+            ):
+                return
+
+            loaded_at = utcnow()
+            try:
+                instruments = query_category_instruments(
+                    client,
+                    category=category,
+                )
+            except Exception as exc:
+                log.warning(
+                    "Bybit instruments bulk load failed "
+                    "network=%s category=%s: %s",
+                    network,
+                    category,
+                    exc,
+                )
+                with self._lock:
+                    self._failed[key] = self._now()
+                return
+
+            expires_at = self._now() + self.ttl_sec
+            self._store(
+                network,
+                list(instruments.values()),
+                expires_at=expires_at,
+            )
+            with self._lock:
+                self._categories[key] = expires_at
+                self._failed.pop(key, None)
+
+            log.info(
+                "Bybit instruments loaded network=%s category=%s count=%s",
+                network,
+                category,
+                len(instruments),
+            )
+
+            if self.persist:
+                self._persist(
+                    network,
+                    list(instruments.values()),
+                    category_loaded=(category, loaded_at),
+                )
+
+    def _load_persisted(
+        self,
+        *,
+        network: str,
+        category: str,
+    ) -> bool:
+        fresh_after = utcnow() - timedelta(seconds=self.ttl_sec)
+
+        try:
+            with self.session_factory() as db:
+                rows = db.execute(
+                    select(BybitInstrumentInfoCache).where(
+                        BybitInstrumentInfoCache.network == network,
+                        BybitInstrumentInfoCache.category == category,
+                        BybitInstrumentInfoCache.captured_at >= fresh_after,
+                    )
+                ).scalars().all()
+        except Exception as exc:
+            log.warning(
+                "Bybit instruments cache read failed "
+                "network=%s category=%s: %s",
+                network,
+                category,
+                exc,
+            )
+            return False
+
+        marker = next(
+            (row for row in rows if row.symbol == CATEGORY_MARKER_SYMBOL),
+            None,
+        )
+        if marker is None:
+            return False
+
+        infos: list[BybitInstrumentInfo] = []
+        for row in rows:
+            if row is marker:
+                continue
+            try:
+                infos.append(
+                    parse_bybit_instrument_row(
+                        dict(row.row_json),
+                        category=category,
+                        captured_at=row.captured_at,
+                    )
+                )
+            except BybitInstrumentInfoError:
+                continue
+
+        loaded_at: datetime = marker.captured_at
+        remaining_sec = (
+            loaded_at
+            + timedelta(seconds=self.ttl_sec)
+            - utcnow()
+        ).total_seconds()
+        expires_at = self._now() + max(remaining_sec, 0)
+
+        self._store(network, infos, expires_at=expires_at)
+        with self._lock:
+            self._categories[(network, category)] = expires_at
+            self._failed.pop((network, category), None)
+
+        return True
+
+    def _persist(
+        self,
+        network: str,
+        infos: list[BybitInstrumentInfo],
+        *,
+        category_loaded: tuple[str, datetime] | None = None,
+    ) -> None:
+        if not infos:
+            return
+
+        values: list[dict[str, Any]] = [
+            {
+                "network": network,
+                "category": info.category,
+                "symbol": info.symbol,
+                "row_json": dict(info.raw),
+                "captured_at": info.captured_at,
+            }
+            for info in infos
+        ]
+        if category_loaded is not None:
+            category, loaded_at = category_loaded
+            values.append(
+                {
+                    "network": network,
+                    "category": category,
+                    "symbol": CATEGORY_MARKER_SYMBOL,
+                    "row_json": {"count": len(infos)},
+                    "captured_at": loaded_at,
+                }
+            )
+        stmt = pg_insert(BybitInstrumentInfoCache.__table__).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["network", "category", "symbol"],
+            set_={
+                "row_json": stmt.excluded.row_json,
+                "captured_at": stmt.excluded.captured_at,
+                "updated_at": utcnow(),
+            },
+        )
+
+        try:
+            with self.session_factory() as db:
+                db.execute(stmt)
+                db.commit()
+        except Exception as exc:
+            log.warning(
+                "Bybit instruments cache write failed network=%s: %s",
+                network,
+                exc,
+            )
+
+    def get(
+        self,
+        client: BybitV5Client,
+        *,
+        category: str,
+        symbol: str,
+    ) -> BybitInstrumentInfo:
+        normalized_category = str(category or "").strip().lower()
+        normalized_symbol = str(symbol or "").strip().upper()
+
+        if (
+            not self.enabled
+            or normalized_category not in SUPPORTED_CATEGORIES
+            or not normalized_symbol
+        ):
+            return query_instrument_info(
+                client,
+                category=category,
+                symbol=symbol,
+            )
+
+        network = network_key(client)
+        key = (network, normalized_category, normalized_symbol)
+
+        info = self._cached(key)
+        if info is not None:
+            return info
+
+        self._load_category(
+            client,
+            network=network,
+            category=normalized_category,
+        )
+
+        info = self._cached(key)
+        if info is not None:
+            return info
+
+        info = query_instrument_info(
+            client,
+            category=normalized_category,
+            symbol=normalized_symbol,
+        )
+        self._store(
+            network,
+            [info],
+            expires_at=self._now() + self.ttl_sec,
+        )
+        if self.persist:
+            self._persist(network, [info])
+
+        return info
+
+    def preload(
+        self,
+        client: BybitV5Client,
+        *,
+        categories: tuple[str, ...] | list[str] = tuple(
+            sorted(SUPPORTED_CATEGORIES)
+        ),
+    ) -> None:
+        if not self.enabled:
+            return
+
+        network = network_key(client)
+        for category in categories:
+            self._load_category(
+                client,
+                network=network,
+                category=str(category).strip().lower(),
+            )
+
+    def invalidate(
+        self,
+        *,
+        network: str | None = None,
+        category: str | None = None,
+        symbol: str | None = None,
+    ) -> None:
+        """
+        Drop cached instruments matching every given filter.
+
+        Call after Bybit rejects an order for lot/tick filters or when an
+        operator knows instrument rules changed. Persisted rows are
+        removed too, so the next worker start does not re-warm them.
+        """
+        category = category.strip().lower() if category else None
+        symbol = symbol.strip().upper() if symbol else None
+
+        def matches(entry_network: str, entry_category: str) -> bool:
+            return (
+                (network is None or entry_network == network)
+                and (category is None or entry_category == category)
+            )
+
+        with self._lock:
+            for key in list(self._entries):
+                if matches(key[0], key[1]) and (
+                    symbol is None or key[2] == symbol
+                ):
+                    del self._entries[key]
+
+            if symbol is None:
+                for registry in (self._categories, self._failed):
+                    for key in list(registry):
+                        if matches(*key):
+                            del registry[key]
+
+        if not self.persist:
+            return
+
+        stmt = delete(BybitInstrumentInfoCache)
+        if network is not None:
+            stmt = stmt.where(BybitInstrumentInfoCache.network == network)
+        if category is not None:
+            stmt = stmt.where(BybitInstrumentInfoCache.category == category)
+        if symbol is not None:
+            stmt = stmt.where(BybitInstrumentInfoCache.symbol == symbol)
+
+        try:
+            with self.session_factory() as db:
+                db.execute(stmt)
+                db.commit()
+        except Exception as exc:
+            log.warning("Bybit instruments cache delete failed: %s", exc)
+
+
+_CACHE: ProcessSingleton[BybitInstrumentCache] = ProcessSingleton(
+    BybitInstrumentCache
+)
+
+
+def get_instrument_cache() -> BybitInstrumentCache:
+    return _CACHE.get()
+
+
+def cached_instrument_info(
+    client: BybitV5Client,
+    *,
+    category: str,
+    symbol: str,
+) -> BybitInstrumentInfo:
+    return get_instrument_cache().get(
+        client,
+        category=category,
+        symbol=symbol,
+    )
+
+
+def invalidate_instrument_cache(
+    *,
+    network: str | None = None,
+    category: str | None = None,
+    symbol: str | None = None,
+) -> None:
+    get_instrument_cache().invalidate(
+        network=network,
+        category=category,
+        symbol=symbol,
+    )
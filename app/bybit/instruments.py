@@ -13,6 +13,8 @@ from app.bybit.client import BybitV5Client
 
 
 INSTRUMENTS_INFO_PATH = "/v5/market/instruments-info"
+INSTRUMENTS_PAGE_LIMIT = 1000
+INSTRUMENTS_MAX_PAGES = 50
 SUPPORTED_CATEGORIES = {
     "spot",
     "linear",
@@ -415,6 +417,39 @@ def query_instrument_info(
             f"symbol={normalized_symbol}"
         )
 
+    return parse_bybit_instrument_row(
+        matching_row,
+        category=normalized_category,
+        captured_at=captured_at,
+    )
+
+
+def parse_bybit_instrument_row(
+    row: dict[str, Any],
+    *,
+    category: str,
+    captured_at: datetime | None = None,
+) -> BybitInstrumentInfo:
+    normalized_category = str(
+        category or ""
+    ).strip().lower()
+    normalized_symbol = _upper(
+        row.get("symbol")
+    )
+
+    if normalized_category not in SUPPORTED_CATEGORIES:
+        raise BybitInstrumentInfoError(
+            "Unsupported Bybit instrument category: "
+            f"{category!r}"
+        )
+
+    if not normalized_symbol:
+        raise BybitInstrumentInfoError(
+            "Bybit instrument row has no symbol"
+        )
+
+    matching_row = row
+
     lot_size_filter = _dict_value(
         matching_row.get("lotSizeFilter")
     )
@@ -558,6 +593,78 @@ def query_instrument_info(
         raw=dict(matching_row),
     )
 
+
+def query_category_instruments(
+    client: BybitV5Client,
+    *,
+    category: str,
+    captured_at: datetime | None = None,
+    page_limit: int = INSTRUMENTS_PAGE_LIMIT,
+    max_pages: int = INSTRUMENTS_MAX_PAGES,
+) -> dict[str, BybitInstrumentInfo]:
+    """
+    Load every instrument of one category, following nextPageCursor.
+
+    Rows that fail to parse are skipped here; a later per-symbol
+    query_instrument_info call surfaces their error to the caller.
+    """
+    normalized_category = str(
+        category or ""
+    ).strip().lower()
+
+    if normalized_category not in SUPPORTED_CATEGORIES:
+        raise BybitInstrumentInfoError(
+            "Unsupported Bybit instrument category: "
+            f"{category!r}"
+        )
+
+    captured_at = captured_at or utcnow()
+    instruments: dict[str, BybitInstrumentInfo] = {}
+    cursor: str | None = None
+
+    for _ in range(max_pages):
+        params: dict[str, Any] = {
+            "category": normalized_category,
+            "limit": page_limit,
+        }
+        if cursor:
+            params["cursor"] = cursor
+
+        payload = _public_get(
+            client,
+            INSTRUMENTS_INFO_PATH,
+            params,
+        )
+
+        for row in _result_rows(payload):
+            try:
+                info = parse_bybit_instrument_row(
+                    row,
+                    category=normalized_category,
+                    captured_at=captured_at,
+                )
+            except BybitInstrumentInfoError:
+                continue
+
+            instruments[info.symbol] = info
+
+        result = payload.get("result")
+        cursor = (
+            _text(result.get("nextPageCursor"))
+            if isinstance(result, dict)
+            else None
+        )
+
+        if not cursor:
+            return instruments
+
+    raise BybitInstrumentInfoError(
+        "Bybit instruments-info pagination did not finish: "
+        f"category={normalized_category}, "
+        f"max_pages={max_pages}"
+    )
+
+
 @dataclass(frozen=True)
 class NormalizedOrderQuantity:
     requested_qty: Decimal
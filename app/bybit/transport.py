@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Mapping
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton
+
+
+log = logging.getLogger("app.bybit.transport")
+
+
+# Bybit retCodes that mean "slow down", not "request is wrong".
+RATE_LIMIT_RET_CODES = frozenset({10006, 10018})
+
+# Transient server-side/timing retCodes worth another signed attempt.
+RETRYABLE_RET_CODES = frozenset({10000, 10002, 10016}) | RATE_LIMIT_RET_CODES
+
+PUBLIC_KEY = "public"
+
+
+class BybitRateLimited(RuntimeError):
+    def __init__(
+        self,
+        message: str,
+        *,
+        reset_at_ms: int | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.reset_at_ms = reset_at_ms
+
+
+def endpoint_class(path: str) -> str:
+    """
+    Rate-limit bucket name for a V5 path.
+
+    Bybit publishes limits per endpoint, so the bucket is the path
+    itself without the query string.
+    """
+    return str(path or "").split("?", 1)[0].rstrip("/") or "/"
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    raw = headers.get(name)
+    if raw is None or str(raw).strip() == "":
+        return None
+    try:
+        return int(str(raw).strip())
+    except ValueError:
+        return None
+
+
+@dataclass
+class _Bucket:
+    limit: int | None = None
+    remaining: int | None = None
+    reset_at_ms: int | None = None
+
+
+class BybitRateLimiter:
+    """
+    Token bucket per (api_key, endpoint class).
+
+    The bucket is fed from the X-Bapi-Limit, X-Bapi-Limit-Status and
+    X-Bapi-Limit-Reset-Timestamp response headers: tokens are the
+    remaining budget reported by Bybit, decremented locally for
+    in-flight calls and refilled to the limit once the reset timestamp
+    passes. Buckets without headers yet never block.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    def _bucket(self, key: tuple[str, str]) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket()
+            self._buckets[key] = bucket
+        return bucket
+
+    def _refill(self, bucket: _Bucket, now_ms: int) -> None:
+        if bucket.reset_at_ms is not None and now_ms >= bucket.reset_at_ms:
+            bucket.remaining = bucket.limit
+            bucket.reset_at_ms = None
+
+    def acquire(
+        self,
+        key: tuple[str, str],
+        *,
+        max_wait_sec: float | None = None,
+    ) -> float:
+        """
+        Take one token, sleeping until the bucket resets if it is empty.
+
+        Returns the number of seconds slept.
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                bucket = self._bucket(key)
+                now_ms = self._now_ms()
+                self._refill(bucket, now_ms)
+
+                if bucket.remaining is None or bucket.remaining > 0:
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return waited
+
+                if bucket.reset_at_ms is None:
+                    # Exhausted without a known reset: allow one probe.
+                    return waited
+
+                sleep_sec = max(bucket.reset_at_ms - now_ms, 0) / 1000
+
+            if max_wait_sec is not None:
+                sleep_sec = min(sleep_sec, max(max_wait_sec - waited, 0))
+                if sleep_sec <= 0:
+                    return waited
+
+            log.debug(
+                "Bybit rate-limit budget exhausted key=%s sleep_sec=%.3f",
+                key[1],
+                sleep_sec,
+            )
+            time.sleep(sleep_sec)
+            waited += sleep_sec
+
+    def update_from_headers(
+        self,
+        key: tuple[str, str],
+        headers: Mapping[str, str],
+    ) -> None:
+        limit = _header_int(headers, "X-Bapi-Limit")
+        remaining = _header_int(headers, "X-Bapi-Limit-Status")
+        reset_at_ms = _header_int(headers, "X-Bapi-Limit-Reset-Timestamp")
+
+        if limit is None and remaining is None and reset_at_ms is None:
+            return
+
+        with self._lock:
+            bucket = self._bucket(key)
+            if limit is not None:
+                bucket.limit = limit
+            if remaining is not None:
+                bucket.remaining = remaining
+            if reset_at_ms is not None:
+                bucket.reset_at_ms = reset_at_ms
+
+    def mark_exhausted(
+        self,
+        key: tuple[str, str],
+        *,
+        reset_at_ms: int,
+    ) -> None:
+        with self._lock:
+            bucket = self._bucket(key)
+            bucket.remaining = 0
+            bucket.reset_at_ms = max(
+                int(reset_at_ms),
+                int(bucket.reset_at_ms or 0),
+            )
+
+
+class BybitTransport:
+    """
+    Process-wide HTTP transport shared by every BybitV5Client.
+
+    Keeps one keep-alive requests.Session (with its own connection
+    pool) per base URL, so repeated signed calls reuse TCP+TLS
+    connections, and routes every call through the rate limiter.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int | None = None,
+        pool_maxsize: int | None = None,
+        backoff_max_sec: Decimal | float | None = None,
+        limiter: BybitRateLimiter | None = None,
+    ) -> None:
+        self.pool_connections = int(
+            pool_connections or settings.BYBIT_HTTP_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = int(
+            pool_maxsize or settings.BYBIT_HTTP_POOL_MAXSIZE
+        )
+        self.backoff_max_sec = float(
+            backoff_max_sec
+            if backoff_max_sec is not None
+            else settings.BYBIT_HTTP_BACKOFF_MAX_SEC
+        )
+        self.limiter = limiter or BybitRateLimiter()
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+
+    def session_for(self, base_url: str) -> requests.Session:
+        base_url = base_url.rstrip("/")
+
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[base_url] = session
+
+        return session
+
+    def request(
+        self,
+        method: str,
+        *,
+        base_url: str,
+        path: str,
+        api_key: str | None,
+        params: dict[str, Any] | None = None,
+        data: str | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float,
+    ) -> requests.Response:
+        key = (api_key or PUBLIC_KEY, endpoint_class(path))
+        self.limiter.acquire(
+            key,
+            max_wait_sec=self.backoff_max_sec,
+        )
+
+        resp = self.session_for(base_url).request(
+            method,
+            f"{base_url.rstrip('/')}{path}",
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=timeout,
+        )
+
+        self.limiter.update_from_headers(key, resp.headers)
+
+        if resp.status_code == 429:
+            reset_at_ms = _header_int(
+                resp.headers,
+                "X-Bapi-Limit-Reset-Timestamp",
+            )
+            self.limiter.mark_exhausted(
+                key,
+                reset_at_ms=(
+                    reset_at_ms
+                    or int(time.time() * 1000) + 1000
+                ),
+            )
+            raise BybitRateLimited(
+                f"HTTP 429 for {path}",
+                reset_at_ms=reset_at_ms,
+            )
+
+        return resp
+
+    def note_rate_limited(
+        self,
+        *,
+        api_key: str | None,
+        path: str,
+        reset_at_ms: int | None,
+    ) -> None:
+        self.limiter.mark_exhausted(
+            (api_key or PUBLIC_KEY, endpoint_class(path)),
+            reset_at_ms=(
+                reset_at_ms
+                or int(time.time() * 1000) + 1000
+            ),
+        )
+
+    def retry_delay_sec(
+        self,
+        exc: Exception,
+        *,
+        attempt: int,
+        base_sec: Decimal | float,
+    ) -> float:
+        """
+        Adaptive delay before the next attempt.
+
+        Rate-limited calls wait in the limiter until the bucket resets,
+        so no extra sleep is added here. Other transient failures use
+        exponential backoff with full jitter, capped at
+        BYBIT_HTTP_BACKOFF_MAX_SEC.
+        """
+        if isinstance(exc, BybitRateLimited):
+            return 0.0
+
+        ceiling = min(
+            float(base_sec) * (2 ** max(int(attempt), 0)),
+            self.backoff_max_sec,
+        )
+        return random.uniform(ceiling / 2, ceiling) if ceiling > 0 else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+
+        for session in sessions:
+            session.close()
+
+
+_TRANSPORT: ProcessSingleton[BybitTransport] = ProcessSingleton(BybitTransport)
+
+
+def get_bybit_transport() -> BybitTransport:
+    return _TRANSPORT.get()
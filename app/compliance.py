@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import re
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,6 +12,7 @@ from typing import Any
 import aiohttp
 
 from app.config import settings
+from app.utils.cache import ProcessSingleton, TtlLruCache
 
 # keccak256("isSanctioned(address)")[:4] = 0xdf592f7d
 ORACLE_SELECTOR = "df592f7d"
@@ -31,11 +34,11 @@ def _encode_call_is_sanctioned(address_lower_0x: str) -> str:
     return "0x" + ORACLE_SELECTOR + ("0" * 24) + addr
 
 
-_ofac_cache: set[str] | None = None
+_ofac_cache: frozenset[str] | None = None
 _ofac_cache_mtime: float | None = None
 
 
-def _load_ofac_set() -> set[str]:
+def _load_ofac_set() -> frozenset[str]:
     global _ofac_cache, _ofac_cache_mtime
 
     root = Path(__file__).resolve().parent.parent
@@ -50,10 +53,7 @@ def _load_ofac_set() -> set[str]:
     if not isinstance(data, list):
         raise ValueError("OFAC file must be a JSON list of addresses")
 
-    s = set()
-    for x in data:
-        if isinstance(x, str):
-            s.add(x.strip().lower())
+    s = frozenset(x.strip().lower() for x in data if isinstance(x, str))
     _ofac_cache = s
     _ofac_cache_mtime = st.st_mtime
     return s
@@ -135,15 +135,90 @@ async def check_ofac_local(address: str) -> tuple[str, dict]:
         return "error", {"exception": str(e)}
 
 
-async def screen_address(address: str, session: aiohttp.ClientSession) -> tuple[str, dict]:
+class ScreeningVerdictCache:
+    """
+    Recently screened clean addresses.
+
+    Only "ok" verdicts go in: a blocked address must stay blocked and a
+    provider error must be retried, so neither is ever cached. Entries
+    expire after ttl_sec; the oldest are dropped beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._entries: TtlLruCache[str, dict] = TtlLruCache(
+            ttl_sec=(
+                ttl_sec
+                if ttl_sec is not None
+                else settings.COMPLIANCE_VERDICT_CACHE_TTL_SEC
+            ),
+            max_entries=(
+                max_entries
+                if max_entries is not None
+                else settings.COMPLIANCE_VERDICT_CACHE_MAX_ENTRIES
+            ),
+            clock=self._now,
+        )
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def get_ok(self, address: str) -> dict | None:
+        return self._entries.get(normalize_address(address))
+
+    def put(self, address: str, final: str, details: dict) -> None:
+        if final != "ok":
+            return
+
+        self._entries.put(normalize_address(address), details)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_VERDICT_CACHE: ProcessSingleton[ScreeningVerdictCache] = ProcessSingleton(
+    ScreeningVerdictCache
+)
+
+
+def get_screening_verdict_cache() -> ScreeningVerdictCache:
+    return _VERDICT_CACHE.get()
+
+
+async def screen_address(
+    address: str,
+    session: aiohttp.ClientSession,
+    *,
+    use_cache: bool = True,
+) -> tuple[str, dict]:
     """
     final: ok | blocked | pending_check
+
+    The three providers run concurrently. A cached "ok" skips the remote
+    providers, but the local OFAC list is always consulted so a freshly
+    reloaded list takes effect immediately.
     """
+    cache = get_screening_verdict_cache() if use_cache else None
+
+    if cache is not None:
+        cached = cache.get_ok(address)
+        if cached is not None:
+            f_status, f_det = await check_ofac_local(address)
+            if f_status == "ok":
+                return "ok", {**cached, "cached": True, "ofac_local": {"status": f_status, "details": f_det}}
+
     details: dict[str, Any] = {"address": normalize_address(address), "ts": utcnow().isoformat()}
 
-    c_status, c_det = await check_chainalysis_api(address, session)
-    o_status, o_det = await check_oracle(address, session)
-    f_status, f_det = await check_ofac_local(address)
+    (c_status, c_det), (o_status, o_det), (f_status, f_det) = await asyncio.gather(
+        check_chainalysis_api(address, session),
+        check_oracle(address, session),
+        check_ofac_local(address),
+    )
 
     details["chainalysis_api"] = {"status": c_status, "details": c_det}
     details["oracle"] = {"status": o_status, "details": o_det}
@@ -157,6 +232,10 @@ async def screen_address(address: str, session: aiohttp.ClientSession) -> tuple[
     if settings.COMPLIANCE_FAIL_CLOSED and "error" in statuses:
         return "pending_check", details
 
+    # With fail-open, "ok" may hide a provider error; that is not cached.
+    if cache is not None and "error" not in statuses:
+        cache.put(address, "ok", details)
+
     return "ok", details
 
 
@@ -7,6 +7,31 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     DATABASE_URL: str
+    # Optional hot standby for read-mostly routes (app.db.get_read_db).
+    DATABASE_READ_URL: str = ""
+
+    # --- database pools ---
+    # Profile per process role: web | worker | collector. Empty picks it
+    # from the entrypoint (see app.db.detect_process_role).
+    DB_POOL_PROFILE: str = ""
+    DB_POOL_TIMEOUT_SEC: int = 30
+
+    DB_WEB_POOL_SIZE: int = 10
+    DB_WEB_MAX_OVERFLOW: int = 20
+    DB_WEB_POOL_RECYCLE_SEC: int = 1800
+    DB_WEB_STATEMENT_TIMEOUT_MS: int = 15000
+
+    # Unset worker/collector sizes follow the thread counts they serve
+    # (see app.db.pool_profile): never below SQLAlchemy's old 5 + 10.
+    DB_WORKER_POOL_SIZE: int | None = None
+    DB_WORKER_MAX_OVERFLOW: int | None = None
+    DB_WORKER_POOL_RECYCLE_SEC: int = 1800
+    DB_WORKER_STATEMENT_TIMEOUT_MS: int = 0
+
+    DB_COLLECTOR_POOL_SIZE: int | None = None
+    DB_COLLECTOR_MAX_OVERFLOW: int | None = None
+    DB_COLLECTOR_POOL_RECYCLE_SEC: int = 1800
+    DB_COLLECTOR_STATEMENT_TIMEOUT_MS: int = 60000
 
     SECRET_KEY: str = "CHANGE_ME"
 
@@ -22,6 +47,21 @@ class Settings(BaseSettings):
     SMTP_USERNAME: str = ""
     SMTP_PASSWORD: str = ""
     SMTP_TIMEOUT_SEC: int = 20
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+
+    # Outbox: request handlers only insert into email_outbox and
+    # workers.email_delivery_worker sends. Retries back off from
+    # RETRY_BASE_SEC doubling up to RETRY_MAX_SEC.
+    EMAIL_OUTBOX_ENABLED: bool = False
+    EMAIL_OUTBOX_POLL_SEC: float = 1.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_LEASE_SEC: int = 120
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SEC: int = 10
+    EMAIL_OUTBOX_RETRY_MAX_SEC: int = 900
+    # Rows older than this are failed unsent: the codes they carry have
+    # expired (SECURITY_CODE_TTL_MINUTES). 0 disables the age limit.
+    EMAIL_OUTBOX_MAX_AGE_SEC: int = 1200
 
     # --- security codes ---
     SECURITY_CODE_LENGTH: int = 6
@@ -36,6 +76,14 @@ class Settings(BaseSettings):
     COOKIE_SAMESITE: str = "lax"   # lax | strict | none
     COOKIE_DOMAIN: str = ""
     COOKIE_PATH: str = "/"
+    # Authenticated sessions are cached per process; logout and password
+    # changes invalidate locally, other processes catch up within the TTL.
+    AUTH_SESSION_CACHE_TTL_SEC: int = 30
+    AUTH_SESSION_CACHE_MAX_ENTRIES: int = 10000
+    SESSION_SWEEP_INTERVAL_SEC: int = 300
+    SESSION_SWEEP_BATCH_SIZE: int = 500
+    SESSION_SWEEP_MAX_BATCHES: int = 200
+    SESSION_SWEEP_BATCH_PAUSE_SEC: float = 0.05
 
     # --- TOTP / Google Authenticator ---
     TOTP_ENC_KEY: str = ""
@@ -87,15 +135,42 @@ class Settings(BaseSettings):
 
     # --- wallets / bsc ---
     BSC_RPC_URL: str = ""
+    # Extra HTTP endpoints (comma-separated) pooled with BSC_RPC_URL for failover.
+    BSC_RPC_URLS: str = ""
+    BSC_RPC_TIMEOUT_SEC: float = 20.0
+    BSC_RPC_POOL_SIZE: int = 16
+    BSC_RPC_ERROR_COOLDOWN_SEC: float = 5.0
     BSC_WS_URL: str = ""
     BSC_USDT_CONTRACT: str = "0x55d398326f99059fF775485246999027B3197955"
     BSC_USDT_DECIMALS: int = 18
     BSC_CONFIRMATIONS: int = 20
     BSC_CONFIRM_POLL_SEC: int = 15
     BSC_BALANCE_POLL_SEC: int = 15
+    # Multicall3 is deployed at the same address on BSC mainnet and testnet.
+    BSC_MULTICALL3_ADDRESS: str = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    BSC_BALANCE_BATCH_SIZE: int = 200
     BSC_WALLET_MAP_RELOAD_SEC: int = 60
+    # Shared DB nonce allocator for hot senders (stage 27.6 tables required).
+    BSC_NONCE_MANAGER_ENABLED: bool = False
+    BSC_NONCE_RECONCILE_SEC: int = 30
+    BSC_NONCE_STALE_SEC: int = 300
+    # Gas price / BNB quote oracle; percentile 0 disables feeHistory smoothing.
+    BSC_GAS_PRICE_TTL_SEC: float = 3.0
+    BSC_BNB_PRICE_TTL_SEC: float = 30.0
+    BSC_GAS_PRICE_PERCENTILE: float = 0.0
+    BSC_GAS_PRICE_HISTORY_BLOCKS: int = 20
+    BSC_BLOCK_HEADER_CACHE_SIZE: int = 4096
+    BSC_BLOCK_HEADER_BATCH_SIZE: int = 100
+    BSC_AVG_BLOCK_TIME_SEC: float = 0.75
+    # Non-exact lookups extrapolate from a cached header at most this far away.
+    BSC_BLOCK_TIME_ESTIMATE_MAX_BLOCKS: int = 20
     BSC_REORG_BUFFER_BLOCKS: int = 20
+    # Initial eth_getLogs window; it adapts between the min/max below.
     BSC_BACKFILL_CHUNK_BLOCKS: int = 2000
+    BSC_BACKFILL_MIN_CHUNK_BLOCKS: int = 50
+    BSC_BACKFILL_MAX_CHUNK_BLOCKS: int = 10000
+    BSC_BACKFILL_TARGET_SEC: float = 2.0
+    BSC_BACKFILL_CONCURRENCY: int = 4
     BSC_START_LOOKBACK_BLOCKS: int = 50000
     BSC_BACKFILL_ON_START: bool = True
     WALLET_ENC_KEY: str = ""
@@ -111,6 +186,10 @@ class Settings(BaseSettings):
     COMPLIANCE_PENDING_RETRY_SEC: int = 60
     COMPLIANCE_ORACLE_CONTRACT: str = "0x40C57923924B5c5c5455c48D93317139ADDaC8fb"
     COMPLIANCE_OFAC_FILE: str = "data/ofac_addresses.json"
+    COMPLIANCE_CONCURRENCY: int = 16
+    # Only "ok" verdicts are cached; blocked and provider errors never are.
+    COMPLIANCE_VERDICT_CACHE_TTL_SEC: int = 900
+    COMPLIANCE_VERDICT_CACHE_MAX_ENTRIES: int = 10000
 
     # --- stage 10: withdrawals ---
     FEE_WALLET_OK_ADDRESS: str = ""
@@ -122,6 +201,9 @@ class Settings(BaseSettings):
     WITHDRAW_SESSION_TTL_MIN: int = 15
     WITHDRAW_GAS_BUFFER_MULT: Decimal = Decimal("1.2")
     WITHDRAW_GAS_MAX_BNB: Decimal = Decimal("0.01")
+    # Withdrawals from different user wallets processed at once.
+    WITHDRAW_CONCURRENCY: int = 4
+    WITHDRAW_BATCH_SIZE: int = 50
     ERC20_TRANSFER_GAS_FALLBACK: int = 70000
 
     # --- telegram watchdog ---
@@ -237,6 +319,30 @@ class Settings(BaseSettings):
     BYBIT_NAV_RECV_WINDOW_MS: int = 5000
     BYBIT_NAV_EQUITY_TOL_PCT: Decimal = Decimal("0.5")
     NAV_POLL_INTERVAL_SEC: int = 10
+    NAV_COLLECTOR_MAX_WORKERS: int = 16
+    NAV_LATEST_CACHE_TTL_SEC: int = 5
+
+    # --- chart candles ---
+    # Enable only after scripts.backfill_chart_rollups has run; the
+    # migration creates fund_chart_rollup empty.
+    CHART_ROLLUP_READS_ENABLED: bool = False
+    CHART_BARS_CACHE_ENABLED: bool = True
+    CHART_BARS_CACHE_OPEN_TTL_SEC: int = 5
+    CHART_BARS_CACHE_CLOSED_GRACE_SEC: int = 120
+    CHART_BARS_CACHE_MAX_ENTRIES: int = 2048
+    CHART_BARS_CACHE_MAX_BARS: int = 500_000
+
+    # --- history page ---
+    HISTORY_PAGE_SIZE: int = 50
+    HISTORY_PAGE_SIZE_MAX: int = 200
+    HISTORY_EXPORT_BATCH_ROWS: int = 500
+    HISTORY_EXPORT_SPOOL_BYTES: int = 8 * 1024 * 1024
+
+    # --- live feed (SSE) ---
+    LIVE_FEED_POLL_SEC: float = 2.0
+    LIVE_FEED_HEARTBEAT_SEC: float = 15.0
+    LIVE_FEED_USER_REFRESH_SEC: int = 60
+    LIVE_FEED_RETRY_MS: int = 5000
 
     # --- stage 21: settlement ---
     SETTLEMENT_ENABLED: bool = False
@@ -289,6 +395,9 @@ class Settings(BaseSettings):
     ALLOCATION_MAX_IM_RATE: Decimal = Decimal("0.70")
     ALLOCATION_MAX_MM_RATE: Decimal = Decimal("0.50")
 
+    # Read-only Bybit snapshot fetch pool; 1 keeps the serial path.
+    ALLOCATION_SNAPSHOT_FETCH_WORKERS: int = 6
+
     # --- stage 22.4: spot / earn / residual mock handlers ---
     ALLOCATION_SPOT_EARN_ENABLED: bool = False
     ALLOCATION_EARN_ENABLED: bool = False
@@ -332,5 +441,15 @@ class Settings(BaseSettings):
     BYBIT_MASTER_RETRIES: int = 3
     BYBIT_MASTER_BACKOFF_SEC: Decimal = Decimal("0.8")
 
+    # --- shared Bybit V5 HTTP transport ---
+    BYBIT_HTTP_POOL_CONNECTIONS: int = 4
+    BYBIT_HTTP_POOL_MAXSIZE: int = 16
+    BYBIT_HTTP_BACKOFF_MAX_SEC: Decimal = Decimal("10")
+
+    # --- Bybit instruments-info cache ---
+    BYBIT_INSTRUMENT_CACHE_TTL_SEC: int = 3600
+    BYBIT_INSTRUMENT_CACHE_RETRY_SEC: int = 60
+    BYBIT_INSTRUMENT_CACHE_PERSIST: bool = False
+
 
 settings = Settings()
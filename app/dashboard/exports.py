@@ -0,0 +1,124 @@
+"""Streaming XLSX / CSV exports of the history page."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import ReadSessionLocal
+
+EXPORT_FORMATS = ("xlsx", "csv")
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+
+CHUNK_BYTES = 64 * 1024
+
+
+def export_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def iter_csv(headers: list[str], rows: Iterable[list[Any]], *, chunk_rows: int) -> Iterator[bytes]:
+    """CSV in chunks of chunk_rows rows; starts with a BOM so Excel reads UTF-8."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    buf.write("\ufeff")
+    writer.writerow(headers)
+
+    pending = 0
+    for row in rows:
+        writer.writerow([export_value(v) for v in row])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
+
+    tail = buf.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def iter_xlsx(headers: list[str], rows: Iterable[list[Any]], *, spool_bytes: int) -> Iterator[bytes]:
+    """
+    Write-only workbook: rows go straight to openpyxl's temp file instead
+    of an in-memory sheet. The zip container can only be read once it is
+    complete, so it is assembled in a spooled temp file (on disk beyond
+    spool_bytes) and then sent in chunks.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+
+    ws.append(headers)
+    for row in rows:
+        ws.append([export_value(v) for v in row])
+
+    with tempfile.SpooledTemporaryFile(max_size=spool_bytes) as out:
+        wb.save(out)
+        out.seek(0)
+        while chunk := out.read(CHUNK_BYTES):
+            yield chunk
+
+
+def stream_export(
+    fmt: str,
+    headers: list[str],
+    fetch_rows: Callable[[Session], Iterable[list[Any]]],
+    filename_prefix: str,
+    *,
+    now: datetime,
+    session_factory: Callable[[], Session] = ReadSessionLocal,
+) -> StreamingResponse:
+    """
+    StreamingResponse that renders fetch_rows(db) as it is consumed.
+
+    The session is opened inside the body iterator and closed when the
+    download finishes or the client goes away, so rows can be read from
+    a server-side cursor (yield_per) without holding everything in memory.
+    """
+    fmt = fmt if fmt in EXPORT_FORMATS else "xlsx"
+    batch_rows = max(1, int(settings.HISTORY_EXPORT_BATCH_ROWS))
+
+    def body() -> Iterator[bytes]:
+        db = session_factory()
+        try:
+            rows = fetch_rows(db)
+            if fmt == "csv":
+                yield from iter_csv(headers, rows, chunk_rows=batch_rows)
+            else:
+                yield from iter_xlsx(
+                    headers,
+                    rows,
+                    spool_bytes=int(settings.HISTORY_EXPORT_SPOOL_BYTES),
+                )
+        finally:
+            db.close()
+
+    filename = f"{filename_prefix}_{now.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        },
+    )
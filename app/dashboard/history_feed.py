@@ -0,0 +1,200 @@
+"""Keyset-paginated, incremental reads for the history page."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Fund, FundOrder, UserHistoryVersion, WalletTransfer
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+TRANSFER_SUBS = {
+    "all": None,
+    "deposits": "deposit",
+    "withdrawals": "withdraw",
+}
+
+TRADING_SUBS = {
+    "all": None,
+    "purchases": "buy",
+    "buys": "buy",
+    "redemptions": "redeem",
+    "redeem": "redeem",
+}
+
+
+class HistoryCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class HistoryCursor:
+    sort_ts: datetime
+    id: int
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    rows: list[Any]
+    next_cursor: str | None = None
+    # True when a `since` request had more changes than one page;
+    # the client should reload the first page instead of merging.
+    reset: bool = False
+
+
+def sort_ts_us(value: datetime) -> int:
+    """Microseconds since the epoch; exact and safe as a JS number."""
+    return (value.astimezone(timezone.utc) - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(sort_ts: datetime, row_id: int) -> str:
+    return f"{sort_ts_us(sort_ts)}.{int(row_id)}"
+
+
+def decode_cursor(value: str) -> HistoryCursor:
+    try:
+        ts_part, id_part = (value or "").strip().split(".", 1)
+        return HistoryCursor(
+            sort_ts=EPOCH + timedelta(microseconds=int(ts_part)),
+            id=int(id_part),
+        )
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise HistoryCursorError(f"Invalid cursor: {value!r}") from exc
+
+
+def page_limit(limit: int | None) -> int:
+    if limit is None or limit <= 0:
+        return settings.HISTORY_PAGE_SIZE
+    return min(int(limit), settings.HISTORY_PAGE_SIZE_MAX)
+
+
+def get_history_version(db: Session, user_id: int) -> int:
+    version = (
+        db.query(UserHistoryVersion.version)
+        .filter(UserHistoryVersion.user_id == user_id)
+        .scalar()
+    )
+    return int(version or 0)
+
+
+def transfer_sort_ts():
+    return func.coalesce(WalletTransfer.tx_time, WalletTransfer.detected_at)
+
+
+def transfer_row_sort_ts(tx: WalletTransfer) -> datetime:
+    return tx.tx_time or tx.detected_at
+
+
+def _page(
+    rows: list[Any],
+    *,
+    limit: int,
+    since: int | None,
+    cursor_of,
+) -> HistoryPage:
+    if len(rows) <= limit:
+        return HistoryPage(rows=rows)
+
+    if since is not None:
+        return HistoryPage(rows=[], reset=True)
+
+    rows = rows[:limit]
+    return HistoryPage(rows=rows, next_cursor=cursor_of(rows[-1]))
+
+
+def query_transfers_page(
+    db: Session,
+    *,
+    user_id: int,
+    sub: str,
+    cursor: HistoryCursor | None = None,
+    since: int | None = None,
+    limit: int | None = None,
+) -> HistoryPage:
+    """
+    Newest-first wallet transfers, keyset-paginated on
+    (COALESCE(tx_time, detected_at), id). With since, only rows whose
+    history_version is newer are returned and cursor is ignored.
+    """
+    limit = page_limit(limit)
+    sort_ts = transfer_sort_ts()
+
+    q = db.query(WalletTransfer).filter(WalletTransfer.user_id == user_id)
+
+    transfer_type = TRANSFER_SUBS[sub]
+    if transfer_type is not None:
+        q = q.filter(WalletTransfer.type == transfer_type)
+
+    if since is not None:
+        q = q.filter(WalletTransfer.history_version > since)
+    elif cursor is not None:
+        q = q.filter(
+            tuple_(sort_ts, WalletTransfer.id)
+            < tuple_(cursor.sort_ts, cursor.id)
+        )
+
+    rows = (
+        q.order_by(sort_ts.desc(), WalletTransfer.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    return _page(
+        rows,
+        limit=limit,
+        since=since,
+        cursor_of=lambda tx: encode_cursor(transfer_row_sort_ts(tx), tx.id),
+    )
+
+
+def query_trading_page(
+    db: Session,
+    *,
+    user_id: int,
+    sub: str,
+    cursor: HistoryCursor | None = None,
+    since: int | None = None,
+    limit: int | None = None,
+) -> HistoryPage:
+    """
+    Newest-first (FundOrder, Fund) pairs, keyset-paginated on
+    (created_at, id) along fund_orders_user_created_at_idx.
+    """
+    limit = page_limit(limit)
+
+    q = (
+        db.query(FundOrder, Fund)
+        .join(Fund, Fund.id == FundOrder.fund_id)
+        .filter(FundOrder.user_id == user_id)
+    )
+
+    side = TRADING_SUBS[sub]
+    if side is not None:
+        q = q.filter(FundOrder.side == side)
+
+    if since is not None:
+        q = q.filter(FundOrder.history_version > since)
+    elif cursor is not None:
+        q = q.filter(
+            tuple_(FundOrder.created_at, FundOrder.id)
+            < tuple_(cursor.sort_ts, cursor.id)
+        )
+
+    rows = (
+        q.order_by(FundOrder.created_at.desc(), FundOrder.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    return _page(
+        rows,
+        limit=limit,
+        since=since,
+        cursor_of=lambda row: encode_cursor(row[0].created_at, row[0].id),
+    )
@@ -1,6 +1,5 @@
 """Dashboard routes: dashboard, useragreement, set-language."""
-import io
-import json
+import asyncio
 import secrets
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_DOWN
@@ -8,21 +7,34 @@ from typing import Any
 
 import segno
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
-from openpyxl import Workbook
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from starlette.requests import Request
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.db import get_db
+from app.db import SessionLocal, get_db, get_read_db
 from app.web import templates
 from app.i18n import get_lang_from_request, t, SUPPORTED_LANGS, LANG_COOKIE_NAME
-from app.auth import get_current_user
-from app.auth.deps import NotAuthenticated
+from app.auth import get_current_principal, get_current_user
+from app.auth.deps import NotAuthenticated, get_current_principal as get_current_principal_from_cookie
+from app.auth.session_cache import SessionPrincipal
 from app.auth.code_action_cooldown import enforce_code_action_cooldown
+from app.live_feed import SSE_HEADERS, get_live_feed_hub, stream_topic
 from app.portfolio import get_user_portfolio
+from app.dashboard.exports import stream_export
+from app.dashboard.history_feed import (
+    TRADING_SUBS,
+    TRANSFER_SUBS,
+    HistoryCursorError,
+    decode_cursor,
+    get_history_version,
+    query_trading_page,
+    query_transfers_page,
+    sort_ts_us,
+    transfer_row_sort_ts,
+)
 from app.models import (
     User,
     UserWallet,
@@ -36,7 +48,7 @@ from app.utils.wallet_check import validate_address_status
 from app.codes import create_code, verify_code, get_active_code
 from app.emails import send_withdraw_code
 from app.totp import require_totp_if_enabled
-from app.trading.history_formatter import format_trading_history_rows
+from app.trading.history_formatter import format_trading_history_row, format_trading_history_rows
 
 router = APIRouter()
 
@@ -115,39 +127,6 @@ def _transfer_datetime(tx: WalletTransfer) -> datetime | None:
     return tx.tx_time or tx.detected_at
 
 
-def _excel_value(value: Any) -> Any:
-    if isinstance(value, Decimal):
-        return str(value)
-    if isinstance(value, datetime):
-        return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-    if isinstance(value, (dict, list)):
-        return json.dumps(value, ensure_ascii=False, default=str)
-    return value
-
-
-def _build_xlsx_response(headers: list[str], rows: list[list[Any]], filename_prefix: str) -> StreamingResponse:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "data"
-
-    ws.append(headers)
-    for row in rows:
-        ws.append([_excel_value(v) for v in row])
-
-    bio = io.BytesIO()
-    wb.save(bio)
-    bio.seek(0)
-
-    filename = f"{filename_prefix}_{utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    return StreamingResponse(
-        bio,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        },
-    )
-
-
 @router.get("/dashboard")
 def dashboard(
     request: Request,
@@ -642,13 +621,7 @@ def withdraw_cancel(
     return {"status": "ok"}
 
 
-@router.get("/api/dashboard/live")
-def dashboard_live(
-    request: Request,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    lang = get_lang_from_request(request)
+def _dashboard_live_payload(db: Session, user: User | SessionPrincipal, lang: str) -> dict:
     portfolio = get_user_portfolio(db, user, lang)
 
     wallet = (
@@ -693,14 +666,112 @@ def dashboard_live(
     }
 
 
+@router.get("/api/dashboard/live")
+def dashboard_live(
+    request: Request,
+    principal: SessionPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    lang = get_lang_from_request(request)
+    return _dashboard_live_payload(db, principal, lang)
+
+
+def _stream_user_id(request: Request) -> int:
+    # Short-lived session: a stream must not pin a pooled connection.
+    db = SessionLocal()
+    try:
+        return get_current_principal_from_cookie(request, db).user_id
+    finally:
+        db.close()
+
+
+def _user_stream_payload(db: Session, user_id: int, lang: str) -> dict | None:
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_active:
+        return None
+
+    payload = _dashboard_live_payload(db, user, lang)
+    payload["history_version"] = get_history_version(db, user_id)
+    return payload
+
+
+@router.get("/api/dashboard/stream")
+async def dashboard_stream(request: Request):
+    """
+    Server-sent portfolio updates for the dashboard and history pages.
+
+    The first "portfolio" event carries the /api/dashboard/live payload
+    plus history_version; later "portfolio_delta" events carry only the
+    fields and funds rows that changed. Recomputed on NAV ticks, history
+    writes and every LIVE_FEED_USER_REFRESH_SEC.
+    """
+    lang = get_lang_from_request(request)
+    user_id = await asyncio.to_thread(_stream_user_id, request)
+    refresh_sec = max(1, int(settings.LIVE_FEED_USER_REFRESH_SEC))
+
+    async def events():
+        async with get_live_feed_hub().subscribe(
+            ("portfolio", user_id, lang),
+            compute=lambda db: _user_stream_payload(db, user_id, lang),
+            watermark=lambda tick: (
+                tick.nav_mark,
+                tick.history_versions.get(user_id, 0),
+                int(tick.now // refresh_sec),
+            ),
+            user_id=user_id,
+        ) as topic:
+            async for frame in stream_topic(
+                request,
+                topic,
+                event="portfolio",
+                delta_event="portfolio_delta",
+            ):
+                yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+def _transfer_live_row(tx: WalletTransfer) -> dict:
+    addr = _transfer_address(tx)
+    return {
+        "id": tx.id,
+        "coin": tx.coin or "USDT",
+        "network": tx.network or "BSC (BEP20)",
+        "amount": _dec_str(tx.amount, "0.00"),
+        "type": tx.type,
+        "address": addr,
+        "txid": tx.tx_hash or "",
+        "status": tx.status,
+        "compliance_status": tx.compliance_status,
+        "date_time": _dt_str(_transfer_datetime(tx)),
+        "full_address": addr,
+        "full_tx_hash": tx.tx_hash or "",
+        "sort_ts": sort_ts_us(transfer_row_sort_ts(tx)),
+    }
+
+
 @router.get("/api/history/live")
 def history_live(
     request: Request,
     section: str = Query(default="transfers"),
     sub: str = Query(default="all"),
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None),
+    since: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1),
+    principal: SessionPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    One page of history, newest first.
+
+    cursor  - next_cursor of the previous page (older rows).
+    since   - version from a previous response; only rows changed after
+              it are returned, or 304 when nothing changed.
+    """
     lang = get_lang_from_request(request)
 
     section = (section or "").strip().lower()
@@ -712,170 +783,168 @@ def history_live(
             status_code=400,
         )
 
-    if section == "transfers":
-        sort_by = func.coalesce(WalletTransfer.tx_time, WalletTransfer.detected_at).desc()
-        q = db.query(WalletTransfer).filter(WalletTransfer.user_id == user.id)
-
-        if sub == "deposits":
-            q = q.filter(WalletTransfer.type == "deposit")
-        elif sub == "withdrawals":
-            q = q.filter(WalletTransfer.type == "withdraw")
-        elif sub != "all":
-            return JSONResponse(
-                {"status": "error", "message": "Unsupported sub"},
-                status_code=400,
-            )
-
-        rows = q.order_by(sort_by).all()
-
-        payload_rows = []
-        for tx in rows:
-            addr = _transfer_address(tx)
-            payload_rows.append(
-                {
-                    "id": tx.id,
-                    "coin": tx.coin or "USDT",
-                    "network": tx.network or "BSC (BEP20)",
-                    "amount": _dec_str(tx.amount, "0.00"),
-                    "type": tx.type,
-                    "address": addr,
-                    "txid": tx.tx_hash or "",
-                    "status": tx.status,
-                    "compliance_status": tx.compliance_status,
-                    "date_time": _dt_str(_transfer_datetime(tx)),
-                    "full_address": addr,
-                    "full_tx_hash": tx.tx_hash or "",
-                }
-            )
-
-        return {
-            "status": "ok",
-            "section": "transfers",
-            "sub": sub,
-            "rows": payload_rows,
-        }
-
-    q = (
-        db.query(FundOrder, Fund)
-        .join(Fund, Fund.id == FundOrder.fund_id)
-        .filter(FundOrder.user_id == user.id)
-    )
-
-    if sub in {"purchases", "buys"}:
-        q = q.filter(FundOrder.side == "buy")
-    elif sub in {"redemptions", "redeem"}:
-        q = q.filter(FundOrder.side == "redeem")
-    elif sub != "all":
+    subs = TRANSFER_SUBS if section == "transfers" else TRADING_SUBS
+    if sub not in subs:
         return JSONResponse(
             {"status": "error", "message": "Unsupported sub"},
             status_code=400,
         )
 
-    rows = q.order_by(FundOrder.created_at.desc()).all()
+    try:
+        decoded_cursor = decode_cursor(cursor) if cursor else None
+    except HistoryCursorError:
+        return JSONResponse(
+            {"status": "error", "message": "Invalid cursor"},
+            status_code=400,
+        )
+
+    # Read the version before the rows: a write committed in between is
+    # sent again on the next poll instead of being missed.
+    version = get_history_version(db, principal.user_id)
 
-    payload_rows = format_trading_history_rows(rows, lang)
+    if since is not None and since > version:
+        since = None
+    if since is not None and since == version:
+        return Response(status_code=304)
+
+    query_page = (
+        query_transfers_page if section == "transfers" else query_trading_page
+    )
+    page = query_page(
+        db,
+        user_id=principal.user_id,
+        sub=sub,
+        cursor=decoded_cursor,
+        since=since,
+        limit=limit,
+    )
+
+    if section == "transfers":
+        payload_rows = [_transfer_live_row(tx) for tx in page.rows]
+    else:
+        payload_rows = format_trading_history_rows(page.rows, lang)
+        for row, (order, _fund) in zip(payload_rows, page.rows):
+            row["sort_ts"] = sort_ts_us(order.created_at)
 
     return {
         "status": "ok",
-        "section": "trading",
+        "section": section,
         "sub": sub,
         "rows": payload_rows,
+        "next_cursor": page.next_cursor,
+        "version": version,
+        "changes_only": since is not None and not page.reset,
+        "reset": page.reset,
     }
 
 
-@router.get("/api/history/export/transfers")
-def history_export_transfers(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    headers = [
-        "coin",
-        "network",
-        "amount",
-        "type",
-        "address",
-        "txid",
-        "status",
-        "compliance_status",
-        "date_time",
-    ]
-
+TRANSFER_EXPORT_HEADERS = [
+    "coin",
+    "network",
+    "amount",
+    "type",
+    "address",
+    "txid",
+    "status",
+    "compliance_status",
+    "date_time",
+]
+
+TRADING_EXPORT_HEADERS = [
+    "name",
+    "side",
+    "amount",
+    "shares",
+    "price",
+    "status",
+    "created",
+    "executed",
+]
+
+
+def _transfer_export_rows(db: Session, user_id: int):
     sort_by = func.coalesce(WalletTransfer.tx_time, WalletTransfer.detected_at).desc()
     transfers = (
         db.query(WalletTransfer)
-        .filter(WalletTransfer.user_id == user.id)
-        .order_by(sort_by)
-        .all()
+        .filter(WalletTransfer.user_id == user_id)
+        .order_by(sort_by, WalletTransfer.id.desc())
+        .yield_per(max(1, int(settings.HISTORY_EXPORT_BATCH_ROWS)))
     )
 
-    rows = []
     for tx in transfers:
-        addr = _transfer_address(tx)
-        dt = _transfer_datetime(tx)
-
-        rows.append(
-            [
-                tx.coin or "USDT",
-                tx.network or "BSC (BEP20)",
-                tx.amount,
-                tx.type,
-                addr,
-                tx.tx_hash,
-                tx.status,
-                tx.compliance_status,
-                dt,
-            ]
-        )
+        yield [
+            tx.coin or "USDT",
+            tx.network or "BSC (BEP20)",
+            tx.amount,
+            tx.type,
+            _transfer_address(tx),
+            tx.tx_hash,
+            tx.status,
+            tx.compliance_status,
+            _transfer_datetime(tx),
+        ]
+
+
+def _trading_export_rows(db: Session, user_id: int, lang: str):
+    order_rows = (
+        db.query(FundOrder, Fund)
+        .join(Fund, Fund.id == FundOrder.fund_id)
+        .filter(FundOrder.user_id == user_id)
+        .order_by(FundOrder.created_at.desc(), FundOrder.id.desc())
+        .yield_per(max(1, int(settings.HISTORY_EXPORT_BATCH_ROWS)))
+    )
+
+    for order, fund in order_rows:
+        row = format_trading_history_row(order, fund, lang)
+        yield [
+            row.get("name"),
+            row.get("side_label"),
+            row.get("amount"),
+            row.get("shares_display"),
+            row.get("price"),
+            row.get("status_label"),
+            row.get("created"),
+            row.get("executed"),
+        ]
 
-    return _build_xlsx_response(headers, rows, "wildboar_transfers")
+
+@router.get("/api/history/export/transfers")
+def history_export_transfers(
+    request: Request,
+    format: str = Query(default="xlsx", pattern="^(xlsx|csv)$"),
+):
+    """
+    Transfers as XLSX or CSV, rendered while streaming. Auth uses a
+    short-lived session so a long download holds only the read session.
+    """
+    user_id = _stream_user_id(request)
+
+    return stream_export(
+        format,
+        TRANSFER_EXPORT_HEADERS,
+        lambda db: _transfer_export_rows(db, user_id),
+        "wildboar_transfers",
+        now=utcnow(),
+    )
 
 
 @router.get("/api/history/export/trading")
 def history_export_trading(
     request: Request,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    format: str = Query(default="xlsx", pattern="^(xlsx|csv)$"),
 ):
+    """Trading operations as XLSX or CSV; see history_export_transfers."""
     lang = get_lang_from_request(request)
-
-    headers = [
-        "name",
-        "side",
-        "amount",
-        "shares",
-        "price",
-        "status",
-        "created",
-        "executed",
-    ]
-
-    order_rows = (
-        db.query(FundOrder, Fund)
-        .join(Fund, Fund.id == FundOrder.fund_id)
-        .filter(FundOrder.user_id == user.id)
-        .order_by(FundOrder.created_at.desc())
-        .all()
+    user_id = _stream_user_id(request)
+
+    return stream_export(
+        format,
+        TRADING_EXPORT_HEADERS,
+        lambda db: _trading_export_rows(db, user_id, lang),
+        "wildboar_trading_operations",
+        now=utcnow(),
     )
 
-    formatted_rows = format_trading_history_rows(order_rows, lang)
-
-    rows = []
-    for row in formatted_rows:
-        rows.append(
-            [
-                row.get("name"),
-                row.get("side_label"),
-                row.get("amount"),
-                row.get("shares_display"),
-                row.get("price"),
-                row.get("status_label"),
-                row.get("created"),
-                row.get("executed"),
-            ]
-        )
-
-    return _build_xlsx_response(headers, rows, "wildboar_trading_operations")
-
 
 @router.get("/history")
 def history_page(
@@ -888,27 +957,10 @@ def history_page(
 
     lang = get_lang_from_request(request)
 
-    sort_by = func.coalesce(WalletTransfer.tx_time, WalletTransfer.detected_at).desc()
-
-    transfers_all = (
-        db.query(WalletTransfer)
-        .filter(WalletTransfer.user_id == user.id)
-        .order_by(sort_by)
-        .all()
-    )
-
-    transfers_deposits = (
-        db.query(WalletTransfer)
-        .filter(WalletTransfer.user_id == user.id, WalletTransfer.type == "deposit")
-        .order_by(sort_by)
-        .all()
-    )
-
-    transfers_withdrawals = (
-        db.query(WalletTransfer)
-        .filter(WalletTransfer.user_id == user.id, WalletTransfer.type == "withdraw")
-        .order_by(sort_by)
-        .all()
+    # First page only; history.js loads older pages and live changes.
+    transfers_all, transfers_deposits, transfers_withdrawals = (
+        query_transfers_page(db, user_id=user.id, sub=sub).rows
+        for sub in ("all", "deposits", "withdrawals")
     )
 
     return templates.TemplateResponse(
@@ -1,10 +1,132 @@
+"""
+Engines and session factories.
+
+Each process sizes its pool from a profile picked by its role (web,
+worker, collector). Read-mostly routes can opt into get_read_db, which
+uses DATABASE_READ_URL when a replica is configured and otherwise a
+read-only view of the primary pool.
+"""
+import sys
+from dataclasses import dataclass
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+POOL_ROLES = ("web", "worker", "collector")
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    role: str
+    pool_size: int
+    max_overflow: int
+    pool_recycle_sec: int
+    statement_timeout_ms: int
+
+
+def detect_process_role(main_module: str | None = None, argv0: str | None = None) -> str:
+    """
+    DB_POOL_PROFILE when set; otherwise derived from how the process was
+    started: `python -m workers.nav_collector` is the collector, other
+    `workers.*` modules are workers, uvicorn/gunicorn is web. Anything
+    else (scripts, shells) gets the worker profile, which has no
+    statement timeout.
+    """
+    configured = (settings.DB_POOL_PROFILE or "").strip().lower()
+    if configured:
+        if configured not in POOL_ROLES:
+            raise ValueError(f"DB_POOL_PROFILE must be one of {POOL_ROLES}, got {configured!r}")
+        return configured
+
+    if main_module is None:
+        spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+        main_module = getattr(spec, "name", None) or ""
+    if argv0 is None:
+        argv0 = sys.argv[0] if sys.argv else ""
+
+    if main_module == "workers.nav_collector":
+        return "collector"
+    if main_module.startswith("workers."):
+        return "worker"
+
+    launcher = argv0.replace("\\", "/").rsplit("/", 1)[-1]
+    if launcher in ("uvicorn", "gunicorn") or main_module.split(".", 1)[0] in ("uvicorn", "gunicorn"):
+        return "web"
+
+    return "worker"
+
+
+def _default_pool_size(role: str) -> int:
+    if role == "worker":
+        # bsc_withdrawal_processor: every WITHDRAW_CONCURRENCY thread holds
+        # its process_one session while nonce_lease opens a second one.
+        return max(5, 2 * int(settings.WITHDRAW_CONCURRENCY) + 1)
+    if role == "collector":
+        # Endpoint threads read the DB; fund threads fit in the overflow.
+        return max(5, int(settings.NAV_COLLECTOR_MAX_WORKERS))
+    return 10
+
+
+def pool_profile(role: str) -> PoolProfile:
+    """
+    Pool settings for a role. An unset DB_<ROLE>_POOL_SIZE /
+    MAX_OVERFLOW is sized from the concurrency settings of the threads
+    that share the pool, so raising those knobs cannot starve it.
+    """
+    prefix = f"DB_{role.upper()}_"
+    pool_size = getattr(settings, prefix + "POOL_SIZE")
+    max_overflow = getattr(settings, prefix + "MAX_OVERFLOW")
+    return PoolProfile(
+        role=role,
+        pool_size=max(1, int(pool_size if pool_size is not None else _default_pool_size(role))),
+        max_overflow=max(0, int(max_overflow if max_overflow is not None else 10)),
+        pool_recycle_sec=int(getattr(settings, prefix + "POOL_RECYCLE_SEC")),
+        statement_timeout_ms=max(0, int(getattr(settings, prefix + "STATEMENT_TIMEOUT_MS"))),
+    )
+
+
+def build_engine(url: str, profile: PoolProfile, *, readonly: bool = False) -> Engine:
+    connect_args = {}
+    if profile.statement_timeout_ms > 0 and make_url(url).get_backend_name() == "postgresql":
+        connect_args["options"] = f"-c statement_timeout={profile.statement_timeout_ms}"
+
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_recycle=profile.pool_recycle_sec,
+        connect_args=connect_args,
+    )
+    if readonly:
+        return engine.execution_options(postgresql_readonly=True)
+    return engine
+
+
+def build_read_engine(primary: Engine, read_url: str, profile: PoolProfile) -> Engine:
+    """
+    Replica engine with its own pool, or, without a replica, the primary
+    pool with transactions marked READ ONLY so opting a route in never
+    lets it write by accident. The flag is reset when the connection
+    goes back to the shared pool.
+    """
+    read_url = (read_url or "").strip()
+    if read_url:
+        return build_engine(read_url, profile, readonly=True)
+    return primary.execution_options(postgresql_readonly=True)
+
+
+POOL_PROFILE = pool_profile(detect_process_role())
+
+engine = build_engine(settings.DATABASE_URL, POOL_PROFILE)
+read_engine = build_read_engine(engine, settings.DATABASE_READ_URL, POOL_PROFILE)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 
@@ -14,3 +136,15 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    get_db for read-only routes. Data may lag the primary by the replica
+    delay, so only use it where a slightly stale read is acceptable.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
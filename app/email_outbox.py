@@ -0,0 +1,242 @@
+"""Persisted queue of outgoing email (email_outbox table)."""
+from __future__ import annotations
+
+import smtplib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import EmailOutbox
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: int
+    to_email: str
+    subject: str
+    html_body: str
+    attempts: int
+    created_at: datetime | None = None
+
+
+def enqueue_email(
+    to_email: str,
+    subject: str,
+    html_body: str,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> int:
+    """Queue one message; a single INSERT in its own short transaction."""
+    if not (settings.EMAIL_FROM_EMAIL or "").strip():
+        raise RuntimeError("EMAIL_FROM_EMAIL is not set")
+
+    db = session_factory()
+    try:
+        row = EmailOutbox(
+            to_email=to_email,
+            subject=subject,
+            html_body=html_body,
+            status="pending",
+            attempts=0,
+            next_attempt_at=utcnow(),
+            created_at=utcnow(),
+        )
+        db.add(row)
+        db.flush()
+        outbox_id = int(row.id)
+        db.commit()
+        return outbox_id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def claim_due(db: Session, *, now: datetime, limit: int, lease_sec: int) -> list[OutboxMessage]:
+    """
+    Lock up to limit due rows (pending past next_attempt_at, or sending
+    with an expired lease) and mark them sending. SKIP LOCKED lets
+    several workers drain the queue without waiting on each other.
+    The caller commits.
+    """
+    rows = (
+        db.query(EmailOutbox)
+        .filter(
+            or_(
+                and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+                and_(EmailOutbox.status == "sending", EmailOutbox.locked_until < now),
+            )
+        )
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    claimed = []
+    for row in rows:
+        row.status = "sending"
+        row.locked_until = now + timedelta(seconds=lease_sec)
+        row.attempts = int(row.attempts or 0) + 1
+        claimed.append(
+            OutboxMessage(
+                id=int(row.id),
+                to_email=row.to_email,
+                subject=row.subject,
+                html_body=row.html_body,
+                attempts=row.attempts,
+                created_at=row.created_at,
+            )
+        )
+    return claimed
+
+
+def _max_age_cutoff(now: datetime) -> datetime | None:
+    max_age_sec = int(settings.EMAIL_OUTBOX_MAX_AGE_SEC)
+    if max_age_sec <= 0:
+        return None
+    return now - timedelta(seconds=max_age_sec)
+
+
+def is_expired(message: OutboxMessage, *, now: datetime) -> bool:
+    cutoff = _max_age_cutoff(now)
+    return cutoff is not None and message.created_at is not None and message.created_at < cutoff
+
+
+def expire_stale(db: Session, *, now: datetime) -> int:
+    """
+    Fail unsent rows older than EMAIL_OUTBOX_MAX_AGE_SEC, whatever their
+    attempt count: the codes they carry are no longer valid. Rows under a
+    live lease are left to their worker. The caller commits.
+    """
+    cutoff = _max_age_cutoff(now)
+    if cutoff is None:
+        return 0
+
+    return (
+        db.query(EmailOutbox)
+        .filter(
+            EmailOutbox.created_at < cutoff,
+            or_(
+                EmailOutbox.status == "pending",
+                and_(EmailOutbox.status == "sending", EmailOutbox.locked_until < now),
+            ),
+        )
+        .update(
+            {
+                EmailOutbox.status: "failed",
+                EmailOutbox.locked_until: None,
+                EmailOutbox.html_body: "",
+                EmailOutbox.last_error: "expired: not delivered within EMAIL_OUTBOX_MAX_AGE_SEC",
+            },
+            synchronize_session=False,
+        )
+    )
+
+
+def retry_delay_sec(attempts: int) -> int:
+    base = max(1, int(settings.EMAIL_OUTBOX_RETRY_BASE_SEC))
+    cap = max(base, int(settings.EMAIL_OUTBOX_RETRY_MAX_SEC))
+    return min(cap, base * 2 ** max(0, attempts - 1))
+
+
+# Replies about the session, not the message: service closing and the
+# authentication-required / credentials-rejected family.
+SESSION_REPLY_CODES = frozenset({421, 530, 534, 535, 538})
+
+
+def is_session_refusal(exc: BaseException) -> bool:
+    """
+    The relay refused the sender, the greeting or the credentials. Every
+    message of the session would fail the same way, so none of them is
+    at fault.
+    """
+    if isinstance(
+        exc,
+        (smtplib.SMTPSenderRefused, smtplib.SMTPAuthenticationError, smtplib.SMTPHeloError),
+    ):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and int(exc.smtp_code) in SESSION_REPLY_CODES
+
+
+def is_message_error(exc: BaseException) -> bool:
+    """The relay answered about this message; the session is still usable."""
+    if is_session_refusal(exc):
+        return False
+    return isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+
+
+def is_permanent_failure(exc: BaseException) -> bool:
+    """Errors a retry cannot fix: a 5xx rejection of every recipient."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+        return bool(codes) and all(500 <= int(code) < 600 for code in codes)
+    return False
+
+
+def mark_sent(db: Session, message: OutboxMessage, *, now: datetime) -> None:
+    db.query(EmailOutbox).filter(EmailOutbox.id == message.id).update(
+        {
+            EmailOutbox.status: "sent",
+            EmailOutbox.sent_at: now,
+            EmailOutbox.locked_until: None,
+            EmailOutbox.last_error: None,
+            EmailOutbox.html_body: "",
+        },
+        synchronize_session=False,
+    )
+
+
+def mark_failed(db: Session, message: OutboxMessage, exc: BaseException, *, now: datetime) -> str:
+    """Reschedule with backoff, or give up; returns the new status."""
+    give_up = (
+        is_permanent_failure(exc)
+        or message.attempts >= max(1, int(settings.EMAIL_OUTBOX_MAX_ATTEMPTS))
+        or is_expired(message, now=now)
+    )
+
+    values = {
+        EmailOutbox.locked_until: None,
+        EmailOutbox.last_error: f"{type(exc).__name__}: {exc}"[:1000],
+    }
+    if give_up:
+        values[EmailOutbox.status] = "failed"
+        values[EmailOutbox.html_body] = ""
+    else:
+        values[EmailOutbox.status] = "pending"
+        values[EmailOutbox.next_attempt_at] = now + timedelta(seconds=retry_delay_sec(message.attempts))
+
+    db.query(EmailOutbox).filter(EmailOutbox.id == message.id).update(
+        values,
+        synchronize_session=False,
+    )
+    return values[EmailOutbox.status]
+
+
+def release(db: Session, message: OutboxMessage, *, retry_at: datetime | None = None) -> None:
+    """
+    Put a claimed but unattempted message back without using up an
+    attempt; with retry_at it is not claimed again before then.
+    """
+    values = {
+        EmailOutbox.status: "pending",
+        EmailOutbox.locked_until: None,
+        EmailOutbox.attempts: max(0, message.attempts - 1),
+    }
+    if retry_at is not None:
+        values[EmailOutbox.next_attempt_at] = retry_at
+
+    db.query(EmailOutbox).filter(EmailOutbox.id == message.id).update(
+        values,
+        synchronize_session=False,
+    )
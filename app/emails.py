@@ -5,11 +5,12 @@ import smtplib
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from app.config import settings
+from app.email_outbox import enqueue_email
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,20 +39,19 @@ def _build_message(to_email: str, subject: str, html_body: str) -> MIMEText:
     return msg
 
 
-def _send_via_smtp(to_email: str, subject: str, html_body: str) -> None:
+def _open_smtp() -> smtplib.SMTP:
     host = (settings.SMTP_HOST or "").strip()
     if not host:
         raise RuntimeError("SMTP_HOST is not set")
 
-    msg = _build_message(to_email, subject, html_body)
-
     use_ssl = bool(settings.SMTP_SSL)
     use_starttls = bool(settings.SMTP_STARTTLS)
     timeout = int(settings.SMTP_TIMEOUT_SEC)
 
     smtp_cls = smtplib.SMTP_SSL if use_ssl else smtplib.SMTP
 
-    with smtp_cls(host, int(settings.SMTP_PORT), timeout=timeout) as smtp:
+    smtp = smtp_cls(host, int(settings.SMTP_PORT), timeout=timeout)
+    try:
         smtp.ehlo()
 
         if (not use_ssl) and use_starttls:
@@ -62,10 +62,78 @@ def _send_via_smtp(to_email: str, subject: str, html_body: str) -> None:
         password = settings.SMTP_PASSWORD or ""
         if username and password:
             smtp.login(username, password)
+    except Exception:
+        smtp.close()
+        raise
+
+    return smtp
+
 
+def _send_via_smtp(to_email: str, subject: str, html_body: str) -> None:
+    msg = _build_message(to_email, subject, html_body)
+
+    with _open_smtp() as smtp:
         smtp.send_message(msg)
 
 
+class SmtpSender:
+    """
+    One SMTP session reused across messages, so a batch pays the
+    connect / STARTTLS / AUTH handshake once. Reconnects after
+    max_messages and once when the relay has dropped an idle session.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_messages: int | None = None,
+        connect: Callable[[], smtplib.SMTP] = _open_smtp,
+    ) -> None:
+        self.max_messages = max(
+            1,
+            int(
+                max_messages
+                if max_messages is not None
+                else settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+            ),
+        )
+        self._connect = connect
+        self._smtp: smtplib.SMTP | None = None
+        self._sent = 0
+
+    def send(self, to_email: str, subject: str, html_body: str) -> None:
+        msg = _build_message(to_email, subject, html_body)
+
+        if self._smtp is not None and self._sent >= self.max_messages:
+            self.close()
+
+        reused = self._smtp is not None
+        if self._smtp is None:
+            self._smtp = self._connect()
+            self._sent = 0
+
+        try:
+            self._smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            if not reused:
+                raise
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+
+        self._sent += 1
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        self._sent = 0
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
 def _send_via_gmail_api(to_email: str, subject: str, html_body: str) -> None:
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
@@ -95,11 +163,21 @@ def _send_via_gmail_api(to_email: str, subject: str, html_body: str) -> None:
     service.users().messages().send(userId="me", body={"raw": raw}).execute()
 
 
-def send_email(to_email: str, subject: str, html_body: str) -> None:
+def deliver_email(
+    to_email: str,
+    subject: str,
+    html_body: str,
+    *,
+    smtp_sender: SmtpSender | None = None,
+) -> None:
+    """Hand one message to the configured provider right now."""
     provider = (settings.EMAIL_PROVIDER or "smtp_relay").strip().lower()
 
     if provider == "smtp_relay":
-        _send_via_smtp(to_email, subject, html_body)
+        if smtp_sender is not None:
+            smtp_sender.send(to_email, subject, html_body)
+        else:
+            _send_via_smtp(to_email, subject, html_body)
         return
 
     if provider == "gmail_api":
@@ -109,6 +187,19 @@ def send_email(to_email: str, subject: str, html_body: str) -> None:
     raise RuntimeError(f"Unsupported EMAIL_PROVIDER: {provider}")
 
 
+def send_email(to_email: str, subject: str, html_body: str) -> None:
+    """
+    With EMAIL_OUTBOX_ENABLED this is a single email_outbox insert and
+    workers.email_delivery_worker does the sending; otherwise the
+    message is delivered inline.
+    """
+    if settings.EMAIL_OUTBOX_ENABLED:
+        enqueue_email(to_email, subject, html_body)
+        return
+
+    deliver_email(to_email, subject, html_body)
+
+
 def send_withdraw_code(to_email: str, lang: str, amount_gross_2dp: str, to_address: str, code: str) -> None:
     subject = "Withdraw confirmation code" if lang == "en" else "Код подтверждения вывода"
     html = render_email_template(
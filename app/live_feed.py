@@ -0,0 +1,272 @@
+"""Server-sent live updates for the terminal, dashboard and history pages."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Hashable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import UserHistoryVersion
+from app.utils.cache import ProcessSingleton
+from app.navcalc.latest_nav import get_latest_nav_prices
+
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx buffers proxied responses by default, which stalls SSE.
+    "X-Accel-Buffering": "no",
+}
+
+
+@dataclass(frozen=True)
+class LiveTick:
+    """What one poll of the hub observed; topics derive their watermark from it."""
+
+    # (fund_id, minute, nav, price) per fund. ts_utc is minute-floored and
+    # the collector rewrites the current minute, so the values are part
+    # of the mark: an intra-minute NAV change must move it.
+    nav_mark: tuple[tuple[int, datetime, Decimal, Decimal], ...]
+    history_versions: dict[int, int]
+    now: float
+
+
+@dataclass
+class LiveTopic:
+    key: Hashable
+    compute: Callable[[Session], dict | None]
+    watermark: Callable[[LiveTick], Hashable]
+    user_id: int | None = None
+    subscribers: int = 0
+    mark: Hashable = None
+    payload: dict | None = None
+    version: int = 0
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def publish(self, payload: dict | None) -> None:
+        if payload == self.payload:
+            return
+        self.payload = payload
+        self.version += 1
+        # Wake everyone waiting on the old event; later waiters get a new one.
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class LiveFeedHub:
+    """
+    One poller per process shared by every open live stream.
+
+    Each distinct topic (a fund's market summary, a user's portfolio) is
+    computed once per change and fanned out to all of its subscribers,
+    so the DB work follows NAV ticks and history writes, not the number
+    of open browser tabs. A tick costs one fund_nav_latest read (served
+    by the latest-NAV cache) plus one user_history_versions query for
+    all subscribed users; topics are only recomputed when their
+    watermark moves.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_sec: float | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.poll_sec = float(
+            poll_sec if poll_sec is not None else settings.LIVE_FEED_POLL_SEC
+        )
+        self.session_factory = session_factory
+        self.topics: dict[Hashable, LiveTopic] = {}
+        self._task: asyncio.Task | None = None
+
+    def _load_tick(self, db: Session, user_ids: list[int]) -> LiveTick:
+        prices = get_latest_nav_prices(db)
+        nav_mark = tuple(
+            sorted(
+                (fund_id, price.ts_utc, price.nav_usdt, price.price_usdt)
+                for fund_id, price in prices.items()
+            )
+        )
+
+        versions: dict[int, int] = {}
+        if user_ids:
+            rows = db.execute(
+                select(UserHistoryVersion.user_id, UserHistoryVersion.version)
+                .where(UserHistoryVersion.user_id.in_(user_ids))
+            ).all()
+            versions = {int(uid): int(version) for uid, version in rows}
+
+        return LiveTick(
+            nav_mark=nav_mark,
+            history_versions=versions,
+            now=time.time(),
+        )
+
+    def collect(self, topics: list[LiveTopic]) -> list[tuple[LiveTopic, Hashable, dict | None]]:
+        """Recompute topics whose watermark moved. Runs in a worker thread."""
+        db = self.session_factory()
+        try:
+            user_ids = sorted({t.user_id for t in topics if t.user_id is not None})
+            tick = self._load_tick(db, user_ids)
+
+            updates = []
+            for topic in topics:
+                mark = topic.watermark(tick)
+                if mark == topic.mark and topic.version > 0:
+                    continue
+                try:
+                    payload = topic.compute(db)
+                except Exception:
+                    logger.exception("live topic %s failed", topic.key)
+                    db.rollback()
+                    continue
+                updates.append((topic, mark, payload))
+            return updates
+        finally:
+            db.close()
+
+    async def refresh(self, topics: list[LiveTopic] | None = None) -> None:
+        topics = list(self.topics.values()) if topics is None else topics
+        if not topics:
+            return
+
+        updates = await asyncio.to_thread(self.collect, topics)
+        for topic, mark, payload in updates:
+            topic.mark = mark
+            topic.publish(payload)
+
+    async def _run(self) -> None:
+        while self.topics:
+            await asyncio.sleep(self.poll_sec)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("live feed tick failed")
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        key: Hashable,
+        *,
+        compute: Callable[[Session], dict | None],
+        watermark: Callable[[LiveTick], Hashable],
+        user_id: int | None = None,
+    ) -> AsyncIterator[LiveTopic]:
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = LiveTopic(
+                key=key,
+                compute=compute,
+                watermark=watermark,
+                user_id=user_id,
+            )
+            self.topics[key] = topic
+
+        topic.subscribers += 1
+        try:
+            if topic.version == 0:
+                await self.refresh([topic])
+            self._ensure_running()
+            yield topic
+        finally:
+            topic.subscribers -= 1
+            if topic.subscribers <= 0 and self.topics.get(key) is topic:
+                del self.topics[key]
+
+
+_HUB: ProcessSingleton[LiveFeedHub] = ProcessSingleton(LiveFeedHub)
+
+
+def get_live_feed_hub() -> LiveFeedHub:
+    return _HUB.get()
+
+
+def payload_delta(old: dict, new: dict, *, list_key: str = "funds") -> dict:
+    """
+    Top-level keys of new that differ from old. Rows of new[list_key]
+    are diffed by id: changed rows go in list_key, dropped ids in
+    f"{list_key}_removed".
+    """
+    delta = {
+        key: value
+        for key, value in new.items()
+        if key != list_key and old.get(key) != value
+    }
+
+    old_rows = {row.get("id"): row for row in old.get(list_key) or []}
+    new_rows = {row.get("id"): row for row in new.get(list_key) or []}
+
+    changed = [row for row_id, row in new_rows.items() if old_rows.get(row_id) != row]
+    removed = [row_id for row_id in old_rows if row_id not in new_rows]
+
+    if changed:
+        delta[list_key] = changed
+    if removed:
+        delta[f"{list_key}_removed"] = removed
+
+    return delta
+
+
+def sse_event(event: str, data: Any) -> str:
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":"))
+    return f"event: {event}\ndata: {body}\n\n"
+
+
+async def stream_topic(
+    request: Any,
+    topic: LiveTopic,
+    *,
+    event: str,
+    delta_event: str | None = None,
+    heartbeat_sec: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    SSE frames for one subscriber: the current payload first, then every
+    change (as a payload_delta when delta_event is given). Comment frames
+    keep idle connections open through proxies.
+    """
+    heartbeat = float(
+        heartbeat_sec if heartbeat_sec is not None else settings.LIVE_FEED_HEARTBEAT_SEC
+    )
+    sent: dict | None = None
+    seen = -1
+
+    yield f"retry: {int(settings.LIVE_FEED_RETRY_MS)}\n\n"
+
+    while True:
+        if await request.is_disconnected():
+            return
+
+        if topic.version != seen:
+            seen = topic.version
+            payload = topic.payload
+            if payload is not None:
+                if delta_event and sent is not None:
+                    delta = payload_delta(sent, payload)
+                    if delta:
+                        yield sse_event(delta_event, delta)
+                else:
+                    yield sse_event(event, payload)
+                sent = payload
+            continue
+
+        try:
+            await asyncio.wait_for(topic.changed.wait(), timeout=heartbeat)
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"
@@ -233,6 +233,14 @@ class WalletTransfer(Base):
     compliance_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     compliance_details: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
+    # stage 27.4/27.8: stamped at commit from user_history_versions on every
+    # change to a column the history feed renders
+    history_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+
     __table_args__ = (
         UniqueConstraint("tx_hash", "log_index", name="wallet_transfers_tx_hash_log_index_uq"),
     )
@@ -482,6 +490,34 @@ class FundNavMinute(Base):
     shares_outstanding = Column(Numeric(30, 10), nullable=False)
 
 
+class FundNavLatest(Base):
+    """
+    Latest fund_nav_minute row per fund, kept up to date by the NAV
+    collector so price reads do not scan the minute table.
+    """
+
+    __tablename__ = "fund_nav_latest"
+
+    fund_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("funds.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    ts_utc: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    nav_usdt: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    shares_outstanding: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    # nav_usdt / shares_outstanding, 0 when there are no shares.
+    price_usdt: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
 class FundNavGuardState(Base):
     __tablename__ = "fund_nav_guard_state"
 
@@ -593,6 +629,39 @@ class FundChartMinute(Base):
     )
 
 
+class FundChartRollup(Base):
+    """
+    Pre-aggregated share price candles for chart resolutions above 1 minute
+    (5/15/30/60/240 from fund_chart_minute, 1W/1M/12M from fund_chart_daily).
+    """
+
+    __tablename__ = "fund_chart_rollup"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    fund_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("funds.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    resolution: Mapped[str] = mapped_column(String(8), nullable=False)
+    ts_utc: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    open: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(30, 10), nullable=False)
+    volume: Mapped[Decimal | None] = mapped_column(Numeric(30, 10), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "fund_id",
+            "resolution",
+            "ts_utc",
+            name="fund_chart_rollup_fund_resolution_ts_uq",
+        ),
+    )
+
+
 class FundOrder(Base):
     __tablename__ = "fund_orders"
 
@@ -676,6 +745,14 @@ class FundOrder(Base):
     )
     executed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    # stage 27.4/27.8: stamped at commit from user_history_versions on every
+    # change to a column the history feed renders
+    history_version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+
 
 class FundSettlementBatch(Base):
     __tablename__ = "fund_settlement_batches"
@@ -2714,3 +2791,160 @@ class UserPortfolioDaily(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "date_utc", name="user_portfolio_daily_unique"),
     )
+
+
+class UserHistoryVersion(Base):
+    """
+    Per-user change counter for wallet_transfers and fund_orders.
+
+    Bumped at commit by the stage 27.8 deferred triggers; the new value
+    is also stamped on the changed row as history_version, so /api/history/live can return
+    only rows changed since the version a client last saw.
+    """
+
+    __tablename__ = "user_history_versions"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class BscSenderNonce(Base):
+    """Next nonce to hand out per BSC sender (stage 27.6 nonce manager)."""
+
+    __tablename__ = "bsc_sender_nonces"
+
+    address: Mapped[str] = mapped_column(String(64), primary_key=True)
+    next_nonce: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+    # transaction count mined on chain as of reconciled_at
+    chain_nonce: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+    reconciled_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class BscNonceReservation(Base):
+    __tablename__ = "bsc_nonce_reservations"
+
+    address: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("bsc_sender_nonces.address", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    nonce: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # reserved | sent | released
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    tx_hash: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class BybitInstrumentInfoCache(Base):
+    __tablename__ = "bybit_instrument_info_cache"
+
+    network: Mapped[str] = mapped_column(String(128), primary_key=True)
+    category: Mapped[str] = mapped_column(String(16), primary_key=True)
+    symbol: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    row_json: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "bybit_instrument_info_cache_network_category_captured_idx",
+            "network",
+            "category",
+            "captured_at",
+        ),
+    )
+
+
+class EmailOutbox(Base):
+    """Outgoing email queued by app.emails.send_email (stage 27.7 outbox)."""
+
+    __tablename__ = "email_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    subject: Mapped[str] = mapped_column(Text, nullable=False)
+    # cleared once the message is sent or given up on
+    html_body: Mapped[str] = mapped_column(Text, nullable=False)
+    # pending | sending | sent | failed
+    status: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        server_default=sa_text("'pending'"),
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=sa_text("0"),
+    )
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    # a "sending" row past this is reclaimed (worker died mid-batch)
+    locked_until: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "email_outbox_due_idx",
+            "status",
+            "next_attempt_at",
+            postgresql_where=sa_text("status IN ('pending', 'sending')"),
+        ),
+    )
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import String, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import FundChartDaily, FundChartMinute, FundChartRollup
+
+
+UTC = timezone.utc
+
+MINUTE_ROLLUP_RESOLUTIONS = ("5", "15", "30", "60", "240")
+DAILY_ROLLUP_RESOLUTIONS = ("1W", "1M", "12M")
+ROLLUP_RESOLUTIONS = MINUTE_ROLLUP_RESOLUTIONS + DAILY_ROLLUP_RESOLUTIONS
+
+_DATE_TRUNC_UNITS = {
+    "1W": "week",
+    "1M": "month",
+    "12M": "year",
+}
+
+
+@dataclass(frozen=True)
+class Candle:
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+
+
+def _source_table(resolution: str):
+    if resolution in DAILY_ROLLUP_RESOLUTIONS:
+        return FundChartDaily.__table__
+    return FundChartMinute.__table__
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    month_index = dt.year * 12 + dt.month - 1 + months
+    return dt.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def bucket_range(ts: datetime, resolution: str) -> tuple[datetime, datetime]:
+    """
+    [start, end) of the rollup bucket containing ts.
+
+    Matches the chart service buckets: intraday buckets are floored on
+    the Unix epoch, weeks start on Monday, months and years on the 1st.
+    """
+    ts = ts.astimezone(UTC)
+
+    if resolution in MINUTE_ROLLUP_RESOLUTIONS:
+        bucket_seconds = int(resolution) * 60
+        floored = int(ts.timestamp()) // bucket_seconds * bucket_seconds
+        start = datetime.fromtimestamp(floored, tz=UTC)
+        return start, start + timedelta(seconds=bucket_seconds)
+
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if resolution == "1W":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+
+    if resolution == "1M":
+        start = day.replace(day=1)
+        return start, _add_months(start, 1)
+
+    if resolution == "12M":
+        start = day.replace(month=1, day=1)
+        return start, start.replace(year=start.year + 1)
+
+    raise ValueError(f"Unsupported rollup resolution: {resolution}")
+
+
+def _bucket_expr(column, resolution: str):
+    # Constants are inlined so the SELECT and GROUP BY expressions are
+    # textually identical under server-side parameter binding.
+    unit = _DATE_TRUNC_UNITS.get(resolution)
+    if unit is not None:
+        return func.date_trunc(
+            literal_column(f"'{unit}'"),
+            column,
+            literal_column("'UTC'"),
+        )
+
+    bucket_seconds = literal_column(str(int(resolution) * 60))
+    return func.to_timestamp(
+        func.floor(func.extract("epoch", column) / bucket_seconds)
+        * bucket_seconds
+    )
+
+
+def bucket_candle_columns(source, resolution: str) -> tuple:
+    """
+    (bucket_ts, open, high, low, close, volume) aggregates of a candle
+    table grouped by the returned bucket expression.
+
+    open is the first source open, close the last source close, high/low
+    the extremes and volume the sum.
+    """
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"Unsupported rollup resolution: {resolution}")
+
+    return (
+        _bucket_expr(source.c.ts_utc, resolution),
+        array_agg(
+            aggregate_order_by(source.c.open, source.c.ts_utc.asc())
+        )[1],
+        func.max(source.c.high),
+        func.min(source.c.low),
+        array_agg(
+            aggregate_order_by(source.c.close, source.c.ts_utc.desc())
+        )[1],
+        func.sum(source.c.volume),
+    )
+
+
+def refresh_chart_rollups(
+    db: Session,
+    *,
+    fund_id: int,
+    resolution: str,
+    from_dt: datetime,
+    to_dt: datetime,
+) -> int:
+    """
+    Rebuild rollup candles for every bucket with source rows in
+    [from_dt, to_dt). The range must be aligned to bucket boundaries.
+
+    Candles are aggregated by bucket_candle_columns, the same query the
+    chart service runs when rollup reads are disabled. Does not commit.
+    """
+    source = _source_table(resolution)
+    bucket, *candle = bucket_candle_columns(source, resolution)
+    bucket = bucket.label("bucket_ts")
+
+    aggregated = (
+        select(
+            source.c.fund_id,
+            literal(resolution, String),
+            bucket,
+            *candle,
+        )
+        .where(
+            source.c.fund_id == int(fund_id),
+            source.c.ts_utc >= from_dt,
+            source.c.ts_utc < to_dt,
+        )
+        .group_by(source.c.fund_id, bucket)
+    )
+
+    stmt = pg_insert(FundChartRollup.__table__).from_select(
+        ["fund_id", "resolution", "ts_utc", "open", "high", "low", "close", "volume"],
+        aggregated,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["fund_id", "resolution", "ts_utc"],
+        set_={
+            "open": stmt.excluded.open,
+            "high": stmt.excluded.high,
+            "low": stmt.excluded.low,
+            "close": stmt.excluded.close,
+            "volume": stmt.excluded.volume,
+        },
+    )
+
+    result = db.execute(stmt)
+    return int(result.rowcount or 0)
+
+
+def merge_candle_into_rollup(
+    db: Session,
+    *,
+    fund_id: int,
+    resolution: str,
+    bucket_ts: datetime,
+    candle: Candle,
+) -> None:
+    """
+    Fold the latest source candle into an open rollup bucket without
+    rescanning the source rows: high/low widen, close follows, open and
+    volume stay as the bucket rebuild set them. Does not commit.
+    """
+    table = FundChartRollup.__table__
+
+    stmt = pg_insert(table).values(
+        fund_id=int(fund_id),
+        resolution=resolution,
+        ts_utc=bucket_ts,
+        open=candle.open,
+        high=candle.high,
+        low=candle.low,
+        close=candle.close,
+        volume=None,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["fund_id", "resolution", "ts_utc"],
+        set_={
+            "high": func.greatest(table.c.high, stmt.excluded.high),
+            "low": func.least(table.c.low, stmt.excluded.low),
+            "close": stmt.excluded.close,
+        },
+    )
+
+    db.execute(stmt)
+
+
+def upsert_chart_rollups_for_minute(
+    db: Session,
+    *,
+    fund_id: int,
+    minute_ts: datetime,
+    minute_candle: Candle,
+    daily_candle: Candle,
+    open_buckets: dict[str, datetime],
+) -> dict[str, datetime]:
+    """
+    Bring the rollup buckets containing minute_ts up to date after its
+    minute and daily candles were written.
+
+    open_buckets maps each resolution to the bucket this collector last
+    rebuilt. While a resolution stays in that bucket the written candle
+    is merged in with one keyed upsert; only when its bucket changes is
+    the previous bucket rebuilt from source (sealing it exactly) and the
+    new one built. Returns the updated mapping and commits.
+    """
+    refreshed = dict(open_buckets)
+
+    for resolution in ROLLUP_RESOLUTIONS:
+        from_dt, to_dt = bucket_range(minute_ts, resolution)
+        previous = refreshed.get(resolution)
+
+        if previous == from_dt:
+            merge_candle_into_rollup(
+                db,
+                fund_id=fund_id,
+                resolution=resolution,
+                bucket_ts=from_dt,
+                candle=(
+                    daily_candle
+                    if resolution in DAILY_ROLLUP_RESOLUTIONS
+                    else minute_candle
+                ),
+            )
+            continue
+
+        if previous is not None:
+            refresh_chart_rollups(
+                db,
+                fund_id=fund_id,
+                resolution=resolution,
+                from_dt=previous,
+                to_dt=bucket_range(previous, resolution)[1],
+            )
+
+        refresh_chart_rollups(
+            db,
+            fund_id=fund_id,
+            resolution=resolution,
+            from_dt=from_dt,
+            to_dt=to_dt,
+        )
+        refreshed[resolution] = from_dt
+
+    db.commit()
+    return refreshed
+
+
+def backfill_chart_rollups(
+    db: Session,
+    *,
+    fund_id: int,
+    resolutions: tuple[str, ...] = ROLLUP_RESOLUTIONS,
+    chunk_days: int = 30,
+) -> dict[str, int]:
+    """
+    Build rollups for the whole existing history of one fund.
+
+    Minute-based resolutions are processed in day-aligned chunks (every
+    intraday bucket divides a day), committing after each chunk.
+    """
+    counts: dict[str, int] = {}
+
+    for resolution in resolutions:
+        source = _source_table(resolution)
+        first_ts, last_ts = db.execute(
+            select(func.min(source.c.ts_utc), func.max(source.c.ts_utc)).where(
+                source.c.fund_id == int(fund_id)
+            )
+        ).one()
+
+        counts[resolution] = 0
+        if first_ts is None:
+            continue
+
+        start = bucket_range(first_ts, resolution)[0]
+        end = bucket_range(last_ts, resolution)[1]
+
+        if resolution in DAILY_ROLLUP_RESOLUTIONS:
+            step = end - start
+        else:
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            step = timedelta(days=max(int(chunk_days), 1))
+
+        while start < end:
+            chunk_end = min(start + step, end)
+            counts[resolution] += refresh_chart_rollups(
+                db,
+                fund_id=fund_id,
+                resolution=resolution,
+                from_dt=start,
+                to_dt=chunk_end,
+            )
+            db.commit()
+            start = chunk_end
+
+    return counts
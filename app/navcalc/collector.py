@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import logging
 import time
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from sqlalchemy.orm import Session
+
 from app.config import settings
 from app.db import SessionLocal
 from app.models import FundWallet
+from app.navcalc.chart_rollup import Candle, upsert_chart_rollups_for_minute
 from app.navcalc.db_writer import (
     get_fund_by_code,
     get_fund_shares_outstanding_current,
@@ -22,7 +27,13 @@ from app.navcalc.minute_builder import (
     update_minute_state,
 )
 from app.navcalc.nav_guard import evaluate_and_record_nav_guard, mark_nav_guard_accepted
-from app.navcalc.portfolio_nav import compute_nav
+from app.navcalc.bybit_client import BybitClient
+from app.navcalc.portfolio_nav import (
+    build_nav_client,
+    build_nav_result,
+    fetch_bybit_nav_inputs,
+    fetch_spot_prices,
+)
 from app.navcalc.schemas import FundNavConfig, MinuteState
 from app.settlement.bsc_balance_service import (
     read_bsc_block_number,
@@ -210,15 +221,27 @@ def _read_current_shares_outstanding(
     return shares
 
 
-def run_collector_forever(
-    cfg: FundNavConfig,
-    *,
-    interval_sec: int | None = None,
-) -> None:
-    poll_interval = int(interval_sec or settings.NAV_POLL_INTERVAL_SEC)
-    if poll_interval <= 0:
-        raise ValueError("poll_interval must be positive")
+@dataclass
+class FundCollectorState:
+    """
+    Per-fund collector state kept between ticks.
 
+    The multi-fund collector keeps one instance per fund; minute
+    aggregation works exactly as in the one-process-per-fund mode.
+    """
+
+    cfg: FundNavConfig
+    fund_id: int
+    client: BybitClient
+    current_state: MinuteState | None = None
+    prev_close_nav: Decimal | None = None
+    prev_close_shares_outstanding: Decimal | None = None
+    rollup_buckets: dict[str, datetime] = field(default_factory=dict)
+
+
+def init_fund_collector_state(
+    cfg: FundNavConfig,
+) -> FundCollectorState:
     with SessionLocal() as db:
         fund = get_fund_by_code(db, cfg.fund_code)
 
@@ -254,61 +277,154 @@ def run_collector_forever(
     )
 
     log.info(
-        "Starting NAV collector fund=%s fund_id=%s interval=%ss shares_outstanding_source=db shares_outstanding=%s",
+        "Starting NAV collector fund=%s fund_id=%s shares_outstanding_source=db shares_outstanding=%s",
         cfg.fund_code,
         fund_id,
-        poll_interval,
         initial_shares,
     )
 
-    current_state: MinuteState | None = None
-    prev_close_nav = restored_prev_close_nav
-    prev_close_shares_outstanding = (
-        restored_prev_close_shares
+    return FundCollectorState(
+        cfg=cfg,
+        fund_id=fund_id,
+        client=build_nav_client(cfg),
+        prev_close_nav=restored_prev_close_nav,
+        prev_close_shares_outstanding=(
+            restored_prev_close_shares
+        ),
     )
-    next_tick = time.monotonic()
 
-    while True:
-        now_mono = time.monotonic()
-        if now_mono < next_tick:
-            time.sleep(next_tick - now_mono)
 
-        try:
-            shares_outstanding = _read_current_shares_outstanding(
-                fund_id=fund_id,
+def _sample_fund_nav(
+    fund: FundCollectorState,
+    *,
+    prices: dict[str, Decimal] | None,
+    executor: Executor | None,
+):
+    cfg = fund.cfg
+
+    if executor is None:
+        shares_outstanding = _read_current_shares_outstanding(
+            fund_id=fund.fund_id,
+            fund_code=cfg.fund_code,
+        )
+
+        (
+            settlement_wallet_usdt,
+            settlement_wallet_meta,
+        ) = (
+            _read_active_settlement_wallet_usdt(
+                fund_id=fund.fund_id,
                 fund_code=cfg.fund_code,
             )
+        )
 
-            (
-                settlement_wallet_usdt,
-                settlement_wallet_meta,
-            ) = (
-                _read_active_settlement_wallet_usdt(
-                    fund_id=fund_id,
-                    fund_code=cfg.fund_code,
-                )
-            )
+        inputs = fetch_bybit_nav_inputs(
+            fund.client,
+            prices=prices,
+        )
+    else:
+        # DB/BSC reads and the Bybit endpoints are independent;
+        # only leaf calls go to the executor.
+        shares_future = executor.submit(
+            _read_current_shares_outstanding,
+            fund_id=fund.fund_id,
+            fund_code=cfg.fund_code,
+        )
+        settlement_future = executor.submit(
+            _read_active_settlement_wallet_usdt,
+            fund_id=fund.fund_id,
+            fund_code=cfg.fund_code,
+        )
 
-            result = compute_nav(
-                cfg,
-                settlement_wallet_usdt=(
-                    settlement_wallet_usdt
-                ),
-                settlement_wallet_meta=(
-                    settlement_wallet_meta
-                ),
+        inputs = fetch_bybit_nav_inputs(
+            fund.client,
+            prices=prices,
+            executor=executor,
+        )
+
+        shares_outstanding = shares_future.result()
+        (
+            settlement_wallet_usdt,
+            settlement_wallet_meta,
+        ) = settlement_future.result()
+
+    result = build_nav_result(
+        cfg,
+        inputs,
+        settlement_wallet_usdt=(
+            settlement_wallet_usdt
+        ),
+        settlement_wallet_meta=(
+            settlement_wallet_meta
+        ),
+    )
+
+    return result, shares_outstanding
+
+
+def _refresh_chart_rollups(
+    db: Session,
+    fund: FundCollectorState,
+    *,
+    minute_ts: datetime,
+    minute_candle: Candle,
+    daily_candle: Candle,
+) -> None:
+    """
+    Best effort: the rollups are derived data, so a failure is logged and
+    the fund's buckets are rebuilt from source on its next tick.
+    """
+    try:
+        fund.rollup_buckets = upsert_chart_rollups_for_minute(
+            db,
+            fund_id=fund.fund_id,
+            minute_ts=minute_ts,
+            minute_candle=minute_candle,
+            daily_candle=daily_candle,
+            open_buckets=fund.rollup_buckets,
+        )
+    except Exception as exc:
+        db.rollback()
+        fund.rollup_buckets = {}
+        log.exception(
+            "Chart rollup refresh failed fund=%s minute=%s: %s",
+            fund.cfg.fund_code,
+            minute_ts.isoformat(),
+            exc,
+        )
+
+
+def collect_fund_sample(
+    fund: FundCollectorState,
+    *,
+    prices: dict[str, Decimal] | None = None,
+    executor: Executor | None = None,
+) -> None:
+    """
+    Take one NAV sample for one fund and upsert the minute state.
+
+    Errors are logged and swallowed so one fund never stops the loop.
+    """
+    cfg = fund.cfg
+    fund_id = fund.fund_id
+
+    try:
+        result, shares_outstanding = _sample_fund_nav(
+            fund,
+            prices=prices,
+            executor=executor,
+        )
+        sample_ts = result.snapshot_ts
+        sample_nav = result.nav_usd
+        sample_minute = minute_floor(sample_ts)
+
+        with SessionLocal() as db:
+            guard_decision = evaluate_and_record_nav_guard(
+                db,
+                fund_id=fund_id,
+                fund_code=cfg.fund_code,
+                current=result,
             )
-            sample_ts = result.snapshot_ts
-            sample_nav = result.nav_usd
-            sample_minute = minute_floor(sample_ts)
-
-            with SessionLocal() as db:
-                guard_decision = evaluate_and_record_nav_guard(
-                    db,
-                    fund_id=fund_id,
-                    fund_code=cfg.fund_code,
-                    current=result,
-                )
 
             if guard_decision.decision == "rejected":
                 log.warning(
@@ -322,8 +438,7 @@ def run_collector_forever(
                     guard_decision.compensation_ratio,
                     guard_decision.reason,
                 )
-                next_tick += poll_interval
-                continue
+                return
 
             if guard_decision.decision == "warning":
                 log.warning(
@@ -338,19 +453,19 @@ def run_collector_forever(
                     guard_decision.reason,
                 )
 
-            with SessionLocal() as db:
-                if is_pricing_locked(db, fund_id=fund_id):
-                    log.info(
-                        "Pricing locked; NAV/chart write skipped fund=%s fund_id=%s "
-                        "sample_ts=%s sample_minute=%s nav=%s",
-                        cfg.fund_code,
-                        fund_id,
-                        sample_ts.isoformat(),
-                        sample_minute.isoformat(),
-                        sample_nav,
-                    )
-                    next_tick += poll_interval
-                    continue
+            if is_pricing_locked(db, fund_id=fund_id):
+                log.info(
+                    "Pricing locked; NAV/chart write skipped fund=%s fund_id=%s "
+                    "sample_ts=%s sample_minute=%s nav=%s",
+                    cfg.fund_code,
+                    fund_id,
+                    sample_ts.isoformat(),
+                    sample_minute.isoformat(),
+                    sample_nav,
+                )
+                return
+
+            current_state = fund.current_state
 
             if current_state is None:
                 current_state = open_new_minute_state(
@@ -359,9 +474,9 @@ def run_collector_forever(
                     current_sample_nav=sample_nav,
                     sample_ts=sample_ts,
                     shares_outstanding=shares_outstanding,
-                    prev_close_nav=prev_close_nav,
+                    prev_close_nav=fund.prev_close_nav,
                     prev_close_shares_outstanding=(
-                        prev_close_shares_outstanding
+                        fund.prev_close_shares_outstanding
                     ),
                 )
 
@@ -382,10 +497,10 @@ def run_collector_forever(
                 )
 
             elif sample_minute > current_state.minute_ts:
-                prev_close_nav = (
+                fund.prev_close_nav = (
                     current_state.close_nav
                 )
-                prev_close_shares_outstanding = (
+                fund.prev_close_shares_outstanding = (
                     current_state.shares_outstanding
                 )
 
@@ -401,9 +516,9 @@ def run_collector_forever(
                     current_sample_nav=sample_nav,
                     sample_ts=sample_ts,
                     shares_outstanding=shares_outstanding,
-                    prev_close_nav=prev_close_nav,
+                    prev_close_nav=fund.prev_close_nav,
                     prev_close_shares_outstanding=(
-                        prev_close_shares_outstanding
+                        fund.prev_close_shares_outstanding
                     ),
                 )
 
@@ -412,53 +527,252 @@ def run_collector_forever(
                     "Out-of-order NAV sample ignored fund=%s sample_ts=%s current_minute=%s",
                     cfg.fund_code,
                     sample_ts.isoformat(),
-                    current_state.minute_ts.isoformat() if current_state else None,
-                )
-                next_tick += poll_interval
-                continue
-
-            with SessionLocal() as db:
-                upsert_minute_state(
-                    db,
-                    fund_id=fund_id,
-                    state=current_state,
-                )
-                mark_nav_guard_accepted(
-                    db,
-                    fund_id=fund_id,
-                    current=result,
+                    current_state.minute_ts.isoformat(),
                 )
+                return
 
-            log.info(
-                "Minute upsert fund=%s minute=%s sample_ts=%s open=%s high=%s low=%s close=%s "
-                "sample_count=%s shares_outstanding=%s shares_source=db",
-                cfg.fund_code,
-                current_state.minute_ts.isoformat(),
-                sample_ts.isoformat(),
-                current_state.open_nav,
-                current_state.high_nav,
-                current_state.low_nav,
-                current_state.close_nav,
-                current_state.sample_count,
-                current_state.shares_outstanding,
+            fund.current_state = current_state
+
+            minute_candle, daily_candle = upsert_minute_state(
+                db,
+                fund_id=fund_id,
+                state=current_state,
+            )
+            mark_nav_guard_accepted(
+                db,
+                fund_id=fund_id,
+                current=result,
             )
+            _refresh_chart_rollups(
+                db,
+                fund,
+                minute_ts=current_state.minute_ts,
+                minute_candle=minute_candle,
+                daily_candle=daily_candle,
+            )
+
+        log.info(
+            "Minute upsert fund=%s minute=%s sample_ts=%s open=%s high=%s low=%s close=%s "
+            "sample_count=%s shares_outstanding=%s shares_source=db",
+            cfg.fund_code,
+            current_state.minute_ts.isoformat(),
+            sample_ts.isoformat(),
+            current_state.open_nav,
+            current_state.high_nav,
+            current_state.low_nav,
+            current_state.close_nav,
+            current_state.sample_count,
+            current_state.shares_outstanding,
+        )
+
+    except NavCalcError as exc:
+        log.error("Sample failed fund=%s: %s", cfg.fund_code, exc)
+    except Exception as exc:
+        log.exception("Unexpected collector failure fund=%s: %s", cfg.fund_code, exc)
+
+
+def _advance_next_tick(
+    next_tick: float,
+    *,
+    poll_interval: int,
+    label: str,
+) -> float:
+    next_tick += poll_interval
+
+    after_run = time.monotonic()
+    if after_run > next_tick:
+        skipped = 0
+        while after_run > next_tick:
+            next_tick += poll_interval
+            skipped += 1
+        if skipped > 0:
+            log.warning(
+                "Collector lag fund=%s: skipped %s poll slots to avoid overlap",
+                label,
+                skipped,
+            )
+
+    return next_tick
+
+
+def _resolve_poll_interval(interval_sec: int | None) -> int:
+    poll_interval = int(interval_sec or settings.NAV_POLL_INTERVAL_SEC)
+    if poll_interval <= 0:
+        raise ValueError("poll_interval must be positive")
+    return poll_interval
+
+
+def run_collector_forever(
+    cfg: FundNavConfig,
+    *,
+    interval_sec: int | None = None,
+) -> None:
+    poll_interval = _resolve_poll_interval(interval_sec)
+
+    fund = init_fund_collector_state(cfg)
+
+    next_tick = time.monotonic()
+
+    while True:
+        now_mono = time.monotonic()
+        if now_mono < next_tick:
+            time.sleep(next_tick - now_mono)
+
+        collect_fund_sample(fund)
+
+        next_tick = _advance_next_tick(
+            next_tick,
+            poll_interval=poll_interval,
+            label=cfg.fund_code,
+        )
+
+
+def fetch_shared_spot_prices(
+    funds: list[FundCollectorState],
+) -> dict[bool, dict[str, Decimal]]:
+    """
+    Fetch public spot tickers once per network (mainnet/testnet).
 
+    A network whose ticker fetch fails is left out; its funds fall back
+    to fetching tickers themselves for this tick.
+    """
+    prices_by_network: dict[bool, dict[str, Decimal]] = {}
+
+    for fund in funds:
+        testnet = bool(fund.cfg.bybit_testnet)
+        if testnet in prices_by_network:
+            continue
+
+        try:
+            prices_by_network[testnet] = fetch_spot_prices(fund.client)
+        except NavCalcError as exc:
+            log.error(
+                "Shared spot tickers fetch failed testnet=%s: %s",
+                testnet,
+                exc,
+            )
+            prices_by_network[testnet] = {}
+
+    return {
+        testnet: prices
+        for testnet, prices in prices_by_network.items()
+        if prices
+    }
+
+
+def collect_all_funds_once(
+    funds: list[FundCollectorState],
+    *,
+    fund_pool: Executor,
+    endpoint_pool: Executor,
+) -> None:
+    prices_by_network = fetch_shared_spot_prices(funds)
+
+    futures = [
+        fund_pool.submit(
+            collect_fund_sample,
+            fund,
+            prices=prices_by_network.get(bool(fund.cfg.bybit_testnet)),
+            executor=endpoint_pool,
+        )
+        for fund in funds
+    ]
+    wait(futures)
+
+
+def init_pending_funds(
+    cfgs: list[FundNavConfig],
+) -> tuple[list[FundCollectorState], list[FundNavConfig]]:
+    """
+    Build collector state for every config that can be initialised now.
+
+    Returns (ready funds, configs to retry on a later tick); one fund
+    failing to initialise never keeps the others from collecting.
+    """
+    ready: list[FundCollectorState] = []
+    pending: list[FundNavConfig] = []
+
+    for cfg in cfgs:
+        try:
+            ready.append(init_fund_collector_state(cfg))
         except NavCalcError as exc:
-            log.error("Sample failed fund=%s: %s", cfg.fund_code, exc)
+            log.error("Collector init failed fund=%s, retrying next tick: %s", cfg.fund_code, exc)
+            pending.append(cfg)
         except Exception as exc:
-            log.exception("Unexpected collector failure fund=%s: %s", cfg.fund_code, exc)
+            log.exception(
+                "Unexpected collector init failure fund=%s, retrying next tick: %s",
+                cfg.fund_code,
+                exc,
+            )
+            pending.append(cfg)
 
-        next_tick += poll_interval
+    return ready, pending
 
-        after_run = time.monotonic()
-        if after_run > next_tick:
-            skipped = 0
-            while after_run > next_tick:
-                next_tick += poll_interval
-                skipped += 1
-            if skipped > 0:
-                log.warning(
-                    "Collector lag fund=%s: skipped %s poll slots to avoid overlap",
-                    cfg.fund_code,
-                    skipped,
-                )
\ No newline at end of file
+
+def run_multi_fund_collector_forever(
+    cfgs: list[FundNavConfig],
+    *,
+    interval_sec: int | None = None,
+    max_workers: int | None = None,
+) -> None:
+    """
+    Collect NAV for every given fund from one process.
+
+    Every tick fetches spot tickers once, then samples all funds
+    concurrently; each fund's endpoints run on a shared bounded
+    endpoint pool. Minute state stays per fund. A fund whose state
+    cannot be built yet is retried at the start of every tick.
+    """
+    if not cfgs:
+        raise NavConfigError("No enabled funds to collect NAV for")
+
+    poll_interval = _resolve_poll_interval(interval_sec)
+    endpoint_workers = int(
+        max_workers or settings.NAV_COLLECTOR_MAX_WORKERS
+    )
+    if endpoint_workers <= 0:
+        raise ValueError("max_workers must be positive")
+
+    funds: list[FundCollectorState] = []
+    pending = list(cfgs)
+    label = ",".join(cfg.fund_code for cfg in cfgs)
+
+    log.info(
+        "Starting multi-fund NAV collector funds=%s interval=%ss endpoint_workers=%s",
+        label,
+        poll_interval,
+        endpoint_workers,
+    )
+
+    with (
+        ThreadPoolExecutor(
+            max_workers=len(cfgs),
+            thread_name_prefix="nav-fund",
+        ) as fund_pool,
+        ThreadPoolExecutor(
+            max_workers=endpoint_workers,
+            thread_name_prefix="nav-endpoint",
+        ) as endpoint_pool,
+    ):
+        next_tick = time.monotonic()
+
+        while True:
+            now_mono = time.monotonic()
+            if now_mono < next_tick:
+                time.sleep(next_tick - now_mono)
+
+            if pending:
+                ready, pending = init_pending_funds(pending)
+                funds.extend(ready)
+
+            collect_all_funds_once(
+                funds,
+                fund_pool=fund_pool,
+                endpoint_pool=endpoint_pool,
+            )
+
+            next_tick = _advance_next_tick(
+                next_tick,
+                poll_interval=poll_interval,
+                label=label,
+            )
@@ -7,7 +7,19 @@ from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.models import Fund, FundChartDaily, FundChartMinute, FundNavMinute
+from app.models import (
+    Fund,
+    FundChartDaily,
+    FundChartMinute,
+    FundNavLatest,
+    FundNavMinute,
+)
+from app.navcalc.chart_rollup import Candle
+from app.navcalc.latest_nav import (
+    LatestNavPrice,
+    get_latest_nav_cache,
+    share_price,
+)
 from app.navcalc.schemas import MinuteState
 
 
@@ -76,8 +88,67 @@ def upsert_nav_minute(
         )
     )
     db.execute(stmt)
+    upsert_nav_latest(
+        db,
+        fund_id=fund_id,
+        minute_ts=minute_ts,
+        nav_close_usdt=nav_close_usdt,
+        shares_outstanding=shares_outstanding,
+    )
     db.commit()
 
+    get_latest_nav_cache().publish(
+        LatestNavPrice(
+            fund_id=int(fund_id),
+            ts_utc=_minute_floor(minute_ts),
+            nav_usdt=Decimal(str(nav_close_usdt)),
+            shares_outstanding=Decimal(str(shares_outstanding)),
+            price_usdt=share_price(
+                Decimal(str(nav_close_usdt)),
+                Decimal(str(shares_outstanding)),
+            ),
+        )
+    )
+
+
+def upsert_nav_latest(
+    db: Session,
+    *,
+    fund_id: int,
+    minute_ts: datetime,
+    nav_close_usdt: Decimal,
+    shares_outstanding: Decimal,
+) -> None:
+    """
+    Keep fund_nav_latest on the newest minute. A re-write of an older
+    minute (late retry) does not move it back. Does not commit.
+    """
+    table = FundNavLatest.__table__
+    price_usdt = share_price(
+        Decimal(str(nav_close_usdt)),
+        Decimal(str(shares_outstanding)),
+    )
+
+    stmt = pg_insert(table).values(
+        fund_id=fund_id,
+        ts_utc=_minute_floor(minute_ts),
+        nav_usdt=nav_close_usdt,
+        shares_outstanding=shares_outstanding,
+        price_usdt=price_usdt,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["fund_id"],
+        set_={
+            "ts_utc": stmt.excluded.ts_utc,
+            "nav_usdt": stmt.excluded.nav_usdt,
+            "shares_outstanding": stmt.excluded.shares_outstanding,
+            "price_usdt": stmt.excluded.price_usdt,
+            "updated_at": func.now(),
+        },
+        where=table.c.ts_utc <= stmt.excluded.ts_utc,
+    )
+    db.execute(stmt)
+
 
 def upsert_chart_minute(
     db: Session,
@@ -120,7 +191,7 @@ def upsert_chart_daily_from_minute_state(
     *,
     fund_id: int,
     state: MinuteState,
-) -> None:
+) -> Candle:
     """
     Update daily price candle from the accepted minute NAV state.
 
@@ -180,13 +251,21 @@ def upsert_chart_daily_from_minute_state(
     db.execute(stmt)
     db.commit()
 
+    return Candle(
+        open=daily_open,
+        high=daily_high,
+        low=daily_low,
+        close=close_price,
+    )
+
 
 def upsert_minute_state(
     db: Session,
     *,
     fund_id: int,
     state: MinuteState,
-) -> None:
+) -> tuple[Candle, Candle]:
+    """Write the minute and daily candles; returns (minute, daily) candles."""
     upsert_nav_minute(
         db,
         fund_id=fund_id,
@@ -210,8 +289,16 @@ def upsert_minute_state(
         close_price=close_price,
     )
 
-    upsert_chart_daily_from_minute_state(
+    daily_candle = upsert_chart_daily_from_minute_state(
         db,
         fund_id=fund_id,
         state=state,
     )
+
+    minute_candle = Candle(
+        open=open_price,
+        high=high_price,
+        low=low_price,
+        close=close_price,
+    )
+    return minute_candle, daily_candle
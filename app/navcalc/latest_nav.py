@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import FundNavLatest
+from app.utils.cache import ProcessSingleton
+
+
+ZERO = Decimal("0")
+
+
+@dataclass(frozen=True)
+class LatestNavPrice:
+    fund_id: int
+    ts_utc: datetime
+    nav_usdt: Decimal
+    shares_outstanding: Decimal
+    price_usdt: Decimal
+
+
+def share_price(nav_usdt: Decimal, shares_outstanding: Decimal) -> Decimal:
+    if shares_outstanding <= 0:
+        return ZERO
+    return nav_usdt / shares_outstanding
+
+
+def _from_row(row: FundNavLatest) -> LatestNavPrice:
+    return LatestNavPrice(
+        fund_id=int(row.fund_id),
+        ts_utc=row.ts_utc,
+        nav_usdt=Decimal(str(row.nav_usdt)),
+        shares_outstanding=Decimal(str(row.shares_outstanding)),
+        price_usdt=Decimal(str(row.price_usdt)),
+    )
+
+
+class LatestNavCache:
+    """
+    In-process copy of fund_nav_latest.
+
+    The table has one row per fund, so a refresh reads all of it with a
+    single primary-key-sized query and every dashboard/terminal poll in
+    the next ttl_sec is served from memory. The collector process also
+    pushes its writes here directly via publish(); other processes see
+    them after at most ttl_sec.
+    """
+
+    def __init__(self, *, ttl_sec: float | None = None) -> None:
+        self.ttl_sec = float(
+            ttl_sec
+            if ttl_sec is not None
+            else settings.NAV_LATEST_CACHE_TTL_SEC
+        )
+
+        self._lock = threading.Lock()
+        self._prices: dict[int, LatestNavPrice] = {}
+        self._expires_at = 0.0
+
+    @staticmethod
+    def _now() -> float:
+        return time.monotonic()
+
+    def _refresh(self, db: Session) -> dict[int, LatestNavPrice]:
+        rows = db.execute(select(FundNavLatest)).scalars().all()
+        prices = {int(row.fund_id): _from_row(row) for row in rows}
+
+        with self._lock:
+            # Keep newer prices published while the read was in flight.
+            for fund_id, current in self._prices.items():
+                loaded = prices.get(fund_id)
+                if loaded is None or loaded.ts_utc < current.ts_utc:
+                    prices[fund_id] = current
+            self._prices = prices
+            self._expires_at = self._now() + self.ttl_sec
+            return dict(prices)
+
+    def get_many(
+        self,
+        db: Session,
+        fund_ids: Iterable[int] | None = None,
+    ) -> dict[int, LatestNavPrice]:
+        with self._lock:
+            fresh = self._expires_at > self._now()
+            prices = dict(self._prices)
+
+        if not fresh:
+            prices = self._refresh(db)
+
+        if fund_ids is None:
+            return prices
+
+        return {
+            int(fund_id): prices[int(fund_id)]
+            for fund_id in fund_ids
+            if int(fund_id) in prices
+        }
+
+    def get(self, db: Session, fund_id: int) -> LatestNavPrice | None:
+        return self.get_many(db, [fund_id]).get(int(fund_id))
+
+    def publish(self, price: LatestNavPrice) -> None:
+        with self._lock:
+            current = self._prices.get(price.fund_id)
+            if current is None or current.ts_utc <= price.ts_utc:
+                self._prices[price.fund_id] = price
+
+    def clear(self) -> None:
+        with self._lock:
+            self._prices = {}
+            self._expires_at = 0.0
+
+
+_CACHE: ProcessSingleton[LatestNavCache] = ProcessSingleton(LatestNavCache)
+
+
+def get_latest_nav_cache() -> LatestNavCache:
+    return _CACHE.get()
+
+
+def get_latest_nav_prices(
+    db: Session,
+    fund_ids: Iterable[int] | None = None,
+) -> dict[int, LatestNavPrice]:
+    return get_latest_nav_cache().get_many(db, fund_ids)
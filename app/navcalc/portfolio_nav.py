@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
-from typing import Any
+from functools import partial
+from typing import Any, Callable
 
 from app.config import settings
 from app.navcalc.bybit_client import BybitApiError, BybitClient
@@ -11,7 +13,7 @@ from app.navcalc.exceptions import (
     InvalidWalletResponseError,
     NavSanityCheckError,
 )
-from app.navcalc.schemas import FundNavConfig, NavResult
+from app.navcalc.schemas import BybitNavInputs, FundNavConfig, NavResult
 
 
 STABLECOINS = {
@@ -48,6 +50,23 @@ def _to_decimal(value: Any, default: str = "0") -> Decimal:
         return Decimal(default)
 
 
+def _run_all(
+    fetchers: list[Callable[[], Any]],
+    executor: Executor | None,
+) -> list[Any]:
+    """
+    Run independent endpoint fetchers serially or on the given executor.
+
+    Results keep the fetcher order, so callers aggregate rows exactly
+    as in the serial path. The first failing fetcher (in order) raises.
+    """
+    if executor is None:
+        return [fetch() for fetch in fetchers]
+
+    futures = [executor.submit(fetch) for fetch in fetchers]
+    return [future.result() for future in futures]
+
+
 def _coin_to_usd(coin: str, amount: Decimal, prices: dict[str, Decimal]) -> Decimal:
     if amount == 0:
         return Decimal(0)
@@ -259,25 +278,28 @@ def _fetch_vip_loan(client: BybitClient, prices: dict[str, Decimal]) -> tuple[De
     return total, out
 
 
-def _fetch_earn_total(client: BybitClient, prices: dict[str, Decimal]) -> tuple[Decimal, list[dict[str, Any]]]:
+def _fetch_earn_total(
+    client: BybitClient,
+    prices: dict[str, Decimal],
+    *,
+    executor: Executor | None = None,
+) -> tuple[Decimal, list[dict[str, Any]]]:
     total = Decimal(0)
     rows: list[dict[str, Any]] = []
 
-    flex_total, flex_rows = _fetch_earn_category(client, "FlexibleSaving", prices)
-    total += flex_total
-    rows.extend(flex_rows)
-
-    onchain_total, onchain_rows = _fetch_earn_category(client, "OnChain", prices)
-    total += onchain_total
-    rows.extend(onchain_rows)
-
-    crypto_loan_total, crypto_loan_rows = _fetch_crypto_loan(client, prices)
-    total += crypto_loan_total
-    rows.extend(crypto_loan_rows)
+    parts = _run_all(
+        [
+            partial(_fetch_earn_category, client, "FlexibleSaving", prices),
+            partial(_fetch_earn_category, client, "OnChain", prices),
+            partial(_fetch_crypto_loan, client, prices),
+            partial(_fetch_vip_loan, client, prices),
+        ],
+        executor,
+    )
 
-    vip_total, vip_rows = _fetch_vip_loan(client, prices)
-    total += vip_total
-    rows.extend(vip_rows)
+    for part_total, part_rows in parts:
+        total += part_total
+        rows.extend(part_rows)
 
     return total, rows
 
@@ -353,8 +375,73 @@ def _compose_nav_usd(
     return nav_usd, fund_cash_wallets_usd
 
 
-def compute_nav(
+def build_nav_client(cfg: FundNavConfig) -> BybitClient:
+    return BybitClient(
+        cfg.bybit_api_key,
+        cfg.bybit_api_secret,
+        testnet=cfg.bybit_testnet,
+    )
+
+
+def fetch_spot_prices(client: BybitClient) -> dict[str, Decimal]:
+    """
+    Public spot ticker map. The multi-fund collector fetches it once
+    per tick and shares it between all funds on the same network.
+    """
+    return _fetch_spot_prices(client)
+
+
+def fetch_bybit_nav_inputs(
+    client: BybitClient,
+    *,
+    prices: dict[str, Decimal] | None = None,
+    executor: Executor | None = None,
+) -> BybitNavInputs:
+    """
+    Fetch every Bybit endpoint NAV depends on.
+
+    Without an executor the endpoints are called one after another.
+    With an executor the UTA wallet, FUND wallet and the four earn/loan
+    endpoints are in flight at the same time, so the latency is roughly
+    the slowest single endpoint. Only leaf calls are submitted to the
+    executor; this thread does the waiting.
+    """
+    if executor is None:
+        total_equity, uta_coins = _fetch_wallet_summary(client)
+        if prices is None:
+            prices = _fetch_spot_prices(client)
+        funding_total, funding_rows = _fetch_funding_wallet(client, prices)
+        earn_total, earn_rows = _fetch_earn_total(client, prices)
+    else:
+        wallet_future = executor.submit(_fetch_wallet_summary, client)
+        if prices is None:
+            prices = _fetch_spot_prices(client)
+        funding_future = executor.submit(
+            _fetch_funding_wallet,
+            client,
+            prices,
+        )
+        earn_total, earn_rows = _fetch_earn_total(
+            client,
+            prices,
+            executor=executor,
+        )
+        funding_total, funding_rows = funding_future.result()
+        total_equity, uta_coins = wallet_future.result()
+
+    return BybitNavInputs(
+        total_equity=total_equity,
+        uta_coins=uta_coins,
+        funding_total=funding_total,
+        funding_rows=funding_rows,
+        earn_total=earn_total,
+        earn_rows=earn_rows,
+    )
+
+
+def build_nav_result(
     cfg: FundNavConfig,
+    inputs: BybitNavInputs,
     *,
     settlement_wallet_usdt: Decimal = Decimal(
         "0"
@@ -363,16 +450,12 @@ def compute_nav(
         dict[str, Any] | None
     ) = None,
 ) -> NavResult:
-    client = BybitClient(
-        cfg.bybit_api_key,
-        cfg.bybit_api_secret,
-        testnet=cfg.bybit_testnet,
-    )
-
-    total_equity, uta_coins = _fetch_wallet_summary(client)
-    prices = _fetch_spot_prices(client)
-    funding_total, funding_rows = _fetch_funding_wallet(client, prices)
-    earn_total, earn_rows = _fetch_earn_total(client, prices)
+    total_equity = inputs.total_equity
+    uta_coins = inputs.uta_coins
+    funding_total = inputs.funding_total
+    funding_rows = inputs.funding_rows
+    earn_total = inputs.earn_total
+    earn_rows = inputs.earn_rows
 
     cash = _sum_cash(uta_coins)
     spot = _sum_spot(uta_coins)
@@ -435,4 +518,34 @@ def compute_nav(
             "earn_item_count": len(earn_rows),
             "bybit_testnet": cfg.bybit_testnet,
         },
-    )
\ No newline at end of file
+    )
+
+def compute_nav(
+    cfg: FundNavConfig,
+    *,
+    settlement_wallet_usdt: Decimal = Decimal(
+        "0"
+    ),
+    settlement_wallet_meta: (
+        dict[str, Any] | None
+    ) = None,
+    client: BybitClient | None = None,
+    prices: dict[str, Decimal] | None = None,
+    executor: Executor | None = None,
+) -> NavResult:
+    inputs = fetch_bybit_nav_inputs(
+        client or build_nav_client(cfg),
+        prices=prices,
+        executor=executor,
+    )
+
+    return build_nav_result(
+        cfg,
+        inputs,
+        settlement_wallet_usdt=(
+            settlement_wallet_usdt
+        ),
+        settlement_wallet_meta=(
+            settlement_wallet_meta
+        ),
+    )
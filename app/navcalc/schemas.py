@@ -32,6 +32,16 @@ class NavResult:
     raw_meta: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True)
+class BybitNavInputs:
+    total_equity: Decimal
+    uta_coins: list[dict[str, Any]]
+    funding_total: Decimal
+    funding_rows: list[dict[str, Any]]
+    earn_total: Decimal
+    earn_rows: list[dict[str, Any]]
+
+
 @dataclass
 class MinuteCandle:
     fund_code: str
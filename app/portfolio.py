@@ -4,11 +4,11 @@ from datetime import datetime, timezone
 from decimal import Decimal
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func as sa_func
 
 from app.models import (
-    User, Fund, FundNavMinute, UserFundPosition, UserPortfolioDaily, UserWallet
+    User, Fund, UserFundPosition, UserPortfolioDaily, UserWallet
 )
+from app.navcalc.latest_nav import get_latest_nav_prices, share_price
 
 FUND_ICON_MAP = {
     "defi_sniper": "fund-defi-sniper.svg",
@@ -59,43 +59,17 @@ def get_user_portfolio(db: Session, user: User, lang: str) -> dict:
     )
     pos_by_fund = {p.fund_id: p for p in positions}
 
-    # 4) Текущие цены (последняя запись fund_nav_minute по каждому фонду)
-    subq = (
-        db.query(
-            FundNavMinute.fund_id,
-            sa_func.max(FundNavMinute.ts_utc).label("max_ts"),
-        )
-        .group_by(FundNavMinute.fund_id)
-        .subquery()
-    )
-
-    prices_rows = (
-        db.query(
-            FundNavMinute.fund_id,
-            FundNavMinute.nav_usdt,
-            FundNavMinute.shares_outstanding,
-        )
-        .join(
-            subq,
-            (FundNavMinute.fund_id == subq.c.fund_id)
-            & (FundNavMinute.ts_utc == subq.c.max_ts),
-        )
-        .all()
-    )
-
-    nav_by_fund = {r.fund_id: r.nav_usdt for r in prices_rows}
-    shares_out_by_fund = {r.fund_id: r.shares_outstanding for r in prices_rows}
+    # 4) Текущие цены (fund_nav_latest через in-process кэш)
+    latest_prices = get_latest_nav_prices(db, [fund.id for fund in funds])
 
     # 5) Собираем payload
     funds_payload = []
     total_balance = usdt_total  # включаем общий USDT в текущий баланс
 
     for fund in funds:
-        nav_usdt = Decimal(nav_by_fund.get(fund.id) or 0)
-        shares_outstanding = Decimal(shares_out_by_fund.get(fund.id) or 0)
-
-        if shares_outstanding > 0:
-            price = nav_usdt / shares_outstanding
+        latest = latest_prices.get(fund.id)
+        if latest is not None:
+            price = share_price(latest.nav_usdt, latest.shares_outstanding)
         else:
             price = Decimal("0")
 
@@ -25,7 +25,7 @@ from app.auth import (
     ensure_email_available_for_use,
     get_slot_email,
 )
-from app.auth.deps import COOKIE_NAME
+from app.auth.deps import COOKIE_NAME, invalidate_user_sessions
 from app.auth.code_action_cooldown import enforce_code_action_cooldown
 
 from app.totp import (
@@ -594,4 +594,5 @@ def change_password_confirm(
     q.delete(synchronize_session=False)
 
     db.commit()
+    invalidate_user_sessions(user.id, keep=current_sid)
     return {"status": "ok"}
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any
+from typing import Any, Iterable
 
+from eth_abi import decode as abi_decode
+from eth_abi import encode as abi_encode
 from web3 import Web3
 
 from app.config import settings
@@ -10,6 +12,9 @@ from app.config import settings
 
 BALANCE_OF_SELECTOR = "70a08231"
 
+# Multicall3 aggregate3((address,bool,bytes)[]) -> (bool,bytes)[]
+AGGREGATE3_SELECTOR = "82ad56cb"
+
 
 class BscBalanceReadError(RuntimeError):
     pass
@@ -74,20 +79,7 @@ def read_bsc_block_number(
     return block_number
 
 
-def read_bsc_usdt_balance(
-    w3: Any,
-    address: str,
-    *,
-    block_identifier: int | str,
-) -> Decimal:
-    address_hex = _address_hex(
-        address,
-        field_name="wallet address",
-    )
-    contract_address = (
-        _usdt_contract_address()
-    )
-
+def _usdt_decimals() -> int:
     try:
         decimals = int(
             settings.BSC_USDT_DECIMALS
@@ -103,13 +95,72 @@ def read_bsc_usdt_balance(
             "the supported range"
         )
 
-    call_data = (
-        "0x"
-        + BALANCE_OF_SELECTOR
+    return decimals
+
+
+def _balance_of_call_data(
+    address_hex: str,
+) -> str:
+    return (
+        BALANCE_OF_SELECTOR
         + ("0" * 24)
         + address_hex
     )
 
+
+def _result_bytes(result: Any) -> bytes:
+    if isinstance(result, str):
+        raw_hex = result.strip().lower()
+
+        if raw_hex.startswith("0x"):
+            raw_hex = raw_hex[2:]
+
+        return bytes.fromhex(raw_hex)
+
+    return bytes(result)
+
+
+def _balance_from_word(
+    raw_result: bytes,
+    *,
+    decimals: int,
+) -> Decimal:
+    if len(raw_result) != 32:
+        raise BscBalanceReadError(
+            "BSC USDT balance response must "
+            "contain exactly 32 bytes"
+        )
+
+    balance_units = int.from_bytes(
+        raw_result,
+        byteorder="big",
+    )
+
+    return (
+        Decimal(balance_units)
+        / (Decimal(10) ** decimals)
+    )
+
+
+def read_bsc_usdt_balance(
+    w3: Any,
+    address: str,
+    *,
+    block_identifier: int | str,
+) -> Decimal:
+    address_hex = _address_hex(
+        address,
+        field_name="wallet address",
+    )
+    contract_address = (
+        _usdt_contract_address()
+    )
+    decimals = _usdt_decimals()
+
+    call_data = "0x" + _balance_of_call_data(
+        address_hex
+    )
+
     try:
         result = w3.eth.call(
             {
@@ -124,17 +175,7 @@ def read_bsc_usdt_balance(
         ) from exc
 
     try:
-        if isinstance(result, str):
-            raw_hex = result.strip().lower()
-
-            if raw_hex.startswith("0x"):
-                raw_hex = raw_hex[2:]
-
-            raw_result = bytes.fromhex(
-                raw_hex
-            )
-        else:
-            raw_result = bytes(result)
+        raw_result = _result_bytes(result)
     except (
         TypeError,
         ValueError,
@@ -144,18 +185,188 @@ def read_bsc_usdt_balance(
             "Invalid BSC USDT balance response"
         ) from exc
 
-    if len(raw_result) != 32:
+    return _balance_from_word(
+        raw_result,
+        decimals=decimals,
+    )
+
+
+def _multicall3_address() -> str:
+    multicall_hex = _address_hex(
+        settings.BSC_MULTICALL3_ADDRESS,
+        field_name="BSC Multicall3 address",
+    )
+
+    return Web3.to_checksum_address(
+        f"0x{multicall_hex}"
+    )
+
+
+def encode_usdt_balances_call(
+    addresses: list[str],
+) -> str:
+    """
+    Multicall3 aggregate3 call data reading balanceOf for every
+    address. allowFailure is false, so one bad call reverts the
+    whole batch instead of silently returning a partial result.
+    """
+    contract_address = (
+        _usdt_contract_address()
+    )
+
+    calls = [
+        (
+            contract_address,
+            False,
+            bytes.fromhex(
+                _balance_of_call_data(
+                    _address_hex(
+                        address,
+                        field_name="wallet address",
+                    )
+                )
+            ),
+        )
+        for address in addresses
+    ]
+
+    encoded = abi_encode(
+        ["(address,bool,bytes)[]"],
+        [calls],
+    )
+
+    return "0x" + AGGREGATE3_SELECTOR + encoded.hex()
+
+
+def decode_usdt_balances_result(
+    addresses: list[str],
+    result: Any,
+) -> dict[str, Decimal]:
+    """Balances keyed by lower-case 0x address, in call order."""
+    decimals = _usdt_decimals()
+
+    try:
+        (rows,) = abi_decode(
+            ["(bool,bytes)[]"],
+            _result_bytes(result),
+        )
+    except Exception as exc:
         raise BscBalanceReadError(
-            "BSC USDT balance response must "
-            "contain exactly 32 bytes"
+            "Invalid BSC Multicall3 response"
+        ) from exc
+
+    if len(rows) != len(addresses):
+        raise BscBalanceReadError(
+            "BSC Multicall3 response size does "
+            "not match the request"
         )
 
-    balance_units = int.from_bytes(
-        raw_result,
-        byteorder="big",
+    balances: dict[str, Decimal] = {}
+
+    for address, (success, return_data) in zip(
+        addresses,
+        rows,
+    ):
+        if not success:
+            raise BscBalanceReadError(
+                "BSC USDT balanceOf failed "
+                f"for {address}"
+            )
+
+        balances[
+            normalize_bsc_address(address)
+        ] = _balance_from_word(
+            bytes(return_data),
+            decimals=decimals,
+        )
+
+    return balances
+
+
+def _chunks(
+    values: list[str],
+    size: int,
+) -> Iterable[list[str]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def normalize_bsc_address(value: Any) -> str:
+    """Lower-case 0x address; raises BscBalanceReadError if invalid."""
+    return "0x" + _address_hex(
+        value,
+        field_name="wallet address",
     )
 
-    return (
-        Decimal(balance_units)
-        / (Decimal(10) ** decimals)
-    )
\ No newline at end of file
+
+def unique_addresses(
+    addresses: Iterable[str],
+) -> list[str]:
+    seen: set[str] = set()
+    result: list[str] = []
+
+    for address in addresses:
+        key = normalize_bsc_address(address)
+
+        if key not in seen:
+            seen.add(key)
+            result.append(key)
+
+    return result
+
+
+def balance_batch_size() -> int:
+    return max(
+        int(settings.BSC_BALANCE_BATCH_SIZE),
+        1,
+    )
+
+
+def read_bsc_usdt_balances(
+    w3: Any,
+    addresses: Iterable[str],
+    *,
+    block_identifier: int | str,
+) -> dict[str, Decimal]:
+    """
+    USDT balances of many addresses at one block through Multicall3,
+    BSC_BALANCE_BATCH_SIZE addresses per eth_call. Every chunk is pinned
+    to the same block_identifier, so the snapshot is consistent.
+    Keys are lower-case 0x addresses.
+    """
+    ordered = unique_addresses(addresses)
+    if not ordered:
+        return {}
+
+    multicall_address = _multicall3_address()
+    balances: dict[str, Decimal] = {}
+
+    for chunk in _chunks(
+        ordered,
+        balance_batch_size(),
+    ):
+        call_data = encode_usdt_balances_call(
+            chunk
+        )
+
+        try:
+            result = w3.eth.call(
+                {
+                    "to": multicall_address,
+                    "data": call_data,
+                },
+                block_identifier,
+            )
+        except Exception as exc:
+            raise BscBalanceReadError(
+                "Unable to read BSC USDT balances"
+            ) from exc
+
+        balances.update(
+            decode_usdt_balances_result(
+                chunk,
+                result,
+            )
+        )
+
+    return balances
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton, TtlLruCache
+
+
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
+
+# Below this many blocks between the oldest and newest cached header the
+# observed slope is too noisy; BSC_AVG_BLOCK_TIME_SEC is used instead.
+MIN_SLOPE_SPAN_BLOCKS = 100
+
+
+@dataclass(frozen=True)
+class BlockHeader:
+    number: int
+    timestamp: datetime
+
+
+def _header_from_rpc(block: Any) -> BlockHeader | None:
+    if not block:
+        return None
+
+    number = block.get("number")
+    ts = block.get("timestamp")
+    if number is None or ts is None:
+        return None
+
+    if isinstance(number, str):
+        number = int(number, 16)
+    if isinstance(ts, str):
+        ts = int(ts, 16)
+
+    return BlockHeader(
+        number=int(number),
+        timestamp=datetime.fromtimestamp(int(ts), tz=UTC),
+    )
+
+
+class BlockHeaderCache:
+    """
+    Size-bounded LRU of block number -> header timestamp.
+
+    Shared by every BSC worker in the process so long-running listeners
+    keep flat memory. Cached headers double as anchors for estimate(),
+    which extrapolates with the observed (or configured) block time when
+    an exact timestamp is not required.
+    """
+
+    def __init__(self, *, max_entries: int | None = None) -> None:
+        self._headers: TtlLruCache[int, BlockHeader] = TtlLruCache(
+            max_entries=(
+                max_entries
+                if max_entries is not None
+                else settings.BSC_BLOCK_HEADER_CACHE_SIZE
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._headers)
+
+    def get(self, number: int) -> BlockHeader | None:
+        return self._headers.get(int(number))
+
+    def get_many(self, numbers: Iterable[int]) -> dict[int, BlockHeader]:
+        return self._headers.get_many(int(number) for number in numbers)
+
+    def put(self, header: BlockHeader) -> None:
+        self._headers.put(header.number, header)
+
+    def put_many(self, headers: Iterable[BlockHeader]) -> None:
+        for header in headers:
+            self.put(header)
+
+    def clear(self) -> None:
+        self._headers.clear()
+
+    def average_block_time_sec(self) -> float:
+        return self._average_block_time_sec(self._headers.snapshot())
+
+    @staticmethod
+    def _average_block_time_sec(headers: dict[int, BlockHeader]) -> float:
+        if len(headers) >= 2:
+            oldest = min(headers)
+            newest = max(headers)
+            span = newest - oldest
+            if span >= MIN_SLOPE_SPAN_BLOCKS:
+                elapsed = (
+                    headers[newest].timestamp - headers[oldest].timestamp
+                ).total_seconds()
+                if elapsed > 0:
+                    return elapsed / span
+
+        return float(settings.BSC_AVG_BLOCK_TIME_SEC)
+
+    def estimate(
+        self,
+        number: int,
+        *,
+        max_distance: int | None = None,
+    ) -> datetime | None:
+        """
+        Timestamp extrapolated from the nearest cached header, or None
+        when there is no anchor within max_distance blocks.
+        """
+        number = int(number)
+
+        headers = self._headers.snapshot()
+        if not headers:
+            return None
+        anchor = headers[min(headers, key=lambda n: abs(n - number))]
+
+        distance = number - anchor.number
+        if max_distance is not None and abs(distance) > max_distance:
+            return None
+
+        return anchor.timestamp + timedelta(
+            seconds=distance * self._average_block_time_sec(headers)
+        )
+
+
+_CACHE: ProcessSingleton[BlockHeaderCache] = ProcessSingleton(BlockHeaderCache)
+
+
+def get_block_header_cache() -> BlockHeaderCache:
+    return _CACHE.get()
+
+
+def remember_block_timestamp(number: int, timestamp: datetime) -> None:
+    get_block_header_cache().put(BlockHeader(number=int(number), timestamp=timestamp))
+
+
+def _batch_size() -> int:
+    return max(1, int(settings.BSC_BLOCK_HEADER_BATCH_SIZE))
+
+
+def _missing_numbers(
+    cache: BlockHeaderCache,
+    numbers: Iterable[int],
+    *,
+    exact: bool,
+    out: dict[int, datetime],
+) -> list[int]:
+    wanted = sorted({int(n) for n in numbers})
+    cached = cache.get_many(wanted)
+    missing: list[int] = []
+
+    for number in wanted:
+        header = cached.get(number)
+        if header is not None:
+            out[number] = header.timestamp
+            continue
+
+        if not exact:
+            estimated = cache.estimate(
+                number,
+                max_distance=int(settings.BSC_BLOCK_TIME_ESTIMATE_MAX_BLOCKS),
+            )
+            if estimated is not None:
+                out[number] = estimated
+                continue
+
+        missing.append(number)
+
+    return missing
+
+
+def fetch_block_headers(w3, numbers: list[int]) -> list[BlockHeader]:
+    """eth_getBlockByNumber for numbers through web3 batch requests."""
+    headers: list[BlockHeader] = []
+
+    for start in range(0, len(numbers), _batch_size()):
+        batch_numbers = numbers[start : start + _batch_size()]
+        try:
+            with w3.batch_requests() as batch:
+                for number in batch_numbers:
+                    batch.add(w3.eth.get_block(number, False))
+                blocks = batch.execute()
+        except Exception as exc:
+            # Providers without batch support still get one call per block.
+            logger.debug("block header batch failed, falling back: %s", exc)
+            blocks = []
+            for number in batch_numbers:
+                try:
+                    blocks.append(w3.eth.get_block(number, False))
+                except Exception as block_exc:
+                    logger.warning("get_block %s failed: %s", number, block_exc)
+
+        for block in blocks:
+            header = _header_from_rpc(block)
+            if header is not None:
+                headers.append(header)
+
+    return headers
+
+
+def get_block_timestamps(
+    w3,
+    numbers: Iterable[int],
+    *,
+    exact: bool = True,
+) -> dict[int, datetime]:
+    """
+    Timestamps for numbers: cache first, then one batched RPC for the rest.
+    With exact=False a block near a cached anchor is estimated instead.
+    Blocks the node did not return are absent from the result.
+    """
+    cache = get_block_header_cache()
+    out: dict[int, datetime] = {}
+    missing = _missing_numbers(cache, numbers, exact=exact, out=out)
+
+    if missing:
+        headers = fetch_block_headers(w3, missing)
+        cache.put_many(headers)
+        out.update({header.number: header.timestamp for header in headers})
+
+    return out
+
+
+def get_block_timestamp(
+    w3,
+    number: int,
+    *,
+    exact: bool = True,
+) -> datetime | None:
+    return get_block_timestamps(w3, [number], exact=exact).get(int(number))
+
+
+async def fetch_block_headers_async(
+    session,
+    numbers: list[int],
+    *,
+    rpc_url: str | None = None,
+) -> list[BlockHeader]:
+    """eth_getBlockByNumber for numbers as JSON-RPC arrays over aiohttp."""
+    rpc_url = rpc_url or settings.BSC_RPC_URL
+    if not rpc_url:
+        return []
+
+    headers: list[BlockHeader] = []
+    for start in range(0, len(numbers), _batch_size()):
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": "eth_getBlockByNumber",
+                "params": [hex(number), False],
+                "id": number,
+            }
+            for number in numbers[start : start + _batch_size()]
+        ]
+        async with session.post(rpc_url, json=payload) as resp:
+            if resp.status != 200:
+                txt = await resp.text()
+                raise RuntimeError(f"eth_getBlockByNumber batch HTTP {resp.status}: {txt[:200]}")
+            data = await resp.json(content_type=None)
+
+        if not isinstance(data, list):
+            raise RuntimeError(f"eth_getBlockByNumber batch bad result: {str(data)[:200]}")
+
+        for item in data:
+            header = _header_from_rpc((item or {}).get("result"))
+            if header is not None:
+                headers.append(header)
+
+    return headers
+
+
+async def get_block_timestamps_async(
+    session,
+    numbers: Iterable[int],
+    *,
+    exact: bool = True,
+) -> dict[int, datetime]:
+    """Async twin of get_block_timestamps for aiohttp-based workers."""
+    cache = get_block_header_cache()
+    out: dict[int, datetime] = {}
+    missing = _missing_numbers(cache, numbers, exact=exact, out=out)
+
+    if missing:
+        headers = await fetch_block_headers_async(session, missing)
+        cache.put_many(headers)
+        out.update({header.number: header.timestamp for header in headers})
+
+    return out
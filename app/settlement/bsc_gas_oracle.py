@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import statistics
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Generic, TypeVar
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlightValue(Generic[T]):
+    """
+    One value refreshed at most every ttl_sec.
+
+    When it is stale, the first caller fetches while concurrent callers
+    wait on the same lock and then reuse its result instead of issuing
+    their own RPC. Failed fetches are not cached.
+    """
+
+    def __init__(self, ttl_sec: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_sec = float(ttl_sec)
+        self._clock = clock
+        self._refresh_lock = threading.Lock()
+        self._value: T | None = None
+        self._fetched_at: float | None = None
+
+    def _fresh(self) -> T | None:
+        fetched_at = self._fetched_at
+        if fetched_at is None or self._clock() - fetched_at >= self.ttl_sec:
+            return None
+        return self._value
+
+    def get(self, fetch: Callable[[], T]) -> T:
+        value = self._fresh()
+        if value is not None:
+            return value
+
+        with self._refresh_lock:
+            value = self._fresh()
+            if value is not None:
+                return value
+
+            value = fetch()
+            self._value = value
+            self._fetched_at = self._clock()
+            return value
+
+    def clear(self) -> None:
+        with self._refresh_lock:
+            self._value = None
+            self._fetched_at = None
+
+
+def smoothed_gas_price_wei(fee_history: Any) -> int | None:
+    """
+    Median over recent blocks of base fee + percentile tip, from an
+    eth_feeHistory result requested with a single reward percentile.
+    The median keeps one outlier block from moving the quote.
+    """
+    base_fees = list(fee_history.get("baseFeePerGas") or [])
+    rewards = list(fee_history.get("reward") or [])
+    if not rewards:
+        return None
+
+    prices = []
+    for i, reward in enumerate(rewards):
+        if not reward:
+            continue
+        base = int(base_fees[i]) if i < len(base_fees) else 0
+        prices.append(base + int(reward[0]))
+
+    if not prices:
+        return None
+
+    return int(statistics.median(prices))
+
+
+class BscGasOracle:
+    """
+    Short-lived shared quotes for gas price and BNB/USDT.
+
+    Every settlement and withdrawal pass asks for the same two numbers
+    many times; within the TTL they cost one RPC per process.
+    """
+
+    def __init__(
+        self,
+        *,
+        gas_ttl_sec: float | None = None,
+        price_ttl_sec: float | None = None,
+        percentile: float | None = None,
+        history_blocks: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.percentile = float(
+            percentile if percentile is not None else settings.BSC_GAS_PRICE_PERCENTILE
+        )
+        self.history_blocks = int(
+            history_blocks if history_blocks is not None else settings.BSC_GAS_PRICE_HISTORY_BLOCKS
+        )
+        self._gas_price = SingleFlightValue[int](
+            gas_ttl_sec if gas_ttl_sec is not None else settings.BSC_GAS_PRICE_TTL_SEC,
+            clock=clock,
+        )
+        self._bnb_usdt = SingleFlightValue[Decimal](
+            price_ttl_sec if price_ttl_sec is not None else settings.BSC_BNB_PRICE_TTL_SEC,
+            clock=clock,
+        )
+
+    def _fetch_gas_price(self, w3: Any) -> int:
+        node_price = int(w3.eth.gas_price)
+        if self.percentile <= 0 or self.history_blocks <= 0:
+            return node_price
+
+        try:
+            history = w3.eth.fee_history(self.history_blocks, "latest", [self.percentile])
+            smoothed = smoothed_gas_price_wei(history)
+        except Exception as exc:
+            logger.warning("eth_feeHistory failed, using eth_gasPrice: %s", exc)
+            return node_price
+
+        if smoothed is None:
+            return node_price
+
+        # Recent blocks show congestion before eth_gasPrice does; the node's
+        # suggestion stays the floor so transactions are never underpriced.
+        return max(node_price, smoothed)
+
+    def gas_price_wei(self, w3: Any) -> int:
+        return self._gas_price.get(lambda: self._fetch_gas_price(w3))
+
+    def bnb_usdt_price(self, w3: Any, quote: Callable[[Any], Decimal]) -> Decimal:
+        return self._bnb_usdt.get(lambda: quote(w3))
+
+    def clear(self) -> None:
+        self._gas_price.clear()
+        self._bnb_usdt.clear()
+
+
+_ORACLE: ProcessSingleton[BscGasOracle] = ProcessSingleton(BscGasOracle)
+
+
+def get_bsc_gas_oracle() -> BscGasOracle:
+    return _ORACLE.get()
+
+
+def get_gas_price_wei(w3: Any) -> int:
+    return get_bsc_gas_oracle().gas_price_wei(w3)
@@ -11,6 +11,7 @@ from web3.exceptions import TransactionNotFound
 
 from app.config import settings
 from app.models import FundBscTransactionIntent
+from app.settlement.bsc_provider_pool import configured_rpc_urls
 from app.settlement.erc20_receipt import (
     Erc20ReceiptError,
     exact_decimal_amount_to_raw,
@@ -161,7 +162,7 @@ def _safe_error_text(
         text = error.__class__.__name__
 
     for rpc_url in (
-        settings.BSC_RPC_URL,
+        *configured_rpc_urls(),
         settings.BSC_WS_URL,
     ):
         normalized_url = str(
@@ -21,6 +21,7 @@ from app.settlement.bsc_intent_service import (
     _load_bsc_intent_for_update,
     _validate_persisted_bsc_intent_or_fail,
 )
+from app.settlement.bsc_provider_pool import configured_rpc_urls
 from app.settlement.erc20_receipt import (
     Erc20ReceiptError,
     normalize_transaction_hash,
@@ -213,7 +214,7 @@ def _safe_error_text(
         text = error.__class__.__name__
 
     for rpc_url in (
-        settings.BSC_RPC_URL,
+        *configured_rpc_urls(),
         settings.BSC_WS_URL,
     ):
         normalized_url = str(
@@ -20,6 +20,8 @@ from app.models import (
     FundBscTransactionIntent,
     FundSettlementTransfer,
 )
+from app.settlement.bsc_gas_oracle import get_gas_price_wei
+from app.settlement.nonce_manager import nonce_lease
 from app.settlement.statuses import (
     BSC_INTENT_ACTION_NEGATIVE_REDEEM_PAYOUT,
     BSC_INTENT_ACTION_NEGATIVE_SETTLEMENT_GAS_TOPUP,
@@ -531,35 +533,36 @@ def prepare_native_bnb_transaction(
     )
 
     chain_id = int(w3.eth.chain_id)
-    source_nonce = int(
-        w3.eth.get_transaction_count(
-            from_checksum,
-            "pending",
-        )
-    )
-    gas_price = int(w3.eth.gas_price)
-    value_wei = int(amount * WEI_PER_BNB)
-
-    tx = {
-        "to": to_checksum,
-        "value": value_wei,
-        "gas": 21000,
-        "gasPrice": gas_price,
-        "nonce": source_nonce,
-        "chainId": chain_id,
-    }
 
-    signed = w3.eth.account.sign_transaction(
-        tx,
-        private_key,
-    )
+    with nonce_lease(w3, from_checksum) as lease:
+        source_nonce = lease.nonce
+        gas_price = get_gas_price_wei(w3)
+        value_wei = int(amount * WEI_PER_BNB)
 
-    return _prepared_from_signed(
-        w3,
-        signed=signed,
-        chain_id=chain_id,
-        source_nonce=source_nonce,
-    )
+        tx = {
+            "to": to_checksum,
+            "value": value_wei,
+            "gas": 21000,
+            "gasPrice": gas_price,
+            "nonce": source_nonce,
+            "chainId": chain_id,
+        }
+
+        signed = w3.eth.account.sign_transaction(
+            tx,
+            private_key,
+        )
+
+        prepared = _prepared_from_signed(
+            w3,
+            signed=signed,
+            chain_id=chain_id,
+            source_nonce=source_nonce,
+        )
+        # The signed tx is persisted on the intent and broadcast from there.
+        lease.sent(prepared.tx_hash)
+
+    return prepared
 
 
 def prepare_usdt_transfer_transaction(
@@ -608,42 +611,42 @@ def prepare_usdt_transfer_transaction(
     )
 
     chain_id = int(w3.eth.chain_id)
-    source_nonce = int(
-        w3.eth.get_transaction_count(
-            from_checksum,
-            "pending",
-        )
-    )
-    gas_price = int(w3.eth.gas_price)
 
-    tx = contract.functions.transfer(
-        to_checksum,
-        amount_raw,
-    ).build_transaction(
-        {
-            "from": from_checksum,
-            "nonce": source_nonce,
-            "gasPrice": gas_price,
-            "chainId": chain_id,
-        }
-    )
+    with nonce_lease(w3, from_checksum) as lease:
+        source_nonce = lease.nonce
+        gas_price = get_gas_price_wei(w3)
+
+        tx = contract.functions.transfer(
+            to_checksum,
+            amount_raw,
+        ).build_transaction(
+            {
+                "from": from_checksum,
+                "nonce": source_nonce,
+                "gasPrice": gas_price,
+                "chainId": chain_id,
+            }
+        )
+
+        if "gas" not in tx or not tx["gas"]:
+            tx["gas"] = int(
+                settings.ERC20_TRANSFER_GAS_FALLBACK
+            )
 
-    if "gas" not in tx or not tx["gas"]:
-        tx["gas"] = int(
-            settings.ERC20_TRANSFER_GAS_FALLBACK
+        signed = w3.eth.account.sign_transaction(
+            tx,
+            private_key,
         )
 
-    signed = w3.eth.account.sign_transaction(
-        tx,
-        private_key,
-    )
+        prepared = _prepared_from_signed(
+            w3,
+            signed=signed,
+            chain_id=chain_id,
+            source_nonce=source_nonce,
+        )
+        lease.sent(prepared.tx_hash)
 
-    return _prepared_from_signed(
-        w3,
-        signed=signed,
-        chain_id=chain_id,
-        source_nonce=source_nonce,
-    )
+    return prepared
 
 
 def _raw_transaction_bytes(
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.providers import JSONBaseProvider
+from web3.providers.rpc import HTTPProvider
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton
+
+
+logger = logging.getLogger(__name__)
+
+# A node that accepted (or half-accepted) a raw transaction must not be
+# second-guessed by replaying it elsewhere: sends go to one endpoint only.
+WRITE_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+# JSON-RPC "limit exceeded": the node is healthy but throttling us.
+RATE_LIMIT_ERROR_CODE = -32005
+
+# Transport-level failures. ValueError covers non-JSON bodies from proxies.
+FAILOVER_ERRORS = (requests.RequestException, ConnectionError, TimeoutError, ValueError)
+
+LATENCY_EWMA_ALPHA = 0.2
+MAX_COOLDOWN_SEC = 300.0
+
+
+class BscRpcUnavailableError(ConnectionError):
+    pass
+
+
+def configured_rpc_urls() -> list[str]:
+    """BSC_RPC_URL first, then BSC_RPC_URLS (comma-separated), deduplicated."""
+    urls: list[str] = []
+    for raw in [settings.BSC_RPC_URL, *str(settings.BSC_RPC_URLS or "").split(",")]:
+        url = str(raw or "").strip()
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+@dataclass
+class RpcEndpoint:
+    url: str
+    provider: Any
+    latency_sec: float | None = None
+    consecutive_errors: int = 0
+    total_errors: int = 0
+    cooldown_until: float = 0.0
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self) -> float:
+        # Unmeasured endpoints sort first so every node gets sampled.
+        return self.latency_sec if self.latency_sec is not None else 0.0
+
+
+def _http_provider(url: str, *, timeout: float, pool_size: int) -> HTTPProvider:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Retrying the same node is pointless when another one is a failover away.
+    return HTTPProvider(
+        url,
+        request_kwargs={"timeout": timeout},
+        session=session,
+        exception_retry_configuration=None,
+    )
+
+
+class BscProviderPool:
+    """
+    Several BSC RPC endpoints behind one web3 provider.
+
+    Each endpoint keeps its own keep-alive HTTP session. Reads go to the
+    endpoint with the lowest observed latency and fail over to the next
+    one on transport errors or throttling; a failing endpoint is cooled
+    down with exponential backoff. Sends are pinned to the single best
+    endpoint and never replayed.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        *,
+        timeout: float | None = None,
+        pool_size: int | None = None,
+        cooldown_sec: float | None = None,
+        provider_factory: Callable[[str], Any] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not urls:
+            raise BscRpcUnavailableError("BSC_RPC_URL is not set")
+
+        timeout = float(timeout if timeout is not None else settings.BSC_RPC_TIMEOUT_SEC)
+        pool_size = int(pool_size if pool_size is not None else settings.BSC_RPC_POOL_SIZE)
+        self.cooldown_sec = float(
+            cooldown_sec if cooldown_sec is not None else settings.BSC_RPC_ERROR_COOLDOWN_SEC
+        )
+
+        if provider_factory is None:
+            def provider_factory(url: str) -> Any:
+                return _http_provider(url, timeout=timeout, pool_size=pool_size)
+
+        self.endpoints = [RpcEndpoint(url=url, provider=provider_factory(url)) for url in urls]
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def ranked(self) -> list[RpcEndpoint]:
+        """Available endpoints by latency, then cooled-down ones by readiness."""
+        now = self._clock()
+        with self._lock:
+            order = {id(ep): i for i, ep in enumerate(self.endpoints)}
+            available = sorted(
+                (ep for ep in self.endpoints if ep.available(now)),
+                key=lambda ep: (ep.score(), order[id(ep)]),
+            )
+            cooling = sorted(
+                (ep for ep in self.endpoints if not ep.available(now)),
+                key=lambda ep: ep.cooldown_until,
+            )
+        return available + cooling
+
+    def record_success(self, endpoint: RpcEndpoint, elapsed_sec: float) -> None:
+        with self._lock:
+            if endpoint.latency_sec is None:
+                endpoint.latency_sec = elapsed_sec
+            else:
+                endpoint.latency_sec += LATENCY_EWMA_ALPHA * (elapsed_sec - endpoint.latency_sec)
+            endpoint.consecutive_errors = 0
+            endpoint.cooldown_until = 0.0
+
+    def record_error(self, endpoint: RpcEndpoint, error: Any) -> None:
+        with self._lock:
+            endpoint.consecutive_errors += 1
+            endpoint.total_errors += 1
+            cooldown = min(
+                MAX_COOLDOWN_SEC,
+                self.cooldown_sec * 2 ** (endpoint.consecutive_errors - 1),
+            )
+            endpoint.cooldown_until = self._clock() + cooldown
+
+        logger.warning(
+            "BSC RPC endpoint #%s failed (%s in a row), cooling down %.0fs: %s",
+            self.endpoints.index(endpoint),
+            endpoint.consecutive_errors,
+            cooldown,
+            error,
+        )
+
+    def call(self, send: Callable[[Any], Any], *, write: bool = False) -> Any:
+        """
+        Run send(provider) against the best endpoint, failing over for reads.
+        """
+        candidates = self.ranked()
+        if write:
+            candidates = candidates[:1]
+
+        last_error: Exception | None = None
+        throttled: Any = None
+        for endpoint in candidates:
+            started = self._clock()
+            try:
+                response = send(endpoint.provider)
+            except FAILOVER_ERRORS as exc:
+                self.record_error(endpoint, exc)
+                last_error = exc
+                continue
+
+            if _is_rate_limited(response):
+                self.record_error(endpoint, response.get("error") if isinstance(response, dict) else response)
+                throttled = response
+                continue
+
+            self.record_success(endpoint, self._clock() - started)
+            return response
+
+        if throttled is not None:
+            # Every node throttled us; let web3 surface the RPC error.
+            return throttled
+        if write:
+            raise last_error
+        raise BscRpcUnavailableError(
+            f"All {len(candidates)} BSC RPC endpoint(s) failed: {last_error}"
+        )
+
+    def web3(self) -> Web3:
+        return Web3(PooledHTTPProvider(self))
+
+
+def _is_rate_limited(response: Any) -> bool:
+    items = response if isinstance(response, list) else [response]
+    for item in items:
+        error = item.get("error") if isinstance(item, dict) else None
+        if isinstance(error, dict) and error.get("code") == RATE_LIMIT_ERROR_CODE:
+            return True
+    return False
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    def __init__(self, pool: BscProviderPool, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    def __str__(self) -> str:
+        return f"Pooled RPC connection ({len(self.pool.endpoints)} endpoints)"
+
+    def make_request(self, method, params):
+        return self.pool.call(
+            lambda provider: provider.make_request(method, params),
+            write=method in WRITE_METHODS,
+        )
+
+    def make_batch_request(self, batch_requests):
+        return self.pool.call(
+            lambda provider: provider.make_batch_request(batch_requests),
+            write=any(method in WRITE_METHODS for method, _ in batch_requests),
+        )
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = self.make_request("web3_clientVersion", [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+        return "jsonrpc" in response and "error" not in response
+
+
+_POOL: ProcessSingleton[BscProviderPool] = ProcessSingleton(
+    lambda: BscProviderPool(configured_rpc_urls())
+)
+
+# web3 keeps batch_requests() state on the provider, so each thread gets
+# its own Web3/provider shell over the shared endpoints and sessions.
+_THREAD_WEB3 = threading.local()
+
+
+def get_bsc_provider_pool() -> BscProviderPool:
+    return _POOL.get()
+
+
+def get_bsc_web3() -> Web3:
+    """Web3 over the process-wide endpoint pool, one per thread."""
+    pool = get_bsc_provider_pool()
+
+    w3 = getattr(_THREAD_WEB3, "w3", None)
+    if w3 is None or w3.provider.pool is not pool:
+        w3 = pool.web3()
+        _THREAD_WEB3.w3 = w3
+
+    return w3
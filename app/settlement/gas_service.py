@@ -14,6 +14,9 @@ from app.config import settings
 from app.models import Fund, FundSettlementBatch, FundSettlementTransfer, FundWallet
 from app.settlement.batch_repository import get_or_create_settlement_batch
 from app.settlement.batch_service import get_cutoff_ts, get_default_settlement_date
+from app.settlement.bsc_gas_oracle import get_bsc_gas_oracle, get_gas_price_wei
+from app.settlement.bsc_provider_pool import configured_rpc_urls, get_bsc_web3
+from app.settlement.nonce_manager import nonce_lease
 from app.settlement.statuses import (
     TRANSFER_STATUS_FAILED,
     TRANSFER_STATUS_PENDING,
@@ -309,14 +312,10 @@ def _normalize_private_key(private_key: str) -> str:
 
 
 def get_web3() -> Web3:
-    if not settings.BSC_RPC_URL:
+    if not configured_rpc_urls():
         raise SettlementGasError("BSC_RPC_URL is not configured")
 
-    w3 = Web3(Web3.HTTPProvider(settings.BSC_RPC_URL))
-    if not w3.is_connected():
-        raise SettlementGasError("Cannot connect to BSC RPC")
-
-    return w3
+    return get_bsc_web3()
 
 
 def _checksum(w3: Web3, address: str) -> str:
@@ -332,6 +331,14 @@ def get_bnb_balance(w3: Web3, address: str) -> Decimal:
 
 
 def get_bnb_usd_price(w3: Web3) -> Decimal:
+    """
+    USDT per 1 BNB, shared for BSC_BNB_PRICE_TTL_SEC by every caller
+    in the process.
+    """
+    return get_bsc_gas_oracle().bnb_usdt_price(w3, quote_bnb_usd_price)
+
+
+def quote_bnb_usd_price(w3: Web3) -> Decimal:
     """
     Quote 1 BNB -> USDT through Pancake router.
 
@@ -381,7 +388,7 @@ def estimate_min_operational_bnb(w3: Web3) -> Decimal:
     Stage 21 does not execute final settlement, so this is a practical placeholder:
     2 ERC20 transfers * fallback gas * current gas price * buffer.
     """
-    gas_price_wei = Decimal(int(w3.eth.gas_price))
+    gas_price_wei = Decimal(get_gas_price_wei(w3))
     fallback_gas = Decimal(int(settings.ERC20_TRANSFER_GAS_FALLBACK))
     buffer_mult = Decimal(settings.SETTLEMENT_WALLET_MIN_GAS_BUFFER_MULT)
 
@@ -405,24 +412,24 @@ def send_native_bnb(
     to_checksum = _checksum(w3, to_address)
 
     value_wei = int(amount_bnb * WEI_PER_BNB)
-    gas_price = int(w3.eth.gas_price)
-    nonce = w3.eth.get_transaction_count(from_checksum)
+    gas_price = get_gas_price_wei(w3)
     chain_id = int(w3.eth.chain_id)
 
-    tx = {
-        "to": to_checksum,
-        "value": value_wei,
-        "gas": 21000,
-        "gasPrice": gas_price,
-        "nonce": nonce,
-        "chainId": chain_id,
-    }
-
-    signed = w3.eth.account.sign_transaction(tx, private_key)
-    raw_tx = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction")
-    tx_hash = w3.eth.send_raw_transaction(raw_tx)
-
-    return w3.to_hex(tx_hash)
+    with nonce_lease(w3, from_checksum, block_identifier=None) as lease:
+        tx = {
+            "to": to_checksum,
+            "value": value_wei,
+            "gas": 21000,
+            "gasPrice": gas_price,
+            "nonce": lease.nonce,
+            "chainId": chain_id,
+        }
+
+        signed = w3.eth.account.sign_transaction(tx, private_key)
+        raw_tx = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction")
+        tx_hash = w3.to_hex(lease.send_raw(w3, raw_tx))
+
+    return tx_hash
 
 
 def _get_active_settlement_wallets(
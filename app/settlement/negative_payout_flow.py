@@ -25,6 +25,7 @@ from app.operation_guard.hooks import (
     require_bsc_settlement_gas_topup_guard,
 )
 from app.operation_guard.service import OperationGuardBlockedError
+from app.settlement.bsc_gas_oracle import get_gas_price_wei
 from app.settlement.gas_service import (
     WEI_PER_BNB,
     get_bnb_balance,
@@ -36,8 +37,10 @@ from app.settlement.bsc_intent_service import (
     prepare_usdt_transfer_transaction,
 )
 from app.settlement.bsc_balance_service import (
+    normalize_bsc_address,
     read_bsc_block_number,
     read_bsc_usdt_balance,
+    read_bsc_usdt_balances,
 )
 from app.wallets import decrypt_private_key
 from app.settlement.negative_payout_flow_types import (
@@ -198,7 +201,7 @@ def _required_bnb_for_payout_legs(
     *,
     leg_count: int,
 ) -> Decimal:
-    gas_price_wei = Decimal(int(w3.eth.gas_price))
+    gas_price_wei = Decimal(get_gas_price_wei(w3))
     fallback_gas = Decimal(int(settings.ERC20_TRANSFER_GAS_FALLBACK))
     buffer_mult = Decimal(settings.WITHDRAW_GAS_BUFFER_MULT)
     count = Decimal(max(1, int(leg_count)))
@@ -2274,6 +2277,17 @@ def _refresh_live_balances_after_confirmed_payouts(
         )
     )
 
+    # One Multicall3 read for every user wallet,
+    # pinned to the same block as the settlement read.
+    observed_by_address = read_bsc_usdt_balances(
+        w3,
+        [
+            str(snapshot["address"])
+            for snapshot in wallet_snapshots
+        ],
+        block_identifier=block_number,
+    )
+
     observed_wallet_balances = {}
 
     for snapshot in wallet_snapshots:
@@ -2285,11 +2299,11 @@ def _refresh_live_balances_after_confirmed_payouts(
             continue
 
         observed_wallet_balances[wallet_id] = (
-            read_bsc_usdt_balance(
-                w3,
-                str(snapshot["address"]),
-                block_identifier=block_number,
-            )
+            observed_by_address[
+                normalize_bsc_address(
+                    snapshot["address"]
+                )
+            ]
         )
 
     # RPC is complete. Re-lock and validate the
@@ -9,10 +9,10 @@ from typing import Any
 from sqlalchemy.orm import Session
 
 from app.bybit.client import BybitV5Client
+from app.bybit.instrument_cache import cached_instrument_info
 from app.bybit.instruments import (
     BybitInstrumentInfoError,
     normalize_order_quantity,
-    query_instrument_info,
 )
 from app.bybit.transferable_balance import (
     BybitTransferableBalanceError,
@@ -941,11 +941,10 @@ def _spot_correction_sources(
             continue
 
         try:
-            instrument = query_instrument_info(
+            instrument = cached_instrument_info(
                 client,
                 category="spot",
                 symbol=symbol,
-                captured_at=now,
             )
         except BybitInstrumentInfoError as exc:
             raise (
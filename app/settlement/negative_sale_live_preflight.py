@@ -6,11 +6,11 @@ from decimal import Decimal, InvalidOperation
 from typing import Any
 
 from app.bybit.client import BybitV5Client
+from app.bybit.instrument_cache import cached_instrument_info
 from app.bybit.instruments import (
     BybitInstrumentInfoError,
     NormalizedOrderQuantity,
     normalize_order_quantity,
-    query_instrument_info,
 )
 from app.bybit.transferable_balance import (
     BybitTransferableBalanceError,
@@ -384,14 +384,12 @@ def _validate_instrument(
     *,
     category: str,
     symbol: str,
-    captured_at: datetime,
 ):
     try:
-        instrument = query_instrument_info(
+        instrument = cached_instrument_info(
             client,
             category=category,
             symbol=symbol,
-            captured_at=captured_at,
         )
     except BybitInstrumentInfoError as exc:
         raise NegativeSaleLivePreflightError(
@@ -715,7 +713,6 @@ def _build_derivative_preflight(
         client,
         category=category,
         symbol=symbol,
-        captured_at=captured_at,
     )
 
     price, ticker_row = (
@@ -831,7 +828,6 @@ def _build_spot_preflight(
         client,
         category="spot",
         symbol=symbol,
-        captured_at=captured_at,
     )
 
     base_coin = str(
@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from web3 import Web3
+from web3.exceptions import Web3RPCError
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import BscNonceReservation, BscSenderNonce
+
+
+log = logging.getLogger("settlement.nonce_manager")
+
+NONCE_STATUS_RESERVED = "reserved"
+NONCE_STATUS_SENT = "sent"
+NONCE_STATUS_RELEASED = "released"
+
+IN_FLIGHT_STATUSES = (NONCE_STATUS_RESERVED, NONCE_STATUS_SENT)
+
+# Rejections meaning the node already holds a transaction at this nonce.
+NONCE_IN_USE_MARKERS = (
+    "already known",
+    "known transaction",
+    "nonce too low",
+    "replacement transaction underpriced",
+)
+
+
+class NonceManagerError(RuntimeError):
+    pass
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _key(address: str) -> str:
+    value = str(address or "").strip().lower()
+    if not value:
+        raise NonceManagerError("Sender address is empty")
+    return value
+
+
+@dataclass(frozen=True)
+class ReservationState:
+    nonce: int
+    status: str
+    updated_at: datetime
+
+
+@dataclass
+class ReconcilePlan:
+    next_nonce: int
+    delete: list[int] = field(default_factory=list)
+    release: list[int] = field(default_factory=list)
+    add_released: list[int] = field(default_factory=list)
+
+
+def plan_reconcile(
+    *,
+    next_nonce: int,
+    reservations: list[ReservationState],
+    latest: int,
+    pending: int,
+    now: datetime,
+    stale_after: timedelta,
+) -> ReconcilePlan:
+    """
+    Bring one sender's reservations in line with the chain.
+
+    latest/pending are the mined and mempool transaction counts. Nonces
+    below latest are done. A reservation at or above pending that has not
+    moved for stale_after was never broadcast or was dropped, so it is
+    released. next_nonce falls back to just above the highest live
+    reservation (never below pending), and any hole between pending and
+    next_nonce becomes a released nonce to be handed out first.
+    """
+    plan = ReconcilePlan(next_nonce=next_nonce)
+
+    live: set[int] = set()
+    released: set[int] = set()
+
+    for r in reservations:
+        if r.nonce < latest:
+            plan.delete.append(r.nonce)
+            continue
+
+        status = r.status
+        if (
+            status in IN_FLIGHT_STATUSES
+            and r.nonce >= pending
+            and now - r.updated_at > stale_after
+        ):
+            plan.release.append(r.nonce)
+            status = NONCE_STATUS_RELEASED
+
+        if status == NONCE_STATUS_RELEASED:
+            released.add(r.nonce)
+        else:
+            live.add(r.nonce)
+
+    floor = max(latest, pending)
+    plan.next_nonce = max([floor] + [n + 1 for n in live])
+
+    for n in sorted(released):
+        if n >= plan.next_nonce:
+            plan.delete.append(n)
+            if n in plan.release:
+                plan.release.remove(n)
+
+    plan.add_released = [
+        n
+        for n in range(pending, plan.next_nonce)
+        if n not in live and n not in released
+    ]
+
+    plan.delete.sort()
+    return plan
+
+
+def _lock_sender(db: Session, address: str) -> BscSenderNonce:
+    db.execute(
+        pg_insert(BscSenderNonce)
+        .values(address=address, next_nonce=0, chain_nonce=0)
+        .on_conflict_do_nothing(index_elements=["address"])
+    )
+    return (
+        db.query(BscSenderNonce)
+        .filter(BscSenderNonce.address == address)
+        .with_for_update()
+        .one()
+    )
+
+
+def _reconcile_locked(db: Session, w3: Any, sender: BscSenderNonce) -> ReconcilePlan:
+    checksum = w3.to_checksum_address(sender.address)
+    latest = int(w3.eth.get_transaction_count(checksum, "latest"))
+    pending = int(w3.eth.get_transaction_count(checksum, "pending"))
+    now = utcnow()
+
+    rows = (
+        db.query(BscNonceReservation)
+        .filter(BscNonceReservation.address == sender.address)
+        .all()
+    )
+    by_nonce = {int(r.nonce): r for r in rows}
+
+    plan = plan_reconcile(
+        next_nonce=int(sender.next_nonce),
+        reservations=[
+            ReservationState(
+                nonce=int(r.nonce),
+                status=r.status,
+                updated_at=r.updated_at,
+            )
+            for r in rows
+        ],
+        latest=latest,
+        pending=pending,
+        now=now,
+        stale_after=timedelta(seconds=int(settings.BSC_NONCE_STALE_SEC)),
+    )
+
+    for n in plan.delete:
+        db.delete(by_nonce[n])
+
+    for n in plan.release:
+        by_nonce[n].status = NONCE_STATUS_RELEASED
+        by_nonce[n].updated_at = now
+
+    for n in plan.add_released:
+        db.add(
+            BscNonceReservation(
+                address=sender.address,
+                nonce=n,
+                status=NONCE_STATUS_RELEASED,
+            )
+        )
+
+    if plan.release or plan.add_released:
+        log.warning(
+            "Nonce gaps for %s: released=%s filled=%s (latest=%s pending=%s)",
+            sender.address,
+            plan.release,
+            plan.add_released,
+            latest,
+            pending,
+        )
+
+    sender.next_nonce = plan.next_nonce
+    sender.chain_nonce = latest
+    sender.reconciled_at = now
+    sender.updated_at = now
+    db.flush()
+
+    return plan
+
+
+def _reconcile_due(sender: BscSenderNonce) -> bool:
+    if sender.reconciled_at is None:
+        return True
+    age = utcnow() - sender.reconciled_at
+    return age > timedelta(seconds=int(settings.BSC_NONCE_RECONCILE_SEC))
+
+
+def reserve_nonce(
+    w3: Any,
+    address: str,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> int:
+    """
+    Hand out the next nonce for address.
+
+    Released nonces (gaps) go first, then next_nonce. The chain is only
+    queried when the sender's last reconcile is older than
+    BSC_NONCE_RECONCILE_SEC, so back-to-back sends cost no RPC.
+    """
+    key = _key(address)
+    db = session_factory()
+    try:
+        sender = _lock_sender(db, key)
+        if _reconcile_due(sender):
+            _reconcile_locked(db, w3, sender)
+
+        now = utcnow()
+        gap = (
+            db.query(BscNonceReservation)
+            .filter(BscNonceReservation.address == key)
+            .filter(BscNonceReservation.status == NONCE_STATUS_RELEASED)
+            .filter(BscNonceReservation.nonce >= sender.chain_nonce)
+            .order_by(BscNonceReservation.nonce.asc())
+            .first()
+        )
+
+        if gap is not None:
+            nonce = int(gap.nonce)
+            gap.status = NONCE_STATUS_RESERVED
+            gap.tx_hash = None
+            gap.updated_at = now
+        else:
+            nonce = int(sender.next_nonce)
+            sender.next_nonce = nonce + 1
+            sender.updated_at = now
+            db.add(
+                BscNonceReservation(
+                    address=key,
+                    nonce=nonce,
+                    status=NONCE_STATUS_RESERVED,
+                )
+            )
+
+        db.commit()
+        return nonce
+    finally:
+        db.close()
+
+
+def _set_status(
+    address: str,
+    nonce: int,
+    status: str,
+    *,
+    tx_hash: str | None,
+    session_factory: Callable[[], Session],
+) -> None:
+    db = session_factory()
+    try:
+        row = (
+            db.query(BscNonceReservation)
+            .filter(BscNonceReservation.address == _key(address))
+            .filter(BscNonceReservation.nonce == int(nonce))
+            .first()
+        )
+        if row is not None:
+            row.status = status
+            row.tx_hash = tx_hash
+            row.updated_at = utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def mark_nonce_sent(
+    address: str,
+    nonce: int,
+    tx_hash: str,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> None:
+    _set_status(
+        address,
+        nonce,
+        NONCE_STATUS_SENT,
+        tx_hash=tx_hash,
+        session_factory=session_factory,
+    )
+
+
+def release_nonce(
+    address: str,
+    nonce: int,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> None:
+    """Give back a nonce whose transaction was never broadcast."""
+    _set_status(
+        address,
+        nonce,
+        NONCE_STATUS_RELEASED,
+        tx_hash=None,
+        session_factory=session_factory,
+    )
+
+
+def reconcile_sender_nonce(
+    w3: Any,
+    address: str,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> ReconcilePlan:
+    db = session_factory()
+    try:
+        sender = _lock_sender(db, _key(address))
+        plan = _reconcile_locked(db, w3, sender)
+        db.commit()
+        return plan
+    finally:
+        db.close()
+
+
+def in_flight_nonce_count(
+    address: str,
+    *,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> int:
+    """Nonces reserved or sent but not yet mined (as of the last reconcile)."""
+    db = session_factory()
+    try:
+        return int(
+            db.query(func.count())
+            .select_from(BscNonceReservation)
+            .filter(BscNonceReservation.address == _key(address))
+            .filter(BscNonceReservation.status.in_(IN_FLIGHT_STATUSES))
+            .scalar()
+            or 0
+        )
+    finally:
+        db.close()
+
+
+def is_broadcast_rejection(exc: BaseException) -> bool:
+    """
+    True when the node answered send_raw_transaction with an error that
+    proves the transaction was not accepted and the nonce is still free.
+    Timeouts and dropped connections are not: the node may have taken it.
+    """
+    if not isinstance(exc, Web3RPCError):
+        return False
+    message = str(exc).lower()
+    return not any(marker in message for marker in NONCE_IN_USE_MARKERS)
+
+
+class NonceLease:
+    def __init__(self, address: str, nonce: int, *, managed: bool) -> None:
+        self.address = address
+        self.nonce = int(nonce)
+        self.managed = managed
+        self.is_sent = False
+        # Set while a broadcast may have reached the node.
+        self.broadcast_attempted = False
+
+    def sent(self, tx_hash: str) -> None:
+        """Record that a transaction with this nonce was signed for broadcast."""
+        if self.is_sent:
+            return
+        # Flag first: even if the DB write fails, the nonce must not be released.
+        self.is_sent = True
+        if not self.managed:
+            return
+        try:
+            mark_nonce_sent(self.address, self.nonce, tx_hash)
+        except Exception as exc:
+            # The reservation stays "reserved"; reconcile only releases it
+            # once the chain's pending count shows it was never accepted.
+            log.warning("Nonce %s/%s sent as %s but not recorded: %s", self.address, self.nonce, tx_hash, exc)
+
+    def send_raw(self, w3: Any, raw_tx: Any) -> Any:
+        """
+        Broadcast raw_tx and record it; returns send_raw_transaction's result.
+        The nonce is only given back if the node explicitly rejected the tx.
+        """
+        self.broadcast_attempted = True
+        try:
+            tx_hash = w3.eth.send_raw_transaction(raw_tx)
+        except Exception as exc:
+            if is_broadcast_rejection(exc):
+                self.broadcast_attempted = False
+            raise
+        self.sent(tx_hash if isinstance(tx_hash, str) else Web3.to_hex(tx_hash))
+        return tx_hash
+
+
+@contextmanager
+def nonce_lease(
+    w3: Any,
+    address: str,
+    *,
+    block_identifier: str | None = "pending",
+) -> Iterator[NonceLease]:
+    """
+    Nonce for one transaction from address.
+
+    With BSC_NONCE_MANAGER_ENABLED the nonce comes from the shared DB
+    allocator. It is released again on an error before broadcast (build,
+    signing, or an explicit RPC rejection via lease.send_raw()); after an
+    ambiguous broadcast failure it stays reserved and reconcile sorts it
+    out after BSC_NONCE_STALE_SEC. Otherwise this is the plain get_transaction_count(address,
+    block_identifier) the caller used before.
+    """
+    if not settings.BSC_NONCE_MANAGER_ENABLED:
+        if block_identifier is None:
+            nonce = w3.eth.get_transaction_count(address)
+        else:
+            nonce = w3.eth.get_transaction_count(address, block_identifier)
+        yield NonceLease(address, int(nonce), managed=False)
+        return
+
+    lease = NonceLease(address, reserve_nonce(w3, address), managed=True)
+    try:
+        yield lease
+    finally:
+        if lease.broadcast_attempted and not lease.is_sent:
+            log.warning(
+                "Broadcast outcome unknown for %s/%s; leaving nonce reserved",
+                address,
+                lease.nonce,
+            )
+        elif not lease.is_sent:
+            try:
+                release_nonce(address, lease.nonce)
+            except Exception as exc:
+                # reconcile releases it after BSC_NONCE_STALE_SEC anyway
+                log.warning("Nonce release failed for %s/%s: %s", address, lease.nonce, exc)
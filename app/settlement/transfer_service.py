@@ -23,6 +23,7 @@ from app.operation_guard.hooks import (
     require_bsc_buy_collection_usdt_to_settlement_guard,
 )
 from app.operation_guard.service import OperationGuardBlockedError
+from app.settlement.bsc_gas_oracle import get_gas_price_wei
 from app.settlement.bsc_intent_service import (
     BscIntentError,
     broadcast_persisted_transfer_intent,
@@ -39,6 +40,7 @@ from app.settlement.gas_service import (
     get_bnb_balance,
     get_web3,
 )
+from app.settlement.nonce_manager import nonce_lease
 from app.settlement.pricing_lock import unlock_pricing_for_fund
 from app.settlement.statuses import (
     BATCH_STATUS_AWAITING_NEGATIVE_NET_EXECUTION,
@@ -160,7 +162,7 @@ def _normalize_private_key(private_key: str) -> str:
 
 
 def _bnb_required_for_erc20_transfer(w3: Web3) -> Decimal:
-    gas_price_wei = Decimal(int(w3.eth.gas_price))
+    gas_price_wei = Decimal(get_gas_price_wei(w3))
     fallback_gas = Decimal(int(settings.ERC20_TRANSFER_GAS_FALLBACK))
     buffer_mult = Decimal(settings.WITHDRAW_GAS_BUFFER_MULT)
 
@@ -504,27 +506,27 @@ def _send_usdt_transfer(
 
     amount_raw = _usdt_amount_to_raw(amount_usdt)
 
-    nonce = w3.eth.get_transaction_count(from_checksum)
-    gas_price = int(w3.eth.gas_price)
-    chain_id = int(w3.eth.chain_id)
-
-    tx = contract.functions.transfer(to_checksum, amount_raw).build_transaction(
-        {
-            "from": from_checksum,
-            "nonce": nonce,
-            "gasPrice": gas_price,
-            "chainId": chain_id,
-        }
-    )
+    with nonce_lease(w3, from_checksum, block_identifier=None) as lease:
+        gas_price = get_gas_price_wei(w3)
+        chain_id = int(w3.eth.chain_id)
+
+        tx = contract.functions.transfer(to_checksum, amount_raw).build_transaction(
+            {
+                "from": from_checksum,
+                "nonce": lease.nonce,
+                "gasPrice": gas_price,
+                "chainId": chain_id,
+            }
+        )
 
-    if "gas" not in tx or not tx["gas"]:
-        tx["gas"] = int(settings.ERC20_TRANSFER_GAS_FALLBACK)
+        if "gas" not in tx or not tx["gas"]:
+            tx["gas"] = int(settings.ERC20_TRANSFER_GAS_FALLBACK)
 
-    signed = w3.eth.account.sign_transaction(tx, private_key)
-    raw_tx = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction")
-    tx_hash = w3.eth.send_raw_transaction(raw_tx)
+        signed = w3.eth.account.sign_transaction(tx, private_key)
+        raw_tx = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction")
+        tx_hash = w3.to_hex(lease.send_raw(w3, raw_tx))
 
-    return w3.to_hex(tx_hash)
+    return tx_hash
 
 
 def _send_alert(text: str) -> None:
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable
+
+from app.config import settings
+from app.utils.cache import ProcessSingleton, TtlLruCache
+
+
+UTC = timezone.utc
+
+FUND_ID_TTL_SEC = 60
+
+BarFetcher = Callable[[datetime, datetime], list[tuple]]
+
+
+@dataclass
+class _RangeEntry:
+    closed_rows: list[tuple]
+    closed_until: datetime
+    tail_rows: list[tuple] = field(default_factory=list)
+    tail_expires_at: float = 0.0
+    tail_fetched_at: datetime | None = None
+
+    @property
+    def bar_count(self) -> int:
+        return len(self.closed_rows) + len(self.tail_rows)
+
+
+@dataclass(frozen=True)
+class CachedBars:
+    rows: list[tuple]
+    # True when every bucket in the range is closed and can no longer change.
+    immutable: bool
+    last_modified: datetime
+
+
+class ChartBarsCache:
+    """
+    In-process cache for chart bar tuples.
+
+    A bucket is closed once it ended CHART_BARS_CACHE_CLOSED_GRACE_SEC ago;
+    closed bars are kept until the entry is evicted (LRU, bounded by
+    CHART_BARS_CACHE_MAX_ENTRIES ranges and CHART_BARS_CACHE_MAX_BARS bars
+    in total). Only the still-open tail of a range is
+    re-read, once its TTL expires; the collector runs in another process,
+    so CHART_BARS_CACHE_OPEN_TTL_SEC bounds how stale the tail can be.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        max_bars: int | None = None,
+        open_ttl_sec: float | None = None,
+        closed_grace_sec: int | None = None,
+    ) -> None:
+        self.max_entries = int(
+            max_entries
+            if max_entries is not None
+            else settings.CHART_BARS_CACHE_MAX_ENTRIES
+        )
+        self.max_bars = int(
+            max_bars
+            if max_bars is not None
+            else settings.CHART_BARS_CACHE_MAX_BARS
+        )
+        self.open_ttl_sec = float(
+            open_ttl_sec
+            if open_ttl_sec is not None
+            else settings.CHART_BARS_CACHE_OPEN_TTL_SEC
+        )
+        self.closed_grace_sec = int(
+            closed_grace_sec
+            if closed_grace_sec is not None
+            else settings.CHART_BARS_CACHE_CLOSED_GRACE_SEC
+        )
+
+        # Guards the mutable _RangeEntry objects held by _ranges.
+        self._lock = threading.Lock()
+        self._ranges: TtlLruCache[tuple, _RangeEntry] = TtlLruCache(
+            max_entries=self.max_entries,
+            max_weight=self.max_bars,
+            weigher=lambda entry: entry.bar_count,
+        )
+        self._latest: TtlLruCache[
+            tuple[int, str],
+            tuple[list[tuple], datetime],
+        ] = TtlLruCache(
+            max_entries=self.max_entries,
+            ttl_sec=self.open_ttl_sec,
+            clock=self._monotonic,
+        )
+        self._fund_ids: TtlLruCache[str, tuple[int | None]] = TtlLruCache(
+            max_entries=self.max_entries,
+            ttl_sec=FUND_ID_TTL_SEC,
+            clock=self._monotonic,
+        )
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(UTC)
+
+    @staticmethod
+    def _monotonic() -> float:
+        return time.monotonic()
+
+    def clear(self) -> None:
+        self._ranges.clear()
+        self._latest.clear()
+        self._fund_ids.clear()
+
+    def fund_id(
+        self,
+        fund_code: str,
+        resolve: Callable[[], int | None],
+    ) -> int | None:
+        key = (fund_code or "").strip().lower()
+
+        # Wrapped in a tuple so an unknown fund (None) is cached too.
+        cached = self._fund_ids.get(key)
+        if cached is not None:
+            return cached[0]
+
+        fund_id = resolve()
+        self._fund_ids.put(key, (fund_id,))
+
+        return fund_id
+
+    def get_bars(
+        self,
+        *,
+        fund_id: int,
+        resolution: str,
+        start: datetime,
+        end: datetime,
+        closed_before: datetime,
+        fetch: BarFetcher,
+    ) -> CachedBars:
+        """
+        Bars with bucket timestamps in [start, end).
+
+        closed_before is the start of the oldest bucket that may still
+        change; rows before it are cached for good.
+        """
+        key = (fund_id, resolution, start, end)
+        boundary = min(closed_before, end)
+        now = self._monotonic()
+
+        entry = self._ranges.get(key)
+
+        if entry is None:
+            rows = fetch(start, end)
+            entry = _RangeEntry(
+                closed_rows=[row for row in rows if _row_dt(row) < boundary],
+                closed_until=max(boundary, start),
+            )
+            tail_rows = [row for row in rows if _row_dt(row) >= boundary]
+            self._store_tail(entry, tail_rows, now=now)
+        elif entry.closed_until < end and (
+            entry.closed_until < boundary
+            or entry.tail_expires_at <= now
+        ):
+            fetched_from = entry.closed_until
+            rows = fetch(fetched_from, end)
+            with self._lock:
+                # A concurrent request may have merged the same rows while
+                # this fetch was in flight; only the first one appends.
+                if entry.closed_until == fetched_from:
+                    entry.closed_rows = entry.closed_rows + [
+                        row for row in rows if _row_dt(row) < boundary
+                    ]
+                    entry.closed_until = max(boundary, fetched_from)
+                closed_until = entry.closed_until
+            self._store_tail(
+                entry,
+                [row for row in rows if _row_dt(row) >= closed_until],
+                now=now,
+            )
+
+        self._ranges.put(key, entry)
+
+        with self._lock:
+            immutable = entry.closed_until >= end
+            rows = entry.closed_rows + (
+                [] if immutable else entry.tail_rows
+            )
+            last_modified = (
+                entry.closed_until
+                if immutable
+                else entry.tail_fetched_at or self._now()
+            )
+
+        return CachedBars(
+            rows=rows,
+            immutable=immutable,
+            last_modified=last_modified,
+        )
+
+    def _store_tail(
+        self,
+        entry: _RangeEntry,
+        rows: list[tuple],
+        *,
+        now: float,
+    ) -> None:
+        with self._lock:
+            entry.tail_rows = rows
+            entry.tail_expires_at = now + self.open_ttl_sec
+            entry.tail_fetched_at = self._now()
+
+    def get_latest(
+        self,
+        *,
+        fund_id: int,
+        resolution: str,
+        fetch: Callable[[], list[tuple]],
+    ) -> CachedBars:
+        key = (fund_id, resolution)
+
+        cached = self._latest.get(key)
+        if cached is None:
+            cached = (fetch(), self._now())
+            self._latest.put(key, cached)
+
+        return CachedBars(
+            rows=cached[0],
+            immutable=False,
+            last_modified=cached[1],
+        )
+
+
+def _row_dt(row: tuple) -> datetime:
+    return datetime.fromtimestamp(int(row[0]), tz=UTC)
+
+
+def closed_bucket_boundary(
+    bucket_start: Callable[[datetime], datetime],
+    *,
+    now: datetime,
+    grace_sec: int,
+) -> datetime:
+    """Start of the oldest bucket that can still receive collector writes."""
+    return bucket_start(now - timedelta(seconds=grace_sec))
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def http_date(dt: datetime) -> str:
+    return format_datetime(dt.astimezone(UTC).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(
+    *,
+    etag: str,
+    last_modified: datetime,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> bool:
+    """RFC 9110 conditional GET: If-None-Match wins over If-Modified-Since."""
+    if if_none_match:
+        candidates = {
+            value.strip().removeprefix("W/")
+            for value in if_none_match.split(",")
+        }
+        return "*" in candidates or etag in candidates
+
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+_CACHE: ProcessSingleton[ChartBarsCache] = ProcessSingleton(ChartBarsCache)
+
+
+def get_chart_bars_cache() -> ChartBarsCache:
+    return _CACHE.get()
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 from typing import Any
 
+from sqlalchemy import BigInteger, Float, cast, func, select
 from sqlalchemy.orm import Session
 
-from app.models import Fund, FundChartDaily, FundChartMinute
+from app.config import settings
+from app.models import Fund, FundChartDaily, FundChartMinute, FundChartRollup
+from app.navcalc.chart_rollup import ROLLUP_RESOLUTIONS, bucket_candle_columns
+from app.trading.chart_cache import (
+    CachedBars,
+    closed_bucket_boundary,
+    get_chart_bars_cache,
+)
 
 
 UTC = timezone.utc
@@ -26,14 +34,6 @@ class ChartResolutionError(ValueError):
     pass
 
 
-def _to_decimal(value: Any) -> Decimal | None:
-    if value is None:
-        return None
-    if isinstance(value, Decimal):
-        return value
-    return Decimal(str(value))
-
-
 def _localize(ru_value: Any, en_value: Any, lang: str, fallback: str = "") -> str:
     if lang == "en":
         return str(en_value or ru_value or fallback or "")
@@ -70,6 +70,17 @@ def _get_active_fund_by_code(db: Session, fund_code: str) -> Fund | None:
     return None
 
 
+def _get_active_fund_id(db: Session, fund_code: str) -> int:
+    def resolve() -> int | None:
+        fund = _get_active_fund_by_code(db, fund_code)
+        return int(fund.id) if fund else None
+
+    fund_id = get_chart_bars_cache().fund_id(fund_code, resolve)
+    if fund_id is None:
+        raise ChartNotFoundError(f"Fund not found: {fund_code}")
+    return fund_id
+
+
 def _has_rows(db: Session, model, fund_id: int) -> bool:
     row = (
         db.query(model.id)
@@ -186,6 +197,15 @@ def _bucket_start(dt: datetime, resolution: str) -> datetime:
     return dt.astimezone(UTC)
 
 
+def _open_bucket_start(dt: datetime, resolution: str) -> datetime:
+    """Bucket start for any resolution, including 1 and 1D."""
+    if resolution == "1":
+        return _floor_to_bucket(dt, 60)
+    if resolution == "1D":
+        return _floor_to_bucket(dt, 24 * 60 * 60)
+    return _bucket_start(dt, resolution)
+
+
 def _expand_range(from_dt: datetime, to_dt: datetime, resolution: str) -> tuple[datetime, datetime]:
     if resolution == "1D":
         start = from_dt.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
@@ -222,88 +242,110 @@ def _get_source_model(resolution: str):
     return FundChartMinute
 
 
-def _fetch_rows(
-    db: Session,
-    model,
-    fund_id: int,
-    from_dt: datetime,
-    to_dt: datetime,
-) -> list:
+def _uses_rollup(resolution: str) -> bool:
     return (
-        db.query(model)
-        .filter(
-            model.fund_id == fund_id,
-            model.ts_utc >= from_dt,
-            model.ts_utc < to_dt,
-        )
-        .order_by(model.ts_utc.asc())
-        .all()
+        settings.CHART_ROLLUP_READS_ENABLED
+        and resolution in ROLLUP_RESOLUTIONS
     )
 
 
-def _row_to_dict(row) -> dict:
-    return {
-        "ts_utc": row.ts_utc.astimezone(UTC),
-        "open": _to_decimal(row.open),
-        "high": _to_decimal(row.high),
-        "low": _to_decimal(row.low),
-        "close": _to_decimal(row.close),
-        "volume": _to_decimal(row.volume),
-    }
-
-
-def _aggregate_rows(rows: list[dict], resolution: str) -> list[dict]:
-    if resolution in ("1D", "1"):
-        return rows
+def _bar_columns(model):
+    """
+    (t, o, h, l, c, v) selected as plain ints/floats.
 
-    aggregated: list[dict] = []
-    current: dict | None = None
-    current_bucket: datetime | None = None
-
-    for row in rows:
-        bucket = _bucket_start(row["ts_utc"], resolution)
+    Postgres converts numeric -> float8 and timestamptz -> epoch seconds,
+    so rows come back as tuples ready for the UDF arrays without ORM
+    hydration or per-value Decimal construction.
+    """
+    return (
+        cast(func.floor(func.extract("epoch", model.ts_utc)), BigInteger),
+        cast(model.open, Float),
+        cast(model.high, Float),
+        cast(model.low, Float),
+        cast(model.close, Float),
+        cast(model.volume, Float),
+    )
 
-        if current is None or bucket != current_bucket:
-            if current is not None:
-                aggregated.append(current)
 
-            current_bucket = bucket
-            current = {
-                "ts_utc": bucket,
-                "open": row["open"],
-                "high": row["high"],
-                "low": row["low"],
-                "close": row["close"],
-                "volume": row["volume"],
-            }
-            continue
+def _fetch_bar_tuples(
+    db: Session,
+    model,
+    *conditions,
+    descending: bool = False,
+    limit: int | None = None,
+) -> list[tuple]:
+    stmt = (
+        select(*_bar_columns(model))
+        .where(*conditions)
+        .order_by(model.ts_utc.desc() if descending else model.ts_utc.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
 
-        if row["high"] is not None and (current["high"] is None or row["high"] > current["high"]):
-            current["high"] = row["high"]
+    return [tuple(row) for row in db.execute(stmt).all()]
 
-        if row["low"] is not None and (current["low"] is None or row["low"] < current["low"]):
-            current["low"] = row["low"]
 
-        current["close"] = row["close"]
+def _fetch_aggregated_rows(
+    db: Session,
+    fund_id: int,
+    resolution: str,
+    from_dt: datetime,
+    to_dt: datetime,
+) -> list[tuple]:
+    """
+    Bars aggregated in Postgres from the source candles in [from_dt, to_dt),
+    with the same bucket and OHLCV rules as the rollup table.
+    """
+    source = _get_source_model(resolution).__table__
+    bucket, open_, high, low, close, volume = bucket_candle_columns(source, resolution)
+
+    buckets = (
+        select(
+            bucket.label("ts_utc"),
+            open_.label("open"),
+            high.label("high"),
+            low.label("low"),
+            close.label("close"),
+            volume.label("volume"),
+        )
+        .where(
+            source.c.fund_id == fund_id,
+            source.c.ts_utc >= from_dt,
+            source.c.ts_utc < to_dt,
+        )
+        .group_by(bucket)
+        .subquery("buckets")
+    )
 
-        if current["volume"] is None:
-            current["volume"] = row["volume"]
-        elif row["volume"] is not None:
-            current["volume"] = current["volume"] + row["volume"]
+    return _fetch_bar_tuples(db, buckets.c)
 
-    if current is not None:
-        aggregated.append(current)
 
-    return aggregated
+def _fetch_rollup_rows(
+    db: Session,
+    fund_id: int,
+    resolution: str,
+    from_dt: datetime,
+    to_dt: datetime,
+) -> list[tuple]:
+    return _fetch_bar_tuples(
+        db,
+        FundChartRollup,
+        FundChartRollup.fund_id == fund_id,
+        FundChartRollup.resolution == resolution,
+        FundChartRollup.ts_utc >= from_dt,
+        FundChartRollup.ts_utc < to_dt,
+    )
 
 
-def _filter_aggregated_range(rows: list[dict], from_dt: datetime, to_dt: datetime) -> list[dict]:
-    result: list[dict] = []
-    for row in rows:
-        ts = row["ts_utc"]
-        if from_dt.astimezone(UTC) <= ts <= to_dt.astimezone(UTC):
-            result.append(row)
-    return result
+def _fetch_latest_rollup_row(db: Session, fund_id: int, resolution: str) -> list[tuple]:
+    return _fetch_bar_tuples(
+        db,
+        FundChartRollup,
+        FundChartRollup.fund_id == fund_id,
+        FundChartRollup.resolution == resolution,
+        descending=True,
+        limit=1,
+    )
 
 
 def _bars_to_udf_payload(rows: list[dict]) -> dict:
@@ -329,17 +371,91 @@ def _bars_to_udf_payload(rows: list[dict]) -> dict:
     }
 
 
-def get_chart_bars_payload(
+def bars_to_udf_payload(rows: list[tuple]) -> dict:
+    if not rows:
+        return _bars_to_udf_payload([])
+
+    # One C-level transpose instead of a pass per column.
+    t, o, h, l, c, v = (list(column) for column in zip(*rows))
+
+    return {
+        "s": "ok",
+        "t": t,
+        "o": o,
+        "h": h,
+        "l": l,
+        "c": c,
+        "v": v,
+    }
+
+
+def encode_udf_payload(payload: dict) -> bytes:
+    """
+    Serialize a UDF payload once, with the same options as Starlette's
+    JSONResponse, so routes can skip FastAPI's generic encoder.
+    """
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _fetch_bar_range(
+    db: Session,
+    fund_id: int,
+    resolution: str,
+    start: datetime,
+    end: datetime,
+) -> list[tuple]:
+    """Bars whose bucket starts in [start, end), as (t, o, h, l, c, v)."""
+    if _uses_rollup(resolution):
+        return _fetch_rollup_rows(
+            db=db,
+            fund_id=fund_id,
+            resolution=resolution,
+            from_dt=start,
+            to_dt=end,
+        )
+
+    model = _get_source_model(resolution)
+
+    if resolution in ("1", "1D"):
+        # Source candles are the bars; no aggregation needed.
+        return _fetch_bar_tuples(
+            db,
+            model,
+            model.fund_id == fund_id,
+            model.ts_utc >= start,
+            model.ts_utc < end,
+        )
+
+    last_dt = end - timedelta(seconds=1)
+    query_from_dt, query_to_dt = _expand_range(start, last_dt, resolution)
+
+    rows = _fetch_aggregated_rows(
+        db=db,
+        fund_id=fund_id,
+        resolution=resolution,
+        from_dt=query_from_dt,
+        to_dt=query_to_dt,
+    )
+
+    first_t = _to_unix_seconds(start)
+    end_t = _to_unix_seconds(end)
+    return [row for row in rows if first_t <= row[0] < end_t]
+
+
+def get_chart_bars(
     db: Session,
     fund_code: str,
     resolution: str,
     from_ts: int,
     to_ts: int,
-) -> dict:
-    fund = _get_active_fund_by_code(db, fund_code)
-    if not fund:
-        raise ChartNotFoundError(f"Fund not found: {fund_code}")
-
+) -> CachedBars:
+    fund_id = _get_active_fund_id(db, fund_code)
     norm_resolution = _normalize_resolution(resolution)
 
     from_dt = _dt_from_unix_seconds(from_ts)
@@ -348,31 +464,72 @@ def get_chart_bars_payload(
     if to_dt < from_dt:
         raise ChartResolutionError("`to` must be greater than or equal to `from`")
 
-    model = _get_source_model(norm_resolution)
-    query_from_dt, query_to_dt = _expand_range(from_dt, to_dt, norm_resolution)
+    # UDF ranges are inclusive of `to` except for 1-minute bars.
+    end = to_dt if norm_resolution == "1" else to_dt + timedelta(seconds=1)
 
-    raw_rows = _fetch_rows(
-        db=db,
-        model=model,
-        fund_id=fund.id,
-        from_dt=query_from_dt,
-        to_dt=query_to_dt,
+    if not settings.CHART_BARS_CACHE_ENABLED:
+        rows = _fetch_bar_range(db, fund_id, norm_resolution, from_dt, end)
+        return CachedBars(
+            rows=rows,
+            immutable=False,
+            last_modified=datetime.now(UTC),
+        )
+
+    # Cache whole buckets so a feed polling with `to=now` keeps hitting
+    # the same entry until the open bucket rolls over.
+    aligned_start = _open_bucket_start(from_dt, norm_resolution)
+    aligned_end = _bucket_end(
+        _open_bucket_start(end - timedelta(seconds=1), norm_resolution),
+        norm_resolution,
+    )
+
+    cached = get_chart_bars_cache().get_bars(
+        fund_id=fund_id,
+        resolution=norm_resolution,
+        start=aligned_start,
+        end=aligned_end,
+        closed_before=closed_bucket_boundary(
+            lambda dt: _open_bucket_start(dt, norm_resolution),
+            now=datetime.now(UTC),
+            grace_sec=settings.CHART_BARS_CACHE_CLOSED_GRACE_SEC,
+        ),
+        fetch=lambda start, stop: _fetch_bar_range(
+            db,
+            fund_id,
+            norm_resolution,
+            start,
+            stop,
+        ),
     )
 
-    normalized_rows = [_row_to_dict(row) for row in raw_rows]
-    aggregated_rows = _aggregate_rows(normalized_rows, norm_resolution)
-    filtered_rows = _filter_aggregated_range(aggregated_rows, from_dt, to_dt)
+    first_t = _to_unix_seconds(from_dt)
+    end_t = _to_unix_seconds(end)
 
-    return _bars_to_udf_payload(filtered_rows)
+    return CachedBars(
+        rows=[row for row in cached.rows if first_t <= row[0] < end_t],
+        immutable=cached.immutable,
+        last_modified=cached.last_modified,
+    )
 
 
-def _fetch_latest_row(db: Session, model, fund_id: int):
-    return (
-        db.query(model)
-        .filter(model.fund_id == fund_id)
+def get_chart_bars_payload(
+    db: Session,
+    fund_code: str,
+    resolution: str,
+    from_ts: int,
+    to_ts: int,
+) -> dict:
+    bars = get_chart_bars(db, fund_code, resolution, from_ts, to_ts)
+    return bars_to_udf_payload(bars.rows)
+
+
+def _fetch_latest_ts(db: Session, model, fund_id: int) -> datetime | None:
+    return db.execute(
+        select(model.ts_utc)
+        .where(model.fund_id == fund_id)
         .order_by(model.ts_utc.desc())
-        .first()
-    )
+        .limit(1)
+    ).scalar()
 
 
 def _bucket_end(bucket_start: datetime, resolution: str) -> datetime:
@@ -396,42 +553,68 @@ def _bucket_end(bucket_start: datetime, resolution: str) -> datetime:
     return bucket_start
 
 
-def get_latest_chart_bar_payload(
+def _fetch_latest_bar(
     db: Session,
-    fund_code: str,
+    fund_id: int,
     resolution: str,
-) -> dict:
-    fund = _get_active_fund_by_code(db, fund_code)
-    if not fund:
-        raise ChartNotFoundError(f"Fund not found: {fund_code}")
-
-    norm_resolution = _normalize_resolution(resolution)
-    model = _get_source_model(norm_resolution)
+) -> list[tuple]:
+    if _uses_rollup(resolution):
+        return _fetch_latest_rollup_row(db, fund_id, resolution)
 
-    latest_row = _fetch_latest_row(db, model, fund.id)
-    if latest_row is None:
-        return _bars_to_udf_payload([])
+    model = _get_source_model(resolution)
 
-    latest_dt = latest_row.ts_utc.astimezone(UTC)
+    if resolution in ("1", "1D"):
+        return _fetch_bar_tuples(
+            db,
+            model,
+            model.fund_id == fund_id,
+            descending=True,
+            limit=1,
+        )
 
-    if norm_resolution in ("1", "1D"):
-        return _bars_to_udf_payload([_row_to_dict(latest_row)])
+    latest_ts = _fetch_latest_ts(db, model, fund_id)
+    if latest_ts is None:
+        return []
 
-    bucket_start = _bucket_start(latest_dt, norm_resolution)
-    bucket_end = _bucket_end(bucket_start, norm_resolution)
+    bucket_start = _bucket_start(latest_ts.astimezone(UTC), resolution)
+    bucket_end = _bucket_end(bucket_start, resolution)
 
-    raw_rows = _fetch_rows(
+    rows = _fetch_aggregated_rows(
         db=db,
-        model=model,
-        fund_id=fund.id,
+        fund_id=fund_id,
+        resolution=resolution,
         from_dt=bucket_start,
         to_dt=bucket_end,
     )
+    return rows[-1:]
 
-    normalized_rows = [_row_to_dict(row) for row in raw_rows]
-    aggregated_rows = _aggregate_rows(normalized_rows, norm_resolution)
 
-    if not aggregated_rows:
-        return _bars_to_udf_payload([])
+def get_latest_chart_bar(
+    db: Session,
+    fund_code: str,
+    resolution: str,
+) -> CachedBars:
+    fund_id = _get_active_fund_id(db, fund_code)
+    norm_resolution = _normalize_resolution(resolution)
+
+    if not settings.CHART_BARS_CACHE_ENABLED:
+        return CachedBars(
+            rows=_fetch_latest_bar(db, fund_id, norm_resolution),
+            immutable=False,
+            last_modified=datetime.now(UTC),
+        )
 
-    return _bars_to_udf_payload([aggregated_rows[-1]])
\ No newline at end of file
+    return get_chart_bars_cache().get_latest(
+        fund_id=fund_id,
+        resolution=norm_resolution,
+        fetch=lambda: _fetch_latest_bar(db, fund_id, norm_resolution),
+    )
+
+
+def get_latest_chart_bar_payload(
+    db: Session,
+    fund_code: str,
+    resolution: str,
+) -> dict:
+    bars = get_latest_chart_bar(db, fund_code, resolution)
+    return bars_to_udf_payload(bars.rows)
\ No newline at end of file
@@ -1,20 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from starlette.requests import Request
 
 from app.auth.deps import NotAuthenticated, get_current_user as auth_get_current_user
 from app.config import settings
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.i18n import get_lang_from_request
+from app.live_feed import SSE_HEADERS, get_live_feed_hub, sse_event, stream_topic
 from app.web import templates
 from app.trading.chart_service import (
     ChartNotFoundError,
     ChartResolutionError,
-    get_chart_bars_payload,
+    bars_to_udf_payload,
+    encode_udf_payload,
+    get_chart_bars,
     get_chart_config_by_code,
-    get_latest_chart_bar_payload,
+    get_latest_chart_bar,
+)
+from app.trading.chart_cache import (
+    CachedBars,
+    etag_for,
+    http_date,
+    is_not_modified,
 )
 from app.trading.service import (
     get_first_active_fund_code,
@@ -193,7 +202,7 @@ def terminal_fund_page(
 def chart_config_endpoint(
     fund_code: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     lang = get_lang_from_request(request)
 
@@ -203,22 +212,52 @@ def chart_config_endpoint(
         raise HTTPException(status_code=404, detail="Fund not found")
 
 
+def _chart_bars_response(request: Request, bars: CachedBars) -> Response:
+    body = encode_udf_payload(bars_to_udf_payload(bars.rows))
+    etag = etag_for(body)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(bars.last_modified),
+        "Cache-Control": (
+            "public, max-age=86400"
+            if bars.immutable
+            else "no-cache"
+        ),
+    }
+
+    if is_not_modified(
+        etag=etag,
+        last_modified=bars.last_modified,
+        if_none_match=request.headers.get("if-none-match"),
+        if_modified_since=request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @router.get("/api/chart/bars/{fund_code}")
 def chart_bars_endpoint(
     fund_code: str,
+    request: Request,
     resolution: str = Query(...),
     from_ts: int = Query(..., alias="from"),
     to_ts: int = Query(..., alias="to"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
-        return get_chart_bars_payload(
+        bars = get_chart_bars(
             db=db,
             fund_code=fund_code,
             resolution=resolution,
             from_ts=from_ts,
             to_ts=to_ts,
         )
+        return _chart_bars_response(request, bars)
     except ChartNotFoundError:
         raise HTTPException(status_code=404, detail="Fund not found")
     except ChartResolutionError as exc:
@@ -228,15 +267,17 @@ def chart_bars_endpoint(
 @router.get("/api/chart/latest-bar/{fund_code}")
 def chart_latest_bar_endpoint(
     fund_code: str,
+    request: Request,
     resolution: str = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     try:
-        return get_latest_chart_bar_payload(
+        bars = get_latest_chart_bar(
             db=db,
             fund_code=fund_code,
             resolution=resolution,
         )
+        return _chart_bars_response(request, bars)
     except ChartNotFoundError:
         raise HTTPException(status_code=404, detail="Fund not found")
     except ChartResolutionError as exc:
@@ -247,7 +288,7 @@ def chart_latest_bar_endpoint(
 def terminal_live_endpoint(
     fund_code: str,
     request: Request,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     lang = get_lang_from_request(request)
 
@@ -259,4 +300,40 @@ def terminal_live_endpoint(
     if not payload:
         raise HTTPException(status_code=404, detail="Fund not found")
 
-    return payload
\ No newline at end of file
+    return payload
+
+@router.get("/api/terminal/stream/{fund_code}")
+async def terminal_stream_endpoint(
+    fund_code: str,
+    request: Request,
+):
+    """
+    Server-sent /api/terminal/live payloads ("market" events), computed
+    once per NAV tick per fund and shared by every open terminal.
+    An unknown fund gets a single "not_found" event.
+    """
+    lang = get_lang_from_request(request)
+    code = (fund_code or "").strip().lower()
+
+    async def events():
+        async with get_live_feed_hub().subscribe(
+            ("terminal", code, lang),
+            compute=lambda db: get_terminal_live_payload(
+                db=db,
+                lang=lang,
+                fund_code=code,
+            ),
+            watermark=lambda tick: tick.nav_mark,
+        ) as topic:
+            if topic.payload is None:
+                yield sse_event("not_found", {"fund_code": code})
+                return
+
+            async for frame in stream_topic(request, topic, event="market"):
+                yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Any
+from typing import Any, Iterable
 
-from sqlalchemy import func
+from sqlalchemy import and_, case, func, select, true
 from sqlalchemy.orm import Session
 
 from app.models import (
@@ -15,6 +16,7 @@ from app.models import (
     UserFundPosition,
     UserFundPositionStats,
 )
+from app.navcalc.latest_nav import get_latest_nav_prices
 from app.portfolio import FUND_ICON_MAP, get_user_portfolio
 from app.trading.chart_service import build_chart_config_for_fund
 from app.trading.history_formatter import format_trading_history_rows
@@ -175,71 +177,126 @@ def _get_fund_by_code(db: Session, fund_code: str) -> Fund | None:
     )
 
 
-def _get_latest_nav_row(db: Session, fund_id: int) -> FundNavMinute | None:
-    return (
-        db.query(FundNavMinute)
-        .filter(FundNavMinute.fund_id == fund_id)
-        .order_by(FundNavMinute.ts_utc.desc())
-        .first()
-    )
+@dataclass(frozen=True)
+class FundMarketStats:
+    latest_nav_usdt: Decimal | None = None
+    latest_shares_outstanding: Decimal | None = None
+    prev_close_price: Decimal | None = None
+    day_high: Decimal | None = None
+    day_low: Decimal | None = None
 
 
-def _get_previous_day_close_row(db: Session, fund_id: int, day_start_utc: datetime) -> FundNavMinute | None:
-    return (
-        db.query(FundNavMinute)
-        .filter(
-            FundNavMinute.fund_id == fund_id,
+def _utc_day_bounds(now_utc: datetime) -> tuple[datetime, datetime]:
+    day_start_utc = datetime(now_utc.year, now_utc.month, now_utc.day, tzinfo=timezone.utc)
+    return day_start_utc, day_start_utc + timedelta(days=1)
+
+
+def _load_market_stats(
+    db: Session,
+    fund_ids: Iterable[int],
+    *,
+    now_utc: datetime | None = None,
+) -> dict[int, FundMarketStats]:
+    """
+    Latest NAV (from the fund_nav_latest cache), previous-day close and
+    today's price range for many funds in two set-based queries,
+    regardless of the number of funds.
+    """
+    ids = sorted({int(fund_id) for fund_id in fund_ids})
+    if not ids:
+        return {}
+
+    day_start_utc, day_end_utc = _utc_day_bounds(now_utc or datetime.now(timezone.utc))
+
+    latest_prices = get_latest_nav_prices(db, ids)
+
+    funds = select(Fund.id.label("fund_id")).where(Fund.id.in_(ids)).subquery()
+    prev_close = (
+        select(FundNavMinute.nav_usdt, FundNavMinute.shares_outstanding)
+        .where(
+            FundNavMinute.fund_id == funds.c.fund_id,
             FundNavMinute.ts_utc < day_start_utc,
         )
         .order_by(FundNavMinute.ts_utc.desc())
-        .first()
+        .limit(1)
+        .lateral()
     )
 
-
-def _get_today_rows(
-    db: Session,
-    fund_id: int,
-    day_start_utc: datetime,
-    day_end_utc: datetime,
-) -> list[FundNavMinute]:
-    return (
-        db.query(FundNavMinute)
-        .filter(
-            FundNavMinute.fund_id == fund_id,
-            FundNavMinute.ts_utc >= day_start_utc,
-            FundNavMinute.ts_utc < day_end_utc,
+    prev_close_rows = db.execute(
+        select(
+            funds.c.fund_id,
+            prev_close.c.nav_usdt,
+            prev_close.c.shares_outstanding,
         )
-        .order_by(FundNavMinute.ts_utc.asc())
-        .all()
+        .select_from(funds)
+        .outerjoin(prev_close, true())
+    ).all()
+
+    # Same rule as _safe_price: rows without shares price at zero.
+    price = case(
+        (
+            FundNavMinute.shares_outstanding > 0,
+            FundNavMinute.nav_usdt / FundNavMinute.shares_outstanding,
+        ),
+        else_=0,
     )
+    range_rows = db.execute(
+        select(FundNavMinute.fund_id, func.max(price), func.min(price))
+        .where(
+            and_(
+                FundNavMinute.fund_id.in_(ids),
+                FundNavMinute.ts_utc >= day_start_utc,
+                FundNavMinute.ts_utc < day_end_utc,
+            )
+        )
+        .group_by(FundNavMinute.fund_id)
+    ).all()
+    day_range = {
+        int(fund_id): (day_high, day_low)
+        for fund_id, day_high, day_low in range_rows
+    }
 
+    stats: dict[int, FundMarketStats] = {}
+    for fund_id, prev_nav, prev_shares in prev_close_rows:
+        latest = latest_prices.get(int(fund_id))
+        day_high, day_low = day_range.get(int(fund_id), (None, None))
+        stats[int(fund_id)] = FundMarketStats(
+            latest_nav_usdt=latest.nav_usdt if latest else None,
+            latest_shares_outstanding=(
+                latest.shares_outstanding if latest else None
+            ),
+            prev_close_price=(
+                _safe_price(prev_nav, prev_shares)
+                if prev_nav is not None
+                else None
+            ),
+            day_high=_to_decimal(day_high) if day_high is not None else None,
+            day_low=_to_decimal(day_low) if day_low is not None else None,
+        )
 
-def _build_market_snapshot(db: Session, fund: Fund, lang: str) -> dict:
-    now_utc = datetime.now(timezone.utc)
-    day_start_utc = datetime(now_utc.year, now_utc.month, now_utc.day, tzinfo=timezone.utc)
-    day_end_utc = day_start_utc + timedelta(days=1)
+    return stats
+
+
+def _build_market_snapshot(
+    db: Session,
+    fund: Fund,
+    lang: str,
+    stats: FundMarketStats | None = None,
+) -> dict:
+    if stats is None:
+        stats = _load_market_stats(db, [fund.id]).get(fund.id, FundMarketStats())
 
-    latest_row = _get_latest_nav_row(db, fund.id)
     current_price = _safe_price(
-        latest_row.nav_usdt if latest_row else None,
-        latest_row.shares_outstanding if latest_row else None,
+        stats.latest_nav_usdt,
+        stats.latest_shares_outstanding,
     )
 
-    prev_close_row = _get_previous_day_close_row(db, fund.id, day_start_utc)
-    prev_close_price = None
-    if prev_close_row:
-        prev_close_price = _safe_price(prev_close_row.nav_usdt, prev_close_row.shares_outstanding)
+    prev_close_price = stats.prev_close_price
 
     change_24h_pct = None
     if prev_close_price is not None and prev_close_price > 0 and current_price > 0:
         change_24h_pct = (current_price / prev_close_price - Decimal("1")) * Decimal("100")
 
-    today_rows = _get_today_rows(db, fund.id, day_start_utc, day_end_utc)
-    today_prices = [_safe_price(r.nav_usdt, r.shares_outstanding) for r in today_rows]
-
-    day_high = max(today_prices) if today_prices else None
-    day_low = min(today_prices) if today_prices else None
-
     return {
         "fund_id": fund.id,
         "fund_code": fund.code,
@@ -247,12 +304,16 @@ def _build_market_snapshot(db: Session, fund: Fund, lang: str) -> dict:
         "icon_name": _fund_icon_name(fund),
         "current_price_usdt": current_price,
         "change_24h_pct": change_24h_pct,
-        "day_high_usdt": day_high,
-        "day_low_usdt": day_low,
+        "day_high_usdt": stats.day_high,
+        "day_low_usdt": stats.day_low,
     }
 
 
-def _build_fund_menu(db: Session, lang: str) -> list[dict]:
+def _build_fund_menu(
+    db: Session,
+    lang: str,
+    market_stats: dict[int, FundMarketStats] | None = None,
+) -> list[dict]:
     funds = (
         db.query(Fund)
         .filter(Fund.is_active == True)
@@ -260,9 +321,17 @@ def _build_fund_menu(db: Session, lang: str) -> list[dict]:
         .all()
     )
 
+    if market_stats is None:
+        market_stats = _load_market_stats(db, [fund.id for fund in funds])
+
     items: list[dict] = []
     for fund in funds:
-        snap = _build_market_snapshot(db, fund, lang)
+        snap = _build_market_snapshot(
+            db,
+            fund,
+            lang,
+            market_stats.get(fund.id, FundMarketStats()),
+        )
         items.append(
             {
                 "fund_code": fund.code,
@@ -308,7 +377,12 @@ def _build_trade_history(db: Session, user: User | None, lang: str) -> list[dict
     return format_trading_history_rows(rows, lang)
 
 
-def _build_assets_block(db: Session, user: User | None, lang: str) -> list[dict]:
+def _build_assets_block(
+    db: Session,
+    user: User | None,
+    lang: str,
+    market_stats: dict[int, FundMarketStats] | None = None,
+) -> list[dict]:
     if not user:
         return []
 
@@ -341,6 +415,14 @@ def _build_assets_block(db: Session, user: User | None, lang: str) -> list[dict]
         .all()
     )
 
+    market_stats = dict(market_stats or {})
+    market_stats.update(
+        _load_market_stats(
+            db,
+            [fund.id for fund in funds if fund.id not in market_stats],
+        )
+    )
+
     payload: list[dict] = []
     for fund in funds:
         pos_row = pos_by_fund.get(fund.id)
@@ -356,6 +438,7 @@ def _build_assets_block(db: Session, user: User | None, lang: str) -> list[dict]
             db,
             fund,
             lang,
+            market_stats.get(fund.id, FundMarketStats()),
         )
         current_price = _to_decimal(
             current_snap["current_price_usdt"]
@@ -391,8 +474,14 @@ def _build_assets_block(db: Session, user: User | None, lang: str) -> list[dict]
     return payload
 
 
-def _build_fund_info(db: Session, fund: Fund, lang: str) -> dict:
-    latest_row = _get_latest_nav_row(db, fund.id)
+def _build_fund_info(
+    db: Session,
+    fund: Fund,
+    lang: str,
+    stats: FundMarketStats | None = None,
+) -> dict:
+    if stats is None:
+        stats = _load_market_stats(db, [fund.id]).get(fund.id, FundMarketStats())
 
     launch_date = None
     if getattr(fund, "launch_date", None):
@@ -401,9 +490,9 @@ def _build_fund_info(db: Session, fund: Fund, lang: str) -> dict:
     return {
         "fund_code": fund.code,
         "full_name": _fund_full_name(fund, lang),
-        "aum_usdt": _round_0(latest_row.nav_usdt if latest_row else 0),
+        "aum_usdt": _round_0(stats.latest_nav_usdt or 0),
         "shares_outstanding": _quantize_4_decimal_places(
-            latest_row.shares_outstanding if latest_row else 0
+            stats.latest_shares_outstanding or 0
         ),
         "launch_date": launch_date,
         "benchmark_name": _fund_benchmark_name(fund, lang),
@@ -424,11 +513,18 @@ def get_terminal_page_payload(
 
     chart_config = build_chart_config_for_fund(db, fund, lang)
 
-    market_snapshot = _build_market_snapshot(db, fund, lang)
-    fund_menu = _build_fund_menu(db, lang)
+    active_fund_ids = [
+        fund_id
+        for (fund_id,) in db.query(Fund.id).filter(Fund.is_active == True).all()
+    ]
+    market_stats = _load_market_stats(db, [fund.id, *active_fund_ids])
+    current_stats = market_stats.get(fund.id, FundMarketStats())
+
+    market_snapshot = _build_market_snapshot(db, fund, lang, current_stats)
+    fund_menu = _build_fund_menu(db, lang, market_stats)
     trade_history = _build_trade_history(db, user, lang)
-    asset_rows = _build_assets_block(db, user, lang)
-    fund_info = _build_fund_info(db, fund, lang)
+    asset_rows = _build_assets_block(db, user, lang, market_stats)
+    fund_info = _build_fund_info(db, fund, lang, current_stats)
 
     available_usdt = ZERO
     available_shares_current_fund = ZERO
@@ -472,8 +568,9 @@ def get_terminal_live_payload(
     if not fund:
         return None
 
-    market_snapshot = _build_market_snapshot(db, fund, lang)
-    fund_info = _build_fund_info(db, fund, lang)
+    stats = _load_market_stats(db, [fund.id]).get(fund.id, FundMarketStats())
+    market_snapshot = _build_market_snapshot(db, fund, lang, stats)
+    fund_info = _build_fund_info(db, fund, lang, stats)
 
     return {
         "fund_code": fund.code,
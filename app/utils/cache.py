@@ -0,0 +1,186 @@
+"""Building blocks for the process-wide in-memory caches."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+T = TypeVar("T")
+
+
+class TtlLruCache(Generic[K, V]):
+    """
+    Thread-safe mapping bounded to max_entries, least recently used
+    entry evicted first.
+
+    With ttl_sec an entry expires ttl_sec after it was stored and
+    ttl_sec <= 0 disables the cache; ttl_sec=None keeps entries until
+    they are evicted.
+
+    With max_weight the summed weigher(value) of all entries is bounded
+    too; a value heavier than max_weight on its own is not stored.
+    Weights are taken at put time, so a caller mutating a cached value
+    puts it again to re-weigh it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_sec: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        max_weight: int | None = None,
+        weigher: Callable[[V], int] | None = None,
+    ) -> None:
+        if (max_weight is None) != (weigher is None):
+            raise ValueError("max_weight and weigher go together")
+
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_sec = None if ttl_sec is None else float(ttl_sec)
+        self.max_weight = None if max_weight is None else int(max_weight)
+        self._weigher = weigher
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        self._weights: dict[K, int] = {}
+        self._total_weight = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec is None or self.ttl_sec > 0
+
+    def _live(self, key: K, now: float) -> tuple[float | None, V] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at = entry[0]
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            entry = self._live(key, self._clock())
+        return default if entry is None else entry[1]
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        out: dict[K, V] = {}
+        with self._lock:
+            now = self._clock()
+            for key in keys:
+                entry = self._live(key, now)
+                if entry is not None:
+                    out[key] = entry[1]
+        return out
+
+    def _remove(self, key: K) -> None:
+        self._entries.pop(key, None)
+        self._total_weight -= self._weights.pop(key, 0)
+
+    def put(self, key: K, value: V) -> None:
+        if not self.enabled:
+            return
+
+        weight = 0 if self._weigher is None else max(0, int(self._weigher(value)))
+
+        with self._lock:
+            self._remove(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+
+            expires_at = (
+                None if self.ttl_sec is None else self._clock() + self.ttl_sec
+            )
+            self._entries[key] = (expires_at, value)
+            if self._weigher is not None:
+                self._weights[key] = weight
+                self._total_weight += weight
+
+            while len(self._entries) > self.max_entries or (
+                self.max_weight is not None
+                and self._total_weight > self.max_weight
+            ):
+                self._remove(next(iter(self._entries)))
+
+    @property
+    def total_weight(self) -> int:
+        with self._lock:
+            return self._total_weight
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def discard_where(self, predicate: Callable[[K, V], bool]) -> None:
+        with self._lock:
+            for key, (_, value) in list(self._entries.items()):
+                if predicate(key, value):
+                    self._remove(key)
+
+    def snapshot(self) -> dict[K, V]:
+        """Unexpired entries, without touching their recency."""
+        with self._lock:
+            now = self._clock()
+            return {
+                key: value
+                for key, (expires_at, value) in self._entries.items()
+                if expires_at is None or expires_at > now
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self._total_weight = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_SINGLETONS: list[ProcessSingleton] = []
+
+
+class ProcessSingleton(Generic[T]):
+    """
+    Process-wide instance built by factory on first get().
+
+    Every singleton registers itself, so reset_singletons() drops them
+    all at once (tests start each case with fresh caches and pools).
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instance: T | None = None
+        _SINGLETONS.append(self)
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def set(self, instance: T | None) -> None:
+        with self._lock:
+            self._instance = instance
+
+    def reset(self) -> None:
+        self.set(None)
+
+
+def reset_singletons() -> None:
+    for singleton in list(_SINGLETONS):
+        singleton.reset()
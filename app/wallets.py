@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
 from cryptography.fernet import Fernet
 from eth_account import Account
@@ -24,14 +24,6 @@ if not _WALLET_ENC_KEY or _WALLET_ENC_KEY in {"CHANGE_ME", "CHANGE_ME_TO_FERNET_
 
 fernet = Fernet(_WALLET_ENC_KEY.encode("utf-8"))
 
-# -----------------------
-# BSC RPC (optional for now)
-# -----------------------
-_BSC_RPC_URL = settings.BSC_RPC_URL
-w3: Optional[Web3] = None
-if _BSC_RPC_URL:
-    w3 = Web3(Web3.HTTPProvider(_BSC_RPC_URL))
-
 def encrypt_private_key(priv_hex: str) -> str:
     """Encrypts '0x....' private key to a base64 token string."""
     token = fernet.encrypt(priv_hex.encode("utf-8"))
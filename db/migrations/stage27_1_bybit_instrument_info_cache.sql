@@ -0,0 +1,30 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.1 - Bybit instruments-info cache
+--
+-- Optional warm-start store for app.bybit.instrument_cache
+-- (BYBIT_INSTRUMENT_CACHE_PERSIST=true).
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- rows are a cache only and may be deleted at any time
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.bybit_instrument_info_cache (
+    network character varying(128) NOT NULL,
+    category character varying(16) NOT NULL,
+    symbol character varying(64) NOT NULL,
+    row_json jsonb NOT NULL,
+    captured_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone NOT NULL DEFAULT now(),
+    CONSTRAINT bybit_instrument_info_cache_pkey
+        PRIMARY KEY (network, category, symbol)
+);
+
+CREATE INDEX IF NOT EXISTS bybit_instrument_info_cache_network_category_captured_idx
+    ON public.bybit_instrument_info_cache (network, category, captured_at);
+
+COMMIT;
@@ -0,0 +1,43 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.2 - Pre-aggregated chart candles
+--
+-- fund_chart_rollup holds share price OHLC per resolution:
+-- 5/15/30/60/240 built from fund_chart_minute,
+-- 1W/1M/12M built from fund_chart_daily.
+--
+-- The NAV collector keeps the current buckets up to date.
+-- Existing history is filled by:
+--   python -m scripts.backfill_chart_rollups
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.funds') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.2 blocked. Missing required existing table: public.funds';
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS public.fund_chart_rollup (
+    id bigserial PRIMARY KEY,
+    fund_id integer NOT NULL REFERENCES public.funds(id) ON DELETE CASCADE,
+    resolution character varying(8) NOT NULL,
+    ts_utc timestamp with time zone NOT NULL,
+    open numeric(30,10) NOT NULL,
+    high numeric(30,10) NOT NULL,
+    low numeric(30,10) NOT NULL,
+    close numeric(30,10) NOT NULL,
+    volume numeric(30,10) NULL,
+    CONSTRAINT fund_chart_rollup_fund_resolution_ts_uq
+        UNIQUE (fund_id, resolution, ts_utc)
+);
+
+COMMIT;
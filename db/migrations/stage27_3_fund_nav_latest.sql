@@ -0,0 +1,60 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.3 - Latest NAV per fund
+--
+-- fund_nav_latest holds one row per fund: the newest
+-- fund_nav_minute row and its share price. The NAV collector
+-- updates it in the same transaction as the minute row, so
+-- dashboard and terminal reads no longer scan fund_nav_minute.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.funds') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.3 blocked. Missing required existing table: public.funds';
+    END IF;
+
+    IF to_regclass('public.fund_nav_minute') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.3 blocked. Missing required existing table: public.fund_nav_minute';
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS public.fund_nav_latest (
+    fund_id integer PRIMARY KEY REFERENCES public.funds(id) ON DELETE CASCADE,
+    ts_utc timestamp with time zone NOT NULL,
+    nav_usdt numeric(30,10) NOT NULL,
+    shares_outstanding numeric(30,10) NOT NULL,
+    price_usdt numeric(30,10) NOT NULL,
+    updated_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+INSERT INTO public.fund_nav_latest (
+    fund_id,
+    ts_utc,
+    nav_usdt,
+    shares_outstanding,
+    price_usdt
+)
+SELECT DISTINCT ON (fund_id)
+    fund_id,
+    ts_utc,
+    nav_usdt,
+    shares_outstanding,
+    CASE
+        WHEN shares_outstanding > 0 THEN nav_usdt / shares_outstanding
+        ELSE 0
+    END
+FROM public.fund_nav_minute
+ORDER BY fund_id, ts_utc DESC
+ON CONFLICT (fund_id) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,116 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.4 - Incremental history feed
+--
+-- user_history_versions is a per-user change counter. Every
+-- insert or effective update of wallet_transfers / fund_orders
+-- bumps it and stamps the new value on the row as
+-- history_version, so /api/history/live can answer
+-- "what changed since version N" from an index and return
+-- 304 when nothing did.
+--
+-- The counter row is locked until the writing transaction
+-- commits, so versions of one user are assigned in commit order.
+--
+-- Keyset pagination of transfers orders by
+-- COALESCE(tx_time, detected_at), id: wallet_transfers_user_time_idx
+-- covers tx_time only (pending withdrawals have no tx_time yet),
+-- so a matching expression index is added.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.users') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.4 blocked. Missing required existing table: public.users';
+    END IF;
+
+    IF to_regclass('public.wallet_transfers') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.4 blocked. Missing required existing table: public.wallet_transfers';
+    END IF;
+
+    IF to_regclass('public.fund_orders') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.4 blocked. Missing required existing table: public.fund_orders';
+    END IF;
+END
+$$;
+
+CREATE TABLE IF NOT EXISTS public.user_history_versions (
+    user_id bigint PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
+    version bigint NOT NULL DEFAULT 0,
+    updated_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.wallet_transfers
+    ADD COLUMN IF NOT EXISTS history_version bigint NOT NULL DEFAULT 0;
+
+ALTER TABLE public.fund_orders
+    ADD COLUMN IF NOT EXISTS history_version bigint NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.bump_user_history_version()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.user_history_versions AS v (user_id, version, updated_at)
+    VALUES (NEW.user_id, 1, now())
+    ON CONFLICT (user_id) DO UPDATE
+        SET version = v.version + 1,
+            updated_at = now()
+    RETURNING v.version INTO NEW.history_version;
+
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS wallet_transfers_history_version_ins
+    ON public.wallet_transfers;
+CREATE TRIGGER wallet_transfers_history_version_ins
+    BEFORE INSERT ON public.wallet_transfers
+    FOR EACH ROW
+    EXECUTE FUNCTION public.bump_user_history_version();
+
+DROP TRIGGER IF EXISTS wallet_transfers_history_version_upd
+    ON public.wallet_transfers;
+CREATE TRIGGER wallet_transfers_history_version_upd
+    BEFORE UPDATE ON public.wallet_transfers
+    FOR EACH ROW
+    WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION public.bump_user_history_version();
+
+DROP TRIGGER IF EXISTS fund_orders_history_version_ins
+    ON public.fund_orders;
+CREATE TRIGGER fund_orders_history_version_ins
+    BEFORE INSERT ON public.fund_orders
+    FOR EACH ROW
+    EXECUTE FUNCTION public.bump_user_history_version();
+
+DROP TRIGGER IF EXISTS fund_orders_history_version_upd
+    ON public.fund_orders;
+CREATE TRIGGER fund_orders_history_version_upd
+    BEFORE UPDATE ON public.fund_orders
+    FOR EACH ROW
+    WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION public.bump_user_history_version();
+
+CREATE INDEX IF NOT EXISTS wallet_transfers_user_sort_idx
+    ON public.wallet_transfers
+    USING btree (user_id, (COALESCE(tx_time, detected_at)) DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS wallet_transfers_user_history_version_idx
+    ON public.wallet_transfers
+    USING btree (user_id, history_version);
+
+CREATE INDEX IF NOT EXISTS fund_orders_user_history_version_idx
+    ON public.fund_orders
+    USING btree (user_id, history_version);
+
+COMMIT;
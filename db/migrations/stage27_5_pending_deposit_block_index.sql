@@ -0,0 +1,33 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.5 - Pending deposit confirmations index
+--
+-- workers.bsc_confirmations promotes deposits with one
+--   UPDATE wallet_transfers SET status = 'success' ...
+--   WHERE type = 'deposit' AND status = 'pending'
+--     AND block_number <= :safe_block
+-- on every new head. The partial index only holds pending
+-- deposits, so it stays tiny however large wallet_transfers is.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.wallet_transfers') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.5 blocked. Missing required existing table: public.wallet_transfers';
+    END IF;
+END
+$$;
+
+CREATE INDEX IF NOT EXISTS wallet_transfers_pending_deposit_block_idx
+    ON public.wallet_transfers
+    USING btree (block_number)
+    WHERE status = 'pending' AND type = 'deposit';
+
+COMMIT;
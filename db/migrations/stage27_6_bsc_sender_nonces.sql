@@ -0,0 +1,52 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.6 - Shared nonce allocation for hot BSC senders
+--
+-- bsc_sender_nonces holds the next nonce to hand out per sender
+-- address; the row is locked FOR UPDATE while a nonce is reserved,
+-- so workers in different processes never get the same nonce.
+--
+-- bsc_nonce_reservations tracks every handed-out nonce that the
+-- chain has not mined yet:
+--   reserved - allocated, transaction not broadcast yet
+--   sent     - transaction signed/broadcast (tx_hash known)
+--   released - unused or dropped; handed out again before
+--              next_nonce so the sender has no gaps
+-- Rows below the chain's mined nonce are deleted on reconcile.
+--
+-- Used by app.settlement.nonce_manager when
+-- BSC_NONCE_MANAGER_ENABLED=true.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.bsc_sender_nonces (
+    address character varying(64) PRIMARY KEY,
+    next_nonce bigint NOT NULL DEFAULT 0,
+    chain_nonce bigint NOT NULL DEFAULT 0,
+    reconciled_at timestamp with time zone,
+    updated_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.bsc_nonce_reservations (
+    address character varying(64) NOT NULL
+        REFERENCES public.bsc_sender_nonces(address) ON DELETE CASCADE,
+    nonce bigint NOT NULL,
+    status character varying(16) NOT NULL,
+    tx_hash character varying(100),
+    created_at timestamp with time zone NOT NULL DEFAULT now(),
+    updated_at timestamp with time zone NOT NULL DEFAULT now(),
+    CONSTRAINT bsc_nonce_reservations_pkey
+        PRIMARY KEY (address, nonce),
+    CONSTRAINT bsc_nonce_reservations_status_check
+        CHECK (status IN ('reserved', 'sent', 'released'))
+);
+
+CREATE INDEX IF NOT EXISTS bsc_nonce_reservations_address_status_idx
+    ON public.bsc_nonce_reservations (address, status, nonce);
+
+COMMIT;
@@ -0,0 +1,44 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.7 - Outbound email outbox
+--
+-- Request handlers insert one email_outbox row instead of talking
+-- to the mail relay; workers.email_delivery_worker sends due rows
+-- over a kept-open SMTP connection and retries failures with
+-- exponential backoff:
+--   pending - waiting for next_attempt_at
+--   sending - claimed by a worker until locked_until
+--   sent    - delivered to the relay
+--   failed  - permanently rejected or out of attempts
+-- html_body is cleared once a row is sent or failed.
+--
+-- Used by app.emails.send_email when EMAIL_OUTBOX_ENABLED=true.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS public.email_outbox (
+    id bigserial PRIMARY KEY,
+    to_email character varying(320) NOT NULL,
+    subject text NOT NULL,
+    html_body text NOT NULL,
+    status character varying(16) NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    next_attempt_at timestamp with time zone NOT NULL DEFAULT now(),
+    locked_until timestamp with time zone,
+    last_error text,
+    created_at timestamp with time zone NOT NULL DEFAULT now(),
+    sent_at timestamp with time zone,
+    CONSTRAINT email_outbox_status_check
+        CHECK (status IN ('pending', 'sending', 'sent', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS email_outbox_due_idx
+    ON public.email_outbox (status, next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+
+COMMIT;
@@ -0,0 +1,121 @@
+BEGIN;
+
+-- ============================================================
+-- Stage 27.8 - Deferred history version bumps
+--
+-- Stage 27.4 bumped user_history_versions from BEFORE row
+-- triggers. That bumped the counter for rows an
+-- INSERT ... ON CONFLICT DO NOTHING then skipped, bumped on
+-- updates that only touched bookkeeping columns (next_retry_at,
+-- error, reserve releases, ...), and held the counter row lock
+-- from the first write until commit, serialising every
+-- concurrent writer of the same user.
+--
+-- The bump now runs from AFTER row constraint triggers that are
+-- DEFERRABLE INITIALLY DEFERRED:
+-- - skipped ON CONFLICT rows never fire an AFTER INSERT trigger;
+-- - updates fire only when a column the history feed renders
+--   changed;
+-- - the counter row is locked at commit time only, so versions
+--   are still assigned in commit order but the lock is held for
+--   the commit instead of the whole transaction.
+--
+-- The version is stamped onto the row by a follow-up UPDATE of
+-- history_version only, which does not match the update
+-- trigger's WHEN clause and so does not fire it again.
+--
+-- Non-destructive migration:
+-- no DROP TABLE
+-- no TRUNCATE
+-- no existing data updates
+-- ============================================================
+
+DO $$
+BEGIN
+    IF to_regclass('public.user_history_versions') IS NULL THEN
+        RAISE EXCEPTION
+            'Stage 27.8 blocked. Missing required existing table: public.user_history_versions';
+    END IF;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION public.stamp_user_history_version()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_version bigint;
+BEGIN
+    INSERT INTO public.user_history_versions AS v (user_id, version, updated_at)
+    VALUES (NEW.user_id, 1, now())
+    ON CONFLICT (user_id) DO UPDATE
+        SET version = v.version + 1,
+            updated_at = now()
+    RETURNING v.version INTO new_version;
+
+    EXECUTE format(
+        'UPDATE %I.%I SET history_version = $1 WHERE id = $2',
+        TG_TABLE_SCHEMA,
+        TG_TABLE_NAME
+    )
+    USING new_version, NEW.id;
+
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS wallet_transfers_history_version_ins
+    ON public.wallet_transfers;
+CREATE CONSTRAINT TRIGGER wallet_transfers_history_version_ins
+    AFTER INSERT ON public.wallet_transfers
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    EXECUTE FUNCTION public.stamp_user_history_version();
+
+DROP TRIGGER IF EXISTS wallet_transfers_history_version_upd
+    ON public.wallet_transfers;
+CREATE CONSTRAINT TRIGGER wallet_transfers_history_version_upd
+    AFTER UPDATE ON public.wallet_transfers
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    WHEN (
+        (OLD.coin, OLD.network, OLD.type, OLD.amount,
+         OLD.from_address, OLD.to_address, OLD.tx_hash,
+         OLD.status, OLD.compliance_status,
+         OLD.tx_time, OLD.detected_at)
+        IS DISTINCT FROM
+        (NEW.coin, NEW.network, NEW.type, NEW.amount,
+         NEW.from_address, NEW.to_address, NEW.tx_hash,
+         NEW.status, NEW.compliance_status,
+         NEW.tx_time, NEW.detected_at)
+    )
+    EXECUTE FUNCTION public.stamp_user_history_version();
+
+DROP TRIGGER IF EXISTS fund_orders_history_version_ins
+    ON public.fund_orders;
+CREATE CONSTRAINT TRIGGER fund_orders_history_version_ins
+    AFTER INSERT ON public.fund_orders
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    EXECUTE FUNCTION public.stamp_user_history_version();
+
+DROP TRIGGER IF EXISTS fund_orders_history_version_upd
+    ON public.fund_orders;
+CREATE CONSTRAINT TRIGGER fund_orders_history_version_upd
+    AFTER UPDATE ON public.fund_orders
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW
+    WHEN (
+        (OLD.fund_id, OLD.side, OLD.amount_usdt, OLD.shares,
+         OLD.price_usdt, OLD.net_price_usdt, OLD.net_user_payout_usdt,
+         OLD.status, OLD.created_at, OLD.executed_at)
+        IS DISTINCT FROM
+        (NEW.fund_id, NEW.side, NEW.amount_usdt, NEW.shares,
+         NEW.price_usdt, NEW.net_price_usdt, NEW.net_user_payout_usdt,
+         NEW.status, NEW.created_at, NEW.executed_at)
+    )
+    EXECUTE FUNCTION public.stamp_user_history_version();
+
+DROP FUNCTION IF EXISTS public.bump_user_history_version();
+
+COMMIT;
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+
+from app.db import SessionLocal
+from app.models import Fund
+from app.navcalc.chart_rollup import ROLLUP_RESOLUTIONS, backfill_chart_rollups
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Build fund_chart_rollup candles (5/15/30/60/240, 1W/1M/12M) "
+            "from existing fund_chart_minute / fund_chart_daily history."
+        )
+    )
+
+    parser.add_argument(
+        "--fund-code",
+        action="append",
+        default=None,
+        help="Fund code to backfill. Repeatable. Default: every fund.",
+    )
+
+    parser.add_argument(
+        "--resolution",
+        action="append",
+        choices=ROLLUP_RESOLUTIONS,
+        default=None,
+        help="Resolution to backfill. Repeatable. Default: all rollup resolutions.",
+    )
+
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=30,
+        help="Days of minute history aggregated per transaction. Default: 30.",
+    )
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    resolutions = tuple(args.resolution or ROLLUP_RESOLUTIONS)
+
+    db = SessionLocal()
+    try:
+        query = db.query(Fund).order_by(Fund.id.asc())
+        if args.fund_code:
+            query = query.filter(Fund.code.in_(args.fund_code))
+
+        funds = query.all()
+        if not funds:
+            print("No funds matched.")
+            return 1
+
+        for fund in funds:
+            counts = backfill_chart_rollups(
+                db,
+                fund_id=fund.id,
+                resolutions=resolutions,
+                chunk_days=args.chunk_days,
+            )
+            summary = ", ".join(
+                f"{resolution}={count}"
+                for resolution, count in counts.items()
+            )
+            print(f"{fund.code}: {summary}")
+
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1067,8 +1067,54 @@
         }
       }
 
+      let liveState = null;
+      let streamConnected = false;
+
+      function mergeDashboardDelta(state, delta) {
+        const next = { ...state, ...delta };
+        const funds = new Map((state.funds || []).map((f) => [f.id, f]));
+
+        (delta.funds || []).forEach((f) => funds.set(f.id, f));
+        (delta.funds_removed || []).forEach((id) => funds.delete(id));
+
+        next.funds = Array.from(funds.values());
+        delete next.funds_removed;
+        return next;
+      }
+
+      function initDashboardStream() {
+        if (!window.EventSource) return;
+
+        const source = new EventSource("/api/dashboard/stream");
+        source.addEventListener("open", () => { streamConnected = true; });
+        source.addEventListener("error", () => { streamConnected = false; });
+
+        source.addEventListener("portfolio", (event) => {
+          try {
+            liveState = JSON.parse(event.data);
+            applyDashboardLive(liveState);
+          } catch (err) {
+            console.warn("[dashboard-live] bad stream frame:", err);
+          }
+        });
+
+        source.addEventListener("portfolio_delta", (event) => {
+          if (!liveState) return;
+          try {
+            liveState = mergeDashboardDelta(liveState, JSON.parse(event.data));
+            applyDashboardLive(liveState);
+          } catch (err) {
+            console.warn("[dashboard-live] bad stream frame:", err);
+          }
+        });
+      }
+
+      initDashboardStream();
       pollDashboardLive();
-      window.setInterval(pollDashboardLive, POLL_MS);
+      // Polling is the fallback while the stream is down.
+      window.setInterval(() => {
+        if (!streamConnected) pollDashboardLive();
+      }, POLL_MS);
     }
 
     document.addEventListener("DOMContentLoaded", () => {
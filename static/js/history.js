@@ -303,6 +303,25 @@
     return renderTradingTable(rows);
   }
 
+  function renderLoadMore(nextCursor) {
+    if (!nextCursor) return "";
+
+    return `
+      <div class="tx-col-center" style="margin-top:14px;">
+        <button type="button" class="tab-btn tab-btn--small" data-history-more>
+          ${escapeHtml(L("Показать ещё", "Load more"))}
+        </button>
+      </div>
+    `;
+  }
+
+  // Newest first, same order as the server: (sort_ts, id) descending.
+  function compareRows(a, b) {
+    const byTs = (Number(b.sort_ts) || 0) - (Number(a.sort_ts) || 0);
+    if (byTs !== 0) return byTs;
+    return (Number(b.id) || 0) - (Number(a.id) || 0);
+  }
+
   function initHistoryTabs() {
     const root = document.getElementById("historyTabs");
     if (!root) return;
@@ -317,6 +336,9 @@
     let inFlight = false;
     let pollTimer = null;
 
+    // Loaded rows per panel: { rows: Map(id -> row), nextCursor, version }.
+    const panelState = new Map();
+
     function getPanel(mainName = currentMain, subName = currentSub) {
       return root.querySelector(`[data-panel="${mainName}/${subName}"]`);
     }
@@ -341,36 +363,98 @@
       panels.forEach((p) => p.classList.toggle("hidden", p.dataset.panel !== key));
     }
 
+    async function fetchHistory(mainName, subName, params = {}) {
+      const url = new URL("/api/history/live", window.location.origin);
+      url.searchParams.set("section", mainName);
+      url.searchParams.set("sub", subName);
+
+      Object.entries(params).forEach(([name, value]) => {
+        if (value !== null && value !== undefined) url.searchParams.set(name, String(value));
+      });
+
+      const resp = await fetch(url.toString(), {
+        method: "GET",
+        credentials: "same-origin",
+        headers: { Accept: "application/json" },
+      });
+
+      // 304: nothing changed since the version we already have.
+      if (resp.status === 304 || !resp.ok) return null;
+
+      const data = await resp.json().catch(() => null);
+      if (!data || data.status !== "ok") return null;
+
+      return data;
+    }
+
+    function renderPanel(mainName, subName) {
+      const panel = getPanel(mainName, subName);
+      const state = panelState.get(`${mainName}/${subName}`);
+      if (!panel || !state) return;
+
+      const rows = Array.from(state.rows.values()).sort(compareRows);
+      const html = renderLiveTable(mainName, subName, rows) + renderLoadMore(state.nextCursor);
+
+      if (panel.innerHTML !== html) {
+        panel.innerHTML = html;
+      }
+    }
+
+    function storeRows(state, rows, { changesOnly = false } = {}) {
+      let oldest = null;
+      if (changesOnly && state.nextCursor) {
+        state.rows.forEach((row) => {
+          if (!oldest || compareRows(oldest, row) < 0) oldest = row;
+        });
+      }
+
+      (rows || []).forEach((row) => {
+        // Changed rows older than the loaded window arrive with their page.
+        if (oldest && !state.rows.has(row.id) && compareRows(oldest, row) < 0) return;
+        state.rows.set(row.id, row);
+      });
+    }
+
+    async function loadFirstPage(mainName, subName) {
+      const data = await fetchHistory(mainName, subName);
+      if (!data) return;
+
+      const state = { rows: new Map(), nextCursor: data.next_cursor || null, version: data.version };
+      storeRows(state, data.rows);
+      panelState.set(`${mainName}/${subName}`, state);
+      renderPanel(mainName, subName);
+    }
+
     async function pollActiveHistory({ silent = true } = {}) {
       if (window.location.pathname !== "/history") return;
       if (inFlight) return;
 
       inFlight = true;
 
-      try {
-        const url = new URL("/api/history/live", window.location.origin);
-        url.searchParams.set("section", currentMain);
-        url.searchParams.set("sub", currentSub);
-
-        const resp = await fetch(url.toString(), {
-          method: "GET",
-          credentials: "same-origin",
-          headers: { Accept: "application/json" },
-        });
-
-        if (!resp.ok) return;
+      const mainName = currentMain;
+      const subName = currentSub;
+      const key = `${mainName}/${subName}`;
 
-        const data = await resp.json().catch(() => null);
-        if (!data || data.status !== "ok") return;
+      try {
+        const state = panelState.get(key);
 
-        const panel = getPanel(data.section || currentMain, data.sub || currentSub);
-        if (!panel) return;
+        if (!state) {
+          await loadFirstPage(mainName, subName);
+          return;
+        }
 
-        const html = renderLiveTable(data.section || currentMain, data.sub || currentSub, data.rows || []);
+        const data = await fetchHistory(mainName, subName, { since: state.version });
+        if (!data) return;
 
-        if (panel.innerHTML !== html) {
-          panel.innerHTML = html;
+        if (!data.changes_only) {
+          panelState.delete(key);
+          await loadFirstPage(mainName, subName);
+          return;
         }
+
+        storeRows(state, data.rows, { changesOnly: true });
+        state.version = data.version;
+        renderPanel(mainName, subName);
       } catch (err) {
         if (!silent) console.warn("[history-live] polling failed:", err);
       } finally {
@@ -378,6 +462,60 @@
       }
     }
 
+    async function loadMore() {
+      const mainName = currentMain;
+      const subName = currentSub;
+      const state = panelState.get(`${mainName}/${subName}`);
+      if (!state || !state.nextCursor || inFlight) return;
+
+      inFlight = true;
+
+      try {
+        const data = await fetchHistory(mainName, subName, { cursor: state.nextCursor });
+        if (!data) return;
+
+        // Keep state.version: rows already loaded may have changed since.
+        storeRows(state, data.rows);
+        state.nextCursor = data.next_cursor || null;
+        renderPanel(mainName, subName);
+      } catch (err) {
+        console.warn("[history-live] load more failed:", err);
+      } finally {
+        inFlight = false;
+      }
+    }
+
+    let streamConnected = false;
+
+    // The dashboard stream carries history_version; a change triggers the
+    // same `since` fetch the poll would make.
+    function initHistoryStream() {
+      if (!window.EventSource) return;
+
+      const source = new EventSource("/api/dashboard/stream");
+      let lastVersion = null;
+
+      const onPortfolio = (event) => {
+        let data = null;
+        try {
+          data = JSON.parse(event.data);
+        } catch (_) {
+          return;
+        }
+        if (!data || data.history_version === undefined) return;
+
+        if (lastVersion !== null && data.history_version !== lastVersion) {
+          pollActiveHistory();
+        }
+        lastVersion = data.history_version;
+      };
+
+      source.addEventListener("open", () => { streamConnected = true; });
+      source.addEventListener("error", () => { streamConnected = false; });
+      source.addEventListener("portfolio", onPortfolio);
+      source.addEventListener("portfolio_delta", onPortfolio);
+    }
+
     function restartPolling() {
       if (pollTimer) {
         clearInterval(pollTimer);
@@ -386,7 +524,7 @@
 
       pollActiveHistory({ silent: false });
       pollTimer = window.setInterval(() => {
-        pollActiveHistory();
+        if (!streamConnected) pollActiveHistory();
       }, POLL_MS);
     }
 
@@ -433,6 +571,11 @@
       });
     });
 
+    root.addEventListener("click", (e) => {
+      const moreBtn = e.target.closest && e.target.closest("[data-history-more]");
+      if (moreBtn) loadMore();
+    });
+
     root.addEventListener("click", async (e) => {
       const btn = e.target.closest && e.target.closest("[data-copy]");
       if (!btn) return;
@@ -459,6 +602,7 @@
 
     setMain(tab, { sub, updateUrl: false, poll: false });
     updateExportButtons();
+    initHistoryStream();
     restartPolling();
   }
 
@@ -878,8 +878,28 @@
     if (!fundCode) return;
 
     let lastPollTs = 0;
+    let streamConnected = false;
+
+    // Server push first; the polling below only runs while the stream is down.
+    if (window.EventSource) {
+      const source = new EventSource(`/api/terminal/stream/${encodeURIComponent(fundCode)}`);
+      source.addEventListener("open", () => { streamConnected = true; });
+      source.addEventListener("error", () => { streamConnected = false; });
+      source.addEventListener("market", (event) => {
+        try {
+          applyTerminalLivePayload(JSON.parse(event.data));
+        } catch (_) {
+          /* ignore malformed frames */
+        }
+      });
+      source.addEventListener("not_found", () => {
+        streamConnected = false;
+        source.close();
+      });
+    }
 
     const poll = async () => {
+      if (streamConnected) return;
       lastPollTs = Date.now();
       try {
         const url = `/api/terminal/live/${encodeURIComponent(fundCode)}`;
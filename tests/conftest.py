@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.cache import reset_singletons
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_singletons():
+    # Caches, pools and oracles are process-wide; every test gets its own
+    # instances so fakes never see state left behind by another test.
+    reset_singletons()
+    yield
+    reset_singletons()
@@ -24,6 +24,7 @@ from app.settlement.bsc_balance_service import (
     BscBalanceReadError,
     read_bsc_block_number,
     read_bsc_usdt_balance,
+    read_bsc_usdt_balances,
 )
 
 
@@ -453,11 +454,31 @@ def test_live_balance_refresh_uses_absolute_chain_values(
         "read_bsc_block_number",
         fake_read_block_number,
     )
+    def fake_read_balances(
+        w3,
+        addresses,
+        *,
+        block_identifier,
+    ):
+        return {
+            address.lower(): fake_read_balance(
+                w3,
+                address,
+                block_identifier=block_identifier,
+            )
+            for address in addresses
+        }
+
     monkeypatch.setattr(
         payout_flow,
         "read_bsc_usdt_balance",
         fake_read_balance,
     )
+    monkeypatch.setattr(
+        payout_flow,
+        "read_bsc_usdt_balances",
+        fake_read_balances,
+    )
 
     payout_flow._refresh_live_balances_after_confirmed_payouts(
         db,
@@ -605,3 +626,104 @@ def test_live_balance_refresh_uses_absolute_chain_values(
     } == {
         987654
     }
+
+
+class FakeMulticallEth:
+    def __init__(self, balances, *, fail_for=None):
+        self.balances = balances
+        self.fail_for = fail_for
+        self.calls = []
+
+    def call(self, transaction, block_identifier):
+        from eth_abi import decode, encode
+
+        self.calls.append(
+            {
+                "transaction": transaction,
+                "block_identifier": block_identifier,
+            }
+        )
+
+        data = bytes.fromhex(transaction["data"][2:])
+        assert data[:4].hex() == "82ad56cb"
+        (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+
+        results = []
+        for target, allow_failure, call_data in calls:
+            assert target.lower() == CONTRACT_ADDRESS
+            assert allow_failure is False
+            assert call_data[:4].hex() == "70a08231"
+
+            address = "0x" + call_data[-20:].hex()
+            if address == self.fail_for:
+                results.append((False, b""))
+                continue
+
+            results.append(
+                (
+                    True,
+                    self.balances[address].to_bytes(32, byteorder="big"),
+                )
+            )
+
+        return encode(["(bool,bytes)[]"], [results])
+
+
+def test_read_bsc_usdt_balances_chunks_at_one_block(monkeypatch):
+    configure_usdt(monkeypatch)
+    monkeypatch.setattr(settings, "BSC_BALANCE_BATCH_SIZE", 2)
+
+    addresses = [
+        "0x" + f"{index:040x}"
+        for index in range(1, 6)
+    ]
+    eth = FakeMulticallEth(
+        {address: index * 1_000_000 for index, address in enumerate(addresses, 1)}
+    )
+
+    balances = read_bsc_usdt_balances(
+        FakeWeb3(eth),
+        [addresses[0].upper().replace("0X", "0x"), *addresses],
+        block_identifier=456789,
+    )
+
+    assert balances == {
+        address: Decimal(index)
+        for index, address in enumerate(addresses, 1)
+    }
+    assert len(eth.calls) == 3
+    assert {call["block_identifier"] for call in eth.calls} == {456789}
+    assert {call["transaction"]["to"] for call in eth.calls} == {
+        Web3.to_checksum_address(settings.BSC_MULTICALL3_ADDRESS)
+    }
+
+
+def test_read_bsc_usdt_balances_is_fail_closed(monkeypatch):
+    configure_usdt(monkeypatch)
+
+    eth = FakeMulticallEth(
+        {WALLET_ADDRESS: 1},
+        fail_for=WALLET_ADDRESS,
+    )
+
+    with pytest.raises(
+        BscBalanceReadError,
+        match="balanceOf failed",
+    ):
+        read_bsc_usdt_balances(
+            FakeWeb3(eth),
+            [WALLET_ADDRESS],
+            block_identifier=1,
+        )
+
+
+def test_read_bsc_usdt_balances_without_addresses_skips_rpc(monkeypatch):
+    configure_usdt(monkeypatch)
+    eth = FakeMulticallEth({})
+
+    assert read_bsc_usdt_balances(
+        FakeWeb3(eth),
+        [],
+        block_identifier=1,
+    ) == {}
+    assert eth.calls == []
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import app.settlement.bsc_block_headers as headers_mod
+from app.config import settings
+from app.settlement.bsc_block_headers import BlockHeader, BlockHeaderCache
+
+
+UTC = timezone.utc
+T0 = datetime(2026, 10, 1, tzinfo=UTC)
+
+
+def _header(number: int, sec_per_block: float = 0.75) -> BlockHeader:
+    return BlockHeader(number=number, timestamp=T0 + timedelta(seconds=number * sec_per_block))
+
+
+def test_cache_is_bounded_lru():
+    cache = BlockHeaderCache(max_entries=2)
+    cache.put(_header(1))
+    cache.put(_header(2))
+    assert cache.get(1) is not None
+
+    cache.put(_header(3))
+
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert set(cache.get_many([1, 2, 3])) == {1, 3}
+
+
+def test_estimate_uses_nearest_anchor_and_observed_block_time(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_AVG_BLOCK_TIME_SEC", 0.75)
+    cache = BlockHeaderCache(max_entries=10)
+
+    assert cache.estimate(100) is None
+
+    cache.put(_header(1000, sec_per_block=3.0))
+    assert cache.estimate(1010) == T0 + timedelta(seconds=3000 + 7.5)
+    assert cache.estimate(1100, max_distance=20) is None
+
+    cache.put(_header(1200, sec_per_block=3.0))
+    assert cache.average_block_time_sec() == 3.0
+    assert cache.estimate(1190) == T0 + timedelta(seconds=3570)
+
+
+class _Eth:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def get_block(self, number, full):
+        self.calls.append(number)
+        return {"number": number, "timestamp": 1_700_000_000 + number}
+
+
+class FakeBatch:
+    def __init__(self, w3):
+        self.w3 = w3
+        self.items = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, item):
+        self.items.append(item)
+
+    def execute(self):
+        self.w3.batches.append(len(self.items))
+        return list(self.items)
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+        self.eth = _Eth(self.calls)
+
+    def batch_requests(self):
+        return FakeBatch(self)
+
+
+def test_sync_lookup_batches_only_uncached_blocks(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_BLOCK_HEADER_BATCH_SIZE", 2)
+    w3 = FakeWeb3()
+
+    first = headers_mod.get_block_timestamps(w3, [5, 3, 4, 3])
+    assert sorted(first) == [3, 4, 5]
+    assert w3.batches == [2, 1]
+
+    second = headers_mod.get_block_timestamps(w3, [4, 5])
+    assert second == {4: first[4], 5: first[5]}
+    assert w3.batches == [2, 1]
+    assert headers_mod.get_block_timestamp(w3, 3) == datetime.fromtimestamp(1_700_000_003, tz=UTC)
+
+
+def test_non_exact_lookup_estimates_near_an_anchor(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_AVG_BLOCK_TIME_SEC", 1.0)
+    monkeypatch.setattr(settings, "BSC_BLOCK_TIME_ESTIMATE_MAX_BLOCKS", 5)
+    headers_mod.remember_block_timestamp(100, T0)
+    w3 = FakeWeb3()
+
+    estimated = headers_mod.get_block_timestamps(w3, [103, 200], exact=False)
+
+    assert estimated[103] == T0 + timedelta(seconds=3)
+    assert w3.calls == [200]
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+        self.status = 200
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.payloads = []
+
+    def post(self, url, json):
+        self.payloads.append(json)
+        return _Response(
+            [
+                {
+                    "id": item["id"],
+                    "result": {
+                        "number": item["params"][0],
+                        "timestamp": hex(1_700_000_000 + item["id"]),
+                    },
+                }
+                for item in json
+            ]
+        )
+
+
+def test_async_lookup_sends_one_json_rpc_array(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_RPC_URL", "http://rpc")
+    session = FakeSession()
+
+    out = asyncio.run(headers_mod.get_block_timestamps_async(session, [7, 8]))
+    again = asyncio.run(headers_mod.get_block_timestamps_async(session, [8]))
+
+    assert len(session.payloads) == 1
+    assert [item["method"] for item in session.payloads[0]] == ["eth_getBlockByNumber"] * 2
+    assert out[8] == again[8] == datetime.fromtimestamp(1_700_000_008, tz=UTC)
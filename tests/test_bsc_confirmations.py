@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+import workers.bsc_confirmations as confirmations
+from app.config import settings
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+class RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.commits = 0
+        self.closed = False
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return _Rows(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_promotion_is_one_guarded_update(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_CONFIRMATIONS", 20)
+    db = RecordingSession([(5,), (9,)])
+    monkeypatch.setattr(confirmations, "SessionLocal", lambda: db)
+
+    assert confirmations._promote_confirmed_deposits(1020) == [5, 9]
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.closed
+
+    compiled = db.statements[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("UPDATE wallet_transfers SET status=")
+    assert "wallet_transfers.status = %(status_1)s" in sql
+    assert "wallet_transfers.block_number <= %(block_number_1)s" in sql
+    assert "RETURNING wallet_transfers.id" in sql
+    assert compiled.params["block_number_1"] == 1000
+    assert compiled.params["status_1"] == "pending"
+    assert compiled.params["status"] == "success"
+
+
+def test_promotion_before_enough_blocks_skips_database(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_CONFIRMATIONS", 20)
+    monkeypatch.setattr(
+        confirmations,
+        "SessionLocal",
+        lambda: (_ for _ in ()).throw(AssertionError("no session expected")),
+    )
+
+    assert confirmations._promote_confirmed_deposits(19) == []
+
+
+class FakeWebSocket:
+    def __init__(self, messages):
+        self.sent = []
+        self.messages = list(messages)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+    async def recv(self):
+        if not self.messages:
+            raise ConnectionError("closed")
+        return self.messages.pop(0)
+
+
+def _head(number: int) -> str:
+    return (
+        '{"jsonrpc":"2.0","method":"eth_subscription",'
+        '"params":{"result":{"number":"%s"}}}' % hex(number)
+    )
+
+
+def test_new_heads_drive_promotion_once_per_block(monkeypatch):
+    ws = FakeWebSocket(
+        [
+            '{"jsonrpc":"2.0","id":1,"result":"0xsub"}',
+            _head(100),
+            _head(100),
+            _head(99),
+            '{"jsonrpc":"2.0","method":"other"}',
+            _head(101),
+        ]
+    )
+    promoted = []
+
+    async def fake_promote(block_number):
+        promoted.append(block_number)
+        return 0
+
+    monkeypatch.setattr(settings, "BSC_WS_URL", "wss://example")
+    monkeypatch.setattr(confirmations.websockets, "connect", lambda *a, **k: ws)
+    monkeypatch.setattr(confirmations, "promote", fake_promote)
+
+    try:
+        asyncio.run(confirmations.follow_new_heads())
+    except ConnectionError:
+        pass
+
+    assert '"newHeads"' in ws.sent[0]
+    assert promoted == [100, 101]
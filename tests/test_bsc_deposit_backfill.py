@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+import workers.bsc_usdt_deposit_listener as listener
+from app.config import settings
+
+
+USER_ADDR = "0x" + "a" * 40
+OTHER_ADDR = "0x" + "b" * 40
+SENDER = "0x" + "c" * 40
+
+
+def _log(block: int, log_index: int, to_addr: str = USER_ADDR, amount: int = 10**18) -> dict:
+    return {
+        "transactionHash": f"0x{block:04x}{log_index:04x}",
+        "blockNumber": hex(block),
+        "logIndex": hex(log_index),
+        "data": hex(amount),
+        "topics": [
+            listener.TRANSFER_TOPIC,
+            listener._encode_topic_address(SENDER),
+            listener._encode_topic_address(to_addr),
+        ],
+    }
+
+
+def _window(size=100, min_size=10, max_size=400, target_sec=1.0):
+    return listener.AdaptiveBlockWindow(
+        size=size,
+        min_size=min_size,
+        max_size=max_size,
+        target_sec=target_sec,
+    )
+
+
+def test_adaptive_window_grows_when_fast_and_shrinks_when_slow():
+    window = _window()
+
+    window.observe(100, 0.2)
+    assert window.size == 200
+
+    window.observe(50, 0.2)
+    assert window.size == 200
+
+    window.observe(200, 5.0)
+    assert window.size == 100
+
+    for _ in range(10):
+        window.shrink()
+    assert window.size == 10
+
+
+def test_range_too_large_is_split_without_retries(monkeypatch):
+    calls = []
+
+    async def fake_get_logs(session, start, end, to_topics):
+        calls.append((start, end))
+        if end - start + 1 > 25:
+            raise listener.LogsRangeTooLargeError("query returned more than 10000 results")
+        return [_log(start, 0)]
+
+    monkeypatch.setattr(listener, "rpc_get_logs", fake_get_logs)
+    window = _window(size=100, min_size=10)
+
+    logs = asyncio.run(
+        listener.fetch_logs_range(None, ["t"], 0, 99, window, asyncio.Semaphore(2))
+    )
+
+    assert calls[0] == (0, 99)
+    assert [int(lg["blockNumber"], 16) for lg in logs] == [0, 25, 50, 75]
+    assert window.size < 100
+
+
+def test_window_observes_call_time_not_slot_wait(monkeypatch):
+    observed = []
+
+    async def fake_get_logs(session, start, end, to_topics):
+        return []
+
+    monkeypatch.setattr(listener, "rpc_get_logs", fake_get_logs)
+    window = _window(target_sec=0.05)
+    monkeypatch.setattr(window, "observe", lambda blocks, elapsed: observed.append(elapsed))
+
+    async def run():
+        slots = asyncio.Semaphore(1)
+        await slots.acquire()
+        task = asyncio.create_task(
+            listener.fetch_logs_range(None, ["t"], 0, 99, window, slots)
+        )
+        await asyncio.sleep(0.2)
+        slots.release()
+        await task
+
+    asyncio.run(run())
+
+    assert len(observed) == 1
+    assert observed[0] < 0.1
+
+
+def test_rpc_error_classification():
+    assert listener._is_range_too_large({"message": "query returned more than 10000 results"})
+    assert listener._is_range_too_large("exceed maximum block range: 5000")
+    assert not listener._is_range_too_large({"message": "header not found"})
+
+
+def test_backfill_persists_windows_in_block_order_with_cursor(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_BACKFILL_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "BSC_BACKFILL_CHUNK_BLOCKS", 10)
+    monkeypatch.setattr(settings, "BSC_BACKFILL_MIN_CHUNK_BLOCKS", 10)
+    monkeypatch.setattr(settings, "BSC_BACKFILL_MAX_CHUNK_BLOCKS", 10)
+
+    async def fake_get_logs(session, start, end, to_topics):
+        # later windows answer first
+        await asyncio.sleep(0.001 * (100 - start) / 10)
+        return [_log(start, 1), _log(start, 0, to_addr=OTHER_ADDR)]
+
+    persisted = []
+
+    async def fake_block_times(session, numbers):
+        return {
+            n: datetime.fromtimestamp(1_700_000_000 + n, tz=timezone.utc)
+            for n in numbers
+        }
+
+    def fake_insert(transfers, block_times, *, cursor_name, cursor_block):
+        persisted.append(
+            (
+                [t.block_number for t in transfers],
+                cursor_name,
+                cursor_block,
+                [block_times[t.block_number] is not None for t in transfers],
+            )
+        )
+        return len(transfers)
+
+    monkeypatch.setattr(listener, "rpc_get_logs", fake_get_logs)
+    monkeypatch.setattr(listener, "get_block_timestamps_async", fake_block_times)
+    monkeypatch.setattr(listener, "db_insert_transfers_batch", fake_insert)
+
+    logs_count, inserted = asyncio.run(
+        listener.run_backfill(
+            None,
+            [USER_ADDR],
+            0,
+            49,
+            {USER_ADDR: (7, 70)},
+            set(),
+            cursor_name="cursor",
+        )
+    )
+
+    assert logs_count == 10
+    assert inserted == 5
+    assert [p[2] for p in persisted] == [9, 19, 29, 39, 49]
+    assert [p[0] for p in persisted] == [[0], [10], [20], [30], [40]]
+    assert all(p[1] == "cursor" and p[3] == [True] for p in persisted)
+
+
+class _Result:
+    def __init__(self, rows=None, rowcount=0):
+        self._rows = rows or []
+        self.rowcount = rowcount
+
+    def all(self):
+        return list(self._rows)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, stmt, params=None):
+        self.statements.append((stmt, params))
+        return _Result(rowcount=2)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+def _transfer(block: int, log_index: int) -> listener.ParsedTransfer:
+    return listener.parse_transfer_log(_log(block, log_index), {USER_ADDR: (7, 70)})
+
+
+def test_batch_insert_and_cursor_share_one_commit(monkeypatch):
+    db = RecordingSession()
+    monkeypatch.setattr(listener, "SessionLocal", lambda: db)
+    monkeypatch.setattr(
+        listener,
+        "internal_platform_payout_skip_reasons_db",
+        lambda session, transfers: {
+            (transfers[1].tx_hash, transfers[1].log_index): "known_negative_payout_leg_tx_hash"
+        },
+    )
+
+    transfers = [_transfer(5, 0), _transfer(5, 1), _transfer(6, 0)]
+    inserted = listener.db_insert_transfers_batch(
+        transfers,
+        {5: datetime(2026, 1, 1, tzinfo=timezone.utc)},
+        cursor_name="cursor",
+        cursor_block=9,
+    )
+
+    assert inserted == 2
+    assert db.commits == 1
+    assert len(db.statements) == 2
+
+    insert_stmt, _ = db.statements[0]
+    compiled = insert_stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("INSERT INTO wallet_transfers")
+    assert "ON CONFLICT (tx_hash, log_index) DO NOTHING" in sql
+    assert compiled.params["log_index_m0"] == 0
+    assert compiled.params["block_number_m1"] == 6
+    assert "block_number_m2" not in compiled.params
+
+    cursor_stmt, cursor_params = db.statements[1]
+    assert "worker_cursors" in str(cursor_stmt)
+    assert cursor_params == {"name": "cursor", "b": 9, "i": 0}
+
+
+def test_parse_transfer_log_ignores_unknown_recipients():
+    assert listener.parse_transfer_log(_log(1, 0, to_addr=OTHER_ADDR), {USER_ADDR: (7, 70)}) is None
+
+    parsed = _transfer(1, 3)
+    assert parsed.wallet_id == 7
+    assert parsed.user_id == 70
+    assert parsed.log_index == 3
+    assert parsed.from_lower == SENDER
+    assert parsed.amount == Decimal("1")
+
+
+def test_skip_reasons_use_one_query_per_table():
+    settlement = "0x" + "c" * 40
+
+    class RoutingSession:
+        def __init__(self):
+            self.tables = []
+
+        def execute(self, stmt):
+            sql = str(stmt.compile(dialect=postgresql.dialect()))
+            table = sql.split("FROM", 1)[1].split()[0]
+            self.tables.append(table)
+            if table == "fund_wallets":
+                return _Result([(settlement,)])
+            if table == "user_wallets":
+                return _Result([(USER_ADDR,)])
+            return _Result([("0x0009" + "0000", SENDER, OTHER_ADDR, Decimal("1"))])
+
+    db = RoutingSession()
+    transfers = [
+        _transfer(5, 0),
+        listener.parse_transfer_log(_log(9, 0, to_addr=OTHER_ADDR), {OTHER_ADDR: (8, 80)}),
+    ]
+
+    reasons = listener.internal_platform_payout_skip_reasons_db(db, transfers)
+
+    assert db.tables == ["fund_wallets", "user_wallets", "fund_negative_payout_legs"]
+    assert reasons == {
+        (transfers[0].tx_hash, 0): "active_platform_settlement_wallet_to_registered_user_wallet",
+        (transfers[1].tx_hash, 0): "known_negative_payout_leg_tx_hash",
+    }
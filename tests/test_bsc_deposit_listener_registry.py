@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+import workers.bsc_usdt_deposit_listener as listener
+from app.config import settings
+
+
+def test_registry_refresh_reads_above_watermark_and_grows_in_place(monkeypatch):
+    wallets = [
+        (1, 10, "0xAAA"),
+        (2, 20, "0xBBB"),
+    ]
+    requested_after = []
+
+    def fake_rows(after_id=0):
+        requested_after.append(after_id)
+        return [row for row in wallets if row[0] > after_id]
+
+    settlement = {"0xfee"}
+    monkeypatch.setattr(listener, "load_wallet_rows", fake_rows)
+    monkeypatch.setattr(
+        listener,
+        "load_active_platform_settlement_wallet_addresses",
+        lambda: set(settlement),
+    )
+    monkeypatch.setattr(listener, "WALLET_ID_OVERLAP", 1)
+
+    registry = listener.WalletRegistry()
+    wallet_map = registry.wallet_map
+    settlement_addresses = registry.settlement_addresses
+
+    assert registry.refresh() == ["0xaaa", "0xbbb"]
+    assert registry.last_wallet_id == 2
+
+    wallets.append((3, 30, "0xCCC"))
+    settlement.add("0xfee2")
+
+    assert registry.refresh() == ["0xccc"]
+    assert requested_after == [0, 1]
+    assert registry.wallet_map is wallet_map
+    assert registry.settlement_addresses is settlement_addresses
+    assert wallet_map["0xccc"] == (3, 30)
+    assert settlement_addresses == {"0xfee", "0xfee2"}
+
+    assert registry.refresh() == []
+
+
+def test_catch_up_replays_only_new_addresses_since_last_head(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_REORG_BUFFER_BLOCKS", 5)
+
+    calls = []
+
+    async def fake_latest(session):
+        return 250
+
+    async def fake_backfill(session, addresses, start, end, *args, cursor_name):
+        calls.append((list(addresses), start, end, cursor_name))
+        return 0, 0
+
+    monkeypatch.setattr(listener, "rpc_get_latest_block", fake_latest)
+    monkeypatch.setattr(listener, "run_backfill", fake_backfill)
+
+    registry = listener.WalletRegistry()
+    state = listener.CatchUpState(synced_block=120, pending={"0xbbb", "0xaaa"})
+
+    asyncio.run(listener.catch_up_new_wallets(None, registry, state))
+
+    assert calls == [(["0xaaa", "0xbbb"], 115, 250, None)]
+    assert state.pending == set()
+    assert state.synced_block == 250
+
+    calls.clear()
+    asyncio.run(listener.catch_up_new_wallets(None, registry, state))
+    assert calls == []
+
+
+def test_catch_up_failure_keeps_pending_addresses(monkeypatch):
+    async def fake_latest(session):
+        return 300
+
+    async def failing_backfill(*args, **kwargs):
+        raise RuntimeError("rpc down")
+
+    monkeypatch.setattr(listener, "rpc_get_latest_block", fake_latest)
+    monkeypatch.setattr(listener, "run_backfill", failing_backfill)
+
+    state = listener.CatchUpState(synced_block=200, pending={"0xaaa"})
+
+    try:
+        asyncio.run(
+            listener.catch_up_new_wallets(None, listener.WalletRegistry(), state)
+        )
+    except RuntimeError:
+        pass
+
+    assert state.pending == {"0xaaa"}
+    assert state.synced_block == 200
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+import app.settlement.gas_service as gas_service
+from app.settlement.bsc_gas_oracle import (
+    BscGasOracle,
+    SingleFlightValue,
+    get_gas_price_wei,
+    smoothed_gas_price_wei,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEth:
+    def __init__(self, gas_price=1_000_000_000, history=None):
+        self._gas_price = gas_price
+        self.history = history
+        self.gas_price_calls = 0
+        self.fee_history_calls = []
+
+    @property
+    def gas_price(self):
+        self.gas_price_calls += 1
+        return self._gas_price
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.fee_history_calls.append((blocks, newest, percentiles))
+        if isinstance(self.history, Exception):
+            raise self.history
+        return self.history
+
+
+def test_gas_price_is_cached_for_the_ttl():
+    clock = FakeClock()
+    oracle = BscGasOracle(gas_ttl_sec=3, price_ttl_sec=30, percentile=0, history_blocks=20, clock=clock)
+    w3 = SimpleNamespace(eth=FakeEth())
+
+    assert oracle.gas_price_wei(w3) == 1_000_000_000
+    clock.now += 2.9
+    w3.eth._gas_price = 2_000_000_000
+    assert oracle.gas_price_wei(w3) == 1_000_000_000
+    assert w3.eth.gas_price_calls == 1
+
+    clock.now += 0.2
+    assert oracle.gas_price_wei(w3) == 2_000_000_000
+    assert w3.eth.gas_price_calls == 2
+
+
+def test_concurrent_callers_share_one_refresh():
+    value = SingleFlightValue[int](60)
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(value.get(fetch))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_failed_refresh_is_not_cached():
+    value = SingleFlightValue[int](60)
+
+    def boom():
+        raise RuntimeError("rpc down")
+
+    with pytest.raises(RuntimeError):
+        value.get(boom)
+
+    assert value.get(lambda: 7) == 7
+
+
+def test_smoothed_price_is_median_of_base_plus_tip():
+    history = {
+        "baseFeePerGas": [0, 0, 0, 0, 0],
+        "reward": [[1_000], [50_000], [3_000], [2_000]],
+    }
+
+    assert smoothed_gas_price_wei(history) == 2_500
+    assert smoothed_gas_price_wei({"baseFeePerGas": [0], "reward": []}) is None
+
+
+def test_smoothing_never_goes_below_node_price():
+    w3 = SimpleNamespace(
+        eth=FakeEth(
+            gas_price=3_000,
+            history={"baseFeePerGas": [0, 0, 0, 0], "reward": [[1_000], [2_000], [9_000]]},
+        )
+    )
+    oracle = BscGasOracle(gas_ttl_sec=3, price_ttl_sec=30, percentile=60, history_blocks=3)
+
+    assert oracle.gas_price_wei(w3) == 3_000
+    assert w3.eth.fee_history_calls == [(3, "latest", [60.0])]
+
+    w3.eth.history = {"baseFeePerGas": [0, 0, 0, 0], "reward": [[5_000], [6_000], [9_000]]}
+    oracle.clear()
+    assert oracle.gas_price_wei(w3) == 6_000
+
+
+def test_fee_history_failure_falls_back_to_node_price():
+    w3 = SimpleNamespace(eth=FakeEth(gas_price=3_000, history=RuntimeError("unsupported")))
+    oracle = BscGasOracle(gas_ttl_sec=3, price_ttl_sec=30, percentile=60, history_blocks=3)
+
+    assert oracle.gas_price_wei(w3) == 3_000
+
+
+def test_bnb_quote_is_shared_across_callers(monkeypatch):
+    quotes = []
+
+    def fake_quote(w3):
+        quotes.append(w3)
+        return Decimal("600")
+
+    monkeypatch.setattr(gas_service, "quote_bnb_usd_price", fake_quote)
+    w3 = SimpleNamespace(eth=FakeEth())
+
+    assert gas_service.get_bnb_usd_price(w3) == Decimal("600")
+    assert gas_service.get_bnb_usd_price(w3) == Decimal("600")
+    assert len(quotes) == 1
+
+
+def test_estimates_reuse_the_cached_gas_price():
+    w3 = SimpleNamespace(eth=FakeEth(gas_price=5_000_000_000))
+
+    first = gas_service.estimate_min_operational_bnb(w3)
+    second = gas_service.estimate_min_operational_bnb(w3)
+
+    assert first == second
+    assert get_gas_price_wei(w3) == 5_000_000_000
+    assert w3.eth.gas_price_calls == 1
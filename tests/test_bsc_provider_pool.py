@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import pytest
+import requests
+
+import app.settlement.bsc_provider_pool as bsc_provider_pool
+from app.config import settings
+from app.settlement.bsc_provider_pool import (
+    BscProviderPool,
+    BscRpcUnavailableError,
+    configured_rpc_urls,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProvider:
+    def __init__(self, url, clock, *, latency=0.01):
+        self.url = url
+        self.clock = clock
+        self.latency = latency
+        self.fail_with = None
+        self.error_response = None
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        self.clock.now += self.latency
+        if self.fail_with is not None:
+            raise self.fail_with
+        if self.error_response is not None:
+            return {"jsonrpc": "2.0", "id": 1, "error": self.error_response}
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x10"}
+
+    def make_batch_request(self, batch):
+        self.calls.append("batch")
+        return [
+            {"jsonrpc": "2.0", "id": i, "result": {"number": params[0], "timestamp": "0x1"}}
+            for i, (_, params) in enumerate(batch)
+        ]
+
+
+def _pool(urls=("http://a", "http://b", "http://c"), **latencies):
+    clock = FakeClock()
+    providers = {}
+
+    def factory(url):
+        providers[url] = FakeProvider(url, clock, latency=latencies.get(url[-1], 0.01))
+        return providers[url]
+
+    pool = BscProviderPool(
+        list(urls),
+        cooldown_sec=5,
+        provider_factory=factory,
+        clock=clock,
+    )
+    return pool, providers, clock
+
+
+def test_configured_urls_put_primary_first_and_dedupe(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_RPC_URL", "http://a")
+    monkeypatch.setattr(settings, "BSC_RPC_URLS", " http://b, http://a ,,http://c")
+
+    assert configured_rpc_urls() == ["http://a", "http://b", "http://c"]
+
+
+def test_reads_fail_over_and_cool_down_the_broken_endpoint():
+    pool, providers, clock = _pool()
+    providers["http://a"].fail_with = requests.ConnectionError("down")
+
+    w3 = pool.web3()
+    assert w3.eth.block_number == 16
+    assert providers["http://a"].calls == ["eth_blockNumber"]
+    assert providers["http://b"].calls == ["eth_blockNumber"]
+
+    assert w3.eth.block_number == 16
+    # a is cooling down; b is measured, c is not yet and gets sampled.
+    assert providers["http://a"].calls == ["eth_blockNumber"]
+    assert providers["http://c"].calls == ["eth_blockNumber"]
+
+    clock.now += 6
+    providers["http://a"].fail_with = None
+    pool.endpoints[1].latency_sec = 0.5
+    pool.endpoints[2].latency_sec = 0.5
+    assert w3.eth.block_number == 16
+    assert providers["http://a"].calls == ["eth_blockNumber"] * 2
+
+
+def test_cooldown_doubles_on_repeated_errors():
+    pool, providers, clock = _pool(urls=("http://a", "http://b"))
+    providers["http://a"].fail_with = requests.Timeout("slow")
+
+    pool.call(lambda p: p.make_request("eth_chainId", []))
+    first = pool.endpoints[0].cooldown_until - clock.now
+
+    clock.now = pool.endpoints[0].cooldown_until
+    pool.call(lambda p: p.make_request("eth_chainId", []))
+    second = pool.endpoints[0].cooldown_until - clock.now
+
+    assert pool.endpoints[0].consecutive_errors == 2
+    assert second == pytest.approx(first * 2, abs=0.1)
+
+
+def test_reads_prefer_the_fastest_endpoint():
+    pool, providers, _ = _pool(a=0.3, b=0.05, c=0.2)
+
+    for _ in range(3):
+        pool.call(lambda p: p.make_request("eth_chainId", []))
+
+    assert [ep.url for ep in pool.ranked()] == ["http://b", "http://c", "http://a"]
+
+    pool.call(lambda p: p.make_request("eth_chainId", []))
+    assert len(providers["http://b"].calls) == 2
+
+
+def test_throttled_endpoint_is_skipped():
+    pool, providers, _ = _pool(urls=("http://a", "http://b"))
+    providers["http://a"].error_response = {"code": -32005, "message": "limit exceeded"}
+
+    response = pool.call(lambda p: p.make_request("eth_chainId", []))
+
+    assert response["result"] == "0x10"
+    assert pool.endpoints[0].consecutive_errors == 1
+
+
+def test_sends_are_pinned_to_one_endpoint():
+    pool, providers, _ = _pool()
+    providers["http://a"].fail_with = requests.ConnectionError("reset")
+
+    with pytest.raises(requests.ConnectionError):
+        pool.call(
+            lambda p: p.make_request("eth_sendRawTransaction", ["0x00"]),
+            write=True,
+        )
+
+    assert providers["http://b"].calls == []
+    assert providers["http://c"].calls == []
+
+
+def test_all_endpoints_down_raises():
+    pool, providers, _ = _pool(urls=("http://a", "http://b"))
+    for provider in providers.values():
+        provider.fail_with = requests.ConnectionError("down")
+
+    with pytest.raises(BscRpcUnavailableError):
+        pool.call(lambda p: p.make_request("eth_chainId", []))
+
+
+def test_batch_requests_go_through_the_pool():
+    pool, providers, _ = _pool()
+    w3 = pool.web3()
+
+    with w3.batch_requests() as batch:
+        batch.add(w3.eth.get_block(5, False))
+        batch.add(w3.eth.get_block(6, False))
+        blocks = batch.execute()
+
+    assert [b["number"] for b in blocks] == [5, 6]
+    assert providers["http://a"].calls == ["batch"]
+
+
+def test_web3_is_shared_per_thread(monkeypatch):
+    monkeypatch.setattr(settings, "BSC_RPC_URL", "http://a")
+    monkeypatch.setattr(settings, "BSC_RPC_URLS", "")
+
+    w3 = bsc_provider_pool.get_bsc_web3()
+
+    assert bsc_provider_pool.get_bsc_web3() is w3
+    assert w3.provider.pool is bsc_provider_pool.get_bsc_provider_pool()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+import workers.bsc_usdt_balance_updater as updater
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.closed = False
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return type("Result", (), {"rowcount": 2})()
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_balances_are_written_in_one_set_based_update(monkeypatch):
+    db = RecordingSession()
+    monkeypatch.setattr(updater, "SessionLocal", lambda: db)
+
+    updated = updater._update_wallet_balances(
+        [(11, Decimal("1.5")), (12, Decimal("0"))],
+        4242,
+    )
+
+    assert updated == 2
+    assert len(db.statements) == 1
+    assert db.commits == 1
+    assert db.closed
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE user_wallets SET")
+    assert "FROM (VALUES" in sql
+    assert "user_wallets.id = v.id" in sql
+    assert "user_wallets.usdt_balance_block <=" in sql
+
+
+def test_no_balances_skip_the_database(monkeypatch):
+    monkeypatch.setattr(
+        updater,
+        "SessionLocal",
+        lambda: (_ for _ in ()).throw(AssertionError("no session expected")),
+    )
+
+    assert updater._update_wallet_balances([], 1) == 0
+
+
+def test_balances_are_read_through_the_shared_balance_service(monkeypatch):
+    w3 = object()
+    calls = []
+
+    def fake_read_balances(w3_arg, addresses, *, block_identifier):
+        calls.append((w3_arg, list(addresses), block_identifier))
+        return {"0x" + "a" * 40: Decimal("2")}
+
+    monkeypatch.setattr(updater, "get_bsc_web3", lambda: w3)
+    monkeypatch.setattr(updater, "read_bsc_block_number", lambda w3_arg: 4242)
+    monkeypatch.setattr(updater, "read_bsc_usdt_balances", fake_read_balances)
+
+    block, balances = updater._read_balances_at_head(["0x" + "a" * 40])
+
+    assert block == 4242
+    assert balances == {"0x" + "a" * 40: Decimal("2")}
+    assert calls == [(w3, ["0x" + "a" * 40], 4242)]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import workers.bsc_withdrawal_processor as processor
+
+
+class FakeResult:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class LockSession:
+    def __init__(self, claimed=True):
+        self.claimed = claimed
+        self.statements: list[tuple[str, dict]] = []
+        self.closed = False
+
+    def execute(self, stmt, params=None):
+        self.statements.append((str(stmt), dict(params or {})))
+        return FakeResult(self.claimed)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_group_by_wallet_keeps_order_within_wallet():
+    targets = [(1, 10), (2, 20), (3, 10), (4, 30), (5, 20)]
+
+    assert processor.group_by_wallet(targets) == [(10, [1, 3]), (20, [2, 5]), (30, [4])]
+
+
+def test_sender_lock_is_transaction_scoped_and_case_insensitive():
+    db = LockSession()
+
+    processor.lock_sender(db, " 0xAbC ")
+
+    [(sql, params)] = db.statements
+    assert "pg_advisory_xact_lock" in sql
+    assert params == {"namespace": processor.SENDER_LOCK_NAMESPACE, "address": "0xabc"}
+
+
+def test_wallet_group_claimed_elsewhere_is_skipped(monkeypatch):
+    db = LockSession(claimed=False)
+    processed = []
+    monkeypatch.setattr(processor, "SessionLocal", lambda: db)
+    monkeypatch.setattr(processor, "process_one", lambda tr_id, db=None: processed.append(tr_id))
+
+    processor.process_wallet_group(10, [1, 3])
+
+    assert processed == []
+    assert [sql for sql, _ in db.statements if "unlock" in sql] == []
+    assert db.closed
+
+
+def test_wallet_group_shares_one_session_and_releases_the_claim(monkeypatch):
+    db = LockSession()
+    processed = []
+    monkeypatch.setattr(processor, "SessionLocal", lambda: db)
+    monkeypatch.setattr(
+        processor, "process_one", lambda tr_id, db=None: processed.append((tr_id, db))
+    )
+
+    processor.process_wallet_group(10, [1, 3])
+
+    assert processed == [(1, db), (3, db)]
+    sqls = [sql for sql, _ in db.statements]
+    assert "pg_try_advisory_lock" in sqls[0]
+    assert "pg_advisory_unlock" in sqls[-1]
+    assert db.closed
+
+
+def test_batch_runs_wallets_in_parallel_and_each_wallet_in_order(monkeypatch):
+    order: dict[int, list[int]] = {}
+    wallet_of = {1: 10, 2: 20, 3: 10, 4: 30}
+    active = 0
+    peak = 0
+    guard = threading.Lock()
+
+    def fake_process_one(tr_id, db=None):
+        nonlocal active, peak
+        with guard:
+            active += 1
+            peak = max(peak, active)
+            order.setdefault(wallet_of[tr_id], []).append(tr_id)
+        time.sleep(0.02)
+        with guard:
+            active -= 1
+
+    monkeypatch.setattr(processor, "SessionLocal", LockSession)
+    monkeypatch.setattr(processor, "process_one", fake_process_one)
+
+    targets = [(tr_id, wallet_of[tr_id]) for tr_id in (1, 2, 3, 4)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        asyncio.run(processor.process_batch(targets, executor))
+
+    assert order == {10: [1, 3], 20: [2], 30: [4]}
+    assert peak == 3
+
+
+def test_claim_query_takes_no_row_locks(monkeypatch):
+    captured = []
+
+    class FakeQuery:
+        def __init__(self):
+            self.for_update = None
+
+        def filter(self, *args):
+            return self
+
+        def order_by(self, *args):
+            return self
+
+        def limit(self, n):
+            return self
+
+        def with_for_update(self, **kwargs):
+            self.for_update = kwargs
+            return self
+
+        def all(self):
+            captured.append(self.for_update)
+            return [(7, 70)]
+
+    class FakeSession:
+        def query(self, *cols):
+            return FakeQuery()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(processor, "SessionLocal", FakeSession)
+
+    assert processor.load_processing_targets(5) == [(7, 70)]
+    assert captured == [None]
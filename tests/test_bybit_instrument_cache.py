@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.allocation.instrument_info import (
+    InstrumentInfoError,
+    get_instrument_info,
+)
+from app.bybit.instrument_cache import (
+    CATEGORY_MARKER_SYMBOL,
+    BybitInstrumentCache,
+)
+from app.bybit.instruments import (
+    BybitInstrumentInfoError,
+    query_category_instruments,
+    utcnow,
+)
+
+
+def _spot_row(symbol: str, *, qty_step: str = "0.0001") -> dict:
+    return {
+        "symbol": symbol,
+        "status": "Trading",
+        "baseCoin": symbol.replace("USDT", ""),
+        "quoteCoin": "USDT",
+        "lotSizeFilter": {
+            "basePrecision": qty_step,
+            "quotePrecision": "0.01",
+            "qtyStep": qty_step,
+            "minOrderQty": qty_step,
+            "maxOrderQty": "100",
+            "minOrderAmt": "5",
+            "maxMarketOrderQty": "10",
+        },
+        "priceFilter": {"tickSize": "0.01"},
+    }
+
+
+class FakeInstrumentsClient:
+    base_url = "https://api.bybit.com"
+
+    def __init__(self, pages: list[list[dict]], *, bulk_error: bool = False):
+        self.pages = pages
+        self.bulk_error = bulk_error
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def public_get(self, path, params):
+        with self.lock:
+            self.calls.append(dict(params))
+
+        assert path == "/v5/market/instruments-info"
+
+        if "symbol" in params:
+            rows = [
+                row
+                for page in self.pages
+                for row in page
+                if row["symbol"] == params["symbol"]
+            ]
+            return {"retCode": 0, "result": {"list": rows}}
+
+        if self.bulk_error:
+            raise RuntimeError("bulk endpoint down")
+
+        index = int(params.get("cursor") or 0)
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else ""
+        return {
+            "retCode": 0,
+            "result": {
+                "list": self.pages[index],
+                "nextPageCursor": next_cursor,
+            },
+        }
+
+
+def test_category_bulk_load_follows_cursor():
+    client = FakeInstrumentsClient(
+        [[_spot_row("BTCUSDT")], [_spot_row("ETHUSDT")]]
+    )
+
+    instruments = query_category_instruments(client, category="spot")
+
+    assert sorted(instruments) == ["BTCUSDT", "ETHUSDT"]
+    assert [call.get("cursor") for call in client.calls] == [None, "1"]
+
+
+def test_cache_serves_category_from_one_bulk_load():
+    client = FakeInstrumentsClient(
+        [[_spot_row("BTCUSDT"), _spot_row("ETHUSDT", qty_step="0.001")]]
+    )
+    cache = BybitInstrumentCache(ttl_sec=600, persist=False)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        infos = list(
+            executor.map(
+                lambda symbol: cache.get(client, category="spot", symbol=symbol),
+                ["BTCUSDT", "ETHUSDT", "btcusdt", "ETHUSDT"],
+            )
+        )
+
+    assert [info.symbol for info in infos] == [
+        "BTCUSDT",
+        "ETHUSDT",
+        "BTCUSDT",
+        "ETHUSDT",
+    ]
+    assert infos[1].qty_step == Decimal("0.001")
+    assert client.calls == [{"category": "spot", "limit": 1000}]
+
+
+def test_unknown_symbol_falls_back_to_single_query_and_raises():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT")]])
+    cache = BybitInstrumentCache(ttl_sec=600, persist=False)
+
+    with pytest.raises(BybitInstrumentInfoError, match="not found"):
+        cache.get(client, category="spot", symbol="NEWUSDT")
+
+    assert client.calls[-1] == {"category": "spot", "symbol": "NEWUSDT"}
+
+
+def test_failed_bulk_load_uses_per_symbol_queries_until_retry():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT"), _spot_row("ETHUSDT")]], bulk_error=True)
+    cache = BybitInstrumentCache(ttl_sec=600, retry_sec=60, persist=False)
+
+    assert cache.get(client, category="spot", symbol="BTCUSDT").symbol == "BTCUSDT"
+    assert cache.get(client, category="spot", symbol="ETHUSDT").symbol == "ETHUSDT"
+    assert cache.get(client, category="spot", symbol="BTCUSDT").symbol == "BTCUSDT"
+
+    bulk_calls = [call for call in client.calls if "symbol" not in call]
+    assert len(bulk_calls) == 1
+    assert len(client.calls) == 3
+
+
+def test_invalidate_forces_reload():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT")]])
+    cache = BybitInstrumentCache(ttl_sec=600, persist=False)
+
+    cache.get(client, category="spot", symbol="BTCUSDT")
+    client.pages = [[_spot_row("BTCUSDT", qty_step="0.01")]]
+
+    assert cache.get(client, category="spot", symbol="BTCUSDT").qty_step == Decimal("0.0001")
+
+    cache.invalidate(category="spot")
+
+    assert cache.get(client, category="spot", symbol="BTCUSDT").qty_step == Decimal("0.01")
+    assert len(client.calls) == 2
+
+
+class FakePersistedSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, stmt):
+        rows = self.rows
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows))
+
+    def commit(self):
+        pass
+
+
+def _persisted(symbol: str, row_json: dict, *, age_sec: int = 0):
+    return SimpleNamespace(
+        symbol=symbol,
+        row_json=row_json,
+        captured_at=utcnow() - timedelta(seconds=age_sec),
+    )
+
+
+def test_persisted_symbol_rows_without_bulk_marker_do_not_complete_category():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT"), _spot_row("ETHUSDT")]])
+    rows = [_persisted("BTCUSDT", _spot_row("BTCUSDT"))]
+    cache = BybitInstrumentCache(
+        ttl_sec=600,
+        persist=True,
+        session_factory=lambda: FakePersistedSession(rows),
+    )
+
+    assert cache.get(client, category="spot", symbol="ETHUSDT").symbol == "ETHUSDT"
+    assert client.calls == [{"category": "spot", "limit": 1000}]
+
+
+def test_persisted_bulk_marker_warms_category_without_network():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT")]])
+    rows = [
+        _persisted("BTCUSDT", _spot_row("BTCUSDT")),
+        _persisted(CATEGORY_MARKER_SYMBOL, {"count": 1}, age_sec=60),
+    ]
+    cache = BybitInstrumentCache(
+        ttl_sec=600,
+        persist=True,
+        session_factory=lambda: FakePersistedSession(rows),
+    )
+
+    assert cache.get(client, category="spot", symbol="BTCUSDT").symbol == "BTCUSDT"
+    assert client.calls == []
+
+
+def test_zero_ttl_disables_cache():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT")]])
+    cache = BybitInstrumentCache(ttl_sec=0, persist=False)
+
+    cache.get(client, category="spot", symbol="BTCUSDT")
+    cache.get(client, category="spot", symbol="BTCUSDT")
+
+    assert client.calls == [
+        {"category": "spot", "symbol": "BTCUSDT"},
+        {"category": "spot", "symbol": "BTCUSDT"},
+    ]
+
+
+def test_allocation_instrument_info_reads_through_shared_cache():
+    client = FakeInstrumentsClient([[_spot_row("BTCUSDT")]])
+
+    first = get_instrument_info(client, category="spot", symbol="BTCUSDT")
+    second = get_instrument_info(client, category="SPOT", symbol="btcusdt")
+
+    assert first == second
+    assert first.qty_step == Decimal("0.0001")
+    assert len(client.calls) == 1
+
+    with pytest.raises(InstrumentInfoError, match="Instrument not found"):
+        get_instrument_info(client, category="spot", symbol="NEWUSDT")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.allocation.bybit_snapshot_reader import (
+    _fetch_bybit_readonly_raw_data,
+)
+from app.bybit.client import BybitApiError
+from app.bybit.instrument_cache import invalidate_instrument_cache
+
+
+class FakeSnapshotClient:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, path, params):
+        with self.lock:
+            self.calls.append((path, dict(params)))
+
+    def get(self, path, params):
+        self._record(path, params)
+
+        if path == "/v5/account/wallet-balance":
+            return {
+                "retCode": 0,
+                "result": {
+                    "list": [
+                        {
+                            "totalEquity": "100",
+                            "coin": [
+                                {
+                                    "coin": "BTC",
+                                    "walletBalance": "0.001",
+                                    "usdValue": "50",
+                                },
+                            ],
+                        }
+                    ]
+                },
+            }
+
+        if path == "/v5/asset/transfer/query-account-coins-balance":
+            raise BybitApiError("FUND wallet unavailable")
+
+        if path == "/v5/earn/position":
+            if params["category"] == "OnChain":
+                raise BybitApiError("category not supported")
+            return {"retCode": 0, "result": {"list": []}}
+
+        raise AssertionError(f"unexpected GET {path}")
+
+    def public_get(self, path, params):
+        self._record(path, params)
+
+        if path == "/v5/market/tickers":
+            return {
+                "retCode": 0,
+                "result": {
+                    "list": [
+                        {"symbol": "BTCUSDT", "lastPrice": "50000"},
+                    ]
+                },
+            }
+
+        if path == "/v5/market/instruments-info":
+            return {"retCode": 0, "result": {"list": []}}
+
+        raise AssertionError(f"unexpected PUBLIC GET {path}")
+
+    def paginate_get(self, path, params, **kwargs):
+        self._record(path, params)
+
+        if params.get("settleCoin") == "ETH":
+            raise BybitApiError("inverse ETH timeout")
+
+        if params.get("settleCoin") == "USDT":
+            return [
+                {
+                    "symbol": "ETHUSDT",
+                    "side": "Buy",
+                    "size": "0.1",
+                    "positionValue": "300",
+                }
+            ]
+
+        return []
+
+
+def _matrix_state(raw):
+    matrix = raw.endpoint_matrix
+    return (
+        matrix.required_endpoints,
+        matrix.successful_endpoints,
+        matrix.failed_endpoints,
+        dict(matrix.failures),
+        [dict(row) for row in matrix.suppressed_errors],
+        matrix.snapshot_complete,
+        matrix.completeness_reasons,
+    )
+
+
+def _fetch(executor=None):
+    # Start every fetch cold so serial and concurrent runs issue the
+    # same instruments-info calls.
+    invalidate_instrument_cache()
+    client = FakeSnapshotClient()
+    raw = _fetch_bybit_readonly_raw_data(
+        client,
+        inverse_coins=["BTC", "ETH"],
+        option_coins=["BTC"],
+        executor=executor,
+    )
+    return client, raw
+
+
+def test_concurrent_fetch_fills_matrix_exactly_like_serial():
+    serial_client, serial = _fetch()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent_client, concurrent = _fetch(executor)
+
+    assert _matrix_state(concurrent) == _matrix_state(serial)
+    assert any(
+        key.startswith("instruments:")
+        for key in concurrent.endpoint_matrix.failed_endpoints
+    )
+
+    assert sorted(
+        (path, sorted(params.items()))
+        for path, params in concurrent_client.calls
+    ) == sorted(
+        (path, sorted(params.items()))
+        for path, params in serial_client.calls
+    )
+
+
+def test_concurrent_fetch_keeps_row_grouping():
+    _, serial = _fetch()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        _, concurrent = _fetch(executor)
+
+    assert concurrent.linear_usdt_positions == serial.linear_usdt_positions
+    assert concurrent.linear_usdt_positions[0]["_wb_endpoint_category"] == "linear"
+    assert concurrent.inverse_positions == []
+    assert concurrent.earn_positions == serial.earn_positions
+    assert concurrent.spot_tickers == serial.spot_tickers
+
+
+def test_failed_endpoints_are_recorded_in_serial_order():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        _, raw = _fetch(executor)
+
+    matrix = raw.endpoint_matrix
+
+    assert matrix.required_endpoints[:9] == (
+        "wallet:UNIFIED",
+        "wallet:FUND",
+        "tickers:spot",
+        "positions:linear:USDT",
+        "positions:linear:USDC",
+        "positions:inverse:BTC",
+        "positions:inverse:ETH",
+        "positions:option:BTC",
+        "earn:FlexibleSaving",
+    )
+    assert matrix.failed_endpoints[:3] == (
+        "wallet:FUND",
+        "positions:inverse:ETH",
+        "earn:OnChain",
+    )
+    assert matrix.snapshot_complete is False
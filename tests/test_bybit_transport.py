@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+import requests
+
+import app.bybit.transport as transport_module
+from app.bybit.client import BybitApiError, BybitV5Client
+from app.bybit.transport import (
+    BybitRateLimiter,
+    BybitTransport,
+    endpoint_class,
+)
+
+
+class FakeResponse:
+    def __init__(
+        self,
+        payload: dict,
+        *,
+        status_code: int = 200,
+        headers: dict | None = None,
+    ):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f"HTTP {self.status_code}",
+                response=self,
+            )
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, responses: list[FakeResponse]):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+def _transport_with(
+    responses: list[FakeResponse],
+) -> tuple[BybitTransport, FakeSession]:
+    transport = BybitTransport(
+        pool_connections=1,
+        pool_maxsize=1,
+        backoff_max_sec=Decimal("0"),
+    )
+    session = FakeSession(responses)
+    transport._sessions["https://api.bybit.com"] = session
+    return transport, session
+
+
+def _client(transport: BybitTransport, *, retries: int = 2) -> BybitV5Client:
+    return BybitV5Client(
+        api_key="key",
+        api_secret="secret",
+        retries=retries,
+        backoff_sec=Decimal("0"),
+        transport=transport,
+    )
+
+
+def test_session_is_reused_per_base_url():
+    transport = BybitTransport(pool_connections=1, pool_maxsize=2)
+
+    first = transport.session_for("https://api.bybit.com/")
+    second = transport.session_for("https://api.bybit.com")
+    other = transport.session_for("https://api-testnet.bybit.com")
+
+    assert first is second
+    assert other is not first
+
+    transport.close()
+
+
+def test_clients_share_process_transport():
+    first = BybitV5Client(api_key="a", api_secret="b")
+    second = BybitV5Client(api_key="c", api_secret="d")
+
+    assert first.transport is second.transport
+
+
+def test_endpoint_class_strips_query_and_trailing_slash():
+    assert endpoint_class("/v5/order/create") == "/v5/order/create"
+    assert endpoint_class("/v5/market/tickers?category=spot") == "/v5/market/tickers"
+    assert endpoint_class("/v5/asset/") == "/v5/asset"
+
+
+def test_limiter_waits_for_reset_when_budget_exhausted(monkeypatch):
+    now_ms = [1_000_000]
+    slept = []
+
+    monkeypatch.setattr(
+        BybitRateLimiter,
+        "_now_ms",
+        staticmethod(lambda: now_ms[0]),
+    )
+
+    def fake_sleep(sec):
+        slept.append(sec)
+        now_ms[0] += int(sec * 1000)
+
+    monkeypatch.setattr(transport_module.time, "sleep", fake_sleep)
+
+    limiter = BybitRateLimiter()
+    key = ("key", "/v5/order/create")
+
+    limiter.update_from_headers(
+        key,
+        {
+            "X-Bapi-Limit": "10",
+            "X-Bapi-Limit-Status": "1",
+            "X-Bapi-Limit-Reset-Timestamp": str(now_ms[0] + 400),
+        },
+    )
+
+    assert limiter.acquire(key) == 0.0
+    assert limiter.acquire(key) == pytest.approx(0.4)
+    assert slept == [pytest.approx(0.4)]
+
+    # Refilled to the reported limit after the reset.
+    for _ in range(8):
+        assert limiter.acquire(key) == 0.0
+
+
+def test_limiter_buckets_are_keyed_by_api_key_and_endpoint():
+    limiter = BybitRateLimiter()
+    limiter.mark_exhausted(
+        ("key-a", "/v5/order/create"),
+        reset_at_ms=BybitRateLimiter._now_ms() + 60_000,
+    )
+
+    assert limiter.acquire(("key-b", "/v5/order/create")) == 0.0
+    assert limiter.acquire(("key-a", "/v5/order/realtime")) == 0.0
+
+
+def test_business_error_is_not_retried():
+    transport, session = _transport_with(
+        [
+            FakeResponse({"retCode": 170131, "retMsg": "Insufficient balance"}),
+        ]
+    )
+
+    with pytest.raises(BybitApiError, match="retCode=170131"):
+        _client(transport).post("/v5/order/create", {"symbol": "BTCUSDT"})
+
+    assert len(session.calls) == 1
+
+
+def test_rate_limited_call_is_retried_and_resigned():
+    transport, session = _transport_with(
+        [
+            FakeResponse({"retCode": 10006, "retMsg": "Too many visits"}),
+            FakeResponse({"retCode": 0, "result": {"list": []}}),
+        ]
+    )
+
+    data = _client(transport).get("/v5/order/realtime", {"category": "spot"})
+
+    assert data["retCode"] == 0
+    assert len(session.calls) == 2
+    assert session.calls[0][2]["params"] == {"category": "spot"}
+    assert "X-BAPI-SIGN" in session.calls[1][2]["headers"]
+
+
+def test_http_429_marks_bucket_exhausted():
+    transport, session = _transport_with(
+        [
+            FakeResponse(
+                {},
+                status_code=429,
+                headers={"X-Bapi-Limit-Reset-Timestamp": "1"},
+            ),
+            FakeResponse({"retCode": 0, "result": {}}),
+        ]
+    )
+
+    data = _client(transport).public_get("/v5/market/tickers", {"category": "spot"})
+
+    assert data["retCode"] == 0
+    assert len(session.calls) == 2
+
+
+def test_client_http_4xx_is_not_retried():
+    transport, session = _transport_with(
+        [
+            FakeResponse({}, status_code=403),
+        ]
+    )
+
+    with pytest.raises(BybitApiError, match="Bybit GET failed"):
+        _client(transport).get("/v5/account/wallet-balance")
+
+    assert len(session.calls) == 1
+
+
+def test_server_error_is_retried():
+    transport, session = _transport_with(
+        [
+            FakeResponse({}, status_code=502),
+            FakeResponse({"retCode": 0, "result": {}}),
+        ]
+    )
+
+    data = _client(transport).get("/v5/account/wallet-balance")
+
+    assert data["retCode"] == 0
+    assert len(session.calls) == 2
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from starlette.requests import Request
+
+from app.trading.chart_cache import (
+    CachedBars,
+    ChartBarsCache,
+    http_date,
+    is_not_modified,
+)
+from app.trading.routes import _chart_bars_response
+
+
+UTC = timezone.utc
+START = datetime(2026, 10, 16, tzinfo=UTC)
+
+
+def _bar(minutes: int, close: float = 1.0) -> tuple:
+    ts = START + timedelta(minutes=minutes)
+    return (int(ts.timestamp()), 1.0, 1.0, 1.0, close, None)
+
+
+class RecordingFetcher:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        return [
+            row
+            for row in self.rows
+            if start.timestamp() <= row[0] < end.timestamp()
+        ]
+
+
+def _get(cache, fetch, *, closed_before, end_minutes=60):
+    return cache.get_bars(
+        fund_id=1,
+        resolution="5",
+        start=START,
+        end=START + timedelta(minutes=end_minutes),
+        closed_before=closed_before,
+        fetch=fetch,
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_closed_range_is_served_from_memory(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ChartBarsCache, "_monotonic", staticmethod(clock))
+    cache = ChartBarsCache(max_entries=10, open_ttl_sec=5, closed_grace_sec=0)
+    fetch = RecordingFetcher([_bar(0), _bar(5), _bar(55)])
+    closed_before = START + timedelta(hours=2)
+
+    first = _get(cache, fetch, closed_before=closed_before)
+    clock.now += 60
+    second = _get(cache, fetch, closed_before=closed_before)
+
+    assert first.rows == second.rows == fetch.rows
+    assert second.immutable is True
+    assert len(fetch.calls) == 1
+
+
+def test_only_open_tail_is_reread_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ChartBarsCache, "_monotonic", staticmethod(clock))
+    cache = ChartBarsCache(max_entries=10, open_ttl_sec=5, closed_grace_sec=0)
+    fetch = RecordingFetcher([_bar(0), _bar(5), _bar(50, close=1.0)])
+    closed_before = START + timedelta(minutes=50)
+
+    first = _get(cache, fetch, closed_before=closed_before)
+    assert first.immutable is False
+
+    # TTL not expired: no DB read.
+    clock.now += 4
+    _get(cache, fetch, closed_before=closed_before)
+    assert len(fetch.calls) == 1
+
+    fetch.rows = [_bar(0), _bar(5), _bar(50, close=2.0)]
+    clock.now += 2
+
+    second = _get(cache, fetch, closed_before=closed_before)
+
+    assert fetch.calls[-1] == (closed_before, START + timedelta(minutes=60))
+    assert second.rows[-1][4] == 2.0
+    assert second.rows[:2] == [_bar(0), _bar(5)]
+
+
+def test_tail_moves_into_closed_part_as_buckets_close():
+    cache = ChartBarsCache(max_entries=10, open_ttl_sec=3600, closed_grace_sec=0)
+    fetch = RecordingFetcher([_bar(0), _bar(30), _bar(55)])
+
+    _get(cache, fetch, closed_before=START + timedelta(minutes=30))
+    later = _get(cache, fetch, closed_before=START + timedelta(minutes=60))
+
+    assert fetch.calls[-1][0] == START + timedelta(minutes=30)
+    assert later.rows == fetch.rows
+    assert later.immutable is True
+
+
+def test_concurrent_tail_refreshes_do_not_duplicate_closed_bars():
+    cache = ChartBarsCache(max_entries=10, open_ttl_sec=3600, closed_grace_sec=0)
+    rows = [_bar(0), _bar(30), _bar(55)]
+    closed_before = START + timedelta(minutes=60)
+    _get(cache, RecordingFetcher(rows), closed_before=START + timedelta(minutes=30))
+
+    inner = RecordingFetcher(rows)
+
+    class RacingFetcher(RecordingFetcher):
+        def __call__(self, start, end):
+            result = super().__call__(start, end)
+            # Another request for the same key finishes while this
+            # fetch is still in flight.
+            _get(cache, inner, closed_before=closed_before)
+            return result
+
+    outer = RacingFetcher(rows)
+    result = _get(cache, outer, closed_before=closed_before)
+
+    assert outer.calls == inner.calls == [(START + timedelta(minutes=30), START + timedelta(minutes=60))]
+    assert result.rows == rows
+
+
+def test_lru_eviction_bounds_entries():
+    cache = ChartBarsCache(max_entries=2, open_ttl_sec=5, closed_grace_sec=0)
+    fetch = RecordingFetcher([_bar(0)])
+    closed_before = START + timedelta(days=1)
+
+    for end_minutes in (10, 20, 30):
+        _get(cache, fetch, closed_before=closed_before, end_minutes=end_minutes)
+    _get(cache, fetch, closed_before=closed_before, end_minutes=10)
+
+    assert len(fetch.calls) == 4
+
+
+def test_cached_ranges_are_bounded_by_total_bars():
+    cache = ChartBarsCache(max_entries=10, max_bars=5, open_ttl_sec=5, closed_grace_sec=0)
+    fetch = RecordingFetcher([_bar(minutes) for minutes in range(0, 60, 5)])
+    closed_before = START + timedelta(days=1)
+
+    # 2 + 4 bars exceed the budget: the older range is evicted
+    _get(cache, fetch, closed_before=closed_before, end_minutes=10)
+    _get(cache, fetch, closed_before=closed_before, end_minutes=20)
+    _get(cache, fetch, closed_before=closed_before, end_minutes=10)
+    assert len(fetch.calls) == 3
+
+    # a range larger than the whole budget is served but never stored
+    _get(cache, fetch, closed_before=closed_before, end_minutes=60)
+    _get(cache, fetch, closed_before=closed_before, end_minutes=60)
+    assert len(fetch.calls) == 5
+    assert cache._ranges.total_weight <= 5
+
+
+def test_conditional_get_helpers():
+    last_modified = START + timedelta(hours=1)
+
+    assert is_not_modified(
+        etag='"abc"',
+        last_modified=last_modified,
+        if_none_match='W/"abc", "zzz"',
+        if_modified_since=None,
+    )
+    assert not is_not_modified(
+        etag='"abc"',
+        last_modified=last_modified,
+        if_none_match='"zzz"',
+        if_modified_since=http_date(last_modified),
+    )
+    assert is_not_modified(
+        etag='"abc"',
+        last_modified=last_modified,
+        if_none_match=None,
+        if_modified_since=http_date(last_modified),
+    )
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/chart/bars/wb10",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_bars_response_returns_304_for_matching_etag():
+    bars = CachedBars(
+        rows=[_bar(0)],
+        immutable=True,
+        last_modified=START,
+    )
+
+    first = _chart_bars_response(_request(), bars)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=86400"
+
+    second = _chart_bars_response(
+        _request({"If-None-Match": first.headers["etag"]}),
+        bars,
+    )
+    assert second.status_code == 304
+    assert second.body == b""
+    assert second.headers["etag"] == first.headers["etag"]
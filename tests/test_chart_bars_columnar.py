@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.dialects import postgresql
+
+import app.trading.chart_service as chart_service
+from app.models import FundChartMinute
+
+
+UTC = timezone.utc
+
+
+def _decimal_rows(count: int) -> list[dict]:
+    start = datetime(2026, 10, 16, tzinfo=UTC)
+    return [
+        {
+            "ts_utc": start + timedelta(minutes=index),
+            "open": Decimal("1.0000000001") + index,
+            "high": Decimal("1.2345678901") + index,
+            "low": Decimal("0.9999999999") + index,
+            "close": Decimal("1.1") + index,
+            "volume": None if index % 2 else Decimal("3.5"),
+        }
+        for index in range(count)
+    ]
+
+
+def _as_tuples(rows: list[dict]) -> list[tuple]:
+    return [
+        (
+            int(row["ts_utc"].timestamp()),
+            float(row["open"]),
+            float(row["high"]),
+            float(row["low"]),
+            float(row["close"]),
+            float(row["volume"]) if row["volume"] is not None else None,
+        )
+        for row in rows
+    ]
+
+
+def test_columnar_payload_matches_row_payload():
+    rows = _decimal_rows(5)
+
+    assert chart_service.bars_to_udf_payload(
+        _as_tuples(rows)
+    ) == chart_service._bars_to_udf_payload(rows)
+
+
+def test_empty_columnar_payload_is_no_data():
+    assert chart_service.bars_to_udf_payload([]) == {
+        "s": "no_data",
+        "t": [],
+        "o": [],
+        "h": [],
+        "l": [],
+        "c": [],
+        "v": [],
+    }
+
+
+def test_pre_encoded_payload_matches_json_response_body():
+    payload = chart_service.bars_to_udf_payload(
+        _as_tuples(_decimal_rows(3))
+    )
+
+    assert chart_service.encode_udf_payload(payload) == JSONResponse(payload).body
+
+
+def test_bar_query_selects_casted_columns_only():
+    captured = {}
+
+    class FakeSession:
+        def execute(self, stmt):
+            captured["sql"] = str(stmt.compile(dialect=postgresql.dialect()))
+            return SimpleNamespace(all=lambda: [(1, 1.0, 1.0, 1.0, 1.0, None)])
+
+    rows = chart_service._fetch_bar_tuples(
+        FakeSession(),
+        FundChartMinute,
+        FundChartMinute.fund_id == 1,
+        descending=True,
+        limit=1,
+    )
+
+    assert rows == [(1, 1.0, 1.0, 1.0, 1.0, None)]
+    sql = captured["sql"]
+    assert "CAST(fund_chart_minute.open AS FLOAT)" in sql
+    assert "EXTRACT(epoch FROM fund_chart_minute.ts_utc)" in sql
+    assert "fund_chart_minute.id" not in sql
+    assert "ORDER BY fund_chart_minute.ts_utc DESC" in sql
+
+
+def test_aggregated_resolution_is_bucketed_in_sql():
+    captured = {}
+
+    class FakeSession:
+        def execute(self, stmt):
+            captured["sql"] = str(stmt.compile(dialect=postgresql.dialect()))
+            return SimpleNamespace(all=lambda: [(1, 1.0, 2.0, 0.5, 1.5, 3.0)])
+
+    rows = chart_service._fetch_aggregated_rows(
+        FakeSession(),
+        fund_id=1,
+        resolution="60",
+        from_dt=datetime(2026, 10, 16, tzinfo=UTC),
+        to_dt=datetime(2026, 10, 17, tzinfo=UTC),
+    )
+
+    assert rows == [(1, 1.0, 2.0, 0.5, 1.5, 3.0)]
+    sql = captured["sql"]
+    assert "GROUP BY" in sql
+    assert "array_agg" in sql
+    assert "fund_chart_minute.id" not in sql
+    assert "ORDER BY buckets.ts_utc ASC" in sql
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+import app.navcalc.chart_rollup as chart_rollup
+import app.trading.chart_service as chart_service
+from app.navcalc.chart_rollup import ROLLUP_RESOLUTIONS, bucket_range
+from app.navcalc.db_writer import upsert_minute_state
+from app.navcalc.schemas import MinuteState
+
+
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize("resolution", ROLLUP_RESOLUTIONS)
+def test_bucket_range_matches_chart_service_buckets(resolution):
+    samples = [
+        datetime(2024, 2, 29, 23, 59, tzinfo=UTC),
+        datetime(2025, 12, 31, 21, 7, tzinfo=UTC),
+        datetime(2026, 3, 2, 0, 0, tzinfo=UTC),
+        datetime(2026, 10, 16, 13, 44, tzinfo=UTC),
+    ]
+
+    for ts in samples:
+        start, end = bucket_range(ts, resolution)
+        assert start == chart_service._bucket_start(ts, resolution)
+        assert end == chart_service._bucket_end(start, resolution)
+        assert start <= ts < end
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return SimpleNamespace(rowcount=1)
+
+    def commit(self):
+        self.commits += 1
+
+    def query(self, *args, **kwargs):
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args, **kwargs):
+        return self
+
+    def first(self):
+        return None
+
+
+def _minute_state(minute_ts: datetime) -> MinuteState:
+    return MinuteState(
+        fund_code="wb10",
+        minute_ts=minute_ts,
+        open_nav=Decimal("100"),
+        high_nav=Decimal("110"),
+        low_nav=Decimal("90"),
+        close_nav=Decimal("105"),
+        last_sample_ts=minute_ts + timedelta(seconds=50),
+        sample_count=5,
+        shares_outstanding=Decimal("10"),
+    )
+
+
+def _rollup_statements(db: RecordingSession) -> list:
+    return [
+        stmt
+        for stmt in db.statements
+        if getattr(stmt, "table", None) is not None
+        and stmt.table.name == "fund_chart_rollup"
+    ]
+
+
+def test_minute_upsert_returns_candles_without_touching_rollups():
+    db = RecordingSession()
+
+    minute_candle, daily_candle = upsert_minute_state(
+        db,
+        fund_id=7,
+        state=_minute_state(datetime(2026, 10, 16, 13, 44, tzinfo=UTC)),
+    )
+
+    assert _rollup_statements(db) == []
+    assert db.commits == 3
+    assert minute_candle == chart_rollup.Candle(
+        open=Decimal("10"),
+        high=Decimal("11"),
+        low=Decimal("9"),
+        close=Decimal("10.5"),
+    )
+    assert daily_candle == minute_candle
+
+
+def test_rollups_rebuild_only_when_the_bucket_changes(monkeypatch):
+    rebuilt = []
+    merged = []
+
+    def fake_refresh(db, *, fund_id, resolution, from_dt, to_dt):
+        rebuilt.append((resolution, from_dt))
+        return 1
+
+    def fake_merge(db, *, fund_id, resolution, bucket_ts, candle):
+        merged.append((resolution, bucket_ts, candle))
+
+    monkeypatch.setattr(chart_rollup, "refresh_chart_rollups", fake_refresh)
+    monkeypatch.setattr(chart_rollup, "merge_candle_into_rollup", fake_merge)
+
+    minute = chart_rollup.Candle(Decimal("1"), Decimal("2"), Decimal("1"), Decimal("2"))
+    daily = chart_rollup.Candle(Decimal("1"), Decimal("3"), Decimal("1"), Decimal("2"))
+    first = datetime(2026, 10, 16, 13, 52, tzinfo=UTC)
+
+    def tick(minute_ts, buckets):
+        return chart_rollup.upsert_chart_rollups_for_minute(
+            RecordingSession(),
+            fund_id=7,
+            minute_ts=minute_ts,
+            minute_candle=minute,
+            daily_candle=daily,
+            open_buckets=buckets,
+        )
+
+    buckets = tick(first, {})
+    assert sorted(r for r, _ in rebuilt) == sorted(ROLLUP_RESOLUTIONS)
+    assert merged == []
+
+    rebuilt.clear()
+    buckets = tick(first, buckets)
+    assert rebuilt == []
+    assert {r for r, _, _ in merged} == set(ROLLUP_RESOLUTIONS)
+    assert all(
+        candle is (daily if r in chart_rollup.DAILY_ROLLUP_RESOLUTIONS else minute)
+        for r, _, candle in merged
+    )
+
+    merged.clear()
+    tick(first + timedelta(minutes=3), buckets)
+    assert rebuilt == [
+        ("5", datetime(2026, 10, 16, 13, 50, tzinfo=UTC)),
+        ("5", datetime(2026, 10, 16, 13, 55, tzinfo=UTC)),
+    ]
+    assert "5" not in {r for r, _, _ in merged}
+
+
+def test_backfill_walks_day_aligned_chunks(monkeypatch):
+    ranges = []
+
+    def fake_refresh(db, *, fund_id, resolution, from_dt, to_dt):
+        ranges.append((resolution, from_dt, to_dt))
+        return 1
+
+    class MinMaxSession(RecordingSession):
+        def execute(self, stmt):
+            return SimpleNamespace(
+                one=lambda: (
+                    datetime(2026, 1, 1, 5, 3, tzinfo=UTC),
+                    datetime(2026, 3, 1, 10, 0, tzinfo=UTC),
+                )
+            )
+
+    monkeypatch.setattr(chart_rollup, "refresh_chart_rollups", fake_refresh)
+
+    counts = chart_rollup.backfill_chart_rollups(
+        MinMaxSession(),
+        fund_id=1,
+        resolutions=("240", "1M"),
+        chunk_days=30,
+    )
+
+    intraday = [(a, b) for resolution, a, b in ranges if resolution == "240"]
+    assert intraday[0][0] == datetime(2026, 1, 1, tzinfo=UTC)
+    assert intraday[-1][1] == datetime(2026, 3, 1, 12, tzinfo=UTC)
+    assert all(a < b for a, b in intraday)
+    assert all(
+        intraday[i][1] == intraday[i + 1][0]
+        for i in range(len(intraday) - 1)
+    )
+    assert counts == {"240": len(intraday), "1M": 1}
+    assert [(a, b) for resolution, a, b in ranges if resolution == "1M"] == [
+        (
+            datetime(2026, 1, 1, tzinfo=UTC),
+            datetime(2026, 4, 1, tzinfo=UTC),
+        )
+    ]
+
+
+def test_bars_for_rollup_resolution_use_one_range_query(monkeypatch):
+    fund = SimpleNamespace(id=3, code="wb10")
+    calls = []
+
+    def fake_fetch_rollup_rows(db, fund_id, resolution, from_dt, to_dt):
+        calls.append((fund_id, resolution, from_dt, to_dt))
+        return [
+            (
+                int(datetime(2026, 10, 16, 12, tzinfo=UTC).timestamp()),
+                1.5,
+                2.0,
+                1.0,
+                1.75,
+                None,
+            )
+        ]
+
+    def fail_fetch_rows(**kwargs):
+        raise AssertionError("raw candles must not be scanned")
+
+    monkeypatch.setattr(chart_service.settings, "CHART_ROLLUP_READS_ENABLED", True)
+    monkeypatch.setattr(chart_service, "_get_active_fund_by_code", lambda db, code: fund)
+    monkeypatch.setattr(chart_service, "_fetch_rollup_rows", fake_fetch_rollup_rows)
+    monkeypatch.setattr(chart_service, "_fetch_aggregated_rows", fail_fetch_rows)
+
+    to_dt = datetime(2026, 10, 16, 14, tzinfo=UTC)
+    payload = chart_service.get_chart_bars_payload(
+        db=None,
+        fund_code="wb10",
+        resolution="240",
+        from_ts=int((to_dt - timedelta(days=90)).timestamp()),
+        to_ts=int(to_dt.timestamp()),
+    )
+
+    assert payload == {
+        "s": "ok",
+        "t": [int(datetime(2026, 10, 16, 12, tzinfo=UTC).timestamp())],
+        "o": [1.5],
+        "h": [2.0],
+        "l": [1.0],
+        "c": [1.75],
+        "v": [None],
+    }
+    assert len(calls) == 1
+    assert calls[0][:2] == (3, "240")
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import app.compliance as compliance
+import workers.bsc_compliance_checker as checker
+from app.config import settings
+
+
+ADDR = "0x" + "a" * 40
+
+
+def _patch_providers(monkeypatch, *, chainalysis="ok", oracle="ok", ofac="ok", calls=None):
+    calls = calls if calls is not None else []
+
+    async def fake_chainalysis(address, session):
+        calls.append("chainalysis")
+        return chainalysis, {}
+
+    async def fake_oracle(address, session):
+        calls.append("oracle")
+        return oracle, {}
+
+    async def fake_ofac(address):
+        calls.append("ofac")
+        return ofac, {}
+
+    monkeypatch.setattr(compliance, "check_chainalysis_api", fake_chainalysis)
+    monkeypatch.setattr(compliance, "check_oracle", fake_oracle)
+    monkeypatch.setattr(compliance, "check_ofac_local", fake_ofac)
+    return calls
+
+
+def test_providers_run_concurrently(monkeypatch):
+    started = []
+    release = None
+
+    async def slow(name):
+        started.append(name)
+        await release.wait()
+        return "ok", {}
+
+    monkeypatch.setattr(compliance, "check_chainalysis_api", lambda a, s: slow("chainalysis"))
+    monkeypatch.setattr(compliance, "check_oracle", lambda a, s: slow("oracle"))
+    monkeypatch.setattr(compliance, "check_ofac_local", lambda a: slow("ofac"))
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        task = asyncio.create_task(compliance.screen_address(ADDR, None, use_cache=False))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert sorted(started) == ["chainalysis", "ofac", "oracle"]
+        release.set()
+        return await task
+
+    final, details = asyncio.run(run())
+    assert final == "ok"
+    assert details["oracle"]["status"] == "ok"
+
+
+def test_ok_verdict_is_cached_but_ofac_is_rechecked(monkeypatch):
+    compliance._VERDICT_CACHE.set(compliance.ScreeningVerdictCache(ttl_sec=60))
+    calls = _patch_providers(monkeypatch)
+
+    assert asyncio.run(compliance.screen_address(ADDR, None))[0] == "ok"
+    calls.clear()
+
+    final, details = asyncio.run(compliance.screen_address(ADDR.upper().replace("0X", "0x"), None))
+
+    assert final == "ok"
+    assert details["cached"] is True
+    assert calls == ["ofac"]
+
+
+def test_blocked_and_error_verdicts_are_never_cached(monkeypatch):
+    compliance._VERDICT_CACHE.set(compliance.ScreeningVerdictCache(ttl_sec=60))
+
+    _patch_providers(monkeypatch, oracle="blocked")
+    assert asyncio.run(compliance.screen_address(ADDR, None))[0] == "blocked"
+    assert compliance.get_screening_verdict_cache().get_ok(ADDR) is None
+
+    _patch_providers(monkeypatch, chainalysis="error")
+    assert asyncio.run(compliance.screen_address(ADDR, None))[0] == "pending_check"
+    assert compliance.get_screening_verdict_cache().get_ok(ADDR) is None
+
+    monkeypatch.setattr(settings, "COMPLIANCE_FAIL_CLOSED", False)
+    assert asyncio.run(compliance.screen_address(ADDR, None))[0] == "ok"
+    assert compliance.get_screening_verdict_cache().get_ok(ADDR) is None
+
+
+def test_cached_ok_is_dropped_when_ofac_now_matches(monkeypatch):
+    compliance._VERDICT_CACHE.set(compliance.ScreeningVerdictCache(ttl_sec=60))
+    _patch_providers(monkeypatch)
+    asyncio.run(compliance.screen_address(ADDR, None))
+
+    calls = _patch_providers(monkeypatch, ofac="blocked")
+    final, _details = asyncio.run(compliance.screen_address(ADDR, None))
+
+    assert final == "blocked"
+    assert sorted(calls) == ["chainalysis", "ofac", "ofac", "oracle"]
+
+
+def test_verdict_cache_expires_and_is_bounded(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(compliance.ScreeningVerdictCache, "_now", staticmethod(lambda: now[0]))
+    cache = compliance.ScreeningVerdictCache(ttl_sec=10, max_entries=2)
+
+    cache.put("0x1", "ok", {"n": 1})
+    cache.put("0x2", "ok", {"n": 2})
+    cache.put("0x3", "ok", {"n": 3})
+    assert cache.get_ok("0x1") is None
+    assert cache.get_ok("0x3") == {"n": 3}
+
+    now[0] = 111.0
+    assert cache.get_ok("0x3") is None
+
+
+def test_ofac_set_is_frozen_and_reloaded_on_mtime(monkeypatch, tmp_path):
+    fp = tmp_path / "ofac.json"
+    fp.write_text('["0xAA"]', encoding="utf-8")
+    monkeypatch.setattr(settings, "COMPLIANCE_OFAC_FILE", str(fp))
+    monkeypatch.setattr(compliance, "_ofac_cache", None)
+    monkeypatch.setattr(compliance, "_ofac_cache_mtime", None)
+
+    first = compliance._load_ofac_set()
+    assert isinstance(first, frozenset)
+    assert compliance._load_ofac_set() is first
+
+    fp.write_text('["0xBB"]', encoding="utf-8")
+    os.utime(fp, (1, 1))
+
+    assert compliance._load_ofac_set() == frozenset({"0xbb"})
+
+
+def test_batch_screens_concurrently_and_applies_serially(monkeypatch):
+    monkeypatch.setattr(settings, "COMPLIANCE_CONCURRENCY", 2)
+    in_flight = 0
+    peak = 0
+    applying = []
+    applied = []
+
+    async def fake_tx_from(session, tx_hash):
+        return None
+
+    async def fake_screen(address, session):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return "ok", {}
+
+    def fake_apply(transfer_id, final_status, details, freeze_reason):
+        assert applying == []
+        applying.append(transfer_id)
+        applied.append((transfer_id, final_status))
+        applying.clear()
+
+    monkeypatch.setattr(checker, "rpc_get_tx_from", fake_tx_from)
+    monkeypatch.setattr(checker, "screen_address", fake_screen)
+    monkeypatch.setattr(checker, "_apply_result", fake_apply)
+    monkeypatch.setattr(checker, "_apply_lock", None)
+
+    targets = [
+        SimpleNamespace(id=i, tx_hash=f"0x{i}", from_address=f"0x{i:040x}")
+        for i in range(1, 6)
+    ]
+
+    asyncio.run(checker.process_batch(targets, None))
+
+    assert peak == 2
+    assert sorted(applied) == [(i, "ok") for i in range(1, 6)]
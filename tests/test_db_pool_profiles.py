@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import pytest
+
+import app.db as db_module
+from app.config import settings
+from app.db import build_engine, build_read_engine, detect_process_role, pool_profile
+
+
+URL = "postgresql://u:p@127.0.0.1:1/x"
+
+
+@pytest.fixture(autouse=True)
+def no_configured_profile(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_PROFILE", "")
+
+
+@pytest.mark.parametrize(
+    ("main_module", "argv0", "role"),
+    [
+        ("workers.nav_collector", "", "collector"),
+        ("workers.bsc_withdrawal_processor", "", "worker"),
+        ("", "/opt/wildboar/.venv/bin/uvicorn", "web"),
+        ("uvicorn", "-m", "web"),
+        ("", "scripts/backfill_chart_rollups.py", "worker"),
+    ],
+)
+def test_role_is_detected_from_the_entrypoint(main_module, argv0, role):
+    assert detect_process_role(main_module, argv0) == role
+
+
+def test_configured_profile_wins(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_PROFILE", " Collector ")
+    assert detect_process_role("workers.bsc_confirmations", "") == "collector"
+
+    monkeypatch.setattr(settings, "DB_POOL_PROFILE", "batch")
+    with pytest.raises(ValueError):
+        detect_process_role("", "")
+
+
+def test_profile_reads_role_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_WORKER_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_WORKER_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DB_WORKER_POOL_RECYCLE_SEC", 600)
+    monkeypatch.setattr(settings, "DB_WORKER_STATEMENT_TIMEOUT_MS", 0)
+
+    profile = pool_profile("worker")
+
+    assert (profile.pool_size, profile.max_overflow) == (3, 1)
+    assert profile.pool_recycle_sec == 600
+    assert profile.statement_timeout_ms == 0
+
+
+def test_unset_sizes_follow_thread_counts(monkeypatch):
+    monkeypatch.setattr(settings, "DB_WORKER_POOL_SIZE", None)
+    monkeypatch.setattr(settings, "DB_WORKER_MAX_OVERFLOW", None)
+    monkeypatch.setattr(settings, "DB_COLLECTOR_POOL_SIZE", None)
+    monkeypatch.setattr(settings, "WITHDRAW_CONCURRENCY", 8)
+    monkeypatch.setattr(settings, "NAV_COLLECTOR_MAX_WORKERS", 16)
+
+    worker = pool_profile("worker")
+    assert (worker.pool_size, worker.max_overflow) == (17, 10)
+    assert pool_profile("collector").pool_size == 16
+
+    monkeypatch.setattr(settings, "WITHDRAW_CONCURRENCY", 1)
+    assert pool_profile("worker").pool_size == 5
+
+
+def test_engine_applies_pool_sizing_and_statement_timeout(monkeypatch):
+    captured = {}
+    real_create_engine = db_module.create_engine
+
+    def spy(url, **kwargs):
+        captured.update(kwargs)
+        return real_create_engine(url, **kwargs)
+
+    monkeypatch.setattr(db_module, "create_engine", spy)
+    engine = build_engine(URL, pool_profile("web"))
+
+    assert engine.pool.size() == settings.DB_WEB_POOL_SIZE
+    assert engine.pool._max_overflow == settings.DB_WEB_MAX_OVERFLOW
+    assert engine.pool._recycle == settings.DB_WEB_POOL_RECYCLE_SEC
+    assert captured["connect_args"] == {
+        "options": f"-c statement_timeout={settings.DB_WEB_STATEMENT_TIMEOUT_MS}",
+    }
+
+    captured.clear()
+    build_engine(URL, pool_profile("worker"))
+    assert captured["connect_args"] == {}
+
+
+def test_read_engine_without_replica_shares_the_primary_pool():
+    primary = build_engine(URL, pool_profile("web"))
+    read = build_read_engine(primary, "", pool_profile("web"))
+
+    assert read.pool is primary.pool
+    assert read.get_execution_options()["postgresql_readonly"] is True
+    assert "postgresql_readonly" not in primary.get_execution_options()
+
+
+def test_read_engine_uses_the_replica_when_configured():
+    primary = build_engine(URL, pool_profile("web"))
+    read = build_read_engine(primary, "postgresql://u:p@10.0.0.2:5432/x", pool_profile("web"))
+
+    assert read.pool is not primary.pool
+    assert read.url.host == "10.0.0.2"
+    assert read.get_execution_options()["postgresql_readonly"] is True
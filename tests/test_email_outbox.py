@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import smtplib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.email_outbox as email_outbox
+import app.emails as emails
+import workers.email_delivery_worker as worker
+from app.config import settings
+from app.email_outbox import (
+    OutboxMessage,
+    claim_due,
+    is_expired,
+    is_permanent_failure,
+    is_session_refusal,
+    retry_delay_sec,
+)
+from app.emails import SmtpSender
+from app.models import EmailOutbox
+
+
+UTC = timezone.utc
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+
+class FakeSmtp:
+    def __init__(self, log, fail_with=None):
+        self.log = log
+        self.fail_with = list(fail_with or [])
+        self.closed = False
+
+    def send_message(self, msg):
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.log.append(("send", msg["to"]))
+
+    def quit(self):
+        self.closed = True
+        self.log.append(("quit",))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def from_email(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_FROM_EMAIL", "noreply@example.com")
+
+
+def _sender(log, failures=None, max_messages=100):
+    failures = list(failures or [])
+    connections = []
+
+    def connect():
+        log.append(("connect",))
+        conn = FakeSmtp(log, failures.pop(0) if failures else None)
+        connections.append(conn)
+        return conn
+
+    return SmtpSender(max_messages=max_messages, connect=connect), connections
+
+
+def test_sender_reuses_one_session_across_messages():
+    log = []
+    sender, _ = _sender(log)
+
+    for i in range(3):
+        sender.send(f"u{i}@example.com", "s", "<p>x</p>")
+    sender.close()
+
+    assert log == [
+        ("connect",),
+        ("send", "u0@example.com"),
+        ("send", "u1@example.com"),
+        ("send", "u2@example.com"),
+        ("quit",),
+    ]
+
+
+def test_sender_reconnects_after_max_messages():
+    log = []
+    sender, connections = _sender(log, max_messages=2)
+
+    for i in range(3):
+        sender.send(f"u{i}@example.com", "s", "<p>x</p>")
+
+    assert len(connections) == 2
+    assert connections[0].closed
+
+
+def test_sender_retries_once_when_an_idle_session_was_dropped():
+    log = []
+    sender, connections = _sender(log, failures=[None, None])
+    sender.send("a@example.com", "s", "<p>x</p>")
+    connections[0].fail_with = [smtplib.SMTPServerDisconnected("gone")]
+
+    sender.send("b@example.com", "s", "<p>x</p>")
+
+    assert len(connections) == 2
+    assert log[-1] == ("send", "b@example.com")
+
+
+def test_send_email_only_enqueues_when_outbox_is_enabled(monkeypatch):
+    queued = []
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_ENABLED", True)
+    monkeypatch.setattr(emails, "enqueue_email", lambda *args: queued.append(args))
+    monkeypatch.setattr(emails, "deliver_email", lambda *a, **k: pytest.fail("sent inline"))
+
+    emails.send_email("a@example.com", "Code", "<p>123</p>")
+
+    assert queued == [("a@example.com", "Code", "<p>123</p>")]
+
+
+def test_enqueue_is_a_single_insert():
+    class Db:
+        def __init__(self):
+            self.added = []
+            self.commits = 0
+
+        def add(self, row):
+            row.id = 42
+            self.added.append(row)
+
+        def flush(self):
+            pass
+
+        def commit(self):
+            self.commits += 1
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    db = Db()
+
+    assert email_outbox.enqueue_email("a@example.com", "s", "<p/>", session_factory=lambda: db) == 42
+    assert db.commits == 1
+    assert [(r.to_email, r.status, r.attempts) for r in db.added] == [("a@example.com", "pending", 0)]
+
+
+class RecordingQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = {}
+
+    def filter(self, *criteria):
+        self.calls["filter"] = criteria
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, n):
+        self.calls["limit"] = n
+        return self
+
+    def with_for_update(self, **kwargs):
+        self.calls["for_update"] = kwargs
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+def test_claim_locks_due_rows_with_skip_locked():
+    row = EmailOutbox(id=1, to_email="a@example.com", subject="s", html_body="b", status="pending", attempts=2)
+    query = RecordingQuery([row])
+    db = type("Db", (), {"query": lambda self, model: query})()
+
+    claimed = claim_due(db, now=NOW, limit=5, lease_sec=60)
+
+    sql = str(query.calls["filter"][0].compile(dialect=postgresql.dialect()))
+    assert "email_outbox.status = %(status_1)s AND email_outbox.next_attempt_at <=" in sql
+    assert "email_outbox.status = %(status_2)s AND email_outbox.locked_until <" in sql
+    assert query.calls["limit"] == 5
+    assert query.calls["for_update"] == {"skip_locked": True}
+    assert claimed == [OutboxMessage(1, "a@example.com", "s", "b", 3)]
+    assert row.status == "sending"
+    assert row.locked_until == NOW + timedelta(seconds=60)
+
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_RETRY_BASE_SEC", 10)
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_RETRY_MAX_SEC", 60)
+
+    assert [retry_delay_sec(n) for n in range(1, 6)] == [10, 20, 40, 60, 60]
+
+
+def test_permanent_failures():
+    assert is_permanent_failure(smtplib.SMTPRecipientsRefused({"a@x": (550, b"no")}))
+    assert not is_permanent_failure(smtplib.SMTPRecipientsRefused({"a@x": (450, b"greylisted")}))
+    assert not is_permanent_failure(smtplib.SMTPDataError(554, b"rejected"))
+    assert not is_permanent_failure(smtplib.SMTPDataError(451, b"try later"))
+    assert not is_permanent_failure(smtplib.SMTPSenderRefused(553, b"bad sender", "noreply@x"))
+    assert not is_permanent_failure(smtplib.SMTPAuthenticationError(535, b"bad creds"))
+    assert not is_permanent_failure(ConnectionRefusedError())
+
+
+def test_sender_and_auth_refusals_are_session_errors():
+    assert is_session_refusal(smtplib.SMTPSenderRefused(553, b"bad sender", "noreply@x"))
+    assert is_session_refusal(smtplib.SMTPAuthenticationError(535, b"bad creds"))
+    assert is_session_refusal(smtplib.SMTPDataError(530, b"authentication required"))
+    assert not is_session_refusal(smtplib.SMTPDataError(554, b"rejected"))
+    assert not is_session_refusal(smtplib.SMTPRecipientsRefused({"a@x": (550, b"no")}))
+
+
+def _run_batch(monkeypatch, messages, deliver):
+    recorded = []
+
+    monkeypatch.setattr(worker, "claim_due", lambda db, **kw: list(messages))
+    monkeypatch.setattr(worker, "mark_sent", lambda db, m, now: recorded.append(("sent", m.id)))
+    monkeypatch.setattr(
+        worker,
+        "mark_failed",
+        lambda db, m, exc, now: recorded.append(("failed", m.id, type(exc).__name__)) or "pending",
+    )
+    monkeypatch.setattr(worker, "expire_stale", lambda db, now: 0)
+    monkeypatch.setattr(
+        worker,
+        "release",
+        lambda db, m, retry_at=None: recorded.append(("released", m.id) if retry_at is None else ("deferred", m.id)),
+    )
+
+    class Db:
+        commits = 0
+
+        def commit(self):
+            Db.commits += 1
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    closed = []
+    sender = type("Sender", (), {"close": lambda self: closed.append(1)})()
+    counters = worker.deliver_batch(sender, batch_size=10, lease_sec=60, session_factory=Db, deliver=deliver)
+    return counters, recorded, Db.commits, closed
+
+
+def _messages(n):
+    return [OutboxMessage(i, f"u{i}@example.com", "s", "b", 1) for i in range(1, n + 1)]
+
+
+def test_batch_records_outcomes_in_one_transaction(monkeypatch):
+    def deliver(to, subject, body, *, smtp_sender):
+        if to == "u2@example.com":
+            raise smtplib.SMTPRecipientsRefused({to: (550, b"no")})
+
+    counters, recorded, commits, closed = _run_batch(monkeypatch, _messages(3), deliver)
+
+    assert recorded == [("sent", 1), ("failed", 2, "SMTPRecipientsRefused"), ("sent", 3)]
+    assert commits == 2
+    assert closed == []
+    assert (counters.claimed, counters.sent, counters.retry) == (3, 2, 1)
+
+
+def test_connection_failure_stops_batch_and_releases_the_rest(monkeypatch):
+    def deliver(to, subject, body, *, smtp_sender):
+        if to == "u2@example.com":
+            raise ConnectionRefusedError("relay down")
+
+    counters, recorded, _, closed = _run_batch(monkeypatch, _messages(4), deliver)
+
+    assert recorded == [
+        ("sent", 1),
+        ("failed", 2, "ConnectionRefusedError"),
+        ("released", 3),
+        ("released", 4),
+    ]
+    assert closed == [1]
+    assert counters.released == 2
+
+
+def test_sender_refusal_releases_the_whole_rest_of_the_batch(monkeypatch):
+    def deliver(to, subject, body, *, smtp_sender):
+        if to == "u2@example.com":
+            raise smtplib.SMTPSenderRefused(553, b"sender not allowed", "noreply@example.com")
+
+    counters, recorded, _, closed = _run_batch(monkeypatch, _messages(3), deliver)
+
+    assert recorded == [("sent", 1), ("deferred", 2), ("deferred", 3)]
+    assert closed == [1]
+    assert (counters.failed, counters.retry, counters.released) == (0, 0, 2)
+    assert counters.session_refused is True
+
+
+def test_messages_past_max_age_give_up_regardless_of_attempts(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_AGE_SEC", 1200)
+    now = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    fresh = OutboxMessage(1, "a@x", "s", "b", 1, created_at=now - timedelta(minutes=5))
+    stale = OutboxMessage(2, "a@x", "s", "b", 1, created_at=now - timedelta(minutes=21))
+
+    assert not is_expired(fresh, now=now)
+    assert is_expired(stale, now=now)
+
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_AGE_SEC", 0)
+    assert not is_expired(stale, now=now)
+
+
+def test_empty_queue_does_no_second_transaction(monkeypatch):
+    counters, recorded, commits, _ = _run_batch(monkeypatch, [], lambda *a, **k: None)
+
+    assert counters.claimed == 0
+    assert recorded == []
+    assert commits == 1
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from openpyxl import load_workbook
+
+import app.dashboard.routes as dashboard_routes
+from app.dashboard.exports import iter_csv, iter_xlsx, stream_export
+
+
+UTC = timezone.utc
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+
+
+class FakeQuery:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+
+    def filter(self, *args):
+        return self
+
+    def join(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def yield_per(self, n):
+        self.calls.append(("yield_per", n))
+        return iter(self.rows)
+
+    def all(self):
+        self.calls.append(("all",))
+        return list(self.rows)
+
+
+class FakeSession:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.calls = []
+        self.closed = False
+
+    def query(self, *entities):
+        return FakeQuery(self.rows, self.calls)
+
+    def close(self):
+        self.closed = True
+
+
+def _transfer(i):
+    return SimpleNamespace(
+        id=i,
+        coin="USDT",
+        network=None,
+        amount=Decimal("10.50"),
+        type="deposit",
+        from_address="0xabc",
+        to_address=None,
+        tx_hash=f"0x{i:04x}",
+        status="confirmed",
+        compliance_status="ok",
+        tx_time=NOW,
+        detected_at=NOW,
+    )
+
+
+def _drain(response):
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(collect())
+
+
+def test_csv_is_emitted_in_row_chunks():
+    rows = ([i, Decimal("1.5"), NOW] for i in range(5))
+
+    chunks = list(iter_csv(["id", "amount", "at"], rows, chunk_rows=2))
+
+    assert len(chunks) == 3
+    text = b"".join(chunks).decode("utf-8")
+    assert text.startswith("\ufeff")
+    assert list(csv.reader(io.StringIO(text.lstrip("\ufeff")))) == [
+        ["id", "amount", "at"],
+        *[[str(i), "1.5", "2026-10-17 12:00:00"] for i in range(5)],
+    ]
+
+
+def test_xlsx_round_trips_through_write_only_workbook():
+    rows = ([i, Decimal("2.25"), {"k": i}] for i in range(3))
+
+    data = b"".join(iter_xlsx(["id", "amount", "meta"], rows, spool_bytes=1024))
+
+    ws = load_workbook(io.BytesIO(data), read_only=True)["data"]
+    assert [list(r) for r in ws.iter_rows(values_only=True)] == [
+        ["id", "amount", "meta"],
+        *[[i, "2.25", f'{{"k": {i}}}'] for i in range(3)],
+    ]
+
+
+def test_rows_are_not_read_until_the_body_is_consumed():
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    def fetch(db):
+        assert sessions == [db]
+        yield ["a"]
+        yield ["b"]
+
+    response = stream_export("csv", ["col"], fetch, "test", now=NOW, session_factory=factory)
+
+    assert sessions == []
+    assert response.media_type == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="test_20261017_120000.csv"'
+
+    body = b"".join(_drain(response)).decode("utf-8")
+    assert body.splitlines() == ["\ufeffcol", "a", "b"]
+    assert sessions[0].closed
+
+
+def test_unknown_format_falls_back_to_xlsx():
+    response = stream_export("pdf", ["col"], lambda db: iter(()), "test", now=NOW, session_factory=FakeSession)
+
+    assert response.headers["content-disposition"].endswith('.xlsx"')
+
+
+def test_transfer_export_reads_through_a_server_side_cursor():
+    db = FakeSession([_transfer(1), _transfer(2)])
+
+    rows = list(dashboard_routes._transfer_export_rows(db, 7))
+
+    assert db.calls == [("yield_per", dashboard_routes.settings.HISTORY_EXPORT_BATCH_ROWS)]
+    assert rows[0] == [
+        "USDT",
+        "BSC (BEP20)",
+        Decimal("10.50"),
+        "deposit",
+        dashboard_routes._transfer_address(_transfer(1)),
+        "0x0001",
+        "confirmed",
+        "ok",
+        NOW,
+    ]
+    assert len(rows) == 2
+
+
+def test_export_endpoint_authenticates_before_streaming(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(dashboard_routes, "_stream_user_id", lambda request: 7)
+
+    def fake_stream_export(fmt, headers, fetch_rows, prefix, *, now):
+        seen.update(fmt=fmt, headers=headers, prefix=prefix)
+        return fetch_rows
+
+    monkeypatch.setattr(dashboard_routes, "stream_export", fake_stream_export)
+
+    fetch_rows = dashboard_routes.history_export_transfers(request=SimpleNamespace(), format="csv")
+
+    assert seen == {
+        "fmt": "csv",
+        "headers": dashboard_routes.TRANSFER_EXPORT_HEADERS,
+        "prefix": "wildboar_transfers",
+    }
+    db = FakeSession([_transfer(3)])
+    assert [row[5] for row in fetch_rows(db)] == ["0x0003"]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.dashboard.history_feed as history_feed
+import app.dashboard.routes as dashboard_routes
+from app.dashboard.history_feed import (
+    HistoryCursorError,
+    decode_cursor,
+    encode_cursor,
+    query_transfers_page,
+)
+
+
+UTC = timezone.utc
+T0 = datetime(2026, 10, 16, 12, 0, 0, 123456, tzinfo=UTC)
+
+
+class FakeQuery:
+    def __init__(self, rows, version=None):
+        self.rows = rows
+        self.version = version
+        self.filters = []
+        self.limit_value = None
+
+    def filter(self, *conditions):
+        self.filters.extend(conditions)
+        return self
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def all(self):
+        return list(self.rows)[: self.limit_value]
+
+    def scalar(self):
+        return self.version
+
+
+class FakeSession:
+    def __init__(self, rows=(), version=None):
+        self.queries = []
+        self.rows = list(rows)
+        self.version = version
+
+    def query(self, *entities):
+        query = FakeQuery(self.rows, self.version)
+        self.queries.append(query)
+        return query
+
+
+def _sql(condition) -> str:
+    return str(
+        condition.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def _transfer(index: int, **overrides):
+    row = SimpleNamespace(
+        id=100 - index,
+        coin="USDT",
+        network="BSC (BEP20)",
+        amount=10 + index,
+        type="deposit",
+        from_address="0xfrom",
+        to_address="0xto",
+        tx_hash=f"0x{index:04x}",
+        status="success",
+        compliance_status="ok",
+        tx_time=T0 - timedelta(minutes=index),
+        detected_at=T0 - timedelta(minutes=index),
+    )
+    for name, value in overrides.items():
+        setattr(row, name, value)
+    return row
+
+
+def test_cursor_round_trip_keeps_microseconds():
+    cursor = decode_cursor(encode_cursor(T0, 42))
+
+    assert cursor.sort_ts == T0
+    assert cursor.id == 42
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1.x", "12"])
+def test_invalid_cursor_is_rejected(value):
+    with pytest.raises(HistoryCursorError):
+        decode_cursor(value)
+
+
+def test_transfers_page_returns_next_cursor_after_limit():
+    rows = [_transfer(index) for index in range(4)]
+    db = FakeSession(rows)
+
+    page = query_transfers_page(db, user_id=7, sub="all", limit=3)
+
+    assert [row.id for row in page.rows] == [100, 99, 98]
+    assert page.next_cursor == encode_cursor(rows[2].tx_time, rows[2].id)
+    assert db.queries[0].limit_value == 4
+
+
+def test_transfers_cursor_is_a_keyset_condition():
+    db = FakeSession([])
+    query_transfers_page(
+        db,
+        user_id=7,
+        sub="withdrawals",
+        cursor=decode_cursor(encode_cursor(T0, 55)),
+    )
+
+    sql = [_sql(condition) for condition in db.queries[0].filters]
+
+    assert "wallet_transfers.type = 'withdraw'" in sql
+    assert any(
+        "(coalesce(wallet_transfers.tx_time, wallet_transfers.detected_at), wallet_transfers.id) <" in item
+        for item in sql
+    )
+
+
+def test_since_returns_changed_rows_or_reset_when_too_many():
+    db = FakeSession([_transfer(0)])
+    page = query_transfers_page(db, user_id=7, sub="all", since=5, limit=3)
+
+    assert "wallet_transfers.history_version > 5" in [
+        _sql(condition) for condition in db.queries[0].filters
+    ]
+    assert len(page.rows) == 1
+    assert page.next_cursor is None
+    assert page.reset is False
+
+    db = FakeSession([_transfer(index) for index in range(4)])
+    page = query_transfers_page(db, user_id=7, sub="all", since=5, limit=3)
+
+    assert page.rows == []
+    assert page.reset is True
+
+
+def _live(db, **params):
+    defaults = {
+        "section": "transfers",
+        "sub": "all",
+        "cursor": None,
+        "since": None,
+        "limit": None,
+    }
+    defaults.update(params)
+    return dashboard_routes.history_live(
+        request=SimpleNamespace(cookies={}, headers={}, query_params={}),
+        principal=SimpleNamespace(user_id=7),
+        db=db,
+        **defaults,
+    )
+
+
+def test_live_history_is_not_modified_at_current_version(monkeypatch):
+    monkeypatch.setattr(dashboard_routes, "get_lang_from_request", lambda request: "en")
+
+    response = _live(FakeSession(version=12), since=12)
+
+    assert response.status_code == 304
+    assert response.body == b""
+
+
+def test_live_history_returns_changes_with_version(monkeypatch):
+    monkeypatch.setattr(dashboard_routes, "get_lang_from_request", lambda request: "en")
+    pending = _transfer(0, type="withdraw", status="processing", tx_time=None)
+
+    payload = _live(FakeSession([pending], version=13), since=12)
+
+    assert payload["version"] == 13
+    assert payload["changes_only"] is True
+    assert payload["next_cursor"] is None
+    assert payload["rows"][0]["id"] == pending.id
+    assert payload["rows"][0]["sort_ts"] == history_feed.sort_ts_us(T0)
+
+
+def test_live_history_rejects_bad_cursor(monkeypatch):
+    monkeypatch.setattr(dashboard_routes, "get_lang_from_request", lambda request: "en")
+
+    response = _live(FakeSession(version=1), cursor="nope")
+
+    assert response.status_code == 400
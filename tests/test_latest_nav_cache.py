@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import app.navcalc.latest_nav as latest_nav
+from app.navcalc.db_writer import upsert_nav_minute
+from app.navcalc.latest_nav import LatestNavCache, LatestNavPrice
+
+
+UTC = timezone.utc
+TS = datetime(2026, 10, 16, 13, 44, tzinfo=UTC)
+
+
+class _Scalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+
+class LatestTableSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    def execute(self, stmt):
+        self.reads += 1
+        return _Scalars(self.rows)
+
+
+def _row(fund_id: int, ts: datetime, nav: str, shares: str):
+    return SimpleNamespace(
+        fund_id=fund_id,
+        ts_utc=ts,
+        nav_usdt=Decimal(nav),
+        shares_outstanding=Decimal(shares),
+        price_usdt=latest_nav.share_price(Decimal(nav), Decimal(shares)),
+    )
+
+
+def _price(fund_id: int, ts: datetime, nav: str) -> LatestNavPrice:
+    return LatestNavPrice(
+        fund_id=fund_id,
+        ts_utc=ts,
+        nav_usdt=Decimal(nav),
+        shares_outstanding=Decimal("10"),
+        price_usdt=Decimal(nav) / Decimal("10"),
+    )
+
+
+def test_reads_table_once_per_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(LatestNavCache, "_now", staticmethod(lambda: clock[0]))
+
+    cache = LatestNavCache(ttl_sec=5)
+    db = LatestTableSession([_row(1, TS, "1100", "10"), _row(2, TS, "5", "0")])
+
+    prices = cache.get_many(db, [1, 2, 3])
+    assert prices[1].price_usdt == Decimal("110")
+    assert prices[2].price_usdt == Decimal("0")
+    assert 3 not in prices
+
+    clock[0] += 4
+    assert cache.get(db, 1).nav_usdt == Decimal("1100")
+    assert db.reads == 1
+
+    clock[0] += 2
+    cache.get_many(db)
+    assert db.reads == 2
+
+
+def test_published_write_is_visible_without_reread(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(LatestNavCache, "_now", staticmethod(lambda: clock[0]))
+
+    cache = LatestNavCache(ttl_sec=5)
+    db = LatestTableSession([_row(1, TS, "1100", "10")])
+    cache.get_many(db)
+
+    cache.publish(_price(1, TS + timedelta(minutes=1), "1200"))
+    cache.publish(_price(1, TS - timedelta(minutes=5), "900"))
+
+    assert cache.get(db, 1).nav_usdt == Decimal("1200")
+    assert db.reads == 1
+
+
+def test_refresh_does_not_roll_back_newer_published_price(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(LatestNavCache, "_now", staticmethod(lambda: clock[0]))
+
+    cache = LatestNavCache(ttl_sec=5)
+    cache.publish(_price(1, TS + timedelta(minutes=1), "1200"))
+
+    db = LatestTableSession([_row(1, TS, "1100", "10")])
+    assert cache.get(db, 1).nav_usdt == Decimal("1200")
+    assert db.reads == 1
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_nav_minute_upsert_keeps_latest_row_in_same_commit():
+    db = RecordingSession()
+
+    upsert_nav_minute(
+        db,
+        fund_id=7,
+        minute_ts=TS.replace(second=31),
+        nav_close_usdt=Decimal("1050"),
+        shares_outstanding=Decimal("10"),
+    )
+
+    assert [stmt.table.name for stmt in db.statements] == [
+        "fund_nav_minute",
+        "fund_nav_latest",
+    ]
+    assert db.commits == 1
+
+    sql = str(db.statements[1].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (fund_id) DO UPDATE" in sql
+    assert "WHERE fund_nav_latest.ts_utc <= excluded.ts_utc" in sql
+
+    cached = latest_nav.get_latest_nav_cache().get(
+        LatestTableSession([]),
+        7,
+    )
+    assert cached.ts_utc == TS
+    assert cached.price_usdt == Decimal("105")
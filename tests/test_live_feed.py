@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import app.live_feed as live_feed
+from app.live_feed import LiveFeedHub, payload_delta, stream_topic
+
+
+UTC = timezone.utc
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    def __init__(self, versions):
+        self.versions = versions
+        self.closed = False
+
+    def execute(self, stmt):
+        return _Rows(self.versions.items())
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def _nav(ts_minute: int, nav: str = "100"):
+    return {
+        1: SimpleNamespace(
+            ts_utc=datetime(2026, 10, 17, 12, ts_minute, tzinfo=UTC),
+            nav_usdt=Decimal(nav),
+            price_usdt=Decimal(nav) / 10,
+        ),
+    }
+
+
+def _hub(monkeypatch, nav_state, versions):
+    monkeypatch.setattr(live_feed, "get_latest_nav_prices", lambda db: nav_state["prices"])
+    return LiveFeedHub(poll_sec=60, session_factory=lambda: FakeSession(versions))
+
+
+def _frames(chunks):
+    out = []
+    for chunk in chunks:
+        if chunk.startswith("event: "):
+            head, data = chunk.strip().split("\n", 1)
+            out.append((head[len("event: "):], json.loads(data[len("data: "):])))
+    return out
+
+
+def test_delta_carries_changed_fields_and_rows():
+    old = {
+        "current_balance": "10.00",
+        "stable_symbol": "USDT",
+        "funds": [{"id": 1, "value": "5.00"}, {"id": 2, "value": "5.00"}],
+    }
+    new = {
+        "current_balance": "11.00",
+        "stable_symbol": "USDT",
+        "funds": [{"id": 1, "value": "6.00"}, {"id": 3, "value": "0.00"}],
+    }
+
+    assert payload_delta(old, new) == {
+        "current_balance": "11.00",
+        "funds": [{"id": 1, "value": "6.00"}, {"id": 3, "value": "0.00"}],
+        "funds_removed": [2],
+    }
+    assert payload_delta(new, new) == {}
+
+
+def test_topic_is_computed_once_per_watermark_for_all_subscribers(monkeypatch):
+    nav_state = {"prices": _nav(1)}
+    hub = _hub(monkeypatch, nav_state, {})
+    computed = []
+
+    def compute(db):
+        computed.append(1)
+        return {"price": len(computed)}
+
+    async def scenario():
+        kwargs = dict(compute=compute, watermark=lambda tick: tick.nav_mark)
+        async with hub.subscribe(("terminal", "wbx", "en"), **kwargs) as first:
+            async with hub.subscribe(("terminal", "wbx", "en"), **kwargs) as second:
+                assert first is second
+                assert first.subscribers == 2
+
+                await hub.refresh()
+                await hub.refresh()
+                assert len(computed) == 1
+
+                nav_state["prices"] = _nav(2)
+                await hub.refresh()
+                assert len(computed) == 2
+                assert first.payload == {"price": 2}
+
+        assert hub.topics == {}
+        hub._task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_nav_change_within_the_same_minute_moves_the_watermark(monkeypatch):
+    nav_state = {"prices": _nav(1, "100")}
+    hub = _hub(monkeypatch, nav_state, {})
+    computed = []
+
+    def compute(db):
+        computed.append(nav_state["prices"][1].nav_usdt)
+        return {"nav": str(computed[-1])}
+
+    async def scenario():
+        async with hub.subscribe(
+            ("terminal", "wbx", "en"),
+            compute=compute,
+            watermark=lambda tick: tick.nav_mark,
+        ):
+            nav_state["prices"] = _nav(1, "101")
+            await hub.refresh()
+        hub._task.cancel()
+
+    asyncio.run(scenario())
+
+    assert computed == [Decimal("100"), Decimal("101")]
+
+
+def test_user_topics_follow_history_versions(monkeypatch):
+    nav_state = {"prices": _nav(1)}
+    versions = {7: 1}
+    hub = _hub(monkeypatch, nav_state, versions)
+    computed = []
+
+    def compute(db):
+        computed.append(versions[7])
+        return {"history_version": versions[7]}
+
+    async def scenario():
+        async with hub.subscribe(
+            ("portfolio", 7, "en"),
+            compute=compute,
+            watermark=lambda tick: (tick.nav_mark, tick.history_versions.get(7, 0)),
+            user_id=7,
+        ) as topic:
+            await hub.refresh()
+            versions[7] = 2
+            await hub.refresh()
+            assert computed == [1, 2]
+            assert topic.version == 2
+        hub._task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_stream_sends_snapshot_then_deltas(monkeypatch):
+    nav_state = {"prices": _nav(1)}
+    hub = _hub(monkeypatch, nav_state, {})
+    state = {"balance": "1.00", "funds": [{"id": 1, "value": "1.00"}]}
+
+    async def scenario():
+        request = FakeRequest()
+        chunks = []
+
+        async with hub.subscribe(
+            ("portfolio", 1, "en"),
+            compute=lambda db: dict(state),
+            watermark=lambda tick: tick.nav_mark,
+        ) as topic:
+            async def consume():
+                async for chunk in stream_topic(
+                    request,
+                    topic,
+                    event="portfolio",
+                    delta_event="portfolio_delta",
+                    heartbeat_sec=0.01,
+                ):
+                    chunks.append(chunk)
+
+            consumer = asyncio.create_task(consume())
+            await asyncio.sleep(0.02)
+
+            state["balance"] = "2.00"
+            nav_state["prices"] = _nav(2)
+            await hub.refresh()
+            await asyncio.sleep(0.02)
+
+            request.disconnected = True
+            await asyncio.wait_for(consumer, timeout=1)
+        hub._task.cancel()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert chunks[0].startswith("retry: ")
+    assert ": ping\n\n" in chunks
+    assert _frames(chunks) == [
+        ("portfolio", {"balance": "1.00", "funds": [{"id": 1, "value": "1.00"}]}),
+        ("portfolio_delta", {"balance": "2.00"}),
+    ]
+
+
+def test_unchanged_recompute_does_not_wake_subscribers(monkeypatch):
+    nav_state = {"prices": _nav(1)}
+    hub = _hub(monkeypatch, nav_state, {})
+
+    async def scenario():
+        async with hub.subscribe(
+            ("terminal", "wbx", "en"),
+            compute=lambda db: {"price": "1"},
+            watermark=lambda tick: tick.nav_mark,
+        ) as topic:
+            event = topic.changed
+            nav_state["prices"] = _nav(2)
+            await hub.refresh()
+            assert topic.version == 1
+            assert not event.is_set()
+        hub._task.cancel()
+
+    asyncio.run(scenario())
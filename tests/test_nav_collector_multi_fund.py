@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import app.navcalc.collector as nav_collector
+import app.navcalc.portfolio_nav as portfolio_nav
+from app.navcalc.bybit_client import BybitApiError
+from app.navcalc.collector import FundCollectorState
+from app.navcalc.schemas import FundNavConfig
+
+
+def _cfg(
+    fund_code: str,
+    *,
+    testnet: bool = False,
+) -> FundNavConfig:
+    return FundNavConfig(
+        fund_code=fund_code,
+        provider="bybit_v5",
+        enabled=True,
+        collect_nav=True,
+        collect_breakdown=False,
+        env_prefix=f"FUND_{fund_code.upper()}",
+        bybit_api_key="key",
+        bybit_api_secret="secret",
+        bybit_testnet=testnet,
+    )
+
+
+class FakeNavClient:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, path, params):
+        with self.lock:
+            self.calls.append((path, dict(params)))
+
+    def get(self, path, **params):
+        self._record(path, params)
+
+        if path == "/v5/account/wallet-balance":
+            return {
+                "list": [
+                    {
+                        "totalEquity": "150",
+                        "coin": [
+                            {
+                                "coin": "USDT",
+                                "usdValue": "100",
+                                "walletBalance": "100",
+                                "equity": "100",
+                            },
+                            {
+                                "coin": "BTC",
+                                "usdValue": "50",
+                                "walletBalance": "0.001",
+                                "equity": "0.001",
+                            },
+                        ],
+                    }
+                ]
+            }
+
+        if path == "/v5/asset/transfer/query-account-coins-balance":
+            return {
+                "balance": [
+                    {"coin": "BTC", "walletBalance": "0.0002"},
+                    {"coin": "USDT", "walletBalance": "3"},
+                ]
+            }
+
+        if path == "/v5/earn/position":
+            if params["category"] == "FlexibleSaving":
+                return {
+                    "list": [
+                        {
+                            "coin": "USDT",
+                            "amount": "7",
+                            "totalPrincipalAmount": "7",
+                        }
+                    ]
+                }
+            return {"list": []}
+
+        if path == "/v5/crypto-loan/ongoing-orders":
+            raise BybitApiError(177003, "not available", path)
+
+        if path == "/v5/ins-loan/loan-order":
+            return {
+                "loanInfo": [
+                    {"loanCurrency": "USDT", "loanBalance": "2"}
+                ]
+            }
+
+        raise AssertionError(f"unexpected path {path}")
+
+    def public_get(self, path, **params):
+        self._record(path, params)
+        assert path == "/v5/market/tickers"
+        return {
+            "list": [
+                {"symbol": "BTCUSDT", "lastPrice": "50000"},
+            ]
+        }
+
+
+def _private_paths(client: FakeNavClient) -> list[str]:
+    return sorted(
+        path
+        for path, _ in client.calls
+        if path != "/v5/market/tickers"
+    )
+
+
+def test_concurrent_fetch_matches_serial_fetch():
+    serial_client = FakeNavClient()
+    serial = portfolio_nav.fetch_bybit_nav_inputs(serial_client)
+
+    concurrent_client = FakeNavClient()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent = portfolio_nav.fetch_bybit_nav_inputs(
+            concurrent_client,
+            executor=executor,
+        )
+
+    assert concurrent == serial
+    assert serial.funding_total == Decimal("13")
+    assert serial.earn_total == Decimal("5")
+    assert [row["product"] for row in serial.earn_rows] == [
+        "FlexibleSaving",
+        "VipLoan",
+    ]
+    assert _private_paths(concurrent_client) == _private_paths(
+        serial_client
+    )
+
+
+def test_shared_prices_skip_per_fund_ticker_fetch():
+    client = FakeNavClient()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        inputs = portfolio_nav.fetch_bybit_nav_inputs(
+            client,
+            prices={"BTCUSDT": Decimal("50000")},
+            executor=executor,
+        )
+
+    assert inputs.funding_total == Decimal("13")
+    assert all(
+        path != "/v5/market/tickers"
+        for path, _ in client.calls
+    )
+
+
+def test_build_nav_result_includes_settlement_wallet():
+    inputs = portfolio_nav.fetch_bybit_nav_inputs(FakeNavClient())
+
+    result = portfolio_nav.build_nav_result(
+        _cfg("wb_test"),
+        inputs,
+        settlement_wallet_usdt=Decimal("0.5"),
+    )
+
+    assert result.nav_usd == Decimal("168.5")
+    assert result.raw_meta["bsc_settlement_wallet_usdt"] == "0.5"
+
+
+def test_collect_all_funds_fetches_tickers_once_per_network(
+    monkeypatch,
+):
+    funds = [
+        FundCollectorState(
+            cfg=_cfg("wb_test"),
+            fund_id=1,
+            client=FakeNavClient(),
+        ),
+        FundCollectorState(
+            cfg=_cfg("wb10"),
+            fund_id=2,
+            client=FakeNavClient(),
+        ),
+        FundCollectorState(
+            cfg=_cfg("btc_fund", testnet=True),
+            fund_id=3,
+            client=FakeNavClient(),
+        ),
+    ]
+    sampled = {}
+
+    def fake_collect_fund_sample(fund, *, prices=None, executor=None):
+        sampled[fund.cfg.fund_code] = (prices, executor)
+
+    monkeypatch.setattr(
+        nav_collector,
+        "collect_fund_sample",
+        fake_collect_fund_sample,
+    )
+
+    with (
+        ThreadPoolExecutor(max_workers=3) as fund_pool,
+        ThreadPoolExecutor(max_workers=4) as endpoint_pool,
+    ):
+        nav_collector.collect_all_funds_once(
+            funds,
+            fund_pool=fund_pool,
+            endpoint_pool=endpoint_pool,
+        )
+
+    ticker_calls = [
+        sum(
+            1
+            for path, _ in fund.client.calls
+            if path == "/v5/market/tickers"
+        )
+        for fund in funds
+    ]
+    assert ticker_calls == [1, 0, 1]
+
+    assert set(sampled) == {"wb_test", "wb10", "btc_fund"}
+    assert sampled["wb_test"][0] is sampled["wb10"][0]
+    assert sampled["wb_test"][0] == {"BTCUSDT": Decimal("50000")}
+    assert all(
+        executor is endpoint_pool
+        for _, executor in sampled.values()
+    )
+
+
+def test_rollup_refresh_failure_is_logged_and_forces_rebuild(monkeypatch):
+    class FakeDb:
+        rolled_back = False
+
+        def rollback(self):
+            self.rolled_back = True
+
+    def failing_upsert(db, **kwargs):
+        raise RuntimeError("deadlock detected")
+
+    monkeypatch.setattr(
+        nav_collector,
+        "upsert_chart_rollups_for_minute",
+        failing_upsert,
+    )
+    fund = FundCollectorState(
+        cfg=_cfg("wb10"),
+        fund_id=2,
+        client=FakeNavClient(),
+        rollup_buckets={"5": datetime(2026, 10, 16, 13, 50, tzinfo=timezone.utc)},
+    )
+    db = FakeDb()
+
+    nav_collector._refresh_chart_rollups(
+        db,
+        fund,
+        minute_ts=datetime(2026, 10, 16, 13, 52, tzinfo=timezone.utc),
+        minute_candle=None,
+        daily_candle=None,
+    )
+
+    assert db.rolled_back
+    assert fund.rollup_buckets == {}
+
+
+def test_fund_init_failures_are_isolated_and_retried(monkeypatch):
+    attempts = []
+    broken = {"wb10"}
+
+    def fake_init(cfg):
+        attempts.append(cfg.fund_code)
+        if cfg.fund_code in broken:
+            raise nav_collector.NavConfigError("no shares_outstanding_current")
+        return FundCollectorState(cfg=cfg, fund_id=1, client=FakeNavClient())
+
+    monkeypatch.setattr(nav_collector, "init_fund_collector_state", fake_init)
+
+    ready, pending = nav_collector.init_pending_funds([_cfg("wb_test"), _cfg("wb10")])
+    assert [fund.cfg.fund_code for fund in ready] == ["wb_test"]
+    assert [cfg.fund_code for cfg in pending] == ["wb10"]
+
+    broken.clear()
+    ready, pending = nav_collector.init_pending_funds(pending)
+    assert [fund.cfg.fund_code for fund in ready] == ["wb10"]
+    assert pending == []
+    assert attempts == ["wb_test", "wb10", "wb10"]
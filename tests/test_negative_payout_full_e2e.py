@@ -653,6 +653,17 @@ def test_negative_payout_full_fake_e2e(
             ]
         ),
     )
+    monkeypatch.setattr(
+        payout_flow,
+        "read_bsc_usdt_balances",
+        lambda value, addresses, *,
+        block_identifier: {
+            address.lower(): observed_balances[
+                address.lower()
+            ]
+            for address in addresses
+        },
+    )
 
     payout_flow._refresh_live_balances_after_confirmed_payouts(
         db,
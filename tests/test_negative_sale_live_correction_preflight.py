@@ -135,7 +135,7 @@ def test_source_scan_caps_snapshot_by_live_balance(
 
     monkeypatch.setattr(
         service,
-        "query_instrument_info",
+        "cached_instrument_info",
         lambda *args, **kwargs: (
             instrument
         ),
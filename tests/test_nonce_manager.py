@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from hexbytes import HexBytes
+from web3.exceptions import Web3RPCError
+
+import app.settlement.nonce_manager as nonce_manager
+from app.settlement.nonce_manager import (
+    NONCE_STATUS_RELEASED,
+    NONCE_STATUS_RESERVED,
+    NONCE_STATUS_SENT,
+    ReservationState,
+    nonce_lease,
+    plan_reconcile,
+)
+
+
+UTC = timezone.utc
+NOW = datetime(2026, 10, 17, 12, tzinfo=UTC)
+STALE = timedelta(seconds=300)
+
+
+def _r(nonce: int, status: str, age_sec: int = 0) -> ReservationState:
+    return ReservationState(
+        nonce=nonce,
+        status=status,
+        updated_at=NOW - timedelta(seconds=age_sec),
+    )
+
+
+def _plan(reservations, *, next_nonce, latest, pending):
+    return plan_reconcile(
+        next_nonce=next_nonce,
+        reservations=reservations,
+        latest=latest,
+        pending=pending,
+        now=NOW,
+        stale_after=STALE,
+    )
+
+
+def test_mined_reservations_are_deleted():
+    plan = _plan(
+        [_r(5, NONCE_STATUS_SENT), _r(6, NONCE_STATUS_SENT), _r(7, NONCE_STATUS_SENT)],
+        next_nonce=8,
+        latest=7,
+        pending=8,
+    )
+
+    assert plan.delete == [5, 6]
+    assert plan.release == []
+    assert plan.add_released == []
+    assert plan.next_nonce == 8
+
+
+def test_fresh_unbroadcast_reservation_is_kept():
+    plan = _plan(
+        [_r(10, NONCE_STATUS_RESERVED, age_sec=5)],
+        next_nonce=11,
+        latest=10,
+        pending=10,
+    )
+
+    assert plan.release == []
+    assert plan.delete == []
+    assert plan.next_nonce == 11
+
+
+def test_stale_tail_reservation_rewinds_next_nonce():
+    plan = _plan(
+        [_r(10, NONCE_STATUS_RESERVED, age_sec=600)],
+        next_nonce=11,
+        latest=10,
+        pending=10,
+    )
+
+    assert plan.next_nonce == 10
+    assert plan.delete == [10]
+    assert plan.release == []
+
+
+def test_stale_reservation_below_live_one_becomes_gap():
+    plan = _plan(
+        [
+            _r(10, NONCE_STATUS_SENT, age_sec=600),
+            _r(11, NONCE_STATUS_RESERVED, age_sec=5),
+        ],
+        next_nonce=12,
+        latest=10,
+        pending=10,
+    )
+
+    assert plan.release == [10]
+    assert plan.delete == []
+    assert plan.next_nonce == 12
+
+
+def test_missing_rows_between_pending_and_next_are_filled():
+    plan = _plan(
+        [_r(13, NONCE_STATUS_RESERVED, age_sec=5)],
+        next_nonce=14,
+        latest=10,
+        pending=11,
+    )
+
+    assert plan.add_released == [11, 12]
+    assert plan.next_nonce == 14
+
+
+def test_external_sends_raise_next_nonce():
+    plan = _plan(
+        [_r(4, NONCE_STATUS_RELEASED)],
+        next_nonce=5,
+        latest=9,
+        pending=12,
+    )
+
+    assert plan.delete == [4]
+    assert plan.next_nonce == 12
+    assert plan.add_released == []
+
+
+class FakeEth:
+    def __init__(self, nonce: int):
+        self.nonce = nonce
+        self.calls = []
+
+    def get_transaction_count(self, *args):
+        self.calls.append(args)
+        return self.nonce
+
+
+def test_disabled_lease_keeps_original_rpc(monkeypatch):
+    monkeypatch.setattr(nonce_manager.settings, "BSC_NONCE_MANAGER_ENABLED", False)
+    w3 = SimpleNamespace(eth=FakeEth(7))
+
+    with nonce_lease(w3, "0xabc") as lease:
+        assert lease.nonce == 7
+    with nonce_lease(w3, "0xabc", block_identifier=None) as lease:
+        lease.sent("0xhash")
+
+    assert w3.eth.calls == [("0xabc", "pending"), ("0xabc",)]
+
+
+def test_enabled_lease_releases_unsent_nonce(monkeypatch):
+    monkeypatch.setattr(nonce_manager.settings, "BSC_NONCE_MANAGER_ENABLED", True)
+    events = []
+    monkeypatch.setattr(nonce_manager, "reserve_nonce", lambda w3, address: 21)
+    monkeypatch.setattr(
+        nonce_manager,
+        "release_nonce",
+        lambda address, nonce: events.append(("release", address, nonce)),
+    )
+    monkeypatch.setattr(
+        nonce_manager,
+        "mark_nonce_sent",
+        lambda address, nonce, tx_hash: events.append(("sent", address, nonce, tx_hash)),
+    )
+    w3 = SimpleNamespace(eth=FakeEth(0))
+
+    with pytest.raises(RuntimeError):
+        with nonce_lease(w3, "0xabc") as lease:
+            assert lease.nonce == 21
+            raise RuntimeError("sign failed")
+
+    with nonce_lease(w3, "0xabc") as lease:
+        lease.sent("0xhash")
+
+    assert events == [
+        ("release", "0xabc", 21),
+        ("sent", "0xabc", 21, "0xhash"),
+    ]
+    assert w3.eth.calls == []
+
+
+class BroadcastEth(FakeEth):
+    def __init__(self, outcome):
+        super().__init__(0)
+        self.outcome = outcome
+
+    def send_raw_transaction(self, raw):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def _managed_events(monkeypatch, *, mark_sent_error=None):
+    monkeypatch.setattr(nonce_manager.settings, "BSC_NONCE_MANAGER_ENABLED", True)
+    events = []
+    monkeypatch.setattr(nonce_manager, "reserve_nonce", lambda w3, address: 21)
+    monkeypatch.setattr(
+        nonce_manager,
+        "release_nonce",
+        lambda address, nonce: events.append(("release", nonce)),
+    )
+
+    def mark_sent(address, nonce, tx_hash):
+        if mark_sent_error is not None:
+            raise mark_sent_error
+        events.append(("sent", nonce, tx_hash))
+
+    monkeypatch.setattr(nonce_manager, "mark_nonce_sent", mark_sent)
+    return events
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        TimeoutError("read timed out"),
+        ConnectionResetError("connection dropped"),
+        Web3RPCError("{'code': -32000, 'message': 'nonce too low'}"),
+        Web3RPCError("already known"),
+    ],
+)
+def test_ambiguous_broadcast_failure_keeps_nonce_reserved(monkeypatch, error):
+    events = _managed_events(monkeypatch)
+    w3 = SimpleNamespace(eth=BroadcastEth(error))
+
+    with pytest.raises(type(error)):
+        with nonce_lease(w3, "0xabc") as lease:
+            lease.send_raw(w3, b"raw")
+
+    assert events == []
+
+
+def test_explicit_rpc_rejection_releases_nonce(monkeypatch):
+    events = _managed_events(monkeypatch)
+    w3 = SimpleNamespace(eth=BroadcastEth(Web3RPCError("insufficient funds for gas * price + value")))
+
+    with pytest.raises(Web3RPCError):
+        with nonce_lease(w3, "0xabc") as lease:
+            lease.send_raw(w3, b"raw")
+
+    assert events == [("release", 21)]
+
+
+def test_successful_broadcast_is_recorded(monkeypatch):
+    events = _managed_events(monkeypatch)
+    w3 = SimpleNamespace(eth=BroadcastEth(HexBytes("0x01ab")))
+
+    with nonce_lease(w3, "0xabc") as lease:
+        assert lease.send_raw(w3, b"raw") == HexBytes("0x01ab")
+
+    assert events == [("sent", 21, "0x01ab")]
+
+
+def test_failed_sent_record_does_not_release_broadcast_nonce(monkeypatch):
+    events = _managed_events(monkeypatch, mark_sent_error=RuntimeError("db down"))
+    w3 = SimpleNamespace(eth=BroadcastEth(HexBytes("0x01ab")))
+
+    with nonce_lease(w3, "0xabc") as lease:
+        lease.send_raw(w3, b"raw")
+
+    assert lease.is_sent
+    assert events == []
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.auth.deps as deps
+import workers.session_sweeper as session_sweeper
+from app.auth.deps import (
+    COOKIE_NAME,
+    NotAuthenticated,
+    get_current_principal,
+    get_current_user,
+    invalidate_session,
+    invalidate_user_sessions,
+)
+from app.auth.session_cache import SessionPrincipal, SessionPrincipalCache, get_session_cache
+
+
+UTC = timezone.utc
+
+
+def _principal(session_id="s1", user_id=1, expires_in=timedelta(days=1)):
+    return SessionPrincipal(
+        session_id=session_id,
+        user_id=user_id,
+        expires_at=datetime.now(UTC) + expires_in,
+        is_active=True,
+        compliance_status="ok",
+    )
+
+
+class _Query:
+    def __init__(self, db):
+        self.db = db
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def first(self):
+        return self.db.row
+
+
+class FakeDb:
+    def __init__(self, sess=None, user=None):
+        self.row = (sess, user) if sess is not None else None
+        self.users = {user.id: user} if user is not None else {}
+        self.queries = 0
+        self.gets = 0
+        self.deleted = []
+        self.commits = 0
+
+    def query(self, *entities):
+        self.queries += 1
+        return _Query(self)
+
+    def get(self, model, pk):
+        self.gets += 1
+        return self.users.get(pk)
+
+    def delete(self, obj):
+        self.deleted.append(obj)
+
+    def commit(self):
+        self.commits += 1
+
+
+def _request(session_id="s1"):
+    return SimpleNamespace(cookies={COOKIE_NAME: session_id} if session_id else {})
+
+
+def _row(*, user_id=1, expires_in=timedelta(days=1), is_active=True):
+    sess = SimpleNamespace(id="s1", user_id=user_id, expires_at=datetime.now(UTC) + expires_in)
+    user = SimpleNamespace(id=user_id, is_active=is_active)
+    return sess, user
+
+
+def test_cache_entries_expire_after_ttl(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr(SessionPrincipalCache, "_now", staticmethod(lambda: clock["now"]))
+    cache = SessionPrincipalCache(ttl_sec=30, max_entries=10)
+    cache.put(_principal())
+
+    clock["now"] += 29
+    assert cache.get("s1") is not None
+
+    clock["now"] += 2
+    assert cache.get("s1") is None
+    assert len(cache) == 0
+
+
+def test_cache_never_outlives_the_session():
+    cache = SessionPrincipalCache(ttl_sec=300, max_entries=10)
+    cache.put(_principal(expires_in=timedelta(seconds=-1)))
+
+    assert cache.get("s1") is None
+
+
+def test_cache_drops_least_recently_used():
+    cache = SessionPrincipalCache(ttl_sec=300, max_entries=2)
+    cache.put(_principal("a"))
+    cache.put(_principal("b"))
+    assert cache.get("a") is not None
+
+    cache.put(_principal("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = SessionPrincipalCache(ttl_sec=0, max_entries=10)
+    cache.put(_principal())
+
+    assert len(cache) == 0
+
+
+def test_invalidate_user_keeps_the_current_session():
+    cache = get_session_cache()
+    cache.put(_principal("a", user_id=1))
+    cache.put(_principal("b", user_id=1))
+    cache.put(_principal("c", user_id=2))
+
+    invalidate_user_sessions(1, keep="b")
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+
+def test_miss_loads_session_and_user_in_one_query():
+    sess, user = _row()
+    db = FakeDb(sess, user)
+
+    assert get_current_user(_request(), db) is user
+    assert db.queries == 1
+    assert db.gets == 0
+    assert get_session_cache().get("s1").user_id == 1
+
+
+def test_hit_skips_the_session_lookup():
+    sess, user = _row()
+    db = FakeDb(sess, user)
+    get_current_user(_request(), db)
+
+    db.queries = 0
+    assert get_current_user(_request(), db) is user
+    assert db.queries == 0
+    assert db.gets == 1
+
+    principal = get_current_principal(_request(), db)
+    assert principal.user_id == 1
+    assert db.queries == 0
+    assert db.gets == 1
+
+
+def test_logout_invalidation_forces_a_fresh_lookup():
+    sess, user = _row()
+    db = FakeDb(sess, user)
+    get_current_user(_request(), db)
+
+    invalidate_session("s1")
+    db.row = None
+
+    with pytest.raises(NotAuthenticated):
+        get_current_user(_request(), db)
+
+
+def test_expired_session_is_deleted_and_not_cached():
+    sess, user = _row(expires_in=timedelta(seconds=-1))
+    db = FakeDb(sess, user)
+
+    with pytest.raises(NotAuthenticated):
+        get_current_user(_request(), db)
+
+    assert db.deleted == [sess]
+    assert db.commits == 1
+    assert len(get_session_cache()) == 0
+
+
+def test_deactivated_user_drops_cached_session():
+    sess, user = _row()
+    db = FakeDb(sess, user)
+    get_current_user(_request(), db)
+
+    user.is_active = False
+    with pytest.raises(NotAuthenticated):
+        get_current_user(_request(), db)
+
+    assert get_session_cache().get("s1") is None
+
+
+def test_principal_carries_live_polling_fields_without_a_user_load():
+    sess, user = _row()
+    user.compliance_status = "blocked"
+    db = FakeDb(sess, user)
+    get_current_principal(_request(), db)
+
+    db.queries = 0
+    principal = get_current_principal(_request(), db)
+
+    assert (principal.id, principal.is_active, principal.compliance_status) == (1, True, "blocked")
+    assert (db.queries, db.gets) == (0, 0)
+
+
+def test_missing_cookie_is_rejected():
+    with pytest.raises(NotAuthenticated):
+        get_current_principal(_request(None), FakeDb())
+
+
+def test_create_session_no_longer_prunes_inline():
+    db = SimpleNamespace(added=[], add=None, commit=lambda: None, query=None)
+    db.add = db.added.append
+
+    session_id = deps.create_session(db, 5)
+
+    assert len(db.added) == 1
+    assert db.added[0].id == session_id
+
+
+def test_sweeper_deletes_in_bounded_skip_locked_batches():
+    captured = {}
+
+    class _Db:
+        def execute(self, stmt):
+            captured["sql"] = str(stmt.compile(dialect=postgresql.dialect()))
+            return SimpleNamespace(rowcount=3)
+
+    deleted = session_sweeper.delete_expired_batch(_Db(), now=datetime.now(UTC), batch_size=50)
+
+    assert deleted == 3
+    sql = captured["sql"].upper()
+    assert "DELETE FROM SESSIONS" in sql
+    assert "LIMIT" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+def test_sweeper_stops_after_a_short_batch(monkeypatch):
+    counts = iter([10, 10, 4, 10])
+    sessions = []
+
+    class _Db:
+        def __init__(self):
+            self.committed = False
+            self.closed = False
+
+        def commit(self):
+            self.committed = True
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            self.closed = True
+
+    def factory():
+        db = _Db()
+        sessions.append(db)
+        return db
+
+    monkeypatch.setattr(session_sweeper, "delete_expired_batch", lambda db, **kw: next(counts))
+
+    total = session_sweeper.sweep_expired_sessions(
+        batch_size=10,
+        max_batches=10,
+        pause_sec=0,
+        session_factory=factory,
+    )
+
+    assert total == 24
+    assert len(sessions) == 3
+    assert all(db.committed and db.closed for db in sessions)
+
+
+def test_sweeper_respects_max_batches(monkeypatch):
+    monkeypatch.setattr(session_sweeper, "delete_expired_batch", lambda db, **kw: 10)
+    factory = lambda: SimpleNamespace(commit=lambda: None, rollback=lambda: None, close=lambda: None)
+
+    total = session_sweeper.sweep_expired_sessions(
+        batch_size=10,
+        max_batches=2,
+        pause_sec=0,
+        session_factory=factory,
+    )
+
+    assert total == 20
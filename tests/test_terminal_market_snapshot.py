@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import app.trading.service as trading_service
+from app.navcalc.latest_nav import LatestNavPrice
+from app.trading.service import FundMarketStats
+
+
+UTC = timezone.utc
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    def __init__(self, point_rows, range_rows):
+        self.point_rows = point_rows
+        self.range_rows = range_rows
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        if len(self.statements) == 1:
+            return _Result(self.point_rows)
+        return _Result(self.range_rows)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _fund(fund_id: int, code: str):
+    return SimpleNamespace(
+        id=fund_id,
+        code=code,
+        short_name_ru=code,
+        short_name_en=code,
+        name_ru=code,
+        name_en=code,
+        icon_name=None,
+    )
+
+
+def _latest(fund_id: int, nav: str, shares: str) -> LatestNavPrice:
+    return LatestNavPrice(
+        fund_id=fund_id,
+        ts_utc=datetime(2026, 10, 16, 11, 59, tzinfo=UTC),
+        nav_usdt=Decimal(nav),
+        shares_outstanding=Decimal(shares),
+        price_usdt=Decimal("0"),
+    )
+
+
+def test_market_stats_use_two_queries_for_any_number_of_funds(monkeypatch):
+    requested = []
+
+    def fake_latest_prices(db, fund_ids):
+        requested.append(list(fund_ids))
+        return {
+            1: _latest(1, "1100", "10"),
+            2: _latest(2, "50", "0"),
+        }
+
+    monkeypatch.setattr(
+        trading_service,
+        "get_latest_nav_prices",
+        fake_latest_prices,
+    )
+    db = FakeSession(
+        point_rows=[
+            (1, Decimal("1000"), Decimal("10")),
+            (2, None, None),
+            (3, None, None),
+        ],
+        range_rows=[
+            (1, Decimal("112"), Decimal("99")),
+            (2, Decimal("0"), Decimal("0")),
+        ],
+    )
+
+    stats = trading_service._load_market_stats(
+        db,
+        [3, 1, 2, 1],
+        now_utc=datetime(2026, 10, 16, 12, tzinfo=UTC),
+    )
+
+    assert requested == [[1, 2, 3]]
+    assert len(db.statements) == 2
+    assert "LATERAL" in _sql(db.statements[0])
+    assert "fund_nav_latest" not in _sql(db.statements[0])
+    assert "GROUP BY" in _sql(db.statements[1])
+
+    assert stats[1] == FundMarketStats(
+        latest_nav_usdt=Decimal("1100"),
+        latest_shares_outstanding=Decimal("10"),
+        prev_close_price=Decimal("100"),
+        day_high=Decimal("112"),
+        day_low=Decimal("99"),
+    )
+    assert stats[2].latest_nav_usdt == Decimal("50")
+    assert stats[2].prev_close_price is None
+    assert stats[2].day_low == Decimal("0")
+    assert stats[3] == FundMarketStats()
+
+
+def test_market_stats_skip_queries_without_funds():
+    db = FakeSession(point_rows=[], range_rows=[])
+
+    assert trading_service._load_market_stats(db, []) == {}
+    assert db.statements == []
+
+
+def test_snapshot_is_built_from_preloaded_stats():
+    class NoQuerySession:
+        def execute(self, stmt):
+            raise AssertionError("snapshot must not query with preloaded stats")
+
+    snapshot = trading_service._build_market_snapshot(
+        NoQuerySession(),
+        _fund(1, "wbx"),
+        "en",
+        FundMarketStats(
+            latest_nav_usdt=Decimal("1100"),
+            latest_shares_outstanding=Decimal("10"),
+            prev_close_price=Decimal("100"),
+            day_high=Decimal("112"),
+            day_low=Decimal("99"),
+        ),
+    )
+
+    assert snapshot["current_price_usdt"] == Decimal("110")
+    assert snapshot["change_24h_pct"] == Decimal("10")
+    assert snapshot["day_high_usdt"] == Decimal("112")
+    assert snapshot["day_low_usdt"] == Decimal("99")
+
+
+def test_snapshot_without_history_has_no_change():
+    snapshot = trading_service._build_market_snapshot(
+        None,
+        _fund(1, "wbx"),
+        "en",
+        FundMarketStats(),
+    )
+
+    assert snapshot["current_price_usdt"] == Decimal("0")
+    assert snapshot["change_24h_pct"] is None
+    assert snapshot["day_high_usdt"] is None
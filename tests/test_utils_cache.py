@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from app.utils.cache import ProcessSingleton, TtlLruCache, reset_singletons
+
+
+def test_ttl_lru_expires_and_evicts_least_recently_used():
+    now = [100.0]
+    cache = TtlLruCache(max_entries=2, ttl_sec=10, clock=lambda: now[0])
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    now[0] = 110.0
+    assert cache.get("a") is None
+    assert cache.snapshot() == {}
+
+
+def test_ttl_lru_without_ttl_keeps_entries_and_zero_ttl_disables():
+    unbounded = TtlLruCache(max_entries=1)
+    unbounded.put(1, "x")
+    assert unbounded.get(1) == "x"
+
+    disabled = TtlLruCache(max_entries=10, ttl_sec=0)
+    disabled.put(1, "x")
+    assert len(disabled) == 0
+
+
+def test_ttl_lru_bounds_total_weight():
+    cache = TtlLruCache(max_entries=10, max_weight=5, weigher=len)
+
+    cache.put("a", "xx")
+    cache.put("b", "xx")
+    cache.put("c", "xx")
+    assert cache.get("a") is None
+    assert cache.total_weight == 4
+
+    cache.put("d", "xxxxxx")
+    assert cache.get("d") is None
+    assert cache.snapshot() == {"b": "xx", "c": "xx"}
+
+    cache.put("b", "x")
+    cache.pop("c")
+    assert cache.total_weight == 1
+
+
+def test_discard_where_filters_on_key_and_value():
+    cache = TtlLruCache(max_entries=10)
+    for key, owner in (("s1", 1), ("s2", 1), ("s3", 2)):
+        cache.put(key, owner)
+
+    cache.discard_where(lambda key, owner: owner == 1 and key != "s2")
+
+    assert cache.snapshot() == {"s2": 1, "s3": 2}
+
+
+def test_process_singleton_builds_once_until_reset():
+    built = []
+    singleton = ProcessSingleton(lambda: built.append(1) or object())
+
+    first = singleton.get()
+    assert singleton.get() is first
+
+    reset_singletons()
+
+    assert singleton.get() is not first
+    assert len(built) == 2
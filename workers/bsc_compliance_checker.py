@@ -2,6 +2,8 @@
 
 Checks success deposits that have no compliance_status yet.
 Fail-closed policy: provider errors -> pending_check (operations blocked).
+Transfers and addresses are screened concurrently (COMPLIANCE_CONCURRENCY);
+results are written to the DB one at a time.
 Run:
     python -m workers.bsc_compliance_checker
 """
@@ -31,6 +33,28 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# _apply_result escalates wallet/user status with read-modify-write;
+# two transfers of one user must not interleave there.
+_apply_lock: asyncio.Lock | None = None
+
+
+def _get_apply_lock() -> asyncio.Lock:
+    global _apply_lock
+    if _apply_lock is None:
+        _apply_lock = asyncio.Lock()
+    return _apply_lock
+
+
+async def _apply_result_serialized(
+    transfer_id: int,
+    final_status: str,
+    details: dict,
+    freeze_reason: str | None,
+):
+    async with _get_apply_lock():
+        await asyncio.to_thread(_apply_result, transfer_id, final_status, details, freeze_reason)
+
+
 async def rpc_get_tx_from(session: aiohttp.ClientSession, tx_hash: str) -> str | None:
     if not settings.BSC_RPC_URL:
         return None
@@ -199,15 +223,15 @@ async def process_one(tr: WalletTransfer, session: aiohttp.ClientSession):
             "final": "pending_check",
             "note": "no_addresses_to_check",
         }
-        await asyncio.to_thread(_apply_result, int(tr.id), "pending_check", details, "screening_error")
+        await _apply_result_serialized(int(tr.id), "pending_check", details, "screening_error")
         logging.info("Compliance checked: transfer_id=%s final=pending_check (no addresses)", tr.id)
         return
 
     per_address = {}
     finals = []
 
-    for a in uniq:
-        final, det = await screen_address(a, session)
+    results = await asyncio.gather(*(screen_address(a, session) for a in uniq))
+    for a, (final, det) in zip(uniq, results):
         per_address[a.lower()] = {"final": final, "details": det}
         finals.append(final)
 
@@ -229,11 +253,34 @@ async def process_one(tr: WalletTransfer, session: aiohttp.ClientSession):
         "final": final_status,
     }
 
-    await asyncio.to_thread(_apply_result, int(tr.id), final_status, details, freeze_reason)
+    await _apply_result_serialized(int(tr.id), final_status, details, freeze_reason)
     logging.info("Compliance checked: transfer_id=%s final=%s", tr.id, final_status)
 
 
+async def process_batch(targets: list[WalletTransfer], session: aiohttp.ClientSession) -> None:
+    """
+    Screen targets with at most COMPLIANCE_CONCURRENCY in flight.
+
+    A transfer whose processing raises keeps its current status
+    (None or pending_check) and is picked up again by the next poll.
+    """
+    slots = asyncio.Semaphore(max(1, int(settings.COMPLIANCE_CONCURRENCY)))
+
+    async def run(tr: WalletTransfer):
+        async with slots:
+            await process_one(tr, session)
+
+    results = await asyncio.gather(*(run(tr) for tr in targets), return_exceptions=True)
+    for tr, result in zip(targets, results):
+        if isinstance(result, Exception):
+            logging.error("Compliance check failed: transfer_id=%s error=%s", tr.id, result)
+
+
 async def main_loop():
+    global _apply_lock
+    # asyncio locks bind to the loop they first wait on; restarts get a new one.
+    _apply_lock = asyncio.Lock()
+
     connector = aiohttp.TCPConnector(
         resolver=resolver.ThreadedResolver(),
         ttl_dns_cache=300,
@@ -243,8 +290,7 @@ async def main_loop():
             try:
                 targets = await asyncio.to_thread(_load_targets, 100)
                 if targets:
-                    for tr in targets:
-                        await process_one(tr, session)
+                    await process_batch(targets, session)
                 else:
                     logging.info("No transfers to check.")
             except Exception as e:
@@ -1,13 +1,21 @@
-"""BSC confirmations worker (Stage 9.1)."""
+"""BSC confirmations worker (Stage 9.1).
+
+Promotes pending deposits to success on every new head (newHeads over
+BSC_WS_URL), falling back to polling eth_blockNumber every
+BSC_CONFIRM_POLL_SEC when the subscription is unavailable.
+"""
 
 import asyncio
+import json
 import logging
 import sys
 import time
 from datetime import datetime, timezone
 
 import aiohttp
+import websockets
 from aiohttp import resolver
+from sqlalchemy import update
 
 from app.config import settings
 from app.db import SessionLocal
@@ -35,31 +43,84 @@ async def rpc_get_current_block(session: aiohttp.ClientSession) -> int:
         return int(data["result"], 16)
 
 
-def _load_pending_deposits() -> list[WalletTransfer]:
-    db = SessionLocal()
-    try:
-        return (
-            db.query(WalletTransfer)
-            .filter(WalletTransfer.status == "pending", WalletTransfer.type == "deposit")
-            .all()
+def _promote_confirmed_deposits(current_block: int) -> list[int]:
+    """
+    Mark every pending deposit with at least BSC_CONFIRMATIONS
+    confirmations as success in one guarded UPDATE
+    (wallet_transfers_pending_deposit_block_idx, stage 27.5).
+    Returns the promoted transfer ids.
+    """
+    safe_block = int(current_block) - int(settings.BSC_CONFIRMATIONS)
+    if safe_block < 0:
+        return []
+
+    stmt = (
+        update(WalletTransfer)
+        .where(
+            WalletTransfer.type == "deposit",
+            WalletTransfer.status == "pending",
+            WalletTransfer.block_number <= safe_block,
         )
-    finally:
-        db.close()
-
+        .values(status="success", confirmed_at=utcnow())
+        .returning(WalletTransfer.id)
+        .execution_options(synchronize_session=False)
+    )
 
-def _mark_success(transfer_id: int):
     db = SessionLocal()
     try:
-        tr = db.query(WalletTransfer).filter(WalletTransfer.id == transfer_id).first()
-        if not tr or tr.status != "pending":
-            return
-        tr.status = "success"
-        tr.confirmed_at = utcnow()
+        ids = [int(row[0]) for row in db.execute(stmt).fetchall()]
         db.commit()
+        return ids
     finally:
         db.close()
 
 
+async def promote(current_block: int) -> int:
+    ids = await asyncio.to_thread(_promote_confirmed_deposits, current_block)
+    if ids:
+        logging.info("Marked success: %d transfers (current_block=%d)", len(ids), current_block)
+    return len(ids)
+
+
+def _head_number(message: dict) -> int | None:
+    if message.get("method") != "eth_subscription":
+        return None
+    head = (message.get("params") or {}).get("result")
+    if not isinstance(head, dict) or not head.get("number"):
+        return None
+    return int(head["number"], 16)
+
+
+async def follow_new_heads() -> None:
+    """
+    Promote on every newHeads notification, so deposit-to-credit latency
+    follows block time. Returns only by raising (connection lost).
+    """
+    async with websockets.connect(settings.BSC_WS_URL, ping_interval=20, ping_timeout=20) as ws:
+        await ws.send(
+            json.dumps(
+                {"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}
+            )
+        )
+
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg.get("id") == 1:
+                if "result" not in msg:
+                    raise RuntimeError(f"newHeads subscribe failed: {msg}")
+                logging.info("Subscribed to newHeads, sub_id=%s", msg.get("result"))
+                break
+
+        last_block = -1
+        while True:
+            block_number = _head_number(json.loads(await ws.recv()))
+            if block_number is None or block_number <= last_block:
+                continue
+
+            last_block = block_number
+            await promote(block_number)
+
+
 async def main_loop():
     connector = aiohttp.TCPConnector(
         resolver=resolver.ThreadedResolver(),
@@ -68,21 +129,17 @@ async def main_loop():
     timeout = aiohttp.ClientTimeout(total=20)
     async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
         while True:
+            if settings.BSC_WS_URL:
+                try:
+                    await follow_new_heads()
+                except Exception as e:
+                    logging.warning("newHeads subscription lost, polling once: %s", e)
+
+            # Fallback when BSC_WS_URL is not set, and catch-up after a
+            # dropped subscription.
             try:
                 current_block = await rpc_get_current_block(session)
-                pending = await asyncio.to_thread(_load_pending_deposits)
-
-                updated = 0
-                for tr in pending:
-                    if tr.block_number is None:
-                        continue
-                    if current_block - int(tr.block_number) >= int(settings.BSC_CONFIRMATIONS):
-                        await asyncio.to_thread(_mark_success, int(tr.id))
-                        updated += 1
-
-                if updated:
-                    logging.info("Marked success: %d transfers (current_block=%d)", updated, current_block)
-
+                await promote(current_block)
             except Exception as e:
                 logging.error("Confirmations loop error: %s", e)
 
@@ -7,14 +7,18 @@ import time
 from datetime import datetime, timezone
 from decimal import Decimal
 
-import aiohttp
-from aiohttp import resolver
-
-from sqlalchemy import text
+from sqlalchemy import BigInteger, Numeric, column, or_, text, update, values
 
 from app.config import settings
 from app.db import SessionLocal
 from app.models import UserWallet
+from app.settlement.bsc_balance_service import (
+    BscBalanceReadError,
+    normalize_bsc_address,
+    read_bsc_block_number,
+    read_bsc_usdt_balances,
+)
+from app.settlement.bsc_provider_pool import get_bsc_web3
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -26,26 +30,15 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-async def rpc_get_current_block(session: aiohttp.ClientSession) -> int:
-    payload = {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1}
-    async with session.post(settings.BSC_RPC_URL, json=payload) as resp:
-        data = await resp.json(content_type=None)
-        return int(data["result"], 16)
-
-
-async def rpc_usdt_balance_of(session: aiohttp.ClientSession, address: str) -> int:
-    selector = "70a08231"
-    addr_hex = address[2:].lower()
-    data_field = "0x" + selector + ("0" * 24) + addr_hex
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "eth_call",
-        "params": [{"to": settings.BSC_USDT_CONTRACT, "data": data_field}, "latest"],
-        "id": 1,
-    }
-    async with session.post(settings.BSC_RPC_URL, json=payload) as resp:
-        data = await resp.json(content_type=None)
-        return int(data["result"], 16)
+def _read_balances_at_head(addresses: list[str]) -> tuple[int, dict[str, Decimal]]:
+    """
+    (current block, USDT balances at that block) through the shared BSC
+    endpoint pool; keys are lower-case addresses.
+    """
+    w3 = get_bsc_web3()
+    current_block = read_bsc_block_number(w3)
+    balances = read_bsc_usdt_balances(w3, addresses, block_identifier=current_block)
+    return current_block, balances
 
 
 def _load_bsc_wallets_to_sync(limit: int = 200) -> list[tuple[int, str]]:
@@ -81,52 +74,85 @@ def _load_bsc_wallets_to_sync(limit: int = 200) -> list[tuple[int, str]]:
         db.close()
 
 
-def _update_wallet_balance(wallet_id: int, balance: Decimal, current_block: int):
+def _update_wallet_balances(balances: list[tuple[int, Decimal]], current_block: int) -> int:
+    """
+    Write every balance in one UPDATE ... FROM (VALUES ...) and commit once.
+    A wallet already synced at a newer block is left alone.
+    """
+    if not balances:
+        return 0
+
+    rows = values(
+        column("id", BigInteger),
+        column("balance", Numeric(38, 18)),
+        name="v",
+    ).data(balances)
+
+    stmt = (
+        update(UserWallet)
+        .where(
+            UserWallet.id == rows.c.id,
+            or_(
+                UserWallet.usdt_balance_block.is_(None),
+                UserWallet.usdt_balance_block <= current_block,
+            ),
+        )
+        .values(
+            usdt_balance=rows.c.balance,
+            usdt_balance_updated_at=utcnow(),
+            usdt_balance_block=current_block,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
     db = SessionLocal()
     try:
-        w = db.query(UserWallet).filter(UserWallet.id == wallet_id).first()
-        if not w:
-            return
-        w.usdt_balance = balance
-        w.usdt_balance_updated_at = utcnow()
-        w.usdt_balance_block = current_block
+        result = db.execute(stmt)
         db.commit()
+        return int(result.rowcount or 0)
     finally:
         db.close()
 
 
 async def main_loop():
-    connector = aiohttp.TCPConnector(
-        resolver=resolver.ThreadedResolver(),
-        ttl_dns_cache=300,
-    )
-    timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-        while True:
-            try:
-                current_block = await rpc_get_current_block(session)
-                wallets = await asyncio.to_thread(_load_bsc_wallets_to_sync, 200)
-
-                if not wallets:
-                    logging.info("No wallets to sync right now (block=%d)", current_block)
-                    await asyncio.sleep(int(settings.BSC_BALANCE_POLL_SEC))
-                    continue
+    while True:
+        try:
+            wallets = await asyncio.to_thread(_load_bsc_wallets_to_sync, 200)
 
-                for wallet_id, address in wallets:
-                    try:
-                        bal_int = await rpc_usdt_balance_of(session, address)
-                        bal = Decimal(bal_int) / (Decimal(10) ** Decimal(settings.BSC_USDT_DECIMALS))
-                        await asyncio.to_thread(_update_wallet_balance, wallet_id, bal, current_block)
-                    except Exception as e:
-                        logging.warning("Balance update failed for %s: %s", address, e)
+            if not wallets:
+                logging.info("No wallets to sync right now")
+                await asyncio.sleep(int(settings.BSC_BALANCE_POLL_SEC))
+                continue
 
-                if wallets:
-                    logging.info("Updated balances for %d wallets (block=%d)", len(wallets), current_block)
+            normalized: list[tuple[int, str]] = []
+            for wallet_id, address in wallets:
+                try:
+                    normalized.append((wallet_id, normalize_bsc_address(address)))
+                except BscBalanceReadError as e:
+                    logging.warning("Balance update skipped for %s: %s", address, e)
 
+            try:
+                current_block, balances = await asyncio.to_thread(
+                    _read_balances_at_head,
+                    [address for _, address in normalized],
+                )
+                updated = await asyncio.to_thread(
+                    _update_wallet_balances,
+                    [
+                        (wallet_id, balances[address])
+                        for wallet_id, address in normalized
+                        if address in balances
+                    ],
+                    current_block,
+                )
+                logging.info("Updated balances for %d wallets (block=%d)", updated, current_block)
             except Exception as e:
-                logging.error("Balance updater loop error: %s", e)
+                logging.warning("Batched balance update failed for %d wallets: %s", len(wallets), e)
+
+        except Exception as e:
+            logging.error("Balance updater loop error: %s", e)
 
-            await asyncio.sleep(int(settings.BSC_BALANCE_POLL_SEC))
+        await asyncio.sleep(int(settings.BSC_BALANCE_POLL_SEC))
 
 
 if __name__ == "__main__":
@@ -1,8 +1,14 @@
 """BSC USDT deposit listener (Stage 9.2.1 + backfill).
 
-- Backfill on startup via eth_getLogs (missed deposits while worker was down)
+- Backfill on startup via eth_getLogs (missed deposits while worker was down):
+  concurrent adaptive block windows, batched block timestamps and one bulk
+  insert + cursor commit per window
 - Persists cursor (block/log_index) in Postgres table worker_cursors
-- Continues realtime tracking via WS subscription
+- Continues realtime tracking via one unfiltered USDT Transfer WS
+  subscription, matched locally against the in-memory wallet registry
+- New wallets are picked up incrementally (id watermark) without
+  resubscribing; a short eth_getLogs catch-up covers the blocks between
+  two registry refreshes for the new addresses only
 
 Run:
     python -m workers.bsc_usdt_deposit_listener
@@ -13,6 +19,8 @@ import json
 import logging
 import sys
 import time
+from dataclasses import dataclass, field
+from collections import deque
 from datetime import datetime, timezone
 from decimal import Decimal
 
@@ -21,18 +29,26 @@ from aiohttp import resolver
 import websockets
 from websockets import exceptions as ws_exceptions
 from eth_utils import to_checksum_address
-from sqlalchemy import func, text as sa_text
+from sqlalchemy import func, select, text as sa_text
 from sqlalchemy.dialects.postgresql import insert
 
 from app.config import settings
 from app.db import SessionLocal
 from app.models import FundNegativePayoutLeg, FundWallet, UserWallet, WalletTransfer
+from app.settlement.bsc_block_headers import (
+    get_block_timestamps_async,
+    remember_block_timestamp,
+)
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 CURSOR_NAME = "bsc_usdt_listener"
+ADDRESS_CHUNK_SIZE = 1000
+# Wallet ids are assigned before commit, so a slow transaction can become
+# visible below the watermark; re-read this many ids on every refresh.
+WALLET_ID_OVERLAP = 100
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 
@@ -59,10 +75,18 @@ def _chunk(lst: list[str], size: int) -> list[list[str]]:
     return [lst[i : i + size] for i in range(0, len(lst), size)]
 
 
-async def rpc_with_retries(coro_factory, label: str, attempts: int = 5, base_delay: int = 3):
+async def rpc_with_retries(
+    coro_factory,
+    label: str,
+    attempts: int = 5,
+    base_delay: int = 3,
+    *,
+    no_retry: tuple[type[BaseException], ...] = (),
+):
     """
     Runs async RPC call with retries/backoff.
     If all retries fail -> raises the last exception.
+    Exceptions in no_retry are raised immediately.
     """
     delay = base_delay
     last_exc = None
@@ -70,6 +94,8 @@ async def rpc_with_retries(coro_factory, label: str, attempts: int = 5, base_del
     for attempt in range(1, attempts + 1):
         try:
             return await coro_factory()
+        except no_retry:
+            raise
         except Exception as e:
             last_exc = e
             logging.warning("%s failed (attempt %d/%d): %s", label, attempt, attempts, e)
@@ -80,20 +106,21 @@ async def rpc_with_retries(coro_factory, label: str, attempts: int = 5, base_del
     raise last_exc
 
 
-def load_wallet_map() -> dict[str, tuple[int, int]]:
-    """address_lower -> (wallet_id, user_id)."""
+def load_wallet_rows(after_id: int = 0) -> list[tuple[int, int, str]]:
+    """(wallet_id, user_id, address) of BSC wallets with id > after_id."""
     db = SessionLocal()
     try:
         rows = (
             db.query(UserWallet.id, UserWallet.user_id, UserWallet.address)
             .filter(UserWallet.blockchain == "BSC")
+            .filter(UserWallet.id > int(after_id))
+            .order_by(UserWallet.id.asc())
             .all()
         )
-        m: dict[str, tuple[int, int]] = {}
-        for wallet_id, user_id, address in rows:
-            if address:
-                m[address.lower()] = (int(wallet_id), int(user_id))
-        return m
+        return [
+            (int(wallet_id), int(user_id), address)
+            for wallet_id, user_id, address in rows
+        ]
     finally:
         db.close()
 
@@ -120,6 +147,44 @@ def load_active_platform_settlement_wallet_addresses() -> set[str]:
         db.close()
 
 
+@dataclass
+class WalletRegistry:
+    """
+    Addresses the listener credits, kept in memory and grown in place.
+
+    wallet_map and settlement_addresses are mutated, never replaced, so
+    the running subscription sees new wallets without a reconnect. User
+    wallets are only ever added, so refresh() reads rows above an id
+    watermark; the settlement list is a few rows and is re-read in full
+    because wallets can be deactivated.
+    """
+
+    wallet_map: dict[str, tuple[int, int]] = field(default_factory=dict)
+    settlement_addresses: set[str] = field(default_factory=set)
+    last_wallet_id: int = 0
+
+    def refresh(self) -> list[str]:
+        """Load new wallets; returns the lowercase addresses added."""
+        added: list[str] = []
+        after_id = max(0, self.last_wallet_id - WALLET_ID_OVERLAP)
+
+        for wallet_id, user_id, address in load_wallet_rows(after_id):
+            self.last_wallet_id = max(self.last_wallet_id, wallet_id)
+            if not address:
+                continue
+            key = address.lower()
+            if key not in self.wallet_map:
+                added.append(key)
+            self.wallet_map[key] = (wallet_id, user_id)
+
+        settlement = load_active_platform_settlement_wallet_addresses()
+        if settlement != self.settlement_addresses:
+            self.settlement_addresses.clear()
+            self.settlement_addresses.update(settlement)
+
+        return added
+
+
 def is_internal_platform_payout_transfer(
     *,
     from_address: str | None,
@@ -192,6 +257,69 @@ def internal_platform_payout_skip_reason_db(
     return None
 
 
+def internal_platform_payout_skip_reasons_db(
+    db,
+    transfers: list["ParsedTransfer"],
+) -> dict[tuple[str, int], str]:
+    """
+    internal_platform_payout_skip_reason_db for a whole batch in three
+    queries; keyed by (tx_hash, log_index) of the transfers to skip.
+    """
+    if not transfers:
+        return {}
+
+    from_set = {t.from_lower for t in transfers if t.from_lower}
+    to_set = {t.to_lower for t in transfers}
+    tx_set = {t.tx_hash.lower() for t in transfers}
+
+    settlement_from: set[str] = set()
+    if from_set:
+        settlement_from = {
+            row[0]
+            for row in db.execute(
+                select(func.lower(FundWallet.address))
+                .where(FundWallet.blockchain == "BSC")
+                .where(FundWallet.wallet_type == "settlement")
+                .where(FundWallet.is_active.is_(True))
+                .where(func.lower(FundWallet.address).in_(from_set))
+            ).all()
+        }
+
+    registered_to: set[str] = set()
+    if settlement_from:
+        registered_to = {
+            row[0]
+            for row in db.execute(
+                select(func.lower(UserWallet.address))
+                .where(UserWallet.blockchain == "BSC")
+                .where(func.lower(UserWallet.address).in_(to_set))
+            ).all()
+        }
+
+    known_legs = {
+        (str(tx).lower(), str(frm).lower(), str(to).lower(), Decimal(str(amount)))
+        for tx, frm, to, amount in db.execute(
+            select(
+                FundNegativePayoutLeg.tx_hash,
+                FundNegativePayoutLeg.from_address,
+                FundNegativePayoutLeg.to_address,
+                FundNegativePayoutLeg.amount_usdt,
+            ).where(func.lower(FundNegativePayoutLeg.tx_hash).in_(tx_set))
+        ).all()
+        if tx and frm and to and amount is not None
+    }
+
+    reasons: dict[tuple[str, int], str] = {}
+    for t in transfers:
+        key = (t.tx_hash, t.log_index)
+        if t.from_lower in settlement_from and t.to_lower in registered_to:
+            reasons[key] = "active_platform_settlement_wallet_to_registered_user_wallet"
+        elif (t.tx_hash.lower(), t.from_lower, t.to_lower, t.amount) in known_legs:
+            reasons[key] = "known_negative_payout_leg_tx_hash"
+
+    return reasons
+
+
 def get_cursor(db, name: str) -> tuple[int, int] | None:
     row = db.execute(
         sa_text("SELECT last_block, last_log_index FROM worker_cursors WHERE name=:name"),
@@ -203,6 +331,11 @@ def get_cursor(db, name: str) -> tuple[int, int] | None:
 
 
 def upsert_cursor(db, name: str, last_block: int, last_log_index: int) -> None:
+    execute_cursor_upsert(db, name, last_block, last_log_index)
+    db.commit()
+
+
+def execute_cursor_upsert(db, name: str, last_block: int, last_log_index: int) -> None:
     # monotonic upsert: never move cursor backwards
     db.execute(
         sa_text(
@@ -227,7 +360,6 @@ def upsert_cursor(db, name: str, last_block: int, last_log_index: int) -> None:
         ),
         {"name": name, "b": int(last_block), "i": int(last_log_index)},
     )
-    db.commit()
 
 
 def db_upsert_cursor(name: str, last_block: int, last_log_index: int) -> None:
@@ -253,28 +385,25 @@ async def rpc_get_latest_block(session: aiohttp.ClientSession) -> int:
         return int(result, 16)
 
 
-async def rpc_get_block_timestamp(session: aiohttp.ClientSession, block_number: int) -> datetime | None:
-    if not settings.BSC_RPC_URL:
-        return None
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "eth_getBlockByNumber",
-        "params": [hex(block_number), False],
-        "id": 1,
-    }
-    async with session.post(settings.BSC_RPC_URL, json=payload) as resp:
-        if resp.status != 200:
-            txt = await resp.text()
-            raise RuntimeError(f"eth_getBlockByNumber HTTP {resp.status}: {txt[:200]}")
-        data = await resp.json(content_type=None)
-        result = data.get("result")
-        if not result:
-            return None
-        ts_hex = result.get("timestamp")
-        if not ts_hex:
-            return None
-        ts = int(ts_hex, 16)
-        return datetime.fromtimestamp(ts, tz=timezone.utc)
+class LogsRangeTooLargeError(RuntimeError):
+    """The provider refused an eth_getLogs range; retry it in halves."""
+
+
+_RANGE_TOO_LARGE_MARKERS = (
+    "too many",
+    "more than",
+    "limit exceeded",
+    "response size",
+    "block range",
+    "range is too large",
+    "exceed maximum",
+    "query timeout",
+)
+
+
+def _is_range_too_large(error) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in _RANGE_TOO_LARGE_MARKERS)
 
 
 async def rpc_get_logs(session: aiohttp.ClientSession, from_block: int, to_block: int, to_topics: list[str]) -> list[dict]:
@@ -295,6 +424,8 @@ async def rpc_get_logs(session: aiohttp.ClientSession, from_block: int, to_block
             raise RuntimeError(f"eth_getLogs HTTP {resp.status}: {txt[:200]}")
         data = await resp.json(content_type=None)
         if "error" in data and data["error"]:
+            if _is_range_too_large(data["error"]):
+                raise LogsRangeTooLargeError(f"eth_getLogs range too large: {data['error']}")
             raise RuntimeError(f"eth_getLogs error: {data['error']}")
         result = data.get("result") or []
         if not isinstance(result, list):
@@ -365,31 +496,41 @@ def db_insert_transfer(
         db.close()
 
 
-async def handle_log(
+@dataclass(frozen=True)
+class ParsedTransfer:
+    user_id: int
+    wallet_id: int
+    tx_hash: str
+    log_index: int
+    block_number: int
+    from_lower: str | None
+    to_lower: str
+    from_address: str | None
+    to_address: str
+    amount: Decimal
+
+
+def parse_transfer_log(
     log: dict,
     wallet_map: dict[str, tuple[int, int]],
-    platform_settlement_wallet_addresses: set[str],
-    rpc_session: aiohttp.ClientSession,
-    block_time_cache: dict[int, datetime],
-    *,
-    update_cursor_flag: bool,
-):
+) -> ParsedTransfer | None:
+    """USDT Transfer log to a registered wallet; None for anything else."""
     tx_hash = log.get("transactionHash")
     if not tx_hash:
-        return
+        return None
 
     topics = log.get("topics", []) or []
     if len(topics) < 3:
-        return
+        return None
 
     from_addr_raw = _decode_topic_address(topics[1])
     to_addr_raw = _decode_topic_address(topics[2])
     if not to_addr_raw:
-        return
+        return None
 
     to_lower = to_addr_raw.lower()
     if to_lower not in wallet_map:
-        return
+        return None
 
     wallet_id, user_id = wallet_map[to_lower]
 
@@ -403,12 +544,126 @@ async def handle_log(
     except Exception:
         from_addr = from_addr_raw
 
-    block_number = _hex_to_int(log.get("blockNumber", "0x0"))
-    log_index = _hex_to_int(log.get("logIndex", "0x0"))
-
     amount_int = _hex_to_int(log.get("data") or "0x0")
     amount = Decimal(amount_int) / (Decimal(10) ** Decimal(settings.BSC_USDT_DECIMALS))
 
+    return ParsedTransfer(
+        user_id=user_id,
+        wallet_id=wallet_id,
+        tx_hash=tx_hash,
+        log_index=_hex_to_int(log.get("logIndex", "0x0")),
+        block_number=_hex_to_int(log.get("blockNumber", "0x0")),
+        from_lower=from_addr_raw.lower() if from_addr_raw else None,
+        to_lower=to_lower,
+        from_address=from_addr,
+        to_address=to_addr,
+        amount=amount,
+    )
+
+
+def _log_block_timestamp(log: dict) -> datetime | None:
+    """Some providers include blockTimestamp in logs; saves an RPC."""
+    ts_hex = log.get("blockTimestamp")
+    if not ts_hex:
+        return None
+    try:
+        return datetime.fromtimestamp(_hex_to_int(ts_hex), tz=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def db_insert_transfers_batch(
+    transfers: list[ParsedTransfer],
+    block_times: dict[int, datetime],
+    *,
+    cursor_name: str | None = None,
+    cursor_block: int | None = None,
+) -> int:
+    """
+    Insert a window of deposits with one ON CONFLICT DO NOTHING statement.
+    The cursor (if given) moves in the same commit, so a crash never
+    skips logs or leaves the cursor ahead of inserted rows.
+    """
+    db = SessionLocal()
+    try:
+        skip_reasons = internal_platform_payout_skip_reasons_db(db, transfers)
+        rows = []
+        for t in transfers:
+            reason = skip_reasons.get((t.tx_hash, t.log_index))
+            if reason:
+                logging.info(
+                    (
+                        "internal_platform_payout_ignored: reason=%s tx=%s li=%s "
+                        "from=%s to=%s amount=%s"
+                    ),
+                    reason,
+                    t.tx_hash,
+                    t.log_index,
+                    t.from_lower,
+                    t.to_lower,
+                    str(t.amount),
+                )
+                continue
+
+            rows.append(
+                {
+                    "user_id": t.user_id,
+                    "wallet_id": t.wallet_id,
+                    "coin": "USDT",
+                    "network": "BSC (BEP20)",
+                    "type": "deposit",
+                    "status": "pending",
+                    "tx_hash": t.tx_hash,
+                    "log_index": t.log_index,
+                    "block_number": t.block_number,
+                    "from_address": t.from_address,
+                    "to_address": t.to_address,
+                    "amount": t.amount,
+                    "tx_time": block_times.get(t.block_number),
+                }
+            )
+
+        inserted = 0
+        if rows:
+            stmt = (
+                insert(WalletTransfer)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["tx_hash", "log_index"])
+            )
+            inserted = int(db.execute(stmt).rowcount or 0)
+
+        if cursor_name is not None and cursor_block is not None:
+            execute_cursor_upsert(db, cursor_name, cursor_block, 0)
+
+        db.commit()
+        return inserted
+    finally:
+        db.close()
+
+
+async def handle_log(
+    log: dict,
+    wallet_map: dict[str, tuple[int, int]],
+    platform_settlement_wallet_addresses: set[str],
+    rpc_session: aiohttp.ClientSession,
+    *,
+    update_cursor_flag: bool,
+):
+    transfer = parse_transfer_log(log, wallet_map)
+    if transfer is None:
+        return
+
+    user_id = transfer.user_id
+    wallet_id = transfer.wallet_id
+    tx_hash = transfer.tx_hash
+    log_index = transfer.log_index
+    block_number = transfer.block_number
+    from_addr_raw = transfer.from_lower
+    to_addr_raw = transfer.to_lower
+    from_addr = transfer.from_address
+    to_addr = transfer.to_address
+    amount = transfer.amount
+
     if is_internal_platform_payout_transfer(
         from_address=from_addr_raw,
         to_address=to_addr_raw,
@@ -437,15 +692,18 @@ async def handle_log(
         )
         return
 
-    tx_time = block_time_cache.get(block_number)
-    if tx_time is None:
+    tx_time = _log_block_timestamp(log)
+    if tx_time is not None:
+        remember_block_timestamp(block_number, tx_time)
+    else:
+        # Live logs are at the head, next to the last fetched header, so an
+        # extrapolated timestamp is within a block or two of the real one.
         try:
-            tx_time = await rpc_get_block_timestamp(rpc_session, block_number)
+            block_times = await get_block_timestamps_async(rpc_session, [block_number], exact=False)
+            tx_time = block_times.get(block_number)
         except Exception as e:
             logging.warning("Failed to fetch block time for %s: %s", block_number, e)
             tx_time = None
-        if tx_time is not None:
-            block_time_cache[block_number] = tx_time
 
     inserted = await asyncio.to_thread(
         db_insert_transfer,
@@ -495,18 +753,16 @@ async def handle_log(
     )
 
 
-async def subscribe_chunk(
-    addresses: list[str],
-    wallet_map: dict[str, tuple[int, int]],
-    platform_settlement_wallet_addresses: set[str],
-):
+async def subscribe_transfers(registry: WalletRegistry):
+    """
+    One subscription to every USDT Transfer; recipients are matched
+    against registry.wallet_map, so its size never affects the socket.
+    """
     if not settings.BSC_WS_URL:
         raise RuntimeError("BSC_WS_URL is not set")
 
     connector = aiohttp.TCPConnector(resolver=resolver.ThreadedResolver(), ttl_dns_cache=300)
     async with aiohttp.ClientSession(connector=connector) as rpc_session:
-        block_time_cache: dict[int, datetime] = {}
-
         async with websockets.connect(settings.BSC_WS_URL, ping_interval=20, ping_timeout=20) as ws:
             req = {
                 "jsonrpc": "2.0",
@@ -516,7 +772,7 @@ async def subscribe_chunk(
                     "logs",
                     {
                         "address": settings.BSC_USDT_CONTRACT,
-                        "topics": [TRANSFER_TOPIC, None, [_encode_topic_address(a) for a in addresses]],
+                        "topics": [TRANSFER_TOPIC],
                     },
                 ],
             }
@@ -528,7 +784,11 @@ async def subscribe_chunk(
                 if msg.get("id") == 1:
                     if "result" not in msg:
                         raise RuntimeError(f"Subscribe failed: {msg}")
-                    logging.info("Subscribed (%d addresses), sub_id=%s", len(addresses), msg.get("result"))
+                    logging.info(
+                        "Subscribed to USDT transfers (%d wallets), sub_id=%s",
+                        len(registry.wallet_map),
+                        msg.get("result"),
+                    )
                     break
 
             while True:
@@ -540,14 +800,232 @@ async def subscribe_chunk(
                 if isinstance(lg, dict):
                     await handle_log(
                         lg,
-                        wallet_map,
-                        platform_settlement_wallet_addresses,
+                        registry.wallet_map,
+                        registry.settlement_addresses,
                         rpc_session,
-                        block_time_cache,
                         update_cursor_flag=True,
                     )
 
 
+@dataclass
+class AdaptiveBlockWindow:
+    """
+    eth_getLogs window size shared by the concurrent backfill fetches.
+
+    Halves when the provider rejects a range or answers slower than twice
+    the target; doubles (up to max_size) after a full-size window that
+    came back faster than the target.
+    """
+
+    size: int
+    min_size: int
+    max_size: int
+    target_sec: float
+
+    @classmethod
+    def from_settings(cls) -> "AdaptiveBlockWindow":
+        min_size = max(1, int(settings.BSC_BACKFILL_MIN_CHUNK_BLOCKS))
+        max_size = max(min_size, int(settings.BSC_BACKFILL_MAX_CHUNK_BLOCKS))
+        size = min(max_size, max(min_size, int(settings.BSC_BACKFILL_CHUNK_BLOCKS)))
+        return cls(
+            size=size,
+            min_size=min_size,
+            max_size=max_size,
+            target_sec=float(settings.BSC_BACKFILL_TARGET_SEC),
+        )
+
+    def shrink(self) -> None:
+        self.size = max(self.min_size, self.size // 2)
+
+    def observe(self, blocks: int, elapsed_sec: float) -> None:
+        if elapsed_sec > self.target_sec * 2:
+            self.shrink()
+        elif elapsed_sec < self.target_sec and blocks >= self.size:
+            self.size = min(self.max_size, self.size * 2)
+
+
+async def fetch_logs_range(
+    rpc_session: aiohttp.ClientSession,
+    to_topics: list[str],
+    start: int,
+    end: int,
+    window: AdaptiveBlockWindow,
+    rpc_slots: asyncio.Semaphore,
+) -> list[dict]:
+    """eth_getLogs for [start..end], split in halves while the provider refuses it."""
+    try:
+        async with rpc_slots:
+            # time the call only: waiting for a slot is not provider latency
+            started = time.monotonic()
+            logs = await rpc_with_retries(
+                lambda: rpc_get_logs(rpc_session, start, end, to_topics),
+                f"eth_getLogs {start}-{end}",
+                no_retry=(LogsRangeTooLargeError,),
+            )
+            elapsed = time.monotonic() - started
+    except LogsRangeTooLargeError:
+        if start >= end:
+            raise
+        window.shrink()
+        mid = (start + end) // 2
+        logging.info("eth_getLogs %d-%d too large; splitting (window=%d)", start, end, window.size)
+        left = await fetch_logs_range(rpc_session, to_topics, start, mid, window, rpc_slots)
+        right = await fetch_logs_range(rpc_session, to_topics, mid + 1, end, window, rpc_slots)
+        return left + right
+
+    window.observe(end - start + 1, elapsed)
+    return logs
+
+
+async def fetch_window_logs(
+    rpc_session: aiohttp.ClientSession,
+    addresses: list[str],
+    start: int,
+    end: int,
+    window: AdaptiveBlockWindow,
+    rpc_slots: asyncio.Semaphore,
+) -> list[dict]:
+    parts = await asyncio.gather(
+        *(
+            fetch_logs_range(
+                rpc_session,
+                [_encode_topic_address(a) for a in a_chunk],
+                start,
+                end,
+                window,
+                rpc_slots,
+            )
+            for a_chunk in _chunk(addresses, ADDRESS_CHUNK_SIZE)
+        )
+    )
+    logs_all = [lg for part in parts for lg in part]
+    logs_all.sort(key=lambda x: (_hex_to_int(x.get("blockNumber", "0x0")), _hex_to_int(x.get("logIndex", "0x0"))))
+    return logs_all
+
+
+async def persist_window_logs(
+    rpc_session: aiohttp.ClientSession,
+    logs: list[dict],
+    wallet_map: dict[str, tuple[int, int]],
+    platform_settlement_wallet_addresses: set[str],
+    *,
+    cursor_name: str | None,
+    cursor_block: int,
+) -> int:
+    transfers: list[ParsedTransfer] = []
+    block_times: dict[int, datetime] = {}
+
+    for lg in logs:
+        transfer = parse_transfer_log(lg, wallet_map)
+        if transfer is None:
+            continue
+
+        if is_internal_platform_payout_transfer(
+            from_address=transfer.from_lower,
+            to_address=transfer.to_lower,
+            wallet_map=wallet_map,
+            platform_settlement_wallet_addresses=platform_settlement_wallet_addresses,
+        ):
+            logging.info(
+                (
+                    "internal_platform_payout_ignored: "
+                    "reason=cached_platform_settlement_wallet_to_registered_user_wallet "
+                    "tx=%s li=%s from=%s to=%s amount=%s"
+                ),
+                transfer.tx_hash,
+                transfer.log_index,
+                transfer.from_lower,
+                transfer.to_lower,
+                str(transfer.amount),
+            )
+            continue
+
+        ts = _log_block_timestamp(lg)
+        if ts is not None:
+            block_times[transfer.block_number] = ts
+            remember_block_timestamp(transfer.block_number, ts)
+        transfers.append(transfer)
+
+    missing = [t.block_number for t in transfers if t.block_number not in block_times]
+    if missing:
+        try:
+            block_times.update(await get_block_timestamps_async(rpc_session, missing))
+        except Exception as e:
+            logging.warning("Failed to fetch block times for %d blocks: %s", len(set(missing)), e)
+
+    return await asyncio.to_thread(
+        db_insert_transfers_batch,
+        transfers,
+        block_times,
+        cursor_name=cursor_name,
+        cursor_block=cursor_block,
+    )
+
+
+async def run_backfill(
+    rpc_session: aiohttp.ClientSession,
+    addresses: list[str],
+    from_block: int,
+    to_block: int,
+    wallet_map: dict[str, tuple[int, int]],
+    platform_settlement_wallet_addresses: set[str],
+    *,
+    cursor_name: str | None,
+) -> tuple[int, int]:
+    """
+    Scan [from_block..to_block] for deposits to addresses.
+
+    Up to BSC_BACKFILL_CONCURRENCY windows are fetched at once, but they
+    are persisted strictly in block order, so the cursor only ever covers
+    a contiguous, fully inserted prefix. Returns (logs, inserted).
+    """
+    concurrency = max(1, int(settings.BSC_BACKFILL_CONCURRENCY))
+    window = AdaptiveBlockWindow.from_settings()
+    rpc_slots = asyncio.Semaphore(concurrency)
+    in_flight: deque[tuple[int, int, asyncio.Task]] = deque()
+
+    next_start = from_block
+    logs_total = 0
+    inserted_total = 0
+
+    try:
+        while in_flight or next_start <= to_block:
+            while next_start <= to_block and len(in_flight) < concurrency:
+                end = min(to_block, next_start + window.size - 1)
+                task = asyncio.create_task(
+                    fetch_window_logs(rpc_session, addresses, next_start, end, window, rpc_slots)
+                )
+                in_flight.append((next_start, end, task))
+                next_start = end + 1
+
+            start, end, task = in_flight.popleft()
+            logs = await task
+            inserted = await persist_window_logs(
+                rpc_session,
+                logs,
+                wallet_map,
+                platform_settlement_wallet_addresses,
+                cursor_name=cursor_name,
+                cursor_block=end,
+            )
+            logs_total += len(logs)
+            inserted_total += inserted
+            logging.info(
+                "Backfill window done: %d..%d (logs=%d inserted=%d next_window=%d)",
+                start,
+                end,
+                len(logs),
+                inserted,
+                window.size,
+            )
+    finally:
+        for _start, _end, task in in_flight:
+            task.cancel()
+        await asyncio.gather(*(task for _s, _e, task in in_flight), return_exceptions=True)
+
+    return logs_total, inserted_total
+
+
 async def backfill_on_start(
     wallet_map: dict[str, tuple[int, int]],
     platform_settlement_wallet_addresses: set[str],
@@ -573,7 +1051,6 @@ async def backfill_on_start(
             "eth_blockNumber (backfill start)",
         )
         buffer_blocks = int(getattr(settings, "BSC_REORG_BUFFER_BLOCKS", 20))
-        chunk_blocks = int(getattr(settings, "BSC_BACKFILL_CHUNK_BLOCKS", 2000))
         lookback_blocks = int(getattr(settings, "BSC_START_LOOKBACK_BLOCKS", 50000))
 
         to_block = max(0, int(latest_block) - buffer_blocks)
@@ -596,120 +1073,134 @@ async def backfill_on_start(
             await asyncio.to_thread(db_upsert_cursor, CURSOR_NAME, to_block, 0)
             return
 
-        block_time_cache: dict[int, datetime] = {}
-        addr_chunks = _chunk(addresses, 1000)
-
         logging.info("Backfill start: [%d..%d] (latest=%d, buffer=%d)", from_block, to_block, latest_block, buffer_blocks)
 
-        start = from_block
-        while start <= to_block:
-            end = min(to_block, start + chunk_blocks - 1)
+        logs_count, inserted = await run_backfill(
+            rpc_session,
+            addresses,
+            from_block,
+            to_block,
+            wallet_map,
+            platform_settlement_wallet_addresses,
+            cursor_name=CURSOR_NAME,
+        )
+        logging.info("Backfill done: %d..%d (logs=%d inserted=%d)", from_block, to_block, logs_count, inserted)
 
-            logs_all: list[dict] = []
-            for a_chunk in addr_chunks:
-                to_topics = [_encode_topic_address(a) for a in a_chunk]
-                part = await rpc_with_retries(
-                    lambda: rpc_get_logs(rpc_session, start, end, to_topics),
-                    f"eth_getLogs {start}-{end}",
-                )
-                logs_all.extend(part)
-
-            logs_all.sort(key=lambda x: (_hex_to_int(x.get("blockNumber", "0x0")), _hex_to_int(x.get("logIndex", "0x0"))))
-
-            for lg in logs_all:
-                await handle_log(
-                    lg,
-                    wallet_map,
-                    platform_settlement_wallet_addresses,
-                    rpc_session,
-                    block_time_cache,
-                    update_cursor_flag=False,
-                )
 
-            await asyncio.to_thread(db_upsert_cursor, CURSOR_NAME, end, 0)
-            logging.info("Backfill chunk done: %d..%d (logs=%d)", start, end, len(logs_all))
+@dataclass
+class CatchUpState:
+    """Addresses added since synced_block that still need eth_getLogs."""
 
-            start = end + 1
+    synced_block: int
+    pending: set[str] = field(default_factory=set)
 
 
-async def main():
-    reload_sec = int(getattr(settings, "BSC_WALLET_MAP_RELOAD_SEC", 60))
+async def catch_up_new_wallets(
+    rpc_session: aiohttp.ClientSession,
+    registry: WalletRegistry,
+    state: CatchUpState,
+) -> None:
+    """
+    Deposits to a new wallet that landed before it reached the registry
+    were dropped by the live stream; replay only those addresses from the
+    previous refresh head (minus the reorg buffer) to the current head.
+    """
+    latest_block = await rpc_get_latest_block(rpc_session)
 
-    wallet_map = load_wallet_map()
-    platform_settlement_wallet_addresses = load_active_platform_settlement_wallet_addresses()
-    last_addrs = set(wallet_map.keys())
-    last_settlement_addrs = set(platform_settlement_wallet_addresses)
+    if state.pending:
+        buffer_blocks = int(getattr(settings, "BSC_REORG_BUFFER_BLOCKS", 20))
+        addresses = sorted(state.pending)
+        from_block = max(0, state.synced_block - buffer_blocks)
+
+        # The shared cursor is owned by the live stream; leave it alone.
+        logs_count, inserted = await run_backfill(
+            rpc_session,
+            addresses,
+            from_block,
+            latest_block,
+            registry.wallet_map,
+            registry.settlement_addresses,
+            cursor_name=None,
+        )
 
-    # one-time backfill on startup
-    await backfill_on_start(wallet_map, platform_settlement_wallet_addresses)
+        logging.info(
+            "New wallets caught up: wallets=%d blocks=%d..%d logs=%d inserted=%d",
+            len(addresses),
+            from_block,
+            latest_block,
+            logs_count,
+            inserted,
+        )
+        state.pending.clear()
 
-    while True:
-        if not last_addrs:
-            logging.warning("No BSC wallets found in DB. Waiting for wallets...")
-            await asyncio.sleep(reload_sec)
-            wallet_map = load_wallet_map()
-            platform_settlement_wallet_addresses = load_active_platform_settlement_wallet_addresses()
-            last_addrs = set(wallet_map.keys())
-            last_settlement_addrs = set(platform_settlement_wallet_addresses)
-            continue
+    state.synced_block = latest_block
 
-        addresses = list(last_addrs)
-        chunks = _chunk(addresses, 1000)
 
-        tasks = [
-            asyncio.create_task(
-                subscribe_chunk(
-                    ch,
-                    wallet_map,
-                    platform_settlement_wallet_addresses,
-                )
-            )
-            for ch in chunks
-            if ch
-        ]
-        if not tasks:
+async def refresh_wallets_forever(
+    registry: WalletRegistry,
+    state: CatchUpState,
+    reload_sec: int,
+):
+    connector = aiohttp.TCPConnector(resolver=resolver.ThreadedResolver(), ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=20)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as rpc_session:
+        while True:
             await asyncio.sleep(reload_sec)
-            wallet_map = load_wallet_map()
-            platform_settlement_wallet_addresses = load_active_platform_settlement_wallet_addresses()
-            last_addrs = set(wallet_map.keys())
-            last_settlement_addrs = set(platform_settlement_wallet_addresses)
-            continue
 
-        try:
-            while True:
-                done, _pending = await asyncio.wait(tasks, timeout=reload_sec, return_when=asyncio.FIRST_EXCEPTION)
+            # Added to the live map first, so the stream covers everything
+            # after the catch-up's head and the two ranges overlap.
+            added = await asyncio.to_thread(registry.refresh)
+            if added:
+                logging.info(
+                    "Wallets added: %d (total=%d)",
+                    len(added),
+                    len(registry.wallet_map),
+                )
+                state.pending.update(added)
 
-                for t in done:
-                    exc = t.exception()
-                    if exc:
-                        raise exc
+            try:
+                await catch_up_new_wallets(rpc_session, registry, state)
+            except Exception as e:
+                # pending addresses and synced_block are kept for the next try
+                logging.warning("New wallet catch-up failed: %s", e)
 
-                new_map = load_wallet_map()
-                new_settlement_addrs = load_active_platform_settlement_wallet_addresses()
-                new_addrs = set(new_map.keys())
 
-                if new_addrs != last_addrs or new_settlement_addrs != last_settlement_addrs:
-                    logging.info(
-                        (
-                            "Wallet list changed: user addresses %d -> %d, "
-                            "settlement addresses %d -> %d. Reloading subscriptions..."
-                        ),
-                        len(last_addrs),
-                        len(new_addrs),
-                        len(last_settlement_addrs),
-                        len(new_settlement_addrs),
-                    )
-                    for t in tasks:
-                        t.cancel()
-                    await asyncio.gather(*tasks, return_exceptions=True)
-
-                    wallet_map = new_map
-                    platform_settlement_wallet_addresses = new_settlement_addrs
-                    last_addrs = new_addrs
-                    last_settlement_addrs = new_settlement_addrs
-                    break
-        finally:
-            pass
+async def main():
+    reload_sec = int(getattr(settings, "BSC_WALLET_MAP_RELOAD_SEC", 60))
+
+    registry = WalletRegistry()
+    await asyncio.to_thread(registry.refresh)
+
+    while not registry.wallet_map:
+        logging.warning("No BSC wallets found in DB. Waiting for wallets...")
+        await asyncio.sleep(reload_sec)
+        await asyncio.to_thread(registry.refresh)
+
+    connector = aiohttp.TCPConnector(resolver=resolver.ThreadedResolver(), ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as rpc_session:
+        head = await rpc_with_retries(
+            lambda: rpc_get_latest_block(rpc_session),
+            "eth_blockNumber (listener start)",
+        )
+    state = CatchUpState(synced_block=head)
+
+    # one-time backfill on startup
+    await backfill_on_start(registry.wallet_map, registry.settlement_addresses)
+
+    tasks = [
+        asyncio.create_task(subscribe_transfers(registry)),
+        asyncio.create_task(refresh_wallets_forever(registry, state, reload_sec)),
+    ]
+    try:
+        done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for t in done:
+            exc = t.exception()
+            if exc:
+                raise exc
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
@@ -11,6 +12,10 @@ from sqlalchemy import text as sa_text
 from app.config import settings
 from app.db import SessionLocal
 from app.models import WalletTransfer, UserWallet, User
+from app.settlement.bsc_block_headers import get_block_timestamp
+from app.settlement.bsc_gas_oracle import get_gas_price_wei
+from app.settlement.bsc_provider_pool import get_bsc_web3
+from app.settlement.nonce_manager import NonceLease, nonce_lease
 from app.settlement.statuses import (
     WALLET_TRANSFER_STATUS_PROCESSING,
     WALLET_TRANSFER_STATUS_WAITING_FOR_GAS,
@@ -51,7 +56,7 @@ def erc20_balance_of_data(addr: str) -> str:
 def get_w3() -> Web3:
     if not settings.BSC_RPC_URL:
         raise RuntimeError("BSC_RPC_URL is not set")
-    return Web3(Web3.HTTPProvider(settings.BSC_RPC_URL, request_kwargs={"timeout": 20}))
+    return get_bsc_web3()
 
 
 def pick_fee_wallet(compliance_status: str) -> tuple[str, str]:
@@ -74,8 +79,7 @@ def tx_receipt_status(w3: Web3, tx_hash: str) -> int | None:
 
 def get_block_time(w3: Web3, block_number: int) -> datetime | None:
     try:
-        b = w3.eth.get_block(block_number)
-        return datetime.fromtimestamp(int(b["timestamp"]), tz=timezone.utc)
+        return get_block_timestamp(w3, block_number)
     except Exception:
         return None
 
@@ -91,7 +95,7 @@ def withdraw_gas_alert_cooldown() -> timedelta:
 
 
 def native_tx_cost_wei(w3: Web3, *, gas_units: int = 21000) -> int:
-    return int(gas_units) * int(w3.eth.gas_price)
+    return int(gas_units) * get_gas_price_wei(w3)
 
 
 def waiting_for_gas_reason(compliance_status: str | None) -> str:
@@ -137,9 +141,57 @@ def clear_gas_waiting_state(tr: WalletTransfer) -> None:
     tr.next_retry_at = None
 
 
-def sign_and_send_raw(w3: Web3, priv_key_hex: str, tx: dict) -> str:
+# First key of the two-int advisory locks taken by this worker.
+SENDER_LOCK_NAMESPACE = "bsc-withdraw-sender"
+WALLET_LOCK_NAMESPACE = "bsc-withdraw-wallet"
+
+
+def lock_sender(db, address: str) -> None:
+    """
+    Serialize nonce read, signing and broadcast per sending address across
+    threads and replicas.
+
+    The pending nonce is read right before signing, so two senders from the
+    same address (a user wallet or a shared fee wallet) must not interleave
+    between get_transaction_count and send_raw_transaction. The lock is
+    transaction-scoped: the commit that records the tx hash releases it.
+    """
+    db.execute(
+        sa_text("SELECT pg_advisory_xact_lock(hashtext(:namespace), hashtext(:address))"),
+        {"namespace": SENDER_LOCK_NAMESPACE, "address": (address or "").strip().lower()},
+    )
+
+
+def try_claim_wallet(db, wallet_id: int) -> bool:
+    """
+    Session-level claim on a wallet's withdrawals; False while another
+    replica is working the wallet. Survives commits until release_wallet.
+    """
+    claimed = db.execute(
+        sa_text("SELECT pg_try_advisory_lock(hashtext(:namespace), hashtext(:wallet_id))"),
+        {"namespace": WALLET_LOCK_NAMESPACE, "wallet_id": str(int(wallet_id))},
+    ).scalar()
+    db.commit()
+    return bool(claimed)
+
+
+def release_wallet(db, wallet_id: int) -> None:
+    try:
+        db.rollback()
+        db.execute(
+            sa_text("SELECT pg_advisory_unlock(hashtext(:namespace), hashtext(:wallet_id))"),
+            {"namespace": WALLET_LOCK_NAMESPACE, "wallet_id": str(int(wallet_id))},
+        )
+        db.commit()
+    except Exception as exc:
+        # A session lock must not go back to the pool with the connection.
+        log.warning("Wallet %s claim release failed, dropping connection: %s", wallet_id, exc)
+        db.invalidate()
+
+
+def sign_and_send_raw(w3: Web3, priv_key_hex: str, tx: dict, *, lease: NonceLease) -> str:
     signed = w3.eth.account.sign_transaction(tx, private_key=priv_key_hex)
-    txh = w3.eth.send_raw_transaction(signed.raw_transaction)
+    txh = lease.send_raw(w3, signed.raw_transaction)
     return txh.hex()
 
 
@@ -167,7 +219,7 @@ def calc_gas_need_wei(
     amount_net: Decimal,
     fee_usdt: Decimal,
 ) -> int:
-    gas_price = int(w3.eth.gas_price)
+    gas_price = get_gas_price_wei(w3)
     fallback = int(settings.ERC20_TRANSFER_GAS_FALLBACK)
     buffer = Decimal(str(settings.WITHDRAW_GAS_BUFFER_MULT))
 
@@ -257,15 +309,18 @@ def rotate_blocked_wallet_if_empty(db, tr: WalletTransfer, w3: Web3):
     user.compliance_updated_at = utcnow()
 
 
-def process_one(tr_id: int):
+def process_one(tr_id: int, db=None):
     w3 = get_w3()
 
-    db = SessionLocal()
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
     try:
+        # another replica holding the row is processing it; skip
         tr = (
             db.query(WalletTransfer)
             .filter(WalletTransfer.id == tr_id)
-            .with_for_update()
+            .with_for_update(skip_locked=True)
             .first()
         )
         if not tr or tr.type != "withdraw":
@@ -344,7 +399,7 @@ def process_one(tr_id: int):
                 if topup_wei <= 0:
                     topup_wei = 0
 
-                gas_price = int(w3.eth.gas_price)
+                gas_price = get_gas_price_wei(w3)
                 native_send_cost_wei = 21000 * gas_price
                 required_fee_wallet_wei = int(topup_wei) + native_send_cost_wei
                 fee_wallet_balance_wei = int(w3.eth.get_balance(fee_addr))
@@ -379,17 +434,18 @@ def process_one(tr_id: int):
                     db.commit()
                     return
 
-                nonce_fee = w3.eth.get_transaction_count(fee_addr, "pending")
-                tx = {
-                    "chainId": CHAIN_ID_BSC,
-                    "to": user_addr,
-                    "value": int(topup_wei),
-                    "gas": 21000,
-                    "gasPrice": gas_price,
-                    "nonce": nonce_fee,
-                }
                 try:
-                    txh = sign_and_send_raw(w3, fee_priv, tx)
+                    lock_sender(db, fee_addr)
+                    with nonce_lease(w3, fee_addr) as lease:
+                        tx = {
+                            "chainId": CHAIN_ID_BSC,
+                            "to": user_addr,
+                            "value": int(topup_wei),
+                            "gas": 21000,
+                            "gasPrice": gas_price,
+                            "nonce": lease.nonce,
+                        }
+                        txh = sign_and_send_raw(w3, fee_priv, tx, lease=lease)
                     tr.gas_tx_hash = txh
                     clear_gas_waiting_state(tr)
                     db.commit()
@@ -435,8 +491,7 @@ def process_one(tr_id: int):
             dec = Decimal(settings.BSC_USDT_DECIMALS)
             net_wei = int(amount_net * (Decimal(10) ** dec))
 
-            gas_price = int(w3.eth.gas_price)
-            nonce_user = w3.eth.get_transaction_count(user_addr, "pending")
+            gas_price = get_gas_price_wei(w3)
             data = erc20_transfer_data(to_addr, net_wei)
 
             # gas limit (estimate or fallback)
@@ -474,17 +529,19 @@ def process_one(tr_id: int):
                 db.commit()
                 return
 
-            tx = {
-                "chainId": CHAIN_ID_BSC,
-                "to": usdt,
-                "value": 0,
-                "gas": gas_limit,
-                "gasPrice": gas_price,
-                "nonce": nonce_user,
-                "data": data,
-            }
             try:
-                txh = sign_and_send_raw(w3, user_priv, tx)
+                lock_sender(db, user_addr)
+                with nonce_lease(w3, user_addr) as lease:
+                    tx = {
+                        "chainId": CHAIN_ID_BSC,
+                        "to": usdt,
+                        "value": 0,
+                        "gas": gas_limit,
+                        "gasPrice": gas_price,
+                        "nonce": lease.nonce,
+                        "data": data,
+                    }
+                    txh = sign_and_send_raw(w3, user_priv, tx, lease=lease)
                 tr.tx_hash = txh
                 tr.error = None
                 db.commit()
@@ -512,8 +569,7 @@ def process_one(tr_id: int):
             dec = Decimal(settings.BSC_USDT_DECIMALS)
             fee_wei = int(fee_usdt * (Decimal(10) ** dec))
 
-            gas_price = int(w3.eth.gas_price)
-            nonce_user = w3.eth.get_transaction_count(user_addr, "pending")
+            gas_price = get_gas_price_wei(w3)
             data = erc20_transfer_data(fee_addr, fee_wei)
 
             try:
@@ -550,17 +606,19 @@ def process_one(tr_id: int):
                 db.commit()
                 return
 
-            tx = {
-                "chainId": CHAIN_ID_BSC,
-                "to": usdt,
-                "value": 0,
-                "gas": gas_limit,
-                "gasPrice": gas_price,
-                "nonce": nonce_user,
-                "data": data,
-            }
             try:
-                txh = sign_and_send_raw(w3, user_priv, tx)
+                lock_sender(db, user_addr)
+                with nonce_lease(w3, user_addr) as lease:
+                    tx = {
+                        "chainId": CHAIN_ID_BSC,
+                        "to": usdt,
+                        "value": 0,
+                        "gas": gas_limit,
+                        "gasPrice": gas_price,
+                        "nonce": lease.nonce,
+                        "data": data,
+                    }
+                    txh = sign_and_send_raw(w3, user_priv, tx, lease=lease)
                 tr.fee_tx_hash = txh
                 tr.error = None
                 db.commit()
@@ -598,15 +656,21 @@ def process_one(tr_id: int):
     except Exception as e:
         log.exception("Withdraw worker crashed on transfer %s: %s", tr_id, e)
     finally:
-        db.close()
+        if own_session:
+            db.close()
+        else:
+            # early returns leave the row lock open; the next transfer of
+            # the group must start from a clean transaction
+            db.rollback()
 
 
-def load_processing_ids(limit: int = 50) -> list[int]:
+def load_processing_targets(limit: int = 50) -> list[tuple[int, int]]:
+    """(transfer_id, wallet_id) of due withdrawals, oldest first."""
     db = SessionLocal()
     try:
         now = utcnow()
         rows = (
-            db.query(WalletTransfer.id)
+            db.query(WalletTransfer.id, WalletTransfer.wallet_id)
             .filter(WalletTransfer.type == "withdraw")
             .filter(
                 (
@@ -624,21 +688,68 @@ def load_processing_ids(limit: int = 50) -> list[int]:
             .limit(limit)
             .all()
         )
-        return [int(r[0]) for r in rows]
+        return [(int(r[0]), int(r[1])) for r in rows]
     finally:
         db.close()
 
 
-async def main_loop():
-    while True:
+def group_by_wallet(targets: list[tuple[int, int]]) -> list[tuple[int, list[int]]]:
+    """(wallet_id, transfer ids), keeping the oldest-first order inside each group."""
+    groups: dict[int, list[int]] = {}
+    for tr_id, wallet_id in targets:
+        groups.setdefault(wallet_id, []).append(tr_id)
+    return list(groups.items())
+
+
+def process_wallet_group(wallet_id: int, tr_ids: list[int]) -> None:
+    # One wallet's withdrawals share its nonce and balance: keep them in
+    # order, and let only the replica holding the wallet claim work them.
+    db = SessionLocal()
+    try:
+        if not try_claim_wallet(db, wallet_id):
+            log.info("Wallet %s is being processed by another replica; skipping", wallet_id)
+            return
         try:
-            ids = await asyncio.to_thread(load_processing_ids, 50)
-            for tr_id in ids:
-                await asyncio.to_thread(process_one, tr_id)
-        except Exception as e:
-            log.error("Withdrawal main loop error: %s", e)
+            for tr_id in tr_ids:
+                process_one(tr_id, db)
+        finally:
+            release_wallet(db, wallet_id)
+    finally:
+        db.close()
+
+
+async def process_batch(
+    targets: list[tuple[int, int]],
+    executor: ThreadPoolExecutor,
+) -> None:
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(executor, process_wallet_group, wallet_id, tr_ids)
+        for wallet_id, tr_ids in group_by_wallet(targets)
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            log.error("Withdrawal wallet group failed: %s", result)
+
+
+async def main_loop():
+    concurrency = max(1, int(settings.WITHDRAW_CONCURRENCY))
+    batch_size = max(1, int(settings.WITHDRAW_BATCH_SIZE))
+
+    with ThreadPoolExecutor(
+        max_workers=concurrency,
+        thread_name_prefix="withdraw",
+    ) as executor:
+        while True:
+            try:
+                targets = await asyncio.to_thread(load_processing_targets, batch_size)
+                if targets:
+                    await process_batch(targets, executor)
+            except Exception as e:
+                log.error("Withdrawal main loop error: %s", e)
 
-        await asyncio.sleep(5)
+            await asyncio.sleep(5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Callable, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.email_outbox import (
+    claim_due,
+    expire_stale,
+    is_message_error,
+    is_session_refusal,
+    mark_failed,
+    mark_sent,
+    release,
+    retry_delay_sec,
+    utcnow,
+)
+from app.emails import SmtpSender, deliver_email
+
+log = logging.getLogger("workers.email_delivery_worker")
+
+
+@dataclass
+class DeliveryCounters:
+    claimed: int = 0
+    sent: int = 0
+    retry: int = 0
+    failed: int = 0
+    released: int = 0
+    expired: int = 0
+    session_refused: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def deliver_batch(
+    sender: SmtpSender,
+    *,
+    batch_size: int | None = None,
+    lease_sec: int | None = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+    deliver: Callable[..., None] = deliver_email,
+    refusal_backoff_sec: int | None = None,
+) -> DeliveryCounters:
+    """
+    Claim a batch of due messages, send them over the shared SMTP
+    session, then record every outcome in one transaction. A
+    connection-level failure stops the batch and puts the unsent rest
+    back without using up their attempts. When the relay refuses the
+    sender or the credentials, the failing message goes back too (the
+    fault is the relay configuration, not the message) and the released
+    rows are not due again for refusal_backoff_sec. Rows past
+    EMAIL_OUTBOX_MAX_AGE_SEC are failed before claiming.
+    """
+    batch_size = max(1, int(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE))
+    lease_sec = max(1, int(lease_sec or settings.EMAIL_OUTBOX_LEASE_SEC))
+    counters = DeliveryCounters()
+
+    db = session_factory()
+    try:
+        now = utcnow()
+        counters.expired = expire_stale(db, now=now)
+        messages = claim_due(db, now=now, limit=batch_size, lease_sec=lease_sec)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    counters.claimed = len(messages)
+    if not messages:
+        return counters
+
+    outcomes: list[tuple] = []
+    unsent = []
+    for i, message in enumerate(messages):
+        try:
+            deliver(message.to_email, message.subject, message.html_body, smtp_sender=sender)
+        except Exception as exc:
+            if is_session_refusal(exc):
+                log.error("SMTP relay refused the session, releasing the batch: %s", exc)
+                sender.close()
+                counters.session_refused = True
+                unsent = messages[i:]
+                break
+            log.warning("Email %s to %s failed: %s", message.id, message.to_email, exc)
+            outcomes.append((message, exc))
+            if not is_message_error(exc):
+                sender.close()
+                unsent = messages[i + 1:]
+                break
+            continue
+        outcomes.append((message, None))
+
+    db = session_factory()
+    try:
+        now = utcnow()
+        for message, exc in outcomes:
+            if exc is None:
+                mark_sent(db, message, now=now)
+                counters.sent += 1
+            elif mark_failed(db, message, exc, now=now) == "failed":
+                counters.failed += 1
+            else:
+                counters.retry += 1
+        retry_at = None
+        if counters.session_refused:
+            backoff_sec = refusal_backoff_sec if refusal_backoff_sec is not None else retry_delay_sec(1)
+            retry_at = now + timedelta(seconds=backoff_sec)
+        for message in unsent:
+            release(db, message, retry_at=retry_at)
+            counters.released += 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return counters
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Deliver queued email from email_outbox.")
+    parser.add_argument("--run-once", action="store_true", help="Deliver one batch and exit.")
+    parser.add_argument(
+        "--sleep-sec",
+        type=float,
+        default=float(settings.EMAIL_OUTBOX_POLL_SEC),
+        help="Sleep interval in loop mode when the queue is drained.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    args = build_arg_parser().parse_args(argv)
+
+    if args.sleep_sec <= 0:
+        raise SystemExit("--sleep-sec must be > 0")
+
+    batch_size = max(1, int(settings.EMAIL_OUTBOX_BATCH_SIZE))
+    sender = SmtpSender()
+    refusals = 0
+
+    try:
+        while True:
+            try:
+                counters = deliver_batch(
+                    sender,
+                    batch_size=batch_size,
+                    refusal_backoff_sec=retry_delay_sec(refusals + 1),
+                )
+            except Exception:
+                log.exception("Email delivery batch failed")
+                sender.close()
+                counters = DeliveryCounters()
+
+            if counters.claimed or counters.expired:
+                log.info("Email delivery batch complete: %s", counters.to_dict())
+
+            if args.run_once:
+                return
+
+            if counters.session_refused:
+                # Bad credentials or sender: do not re-AUTH every poll. The
+                # released rows wait out the same delay.
+                refusals += 1
+                time.sleep(retry_delay_sec(refusals))
+                continue
+            refusals = 0
+
+            # A full clean batch means more may be due: go again at once.
+            if counters.claimed >= batch_size and counters.sent == counters.claimed:
+                continue
+
+            if not counters.claimed:
+                # Do not hold an idle session open against the relay.
+                sender.close()
+            time.sleep(float(args.sleep_sec))
+    finally:
+        sender.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,9 @@ from web3 import Web3
 from app.config import settings
 from app.db import SessionLocal
 from app.models import FeeWalletSwap
+from app.settlement.bsc_gas_oracle import get_gas_price_wei
+from app.settlement.bsc_provider_pool import get_bsc_web3
+from app.settlement.nonce_manager import NonceLease, nonce_lease
 from app.settlement.statuses import (
     FEE_WALLET_SWAP_STATUS_FAILED,
     FEE_WALLET_SWAP_STATUS_SKIPPED,
@@ -284,11 +287,7 @@ def get_w3() -> Web3:
     if not settings.BSC_RPC_URL:
         raise RuntimeError("BSC_RPC_URL is not set")
 
-    w3 = Web3(Web3.HTTPProvider(settings.BSC_RPC_URL, request_kwargs={"timeout": 30}))
-    if not w3.is_connected():
-        raise RuntimeError("Web3 provider is not connected")
-
-    return w3
+    return get_bsc_web3()
 
 
 def checksum(addr: str) -> str:
@@ -390,7 +389,7 @@ def build_tx_params(w3: Web3, from_address: str, nonce: int) -> dict[str, Any]:
         "from": from_address,
         "nonce": nonce,
         "chainId": int(w3.eth.chain_id),
-        "gasPrice": int(w3.eth.gas_price),
+        "gasPrice": get_gas_price_wei(w3),
     }
 
 
@@ -411,10 +410,14 @@ def sign_send_wait(
     tx: dict[str, Any],
     label: str,
     timeout: int = 300,
+    lease: NonceLease | None = None,
 ) -> Any:
     signed = w3.eth.account.sign_transaction(tx, private_key=private_key)
     raw = getattr(signed, "raw_transaction", None) or getattr(signed, "rawTransaction", None)
-    tx_hash = w3.eth.send_raw_transaction(raw)
+    if lease is not None:
+        tx_hash = lease.send_raw(w3, raw)
+    else:
+        tx_hash = w3.eth.send_raw_transaction(raw)
     log.info("%s tx sent: %s", label, tx_hash.hex())
 
     receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
@@ -545,26 +548,26 @@ def process_fee_wallet(wallet_type: str) -> None:
         allowance = int(usdt.functions.allowance(wallet_address, router_address).call())
 
         total_gas_spent = Decimal("0")
-        nonce = int(w3.eth.get_transaction_count(wallet_address))
 
         if allowance < amount_to_swap_units:
             approve_fn = usdt.functions.approve(router_address, amount_to_swap_units)
-            approve_tx = build_contract_tx_with_gas(
-                w3=w3,
-                fn=approve_fn,
-                from_address=wallet_address,
-                nonce=nonce,
-                fallback_gas=APPROVE_GAS_FALLBACK,
-            )
+            with nonce_lease(w3, wallet_address, block_identifier=None) as lease:
+                approve_tx = build_contract_tx_with_gas(
+                    w3=w3,
+                    fn=approve_fn,
+                    from_address=wallet_address,
+                    nonce=lease.nonce,
+                    fallback_gas=APPROVE_GAS_FALLBACK,
+                )
 
-            approve_receipt = sign_send_wait(
-                w3=w3,
-                private_key=private_key,
-                tx=approve_tx,
-                label=f"approve {wallet_type}",
-            )
+                approve_receipt = sign_send_wait(
+                    w3=w3,
+                    private_key=private_key,
+                    tx=approve_tx,
+                    label=f"approve {wallet_type}",
+                    lease=lease,
+                )
             total_gas_spent += gas_cost_bnb(approve_receipt)
-            nonce += 1
 
         deadline = int(time.time()) + 20 * 60
 
@@ -576,20 +579,23 @@ def process_fee_wallet(wallet_type: str) -> None:
             deadline,
         )
 
-        swap_tx = build_contract_tx_with_gas(
-            w3=w3,
-            fn=swap_fn,
-            from_address=wallet_address,
-            nonce=nonce,
-            fallback_gas=SWAP_GAS_FALLBACK,
-        )
+        # The approve above is mined by now, so a fresh lease is next in line.
+        with nonce_lease(w3, wallet_address, block_identifier=None) as lease:
+            swap_tx = build_contract_tx_with_gas(
+                w3=w3,
+                fn=swap_fn,
+                from_address=wallet_address,
+                nonce=lease.nonce,
+                fallback_gas=SWAP_GAS_FALLBACK,
+            )
 
-        swap_receipt = sign_send_wait(
-            w3=w3,
-            private_key=private_key,
-            tx=swap_tx,
-            label=f"swap {wallet_type}",
-        )
+            swap_receipt = sign_send_wait(
+                w3=w3,
+                private_key=private_key,
+                tx=swap_tx,
+                label=f"swap {wallet_type}",
+                lease=lease,
+            )
         total_gas_spent += gas_cost_bnb(swap_receipt)
 
         bnb_after_wei = int(w3.eth.get_balance(wallet_address))
@@ -192,6 +192,11 @@ class MockAllocationExecutionClient:
         }
 
     def _instrument_info(self, params: dict[str, Any]) -> dict[str, Any]:
+        if not params.get("symbol"):
+            # Category bulk load: answer empty so lookups fall back to the
+            # per-symbol mock rows below.
+            return {"retCode": 0, "retMsg": "OK", "result": {"list": []}}
+
         symbol = str(params["symbol"]).upper()
         category = str(params["category"]).lower()
 
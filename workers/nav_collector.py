@@ -7,7 +7,10 @@ import sys
 
 from dotenv import load_dotenv
 
-from app.navcalc.collector import run_collector_forever
+from app.navcalc.collector import (
+    run_collector_forever,
+    run_multi_fund_collector_forever,
+)
 from app.navcalc.exceptions import NavConfigError
 from app.navcalc.schemas import FundNavConfig
 
@@ -95,14 +98,36 @@ def build_fund_nav_config(fund_code: str) -> FundNavConfig:
     )
 
 
+def build_enabled_fund_nav_configs() -> list[FundNavConfig]:
+    return [
+        cfg
+        for cfg in (
+            build_fund_nav_config(fund_code)
+            for fund_code in SUPPORTED_FUNDS
+        )
+        if cfg.enabled
+    ]
+
+
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run Wild Boar NAV collector for one fund.")
-    parser.add_argument(
+    parser = argparse.ArgumentParser(description="Run Wild Boar NAV collector.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
         "--fund-code",
-        required=True,
         choices=sorted(SUPPORTED_FUNDS.keys()),
         help="Fund code to collect NAV for.",
     )
+    target.add_argument(
+        "--all-funds",
+        action="store_true",
+        help="Collect NAV for every enabled fund from one process.",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Endpoint pool size for --all-funds (default NAV_COLLECTOR_MAX_WORKERS).",
+    )
     return parser.parse_args()
 
 
@@ -110,6 +135,25 @@ def main() -> int:
     load_dotenv()
 
     args = parse_args()
+
+    if args.all_funds:
+        cfgs = build_enabled_fund_nav_configs()
+
+        if not cfgs:
+            log.info("NAV collector has no enabled funds. Exit without writing data.")
+            return 0
+
+        log.info(
+            "Starting multi-fund NAV collector worker funds=%s",
+            ",".join(cfg.fund_code for cfg in cfgs),
+        )
+
+        run_multi_fund_collector_forever(
+            cfgs,
+            max_workers=args.max_workers,
+        )
+        return 0
+
     cfg = build_fund_nav_config(args.fund_code)
 
     if not cfg.enabled:
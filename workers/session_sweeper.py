@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models import SessionModel
+
+log = logging.getLogger("workers.session_sweeper")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def delete_expired_batch(db: Session, *, now: datetime, batch_size: int) -> int:
+    """
+    Delete up to batch_size expired sessions along idx_sessions_expires_at.
+    SKIP LOCKED keeps a second sweeper (or a racing logout) from waiting.
+    """
+    expired_ids = (
+        select(SessionModel.id)
+        .where(SessionModel.expires_at < now)
+        .order_by(SessionModel.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(SessionModel)
+        .where(SessionModel.id.in_(expired_ids))
+        .execution_options(synchronize_session=False)
+    )
+    return int(result.rowcount or 0)
+
+
+def sweep_expired_sessions(
+    *,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    pause_sec: float | None = None,
+    session_factory=SessionLocal,
+) -> int:
+    """
+    Prune expired sessions in small committed batches so no single
+    statement holds many row locks or bloats one transaction.
+    """
+    batch_size = max(1, int(batch_size or settings.SESSION_SWEEP_BATCH_SIZE))
+    max_batches = max(1, int(max_batches or settings.SESSION_SWEEP_MAX_BATCHES))
+    pause_sec = float(settings.SESSION_SWEEP_BATCH_PAUSE_SEC if pause_sec is None else pause_sec)
+
+    now = utcnow()
+    total = 0
+
+    for _ in range(max_batches):
+        db = session_factory()
+        try:
+            deleted = delete_expired_batch(db, now=now, batch_size=batch_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        total += deleted
+        if deleted < batch_size:
+            break
+
+        if pause_sec > 0:
+            time.sleep(pause_sec)
+
+    return total
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Delete expired login sessions in batches.")
+    parser.add_argument("--run-once", action="store_true", help="Run one sweep and exit.")
+    parser.add_argument(
+        "--sleep-sec",
+        type=int,
+        default=int(settings.SESSION_SWEEP_INTERVAL_SEC),
+        help="Sleep interval in loop mode.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    args = build_arg_parser().parse_args(argv)
+
+    if args.sleep_sec < 1:
+        raise SystemExit("--sleep-sec must be >= 1")
+
+    while True:
+        try:
+            deleted = sweep_expired_sessions()
+            log.info("Session sweep complete: deleted=%s", deleted)
+        except Exception:
+            log.exception("Session sweep failed")
+
+        if args.run_once:
+            return
+
+        time.sleep(int(args.sleep_sec))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import requests
 from web3 import Web3
 
 from app.config import settings
+from app.settlement.bsc_provider_pool import get_bsc_web3
+from app.settlement.gas_service import get_bnb_usd_price
 
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -14,24 +16,11 @@ if sys.platform.startswith("win"):
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 log = logging.getLogger("telegram_fee_wallet_watchdog")
 
-ABI_ROUTER = [
-    {
-        "name": "getAmountsOut",
-        "type": "function",
-        "stateMutability": "view",
-        "inputs": [
-            {"name": "amountIn", "type": "uint256"},
-            {"name": "path", "type": "address[]"},
-        ],
-        "outputs": [{"name": "", "type": "uint256[]"}],
-    }
-]
-
 
 def get_w3() -> Web3:
     if not settings.BSC_RPC_URL:
         raise RuntimeError("BSC_RPC_URL is not set")
-    return Web3(Web3.HTTPProvider(settings.BSC_RPC_URL, request_kwargs={"timeout": 20}))
+    return get_bsc_web3()
 
 
 def send_telegram(text: str):
@@ -52,28 +41,9 @@ def bnb_balance(w3: Web3, addr: str) -> Decimal:
     return Decimal(wei) / (Decimal(10) ** 18)
 
 
-def bnb_price_usdt(w3: Web3) -> Decimal:
-    if not settings.PANCAKE_ROUTER_V2 or not settings.WBNB_ADDRESS or not settings.USDT_BSC_ADDRESS:
-        raise RuntimeError("Pancake quote config missing")
-
-    router = w3.eth.contract(
-        address=Web3.to_checksum_address(settings.PANCAKE_ROUTER_V2),
-        abi=ABI_ROUTER,
-    )
-
-    one_bnb = int(Decimal(10) ** 18)
-    path = [
-        Web3.to_checksum_address(settings.WBNB_ADDRESS),
-        Web3.to_checksum_address(settings.USDT_BSC_ADDRESS),
-    ]
-    amounts = router.functions.getAmountsOut(one_bnb, path).call()
-    out = int(amounts[-1])
-    return Decimal(out) / (Decimal(10) ** Decimal(settings.BSC_USDT_DECIMALS))
-
-
 def run_check_once():
     w3 = get_w3()
-    price = bnb_price_usdt(w3)
+    price = get_bnb_usd_price(w3)
     thr = Decimal(str(settings.BNB_ALERT_THRESHOLD_USD))
 
     wallets = [